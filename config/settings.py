@@ -17,12 +17,53 @@ YOLO_MODEL = "C:/Users/GiapHue04/Desktop/yolo/Ai-yolo/models/trained/giapzech3/w
 CONFIDENCE_THRESHOLD = 0.5  # Tăng nhẹ từ 0.5 -> 0.55 để giảm False Positive
 IOU_THRESHOLD = 0.35
 PERSON_CLASS_ID = 0  # Class ID for "person" in COCO dataset
+INFERENCE_IMGSZ = 640  # Kích thước ảnh đầu vào của model
+WARMUP_ITERATIONS = 3  # Số lần inference giả khi khởi động model (0 = chỉ load)
+# Biến thể model (xem src/core/model_registry.py): "auto" = nhanh nhất đã đo trên
+# thiết bị hiện tại, "pt" = file gốc, hoặc "fused", "half", "onnx", "torchscript", "int8"
+MODEL_VARIANT = os.getenv("MODEL_VARIANT", "auto")
+
+# Tiled Inference (SAHI) - cho frame độ phân giải cao / đám đông dày
+TILED_INFERENCE = False
+TILE_SIZE = 640  # Kích thước cạnh mỗi tile (pixels)
+TILE_OVERLAP = 0.2  # Tỉ lệ chồng lấn giữa hai tile liền kề
+TILE_INCLUDE_FULL_FRAME = True  # Thêm một lượt toàn frame để bắt người lớn
+TILE_MERGE_METRIC = "ios"  # "ios" (giao/box nhỏ) hoặc "iou" khi gộp giữa các tile
+TILE_MERGE_THRESHOLD = 0.5
 
 # Detection Filter (để debug khi cần)
 MIN_DETECTION_AREA = 800  # Diện tích tối thiểu (pixels²) - có thể dùng sau
 MIN_DETECTION_WIDTH = 25  # Chiều rộng tối thiểu
 MIN_DETECTION_HEIGHT = 50  # Chiều cao tối thiểu
 
+# Region of Interest Configuration (theo từng nguồn video)
+# Key là camera index hoặc đường dẫn video; toạ độ pixel hoặc tỉ lệ 0-1, ví dụ:
+# {0: {"roi": [(0.2, 0), (0.8, 0), (0.8, 1), (0.2, 1)],
+#      "exclusions": [[(0.2, 0), (0.4, 0), (0.4, 0.3), (0.2, 0.3)]]}}
+ROI_CONFIG = {}
+
+# Vạch đếm vào/ra và vùng đếm người (theo từng nguồn video, cần bật tracking)
+# Hướng "in" của vạch là sang phía bên phải khi đi từ điểm đầu tới điểm cuối, ví dụ:
+# {0: {"lines": {"cua_chinh": [(0, 0.5), (1, 0.5)]},
+#      "zones": {"quay_thu_ngan": {"polygon": [(0, 0), (0.4, 0), (0.4, 1), (0, 1)],
+#                                  "max_count": 5}}}}
+ZONE_CONFIG = {}
+
+# Motion Gating - bỏ qua inference khi khung hình không thay đổi
+MOTION_GATE_ENABLED = False
+MOTION_THRESHOLD = 0.002  # Tỉ lệ pixel thay đổi tối thiểu để chạy lại inference
+MOTION_PIXEL_DELTA = 25  # Chênh lệch độ sáng (0-255) để coi pixel là thay đổi
+MOTION_DOWNSCALE_WIDTH = 160  # Chiều rộng frame khi so sánh
+MOTION_REFRESH_INTERVAL = 30  # Số frame bỏ qua tối đa trước khi bắt buộc inference
+
+# Tracking - gán ID cố định cho từng người qua các frame (SORT/ByteTrack)
+TRACKING_ENABLED = True
+TRACK_MAX_AGE = 30  # Số frame giữ track khi không còn phát hiện được
+TRACK_MIN_HITS = 3  # Số frame liên tiếp để xác nhận một người mới
+TRACK_IOU_THRESHOLD = 0.3  # IoU tối thiểu để ghép detection với track
+TRACK_HIGH_CONFIDENCE = 0.6  # Detection thấp hơn chỉ dùng để nối track cũ
+TRACK_MATCHING = "hungarian"  # "hungarian" (cần scipy) hoặc "greedy"
+
 # Video/Camera Configuration
 DEFAULT_CAMERA_INDEX = 0
 VIDEO_WIDTH = 640
@@ -32,26 +73,70 @@ FPS = 30
 # Display Configuration
 BOUNDING_BOX_COLOR = (0, 255, 0)  # Green
 TEXT_COLOR = (255, 255, 255)      # White
+LINE_COLOR = (0, 165, 255)        # Orange
+ZONE_COLOR = (255, 255, 0)        # Cyan
 FONT_SCALE = 0.7
 FONT_THICKNESS = 2
 
+# Count Smoothing - số người "báo cáo" ổn định bên cạnh số người thô
+COUNT_SMOOTHING = "median"  # "median", "ema", "mode" hoặc None để tắt
+COUNT_SMOOTHING_WINDOW = 5  # Số frame của cửa sổ (median/mode)
+COUNT_SMOOTHING_ALPHA = 0.3  # Hệ số EMA
+COUNT_HYSTERESIS = 0.6  # Độ lệch tối thiểu (số người) để đổi số báo cáo
+COUNT_HOLD_FRAMES = 3  # Median/mode: số frame liên tiếp giữ thay đổi nhỏ (<= ceil(hysteresis)) trước khi báo cáo
+
 # Alert System Configuration
 MAX_PERSON_COUNT = 10
 ALERT_ENABLED = True
 ALERT_COOLDOWN = 5  # seconds
+ALERT_COUNT_KEY = "reported_count"  # "reported_count" (làm mượt) hoặc "current_count"
 
 # Data Logging Configuration
 SAVE_TO_CSV = True
 CSV_FILENAME = "person_count_data.csv"
 SAVE_INTERVAL = 1  # seconds
+LOG_COUNT_KEY = "current_count"  # Chuỗi số liệu ghi vào cột person_count
+HISTORY_CACHE_RECORDS = 10000  # Số record gần nhất của file CSV giữ trong bộ nhớ cho /history
+HISTORY_INDEX_STRIDE = 1000  # Cứ N dòng ghi một mốc byte offset để đọc khoảng cũ từ file
+
+# Rollup theo thời gian: (độ dài bucket giây, số bucket giữ lại)
+# Mặc định: 2 phút theo giây, 3 giờ theo phút, 7 ngày theo giờ, 90 ngày theo ngày
+ROLLUP_RESOLUTIONS = [(1, 120), (60, 180), (3600, 168), (86400, 90)]
 DATA_DIR = DATA_ROOT / "processed"
 
 # Output Configuration
 OUTPUT_REPORTS_DIR = OUTPUT_ROOT / "reports"
+OUTPUT_PROFILES_DIR = OUTPUT_ROOT / "profiles"  # File collapsed-stack/speedscope
 
 # Model Configuration
 MODEL_PRETRAINED_DIR = MODELS_ROOT / "pretrained"
 MODEL_TRAINED_DIR = MODELS_ROOT / "trained"
+MODEL_CACHE_DIR = MODELS_ROOT / "cache"  # Biến thể dẫn xuất, theo hash nội dung file gốc
+MODEL_BENCHMARK_RUNS = 20  # Số lần inference khi đo tốc độ một biến thể
+
+# INT8 Quantization (biến thể "int8", scripts/quantize_model.py)
+QUANT_DATA_YAML = PROJECT_ROOT / "datasets" / "person" / "data.yaml"
+# Tên class (names trong data.yaml) có label được tính là người khi đo độ chính xác;
+# dataset Roboflow có hai class '1' và 'person', đều là người
+DATASET_PERSON_NAMES = ("1", "person")
+QUANT_CALIBRATION_SPLIT = "train"  # Split lấy ảnh hiệu chỉnh
+QUANT_CALIBRATION_IMAGES = 300  # Số ảnh hiệu chỉnh (chọn ngẫu nhiên theo seed)
+QUANT_CALIBRATION_METHOD = "minmax"  # "minmax", "entropy" hoặc "percentile"
+QUANT_EVAL_SPLIT = "val"  # Split đo độ chính xác trước/sau quantize
+QUANT_EVAL_IMAGES = 1000  # Số ảnh đánh giá (0 = cả split)
+QUANT_MAX_MAP_DROP = 0.01  # mAP@0.5 giảm tối đa để INT8 được PersonDetector dùng
+QUANT_SEED = 0
+
+# Accuracy Evaluation (scripts/evaluate_accuracy.py)
+EVAL_DATA_YAML = QUANT_DATA_YAML
+EVAL_SPLIT = "val"  # Split có label dùng để đánh giá
+EVAL_IMAGES = 0  # Số ảnh đánh giá (0 = cả split)
+EVAL_VARIANTS = ("pt",)  # Biến thể model (backend) được quét
+EVAL_IMGSZ = (320, 480, 640)  # Kích thước inference được quét
+EVAL_IOU_THRESHOLDS = (0.35, 0.45, 0.6, 0.7)  # Ngưỡng IoU của NMS được quét
+EVAL_CONFIDENCES = tuple(round(0.05 * i, 2) for i in range(2, 19))  # 0.10 → 0.90
+EVAL_MATCH_IOU = 0.5  # IoU tối thiểu để prediction khớp ground truth
+EVAL_CACHE_DIR = DATA_ROOT / "cache" / "predictions"  # Prediction đã chạy, theo cấu hình
 
 # UI Configuration (for future UI development)
 UI_THEME = "dark"
@@ -62,6 +147,64 @@ UI_REFRESH_RATE = 30  # FPS
 MAX_FPS = 60
 ENABLE_GPU = True
 BATCH_SIZE = 1
+PIPELINE_ENABLED = True  # Chạy detect/vẽ/hiển thị song song trên các thread riêng
+PIPELINE_QUEUE_SIZE = 2  # Số frame tối đa chờ giữa hai giai đoạn
+INFERENCE_WORKERS = 0  # Số process chạy inference (0 = chạy trong process chính)
+INFERENCE_POOL_SLOTS = None  # Số slot frame trong shared memory (None = 2 × workers)
+INFERENCE_MAX_FRAME_SHAPE = (1080, 1920, 3)  # Kích thước frame lớn nhất (h, w, c)
+INFERENCE_POOL_TIMEOUT = 30  # Thời gian chờ tối đa slot trống/kết quả một frame (giây)
+FPS_WINDOW = 30  # Số frame gần nhất dùng để tính FPS tức thời
+OFFLINE_WORKERS = None  # Số process xử lý video offline (None = số CPU)
+OFFLINE_CHUNK_SECONDS = 60  # Độ dài mỗi đoạn video giao cho một process
+OFFLINE_BATCH_SIZE = 8  # Số frame mỗi lần gọi model khi xử lý offline
+OFFLINE_FRAME_STEP = 1  # Chỉ detect 1 trong N frame (N > 1 để nhanh hơn nữa)
+BULK_DECODE_WORKERS = 4  # Số thread giải mã ảnh khi xử lý thư mục ảnh
+BULK_PREFETCH = 64  # Số ảnh được giải mã trước, chờ đưa vào model
+BULK_BATCH_SIZE = 16  # Số ảnh cùng kích thước mỗi lần gọi model
+BULK_CHECKPOINT_INTERVAL = 1000  # Lưu checkpoint sau mỗi N ảnh (để chạy tiếp)
+LATENCY_ENABLED = False  # Đo độ trễ từng giai đoạn (decode, inference, vẽ, ...)
+LATENCY_MAX_SECONDS = 60  # Độ trễ lớn nhất được phân biệt trong histogram
+LATENCY_PRECISION_BITS = 6  # Sai số tương đối của percentile ≈ 1 / 2^(bits - 1)
+PROFILER_INTERVAL = 0.01  # Chu kỳ lấy mẫu stack của sampling profiler (giây)
+PROFILER_DURATION = 30  # Thời lượng mỗi lần profile (giây), hết giờ tự ghi file
+# Profile khi bắt đầu nhận dạng: PROFILE=1 (PROFILER_DURATION giây) hoặc PROFILE=<giây>
+PROFILE_ON_START = os.getenv("PROFILE", "")
+BENCHMARK_REPEATS = 50  # Số lần đo mỗi trường hợp benchmark
+BENCHMARK_WARMUP = 5  # Số lần chạy trước khi đo (không tính giờ)
+BENCHMARK_ALPHA = 0.01  # Mức ý nghĩa của kiểm định Mann-Whitney khi so với baseline
+# Ngưỡng chậm đi (tỉ lệ so với baseline) để coi là regression, theo từng metric
+BENCHMARK_REGRESSION_THRESHOLDS = {"median_ms": 0.10, "p95_ms": 0.20}
+# Startup-time budget (python -X importtime, ms cumulative) - scripts/check_import_time.py
+IMPORT_TIME_REPEATS = 5  # Lấy trung vị của N lần import trong process mới
+IMPORT_TIME_BUDGETS = {
+    "config.settings": 50,
+    "src.core": 50,
+    "src.core.data_logger": 100,
+    "src.core.person_counter": 400,  # numpy
+    "src.core.person_detector": 400,  # numpy, torch/ultralytics load khi cần
+}
+# Module nặng không được kéo theo khi import (chỉ load khi thực sự dùng)
+IMPORT_FORBIDDEN_MODULES = {
+    "config.settings": ["numpy", "cv2", "pandas", "torch", "ultralytics"],
+    "src.core": ["numpy", "cv2", "pandas", "torch", "ultralytics"],
+    "src.core.data_logger": ["numpy", "pandas", "openpyxl", "torch"],
+    "src.core.person_counter": ["cv2", "pandas", "torch", "ultralytics"],
+    "src.core.person_detector": ["cv2", "pandas", "torch", "ultralytics"],
+}
+SOAK_FRAMES = 10000  # Số frame của một lần soak test
+SOAK_SAMPLE_INTERVAL = 500  # Số frame giữa hai lần lấy mẫu bộ nhớ
+SOAK_SOURCE = "synthetic://?width=640&height=480&fps=30&persons=20&occupancy=0.7"
+SOAK_LOG_INTERVAL = 30  # Ghi một record vào DataLogger mỗi N frame
+SOAK_FLUSH_INTERVAL = 300  # Ghi buffer ra CSV mỗi N frame (0 = không ghi)
+# Mức tăng tối đa cho phép trong cửa sổ đo (sau warm-up) trước khi soak test fail
+SOAK_GROWTH_LIMITS = {
+    "rss_bytes": 64 * 1024 * 1024,
+    "heap_bytes": 16 * 1024 * 1024,
+    "torch_bytes": 16 * 1024 * 1024,
+    "objects": 20000,
+    "buffer_items": 1000,
+}
+SOAK_TOP_SITES = 10  # Số vị trí cấp phát tăng nhiều nhất trong báo cáo
 
 # Security Configuration
 ALLOWED_VIDEO_FORMATS = ['.mp4', '.avi', '.mov', '.mkv', '.wmv']
@@ -71,6 +214,11 @@ ALLOWED_IMAGE_FORMATS = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff']
 API_HOST = "localhost"
 API_PORT = 8000
 API_DEBUG = False
+METRICS_ENABLED = False  # Xuất metric Prometheus tại http://API_HOST:API_PORT/metrics
+API_STREAM_FPS = 10  # FPS tối đa của luồng MJPEG (client có thể yêu cầu thấp hơn)
+API_EVENT_RATE = 10  # Số sự kiện số đếm tối đa mỗi giây gửi tới một client WebSocket
+API_JPEG_QUALITY = 80
+API_MAX_CLIENTS = 20
 
 # Database Configuration (for future database integration)
 DATABASE_URL = "sqlite:///data/person_detection.db"
@@ -79,10 +227,21 @@ DATABASE_URL = "sqlite:///data/person_detection.db"
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
 
-# Create directories if they don't exist
-for directory in [
+# Thư mục dữ liệu/output mặc định. Không tạo lúc import (import config phải
+# nhanh và không đụng tới filesystem): gọi ensure_directories() trước khi ghi.
+DEFAULT_DIRECTORIES = [
     DATA_ROOT, MODELS_ROOT, OUTPUT_ROOT,
     DATA_DIR, OUTPUT_REPORTS_DIR,
     MODEL_PRETRAINED_DIR, MODEL_TRAINED_DIR,
-]:
-    directory.mkdir(parents=True, exist_ok=True)
+]
+
+
+def ensure_directories(*directories):
+    """
+    Tạo các thư mục nếu chưa tồn tại
+
+    Args:
+        *directories (Path): Các thư mục cần tạo (không truyền = DEFAULT_DIRECTORIES)
+    """
+    for directory in directories or DEFAULT_DIRECTORIES:
+        Path(directory).mkdir(parents=True, exist_ok=True)
@@ -0,0 +1,154 @@
+"""
+Script so sánh inference theo tile (SAHI) với inference một lượt
+Chạy cả hai chế độ trên cùng các frame đầu vào, đo thời gian và số người phát hiện
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Thêm thư mục gốc vào path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from config.settings import ALLOWED_IMAGE_FORMATS
+from src.core.person_detector import PersonDetector
+
+
+def load_frames(source, max_frames):
+    """
+    Đọc frame từ thư mục ảnh, file ảnh hoặc file video
+
+    Args:
+        source (str): Đường dẫn nguồn
+        max_frames (int): Số frame tối đa
+
+    Returns:
+        list: Danh sách frame BGR
+    """
+    path = Path(source)
+    frames = []
+
+    if path.is_dir():
+        files = sorted(
+            p for p in path.iterdir() if p.suffix.lower() in ALLOWED_IMAGE_FORMATS
+        )
+        for file in files[:max_frames]:
+            frame = cv2.imread(str(file))
+            if frame is not None:
+                frames.append(frame)
+    elif path.suffix.lower() in ALLOWED_IMAGE_FORMATS:
+        frame = cv2.imread(str(path))
+        if frame is not None:
+            frames.append(frame)
+    else:
+        cap = cv2.VideoCapture(str(path))
+        while len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+
+    return frames
+
+
+def run_mode(detector, frames, warmup):
+    """
+    Chạy detector trên tất cả frame và đo thời gian
+
+    Args:
+        detector (PersonDetector): Detector đã cấu hình chế độ
+        frames (list): Danh sách frame
+        warmup (int): Số frame chạy trước để làm nóng (không tính giờ)
+
+    Returns:
+        dict: Thời gian (ms) và số detection theo từng frame
+    """
+    for frame in frames[:warmup]:
+        detector.detect_array(frame)
+
+    latencies = []
+    counts = []
+    for frame in frames:
+        start = time.perf_counter()
+        boxes = detector.detect_array(frame)
+        latencies.append((time.perf_counter() - start) * 1000)
+        counts.append(len(boxes))
+
+    latencies = np.array(latencies)
+    return {
+        "frames": len(frames),
+        "mean_ms": float(latencies.mean()),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "fps": float(1000 / latencies.mean()),
+        "total_detections": int(sum(counts)),
+        "mean_detections": float(np.mean(counts)),
+        "per_frame_detections": counts,
+    }
+
+
+def main():
+    """Hàm main"""
+    parser = argparse.ArgumentParser(
+        description="So sánh inference theo tile với inference một lượt"
+    )
+    parser.add_argument("source", help="Thư mục ảnh, file ảnh hoặc file video")
+    parser.add_argument("--max-frames", type=int, default=50)
+    parser.add_argument("--tile-size", type=int, default=640)
+    parser.add_argument("--overlap", type=float, default=0.2)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--output", help="File JSON lưu kết quả")
+    args = parser.parse_args()
+
+    frames = load_frames(args.source, args.max_frames)
+    if not frames:
+        print(f"❌ Không đọc được frame nào từ {args.source}")
+        return 1
+
+    height, width = frames[0].shape[:2]
+    print(f"Đã đọc {len(frames)} frame ({width}x{height})")
+
+    single = PersonDetector(tiled=False)
+    single.imgsz = args.imgsz
+
+    tiled = PersonDetector(tiled=True)
+    tiled.imgsz = args.imgsz
+    tiled.tile_size = args.tile_size
+    tiled.tile_overlap = args.overlap
+
+    report = {
+        "source": str(args.source),
+        "resolution": f"{width}x{height}",
+        "imgsz": args.imgsz,
+        "tile_size": args.tile_size,
+        "tile_overlap": args.overlap,
+        "single_pass": run_mode(single, frames, args.warmup),
+        "tiled": run_mode(tiled, frames, args.warmup),
+    }
+
+    for mode in ("single_pass", "tiled"):
+        result = report[mode]
+        print(
+            f"{mode:12s}: {result['mean_ms']:8.1f} ms/frame "
+            f"(p95 {result['p95_ms']:.1f} ms, {result['fps']:.1f} FPS), "
+            f"trung bình {result['mean_detections']:.1f} người/frame"
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Đã lưu kết quả vào {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
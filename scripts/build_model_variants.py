@@ -0,0 +1,84 @@
+"""
+Script build và đo tốc độ các biến thể model (fused, FP16, ONNX, TorchScript,
+INT8) để PersonDetector (MODEL_VARIANT="auto") chọn biến thể nhanh nhất
+"""
+
+import argparse
+import os
+import sys
+
+# CRITICAL FIX: Set this BEFORE any imports
+os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
+
+# Thêm thư mục gốc vào path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import INFERENCE_IMGSZ, MODEL_BENCHMARK_RUNS, YOLO_MODEL
+from src.core.model_registry import VARIANTS, ModelRegistry
+
+
+def detect_device():
+    """Thiết bị inference mặc định: "cuda" nếu có GPU dùng được, ngược lại "cpu" """
+    try:
+        import torch
+
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
+
+def main():
+    """Hàm main"""
+    parser = argparse.ArgumentParser(
+        description="Build và đo tốc độ các biến thể model trong cache"
+    )
+    parser.add_argument("--model", default=YOLO_MODEL, help="File trọng số .pt")
+    parser.add_argument(
+        "--variants",
+        nargs="+",
+        choices=list(VARIANTS),
+        help="Biến thể cần build (mặc định: tất cả chạy được trên thiết bị)",
+    )
+    parser.add_argument("--device", choices=["cpu", "cuda"], default=None)
+    parser.add_argument("--imgsz", type=int, default=INFERENCE_IMGSZ)
+    parser.add_argument("--runs", type=int, default=MODEL_BENCHMARK_RUNS)
+    parser.add_argument(
+        "--no-benchmark", action="store_true", help="Chỉ build, không đo tốc độ"
+    )
+    args = parser.parse_args()
+
+    device = args.device or detect_device()
+    try:
+        registry = ModelRegistry(args.model)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 2
+
+    variants = args.variants or [
+        name for name, spec in VARIANTS.items() if device in spec["devices"]
+    ]
+    print(f"📦 Cache: {registry.directory}")
+    print(f"💻 Thiết bị: {device}, imgsz={args.imgsz}\n")
+
+    failed = []
+    for variant in variants:
+        try:
+            if args.no_benchmark:
+                path = registry.get(variant, args.imgsz)
+                print(f"✅ {variant:12s} {path}")
+            else:
+                latency = registry.benchmark(variant, device, args.imgsz, args.runs)
+                print(f"✅ {variant:12s} {latency:8.1f} ms")
+        except Exception as e:
+            # Thiếu thư viện export (onnx, onnxruntime) hoặc thiết bị không hỗ trợ
+            print(f"⚠️ {variant:12s} bỏ qua: {e}")
+            failed.append(variant)
+
+    if not args.no_benchmark:
+        best = registry.best_variant(device, args.imgsz)
+        print(f"\n🏆 Biến thể nhanh nhất trên {device}: {best}")
+    return 1 if len(failed) == len(variants) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
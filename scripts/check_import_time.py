@@ -0,0 +1,77 @@
+"""
+Script kiểm tra thời gian import lúc khởi động (python -X importtime),
+thoát với mã 1 nếu vượt ngân sách hoặc module nặng bị import sớm
+"""
+
+import argparse
+import os
+import sys
+
+# Thêm thư mục gốc vào path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import IMPORT_TIME_REPEATS
+from src.benchmark.startup import StartupBenchmark
+from src.benchmark.suite import save_report
+
+
+def parse_budget(value):
+    """Đọc ngân sách dạng "module=ms", vd: src.core=30"""
+    module, _, budget = value.partition("=")
+    if not budget:
+        raise argparse.ArgumentTypeError(f"Cần module=ms: {value}")
+    return module.strip(), float(budget)
+
+
+def main():
+    """Hàm main"""
+    parser = argparse.ArgumentParser(
+        description="Kiểm tra thời gian import lúc khởi động so với ngân sách"
+    )
+    parser.add_argument("--repeats", type=int, default=IMPORT_TIME_REPEATS)
+    parser.add_argument(
+        "--budget",
+        type=parse_budget,
+        action="append",
+        help="Ghi đè ngân sách, vd: --budget src.core=30",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="In các import chậm nhất"
+    )
+    parser.add_argument("--output", help="File JSON báo cáo")
+    args = parser.parse_args()
+
+    benchmark = StartupBenchmark(repeats=args.repeats)
+    benchmark.budgets.update(dict(args.budget or []))
+
+    def progress(module, result):
+        budget = result["budget_ms"]
+        over = result["over_budget"] or result["forbidden_loaded"]
+        print(
+            f"{'❌' if over else '✅'} {module:28s} {result['median_ms']:8.1f} ms"
+            f"  (ngân sách {'-' if budget is None else f'{budget:g} ms'})"
+        )
+        if args.verbose:
+            for entry in result["slowest"]:
+                print(f"      {entry['self_ms']:8.2f} ms  {entry['module']}")
+
+    try:
+        report = benchmark.run(progress=progress)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 2
+
+    if args.output:
+        save_report(report, args.output)
+        print(f"📄 Đã lưu: {args.output}")
+
+    if not report["passed"]:
+        for failure in report["failures"]:
+            print(f"❌ {failure}")
+        return 1
+    print("✅ Thời gian import trong ngân sách")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
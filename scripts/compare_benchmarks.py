@@ -0,0 +1,82 @@
+"""
+Script so sánh kết quả benchmark với baseline, thoát với mã 1 nếu có regression
+"""
+
+import argparse
+import os
+import sys
+
+# Thêm thư mục gốc vào path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import BENCHMARK_ALPHA
+from src.benchmark.compare import (
+    REGRESSION,
+    compare_reports,
+    find_regressions,
+    parse_thresholds,
+)
+from src.benchmark.suite import load_report
+
+
+def print_rows(rows, show_all=False):
+    """
+    In bảng so sánh
+
+    Args:
+        rows (list): Kết quả compare_reports()
+        show_all (bool): In cả các dòng OK
+    """
+    for row in rows:
+        if row["status"] == "OK" and not show_all:
+            continue
+        if row["metric"] is None:
+            print(f"{row['status']:12s} {row['key']}")
+            continue
+        marker = "❌" if row["status"] == REGRESSION else "  "
+        print(
+            f"{marker}{row['status']:11s} {row['key']:28s} {row['metric']:10s} "
+            f"{row['baseline']:9.3f} → {row['current']:9.3f} ms "
+            f"({row['change_pct']:+6.1f}%, p={row['p_value']:.4f})"
+        )
+
+
+def main():
+    """Hàm main"""
+    parser = argparse.ArgumentParser(
+        description="So sánh benchmark với baseline (Mann-Whitney U)"
+    )
+    parser.add_argument("current", help="File JSON benchmark hiện tại")
+    parser.add_argument("baseline", help="File JSON benchmark baseline")
+    parser.add_argument(
+        "--threshold",
+        action="append",
+        help="Ngưỡng regression theo metric, vd: --threshold median_ms=10",
+    )
+    parser.add_argument("--alpha", type=float, default=BENCHMARK_ALPHA)
+    parser.add_argument("--all", action="store_true", help="In cả các dòng OK")
+    args = parser.parse_args()
+
+    try:
+        rows = compare_reports(
+            load_report(args.current),
+            load_report(args.baseline),
+            thresholds=parse_thresholds(args.threshold),
+            alpha=args.alpha,
+        )
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+
+    print_rows(rows, show_all=args.all)
+
+    regressions = find_regressions(rows)
+    if regressions:
+        print(f"\n❌ Có {len(regressions)} regression hiệu năng")
+        return 1
+    print("\n✅ Không có regression hiệu năng")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Script đánh giá độ chính xác - tốc độ: chạy PersonDetector trên split có label
+của dataset với từng biến thể model/imgsz, quét ngưỡng confidence và IoU NMS,
+in precision/recall/mAP@0.5/sai số đếm cùng FPS và lưu báo cáo JSON
+"""
+
+import argparse
+import os
+import random
+import sys
+from datetime import datetime
+
+# CRITICAL FIX: Set this BEFORE any imports
+os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
+
+# Thêm thư mục gốc vào path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import (
+    EVAL_CACHE_DIR,
+    EVAL_CONFIDENCES,
+    EVAL_DATA_YAML,
+    EVAL_IMAGES,
+    EVAL_IMGSZ,
+    EVAL_IOU_THRESHOLDS,
+    EVAL_MATCH_IOU,
+    EVAL_SPLIT,
+    EVAL_VARIANTS,
+    OUTPUT_REPORTS_DIR,
+    YOLO_MODEL,
+)
+from src.benchmark.evaluation import AccuracySweep
+from src.benchmark.suite import save_report
+from src.core.dataset import list_samples, load_data_yaml, person_label_ids
+
+
+def format_row(row):
+    """Một dòng kết quả của bảng"""
+    return (
+        f"{row['variant']:8s}{row['imgsz']:6d}{row['iou']:6.2f}"
+        f"{row['confidence']:6.2f}{row['precision']:8.3f}{row['recall']:8.3f}"
+        f"{row['f1']:8.3f}{row['map50']:8.3f}{row['count_mae']:8.2f}"
+        f"{row['count_bias']:+8.2f}{row['fps']:8.1f}"
+    )
+
+
+HEADER = (
+    f"{'biến thể':8s}{'imgsz':>6s}{'iou':>6s}{'conf':>6s}{'P':>8s}{'R':>8s}"
+    f"{'F1':>8s}{'mAP50':>8s}{'MAE':>8s}{'bias':>8s}{'FPS':>8s}"
+)
+
+
+def main():
+    """Hàm main"""
+    parser = argparse.ArgumentParser(
+        description="Đánh giá độ chính xác/tốc độ, quét ngưỡng, imgsz và biến thể"
+    )
+    parser.add_argument("--model", default=YOLO_MODEL, help="File trọng số .pt")
+    parser.add_argument("--data", default=str(EVAL_DATA_YAML), help="data.yaml")
+    parser.add_argument("--split", default=EVAL_SPLIT)
+    parser.add_argument(
+        "--images",
+        type=int,
+        default=EVAL_IMAGES,
+        help="Số ảnh đánh giá, chọn theo seed (0 = cả split)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--variants", nargs="+", default=list(EVAL_VARIANTS))
+    parser.add_argument("--imgsz", type=int, nargs="+", default=list(EVAL_IMGSZ))
+    parser.add_argument(
+        "--iou", type=float, nargs="+", default=list(EVAL_IOU_THRESHOLDS)
+    )
+    parser.add_argument("--conf", type=float, nargs="+", default=list(EVAL_CONFIDENCES))
+    parser.add_argument("--match-iou", type=float, default=EVAL_MATCH_IOU)
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Luôn chạy lại inference"
+    )
+    parser.add_argument("--top", type=int, default=10, help="Số dòng F1 cao nhất")
+    parser.add_argument("--output", help="File JSON báo cáo")
+    args = parser.parse_args()
+
+    try:
+        data = load_data_yaml(args.data)
+        image_dir = data["splits"].get(args.split)
+        if image_dir is None:
+            raise ValueError(f"data.yaml không có split '{args.split}'")
+        label_ids = person_label_ids(data["names"])
+        samples = list_samples(image_dir, require_images=True)
+        if args.images and len(samples) > args.images:
+            samples = random.Random(args.seed).sample(samples, args.images)
+        if not samples:
+            # Dataset chỉ có file label: cần ảnh trong <split>/images
+            raise ValueError(f"Không có ảnh có label trong {image_dir}")
+        sweep = AccuracySweep(
+            samples,
+            model_path=args.model,
+            variants=args.variants,
+            imgsz=args.imgsz,
+            iou_thresholds=args.iou,
+            confidences=args.conf,
+            match_iou=args.match_iou,
+            cache_dir=None if args.no_cache else EVAL_CACHE_DIR,
+            label_ids=label_ids,
+        )
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+
+    print(f"🎯 {len(samples)} ảnh ({args.split}) trong {image_dir}\n")
+
+    def progress(variant, imgsz, done, total):
+        if done % 100 == 0 or done == total:
+            print(
+                f"   {variant} @ {imgsz}: {done}/{total}",
+                end="\r" if done < total else "\n",
+            )
+
+    try:
+        report = sweep.run(progress=progress)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+
+    print("\n⏱️ Tốc độ (ms/ảnh, gồm tiền/hậu xử lý của PersonDetector):")
+    for run in report["runs"]:
+        source = "cache" if run["cached"] else "chạy mới"
+        print(
+            f"   {run['variant']:8s} ({run['resolved_variant']}) @ {run['imgsz']:4d}"
+            f"  median {run['latency_ms']:7.1f}  p95 {run['p95_ms']:7.1f}"
+            f"  {run['fps']:6.1f} FPS  [{source}]"
+        )
+
+    print(f"\n📊 {args.top} cấu hình F1 cao nhất:")
+    print(HEADER)
+    for row in sorted(report["results"], key=lambda r: -r["f1"])[: args.top]:
+        print(format_row(row))
+
+    print("\n🏆 Tốt nhất:")
+    print(HEADER)
+    for name, row in report["best"].items():
+        print(f"{format_row(row)}  ← {name}")
+    if report["current"]:
+        print("\n⚙️ Cấu hình hiện tại (CONFIDENCE/IOU_THRESHOLD, INFERENCE_IMGSZ):")
+        print(HEADER)
+        for row in report["current"]:
+            print(format_row(row))
+
+    output = args.output or str(
+        OUTPUT_REPORTS_DIR / f"eval_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    save_report(report, output)
+    print(f"\n📄 Đã lưu: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -38,6 +38,8 @@ class TestCaseReporter:
             "ModuleIntegration": []
         }
         self.test_results = {}
+        # Kết quả so sánh benchmark với baseline (None = không so sánh)
+        self.performance_rows = None
 
     def define_test_cases(self):
         """Định nghĩa tất cả test cases theo TEST_CASES.md"""
@@ -638,6 +640,10 @@ class TestCaseReporter:
             for module_name, test_cases in self.test_cases.items():
                 self.create_module_sheet(writer, module_name, test_cases)
 
+            # Tạo sheet hiệu năng nếu có so sánh benchmark
+            if self.performance_rows is not None:
+                self.create_performance_sheet(writer)
+
         print(f"✅ Báo cáo đã được lưu tại: {output_path}")
         return output_path
 
@@ -731,6 +737,68 @@ class TestCaseReporter:
                 cell.fill = yellow_fill
                 cell.font = Font(bold=True, color="FF8C00")
 
+    def compare_benchmarks(self, current_file, baseline_file, thresholds=None, alpha=None):
+        """So sánh kết quả benchmark hiện tại với baseline (Mann-Whitney U)"""
+        from config.settings import BENCHMARK_ALPHA
+        from src.benchmark.compare import compare_reports, find_regressions
+        from src.benchmark.suite import load_report
+
+        self.performance_rows = compare_reports(
+            load_report(current_file),
+            load_report(baseline_file),
+            thresholds=thresholds,
+            alpha=BENCHMARK_ALPHA if alpha is None else alpha
+        )
+        regressions = find_regressions(self.performance_rows)
+        print(f"✅ Đã so sánh {len(self.performance_rows)} chỉ số hiệu năng, "
+              f"{len(regressions)} regression")
+        return regressions
+
+    def create_performance_sheet(self, writer):
+        """Tạo sheet hiệu năng (so sánh benchmark với baseline)"""
+        data = []
+
+        for row in self.performance_rows:
+            data.append({
+                "Trường hợp": row["key"],
+                "Metric": row["metric"] or "",
+                "Baseline (ms)": row["baseline"],
+                "Hiện tại (ms)": row["current"],
+                "Thay đổi (%)": None if row["change_pct"] is None else round(row["change_pct"], 2),
+                "Ngưỡng (%)": row["threshold_pct"],
+                "p-value": row["p_value"],
+                "Status": row["status"]
+            })
+
+        df = pd.DataFrame(data)
+        df.to_excel(writer, sheet_name="Hiệu Năng", index=False)
+
+        # Format sheet
+        worksheet = writer.sheets["Hiệu Năng"]
+        worksheet.column_dimensions['A'].width = 30  # Trường hợp
+        for column in "BCDEFG":
+            worksheet.column_dimensions[column].width = 15
+        worksheet.column_dimensions['H'].width = 15  # Status
+
+        # Thêm màu cho Status
+        from openpyxl.styles import PatternFill, Font
+
+        green_fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")
+        red_fill = PatternFill(start_color="FFB6C1", end_color="FFB6C1", fill_type="solid")
+        yellow_fill = PatternFill(start_color="FFFFE0", end_color="FFFFE0", fill_type="solid")
+
+        for row in range(2, len(data) + 2):  # Bỏ qua header
+            cell = worksheet[f'H{row}']
+            if cell.value == "REGRESSION":
+                cell.fill = red_fill
+                cell.font = Font(bold=True, color="8B0000")
+            elif cell.value in ("OK", "IMPROVEMENT"):
+                cell.fill = green_fill
+                cell.font = Font(bold=True, color="006400")
+            else:
+                cell.fill = yellow_fill
+                cell.font = Font(bold=True, color="FF8C00")
+
     def print_summary(self):
         """In tóm tắt kết quả ra console"""
         print("\n" + "="*70)
@@ -778,7 +846,28 @@ def main():
         default="all",
         help="Loại test cần chạy: unit (unit tests), integration (integration tests), system (system tests), all (tất cả)"
     )
+    parser.add_argument(
+        "--benchmark",
+        help="File JSON benchmark hiện tại (scripts/run_benchmarks.py) để thêm sheet hiệu năng"
+    )
+    parser.add_argument(
+        "--baseline",
+        help="File JSON benchmark baseline để so sánh với --benchmark"
+    )
+    parser.add_argument(
+        "--threshold",
+        action="append",
+        help="Ngưỡng regression theo metric, vd: --threshold median_ms=10 --threshold p95_ms=20"
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=None,
+        help="Mức ý nghĩa của kiểm định Mann-Whitney (mặc định BENCHMARK_ALPHA)"
+    )
     args = parser.parse_args()
+    if bool(args.benchmark) != bool(args.baseline):
+        parser.error("--benchmark và --baseline phải được dùng cùng nhau")
 
     print("="*70)
     print("CÔNG CỤ TẠO BÁO CÁO TEST CASE")
@@ -814,6 +903,16 @@ def main():
     print("\n[3/4] Đang ánh xạ kết quả tests...")
     reporter.map_test_results_to_cases()
 
+    # So sánh benchmark với baseline (nếu có)
+    regressions = []
+    if args.benchmark:
+        from src.benchmark.compare import parse_thresholds
+
+        print("\nĐang so sánh benchmark với baseline...")
+        regressions = reporter.compare_benchmarks(
+            args.benchmark, args.baseline, parse_thresholds(args.threshold), args.alpha
+        )
+
     # Bước 4: Tạo báo cáo Excel
     print("\n[4/4] Đang tạo báo cáo Excel...")
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -831,8 +930,16 @@ def main():
     print("Chạy integration tests: python scripts/generate_test_report.py --type integration")
     print("Chạy system tests:      python scripts/generate_test_report.py --type system")
     print("Chạy tất cả tests:      python scripts/generate_test_report.py --type all")
+    print("So sánh hiệu năng:      python scripts/generate_test_report.py --benchmark current.json --baseline baseline.json")
     print("="*70)
 
+    # Có regression hiệu năng → thoát với mã lỗi để CI fail
+    if regressions:
+        print(f"\n❌ Có {len(regressions)} regression hiệu năng:")
+        for row in regressions:
+            print(f"   - {row['key']} {row['metric']}: {row['change_pct']:+.1f}% (p={row['p_value']:.4f})")
+        sys.exit(1)
+
     return report_path
 
 
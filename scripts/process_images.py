@@ -0,0 +1,94 @@
+"""
+Script đếm người trên toàn bộ ảnh trong một thư mục
+Kết quả ghi dạng JSONL/CSV/Parquet, có checkpoint để chạy tiếp khi bị dừng
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# CRITICAL FIX: Set this BEFORE any imports
+os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
+
+# Thêm thư mục gốc vào path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import (
+    BULK_BATCH_SIZE,
+    BULK_CHECKPOINT_INTERVAL,
+    BULK_DECODE_WORKERS,
+    BULK_PREFETCH,
+)
+from src.core.image_batch import OUTPUT_FORMATS, ImageBatchProcessor
+
+
+def main():
+    """Hàm main"""
+    parser = argparse.ArgumentParser(description="Đếm người trên thư mục ảnh")
+    parser.add_argument("folder", help="Thư mục ảnh (duyệt cả thư mục con)")
+    parser.add_argument(
+        "--output", required=True, help="File .jsonl/.csv hoặc thư mục .parquet"
+    )
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default=None)
+    parser.add_argument("--workers", type=int, default=BULK_DECODE_WORKERS)
+    parser.add_argument("--prefetch", type=int, default=BULK_PREFETCH)
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    parser.add_argument(
+        "--checkpoint-interval", type=int, default=BULK_CHECKPOINT_INTERVAL
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Bỏ checkpoint cũ, chạy lại từ đầu"
+    )
+    parser.add_argument("--summary", help="Lưu tổng kết ra file JSON")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.folder):
+        print(f"❌ Không tìm thấy thư mục: {args.folder}")
+        return 1
+
+    processor = ImageBatchProcessor(
+        decode_workers=args.workers,
+        prefetch=args.prefetch,
+        batch_size=args.batch_size,
+        checkpoint_interval=args.checkpoint_interval,
+    )
+
+    def progress(processed, images_per_sec):
+        print(
+            f"\r⏳ {processed} ảnh - {images_per_sec:.1f} ảnh/giây", end="", flush=True
+        )
+
+    try:
+        summary = processor.process(
+            args.folder,
+            args.output,
+            fmt=args.format,
+            resume=not args.restart,
+            progress=progress,
+        )
+    except (ImportError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    except KeyboardInterrupt:
+        print("\n⏹ Đã dừng, chạy lại cùng lệnh để tiếp tục từ checkpoint")
+        return 130
+    print()
+
+    if summary["resumed_from"]:
+        print(f"↪ Tiếp tục từ ảnh thứ {summary['resumed_from']}")
+    print(
+        f"✅ {summary['images']} ảnh ({summary['errors']} lỗi), "
+        f"{summary['persons']} người, {summary['images_per_sec']:.1f} ảnh/giây"
+    )
+    print(f"📄 Đã lưu: {args.output}")
+
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Script lượng tử hoá INT8 (static, hiệu chỉnh trên ảnh của dataset): build
+biến thể "int8" trong ModelRegistry, so độ chính xác với model gốc trên split
+validation, đo tốc độ và chỉ cho PersonDetector dùng khi mAP giảm trong ngưỡng
+"""
+
+import argparse
+import os
+import random
+import sys
+
+# CRITICAL FIX: Set this BEFORE any imports
+os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
+
+# Thêm thư mục gốc vào path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import (
+    INFERENCE_IMGSZ,
+    MODEL_BENCHMARK_RUNS,
+    QUANT_CALIBRATION_IMAGES,
+    QUANT_CALIBRATION_METHOD,
+    QUANT_CALIBRATION_SPLIT,
+    QUANT_DATA_YAML,
+    QUANT_EVAL_IMAGES,
+    QUANT_EVAL_SPLIT,
+    QUANT_MAX_MAP_DROP,
+    QUANT_SEED,
+    YOLO_MODEL,
+)
+from src.benchmark.accuracy import (
+    ACCURACY_METRICS,
+    accuracy_delta,
+    evaluate_detections,
+    predict_samples,
+)
+from src.core.dataset import (
+    list_samples,
+    load_data_yaml,
+    person_label_ids,
+    sample_images,
+)
+from src.core.model_registry import ModelRegistry
+
+
+def split_dir(data, split):
+    """Thư mục ảnh của split, báo lỗi rõ ràng nếu data.yaml không khai báo"""
+    directory = data["splits"].get(split)
+    if directory is None:
+        raise ValueError(f"data.yaml không có split '{split}'")
+    return directory
+
+
+def main():
+    """Hàm main"""
+    parser = argparse.ArgumentParser(
+        description="Lượng tử hoá INT8 model YOLO, hiệu chỉnh trên dataset"
+    )
+    parser.add_argument("--model", default=YOLO_MODEL, help="File trọng số .pt")
+    parser.add_argument("--data", default=str(QUANT_DATA_YAML), help="data.yaml")
+    parser.add_argument("--calibration-split", default=QUANT_CALIBRATION_SPLIT)
+    parser.add_argument(
+        "--calibration",
+        type=int,
+        default=QUANT_CALIBRATION_IMAGES,
+        help="Số ảnh hiệu chỉnh",
+    )
+    parser.add_argument(
+        "--method",
+        choices=["minmax", "entropy", "percentile"],
+        default=QUANT_CALIBRATION_METHOD,
+    )
+    parser.add_argument("--eval-split", default=QUANT_EVAL_SPLIT)
+    parser.add_argument(
+        "--eval-images",
+        type=int,
+        default=QUANT_EVAL_IMAGES,
+        help="Số ảnh đánh giá (0 = cả split)",
+    )
+    parser.add_argument(
+        "--max-drop",
+        type=float,
+        default=QUANT_MAX_MAP_DROP,
+        help="mAP@0.5 giảm tối đa để INT8 được dùng",
+    )
+    parser.add_argument("--imgsz", type=int, default=INFERENCE_IMGSZ)
+    parser.add_argument("--runs", type=int, default=MODEL_BENCHMARK_RUNS)
+    parser.add_argument("--seed", type=int, default=QUANT_SEED)
+    args = parser.parse_args()
+
+    try:
+        data = load_data_yaml(args.data)
+        calibration_dir = split_dir(data, args.calibration_split)
+        eval_dir = split_dir(data, args.eval_split)
+        label_ids = person_label_ids(data["names"])
+        registry = ModelRegistry(args.model)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 2
+
+    calibration = sample_images(calibration_dir, args.calibration, args.seed)
+    samples = list_samples(eval_dir, require_images=True)
+    if args.eval_images and len(samples) > args.eval_images:
+        samples = random.Random(args.seed).sample(samples, args.eval_images)
+    if not calibration or not samples:
+        # Dataset chỉ có file label: cần tải ảnh (Roboflow export) vào
+        # <split>/images cạnh <split>/labels
+        missing = calibration_dir if not calibration else eval_dir
+        print(f"❌ Không có ảnh có label trong {missing}")
+        return 2
+
+    print(f"📦 Cache: {registry.directory}")
+    print(
+        f"🎯 Hiệu chỉnh trên {len(calibration)} ảnh ({args.calibration_split}), "
+        f"đánh giá trên {len(samples)} ảnh ({args.eval_split})\n"
+    )
+
+    registry.calibration = calibration
+    registry.calibration_method = args.method
+    try:
+        registry.build("int8", args.imgsz)
+    except ImportError as e:
+        print(f"❌ Cần onnx và onnxruntime để lượng tử hoá: {e}")
+        return 2
+
+    def progress(done, total):
+        if done % 100 == 0 or done == total:
+            print(f"   {done}/{total}", end="\r" if done < total else "\n")
+
+    metrics = {}
+    for variant in ("pt", "int8"):
+        print(f"🔍 Đánh giá '{variant}'...")
+        results = predict_samples(
+            registry.get(variant, args.imgsz),
+            samples,
+            imgsz=args.imgsz,
+            label_ids=label_ids,
+            progress=progress,
+        )
+        metrics[variant] = evaluate_detections(results)
+
+    delta = accuracy_delta(metrics["pt"], metrics["int8"])
+    accepted = -delta["map50"] <= args.max_drop
+    registry.record_accuracy(
+        "int8",
+        {**metrics["int8"], "baseline": metrics["pt"], "delta": delta},
+        accepted=accepted,
+    )
+
+    print(f"\n{'':12s}{'FP32 (pt)':>12s}{'INT8':>12s}{'Chênh':>12s}")
+    for metric in ACCURACY_METRICS:
+        print(
+            f"{metric:12s}{metrics['pt'][metric]:12.4f}"
+            f"{metrics['int8'][metric]:12.4f}{delta[metric]:+12.4f}"
+        )
+
+    print("\n⏱️ Đo tốc độ trên CPU...")
+    latency = {
+        variant: registry.benchmark(variant, "cpu", args.imgsz, args.runs)
+        for variant in ("pt", "int8")
+    }
+    for variant, ms in latency.items():
+        print(f"   {variant:6s} {ms:8.1f} ms  ({1000 / ms:5.1f} FPS)")
+
+    if not accepted:
+        print(
+            f"\n❌ mAP@0.5 giảm {-delta['map50']:.4f} > {args.max_drop}: "
+            "INT8 không được dùng khi MODEL_VARIANT=auto"
+        )
+        return 1
+    print(
+        f"\n✅ INT8 đã đăng ký; biến thể nhanh nhất trên CPU: "
+        f"{registry.best_variant('cpu', args.imgsz)}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
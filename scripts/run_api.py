@@ -0,0 +1,177 @@
+"""
+Script chạy nhận dạng không cần GUI và phục vụ dashboard qua HTTP/WebSocket
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# CRITICAL FIX: Set this BEFORE any imports
+os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
+
+# Thêm thư mục gốc vào path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import (
+    API_HOST,
+    API_PORT,
+    COUNT_SMOOTHING,
+    LATENCY_ENABLED,
+    PROFILE_ON_START,
+    PROFILER_DURATION,
+    ROI_CONFIG,
+    SAVE_INTERVAL,
+    TRACKING_ENABLED,
+    ZONE_CONFIG,
+    ensure_directories,
+)
+from src.api.server import ApiServer
+from src.core import (
+    AlertSystem,
+    CountSmoother,
+    DataLogger,
+    LatencyRecorder,
+    PersonCounter,
+    PersonDetector,
+    PersonTracker,
+    RegionOfInterest,
+    SamplingProfiler,
+    Visualizer,
+    ZoneCounter,
+)
+from src.core.pipeline import StageTimings
+from src.core.profiler import parse_profile_duration
+from src.core.synthetic_source import open_video_source
+
+# Số record trong buffer trước khi ghi ra file CSV
+FLUSH_RECORDS = 10
+
+
+def main():
+    """Hàm main"""
+    parser = argparse.ArgumentParser(
+        description="Nhận dạng người không cần GUI, phục vụ API/MJPEG/WebSocket"
+    )
+    parser.add_argument(
+        "--source",
+        default="0",
+        help="Camera index, file video hoặc nguồn giả lập synthetic://?persons=20",
+    )
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=str(PROFILER_DURATION),
+        default=PROFILE_ON_START,
+        metavar="SECONDS",
+        help="Ghi sampling profile (collapsed/speedscope) trong N giây đầu "
+        f"(mặc định {PROFILER_DURATION} giây, hoặc biến môi trường PROFILE)",
+    )
+    args = parser.parse_args()
+    ensure_directories()
+
+    try:
+        profile_seconds = parse_profile_duration(args.profile)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    source = int(args.source) if args.source.isdigit() else args.source
+
+    detector = PersonDetector()
+    detector.set_region(RegionOfInterest.from_config(ROI_CONFIG.get(source)))
+    counter = PersonCounter(
+        tracker=PersonTracker() if TRACKING_ENABLED else None,
+        zone_counter=ZoneCounter.from_config(ZONE_CONFIG.get(source)),
+        smoother=CountSmoother() if COUNT_SMOOTHING else None,
+        latency=LatencyRecorder() if LATENCY_ENABLED else None,
+    )
+    # Cùng cách đo với GUI: chỉ bật khi LATENCY_ENABLED, mẫu vào histogram
+    timings = StageTimings(
+        ["decode", "inference", "draw"],
+        latency=counter.latency,
+        enabled=counter.latency is not None,
+    )
+    visualizer = Visualizer()
+    alert_system = AlertSystem()
+    data_logger = DataLogger()
+
+    # Load model và warm-up trong lúc mở server và camera
+    def warmup_progress(status):
+        print(f"⏳ Khởi động model: {status['state']} {status['progress']:.0%}")
+
+    detector.warm_up_async(on_progress=warmup_progress)
+
+    server = ApiServer(counter, alert_system, data_logger, args.host, args.port)
+    server.start()
+
+    cap = open_video_source(source)
+    if not cap.isOpened():
+        print(f"❌ Không thể mở camera/video source: {source}")
+        server.stop()
+        return 1
+
+    # FPS chỉ tính từ khi model sẵn sàng
+    detector.wait_until_ready()
+    counter.restart_timing()
+
+    profiler = None
+    if profile_seconds > 0:
+        profiler = SamplingProfiler()
+        profiler.start(profile_seconds)
+        print(f"🔥 Đang profile trong {profile_seconds:g} giây")
+
+    last_log = 0.0
+    try:
+        while True:
+            with timings.measure("decode"):
+                ret, frame = cap.read()
+            if not ret:
+                if isinstance(source, str):
+                    print("✅ Đã xử lý hết video")
+                    break
+                continue
+
+            with timings.measure("inference"):
+                detections = detector.detect_persons(frame)
+            person_count = counter.update_count(detections, frame.shape)
+            stats = counter.get_all_stats()
+
+            alert_info = alert_system.check_stats(stats) or {}
+            zone_alerts = alert_system.check_zone_alerts(stats.get("zones", {}))
+            if zone_alerts and not alert_info:
+                alert_info = zone_alerts[0]
+
+            with timings.measure("draw"):
+                display_frame = visualizer.draw_detections(
+                    frame, detections, person_count
+                )
+                display_frame = visualizer.draw_stats(display_frame, stats)
+                if counter.zone_counter is not None:
+                    display_frame = visualizer.draw_zones(
+                        display_frame, counter.zone_counter
+                    )
+            server.publish(display_frame, stats, alert_info)
+
+            now = time.monotonic()
+            if now - last_log >= SAVE_INTERVAL:
+                last_log = now
+                data_logger.log_data(stats)
+                if len(data_logger.data_buffer) >= FLUSH_RECORDS:
+                    data_logger.save_to_csv()
+    except KeyboardInterrupt:
+        print("⏹ Dừng theo yêu cầu")
+    finally:
+        cap.release()
+        data_logger.save_to_csv()
+        server.stop()
+        if profiler is not None and profiler.running:
+            profiler.stop()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
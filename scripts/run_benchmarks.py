@@ -0,0 +1,92 @@
+"""
+Script chạy bộ benchmark detect → count → alert → draw trên frame tổng hợp
+Kết quả lưu JSON để so sánh giữa các commit
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+# CRITICAL FIX: Set this BEFORE any imports
+os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
+
+# Thêm thư mục gốc vào path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import BENCHMARK_REPEATS, BENCHMARK_WARMUP, OUTPUT_REPORTS_DIR
+from src.benchmark.suite import (
+    COMPONENTS,
+    DETECTION_COUNTS,
+    RESOLUTIONS,
+    BenchmarkSuite,
+    save_report,
+)
+
+
+def parse_list(value):
+    """Tách danh sách phân cách bằng dấu phẩy"""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main():
+    """Hàm main"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark từng thành phần và toàn pipeline trên frame tổng hợp"
+    )
+    parser.add_argument(
+        "--resolutions",
+        type=parse_list,
+        default=list(RESOLUTIONS),
+        help=f"Các độ phân giải ({','.join(RESOLUTIONS)})",
+    )
+    parser.add_argument(
+        "--detections",
+        type=lambda v: [int(n) for n in parse_list(v)],
+        default=list(DETECTION_COUNTS),
+        help="Các số detection mỗi frame, vd: 0,10,100",
+    )
+    parser.add_argument(
+        "--components",
+        type=parse_list,
+        default=list(COMPONENTS),
+        help=f"Các thành phần ({','.join(COMPONENTS)})",
+    )
+    parser.add_argument("--repeats", type=int, default=BENCHMARK_REPEATS)
+    parser.add_argument("--warmup", type=int, default=BENCHMARK_WARMUP)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="File JSON kết quả")
+    args = parser.parse_args()
+
+    try:
+        suite = BenchmarkSuite(
+            resolutions=args.resolutions,
+            detection_counts=args.detections,
+            components=args.components,
+            repeats=args.repeats,
+            warmup=args.warmup,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    def progress(result, done, total):
+        print(
+            f"[{done:3d}/{total}] {result['key']:28s} "
+            f"median {result['median_ms']:9.3f} ms  p95 {result['p95_ms']:9.3f} ms"
+        )
+
+    report = suite.run(progress=progress)
+
+    output = args.output or str(
+        OUTPUT_REPORTS_DIR
+        / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    save_report(report, output)
+    print(f"📄 Đã lưu: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
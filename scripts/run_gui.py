@@ -2,6 +2,7 @@
 Script để chạy ứng dụng GUI
 """
 
+import argparse
 import os
 import sys
 
@@ -9,16 +10,26 @@ import sys
 os.environ['KMP_DUPLICATE_LIB_OK'] = 'TRUE'
 os.environ['PYTORCH_CUDA_ALLOC_CONF'] = 'max_split_size_mb:128'
 
+# --profile [giây]: profile lần nhận dạng đầu tiên (giống biến môi trường PROFILE)
+_parser = argparse.ArgumentParser(description='Chạy ứng dụng GUI')
+_parser.add_argument('--profile', nargs='?', const='1', metavar='SECONDS',
+                     help='Ghi sampling profile (collapsed/speedscope) khi bắt đầu nhận dạng')
+_args, _qt_args = _parser.parse_known_args()
+if _args.profile is not None:
+    os.environ['PROFILE'] = _args.profile
+
 # Thêm thư mục gốc vào path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from config.settings import ensure_directories
 from src.ui import PersonDetectionGUI
 from PyQt6.QtWidgets import QApplication
 
 
 def main():
     """Chạy ứng dụng GUI"""
-    app = QApplication(sys.argv)
+    ensure_directories()
+    app = QApplication(sys.argv[:1] + _qt_args)
 
     # Thiết lập style
     app.setStyle('Fusion')
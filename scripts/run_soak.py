@@ -0,0 +1,148 @@
+"""
+Script soak test: chạy pipeline nhiều frame liên tục, theo dõi RSS, heap,
+số object và các buffer; thoát với mã 1 nếu bộ nhớ tăng liên tục
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+# CRITICAL FIX: Set this BEFORE any imports
+os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
+
+# Thêm thư mục gốc vào path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import (
+    OUTPUT_REPORTS_DIR,
+    SOAK_FLUSH_INTERVAL,
+    SOAK_FRAMES,
+    SOAK_LOG_INTERVAL,
+    SOAK_SAMPLE_INTERVAL,
+    SOAK_SOURCE,
+    SOAK_TOP_SITES,
+)
+from src.benchmark.soak import SoakTest
+from src.benchmark.suite import save_report
+
+
+def parse_limit(value):
+    """Đọc ngưỡng dạng "metric=giá trị", vd: heap_bytes=8e6"""
+    metric, _, limit = value.partition("=")
+    if not limit:
+        raise argparse.ArgumentTypeError(f"Cần metric=giá trị: {value}")
+    return metric.strip(), float(limit)
+
+
+def format_value(metric, value):
+    """Hiển thị byte theo MB, còn lại giữ nguyên"""
+    if value is None:
+        return "-"
+    if metric.endswith("_bytes"):
+        return f"{value / 1024 / 1024:.2f} MB"
+    return f"{value:.0f}"
+
+
+def main():
+    """Hàm main"""
+    parser = argparse.ArgumentParser(
+        description="Soak test: phát hiện rò rỉ bộ nhớ khi chạy pipeline lâu"
+    )
+    parser.add_argument("--frames", type=int, default=SOAK_FRAMES)
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=SOAK_SAMPLE_INTERVAL,
+        help="Số frame giữa hai lần lấy mẫu",
+    )
+    parser.add_argument("--source", default=SOAK_SOURCE, help="Nguồn synthetic://")
+    parser.add_argument(
+        "--warmup", type=int, default=None, help="Số frame warm-up (mặc định 1/5)"
+    )
+    parser.add_argument("--log-interval", type=int, default=SOAK_LOG_INTERVAL)
+    parser.add_argument(
+        "--flush-interval",
+        type=int,
+        default=SOAK_FLUSH_INTERVAL,
+        help="Ghi buffer ra CSV mỗi N frame (0 = không ghi)",
+    )
+    parser.add_argument(
+        "--limit",
+        type=parse_limit,
+        action="append",
+        help="Ngưỡng tăng, vd: --limit heap_bytes=8e6 --limit buffer_items=500",
+    )
+    parser.add_argument("--top", type=int, default=SOAK_TOP_SITES)
+    parser.add_argument("--output", help="File JSON báo cáo")
+    args = parser.parse_args()
+
+    try:
+        soak = SoakTest(
+            frames=args.frames,
+            sample_interval=args.interval,
+            source=args.source,
+            warmup=args.warmup,
+            log_interval=args.log_interval,
+            flush_interval=args.flush_interval,
+            limits=dict(args.limit or []),
+            top=args.top,
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+
+    def progress(sample, done):
+        print(
+            f"[{done:7d}/{args.frames}] RSS {format_value('rss_bytes', sample['rss_bytes'])}"
+            f"  heap {format_value('heap_bytes', sample['heap_bytes'])}"
+            f"  objects {sample['objects']}"
+            f"{'  (warm-up)' if sample['warmup'] else ''}"
+        )
+
+    try:
+        report = soak.run(progress=progress)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 2
+
+    print("\nMức tăng sau warm-up:")
+    for name, result in report["growth"].items():
+        mark = "❌" if result["sustained"] else "  "
+        print(
+            f"{mark} {name:30s} {format_value(name, result['start']):>12s} → "
+            f"{format_value(name, result['end']):>12s}  "
+            f"({format_value(name, result['per_1k_frames'])} / 1000 frame)"
+        )
+
+    print("\nVị trí cấp phát tăng nhiều nhất:")
+    for site in report["top_sites"]:
+        print(
+            f"   {site['size_diff']:>10d} B  {site['count_diff']:>6d}  {site['site']}"
+        )
+    for component, sites in report["component_sites"].items():
+        if sites:
+            print(f"\n{component}:")
+            for site in sites:
+                print(f"   {site['size_diff']:>10d} B  {site['site']}")
+
+    output = args.output or str(
+        OUTPUT_REPORTS_DIR / f"soak_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    save_report(report, output)
+    print(f"\n📄 Đã lưu: {output}")
+
+    summary = report["summary"]
+    print(
+        f"⏱️ {summary['frames']} frame trong {summary['elapsed']:.1f}s "
+        f"({summary['frames_per_sec']:.1f} frame/s)"
+    )
+    if not report["passed"]:
+        print(f"❌ Bộ nhớ tăng liên tục: {', '.join(report['failures'])}")
+        return 1
+    print("✅ Không phát hiện bộ nhớ tăng liên tục")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
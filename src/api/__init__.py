@@ -0,0 +1,12 @@
+"""
+API modules: xuất số liệu của hệ thống ra ngoài qua HTTP
+"""
+
+from .metrics import MetricsServer, render_metrics
+from .server import ApiServer
+
+__all__ = [
+    "MetricsServer",
+    "render_metrics",
+    "ApiServer",
+]
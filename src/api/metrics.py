@@ -0,0 +1,304 @@
+"""
+Module xuất số liệu theo định dạng văn bản của Prometheus qua HTTP
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config.settings import API_HOST, API_PORT
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "person_detection"
+
+# (khoá trong PersonCounter.get_all_stats(), tên metric, kiểu, mô tả)
+COUNTER_METRICS = [
+    ("current_count", "current_count", "gauge", "Số người trong frame hiện tại"),
+    ("reported_count", "reported_count", "gauge", "Số người báo cáo (đã làm mượt)"),
+    ("max_count", "max_count", "gauge", "Số người lớn nhất đã phát hiện"),
+    ("average_count", "average_count", "gauge", "Số người trung bình"),
+    ("total_detections", "detections_total", "counter", "Tổng số detection"),
+    ("total_frames", "frames_total", "counter", "Tổng số frame đã xử lý"),
+    (
+        "frames_with_persons",
+        "frames_with_persons_total",
+        "counter",
+        "Số frame có người",
+    ),
+    ("detection_rate", "detection_rate", "gauge", "Tỷ lệ frame có người"),
+    ("fps", "fps", "gauge", "FPS tức thời"),
+    ("average_fps", "average_fps", "gauge", "FPS trung bình từ lúc bắt đầu"),
+    ("running_time", "running_time_seconds", "gauge", "Thời gian chạy"),
+    ("unique_count", "unique_persons_total", "counter", "Số người duy nhất (tracking)"),
+    ("tracked_count", "tracked_persons", "gauge", "Số người đang được theo dõi"),
+]
+
+
+def _escape(value):
+    """Escape giá trị label theo định dạng Prometheus"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_sample(name, labels, value):
+    """
+    Định dạng một dòng mẫu
+
+    Args:
+        name (str): Tên metric (đã có prefix)
+        labels (dict): Label của mẫu
+        value (float): Giá trị
+
+    Returns:
+        str: Dòng mẫu, vd: 'name{stage="decode"} 1.5'
+    """
+    if labels:
+        label_text = ",".join(f'{key}="{_escape(v)}"' for key, v in labels.items())
+        name = f"{name}{{{label_text}}}"
+    return f"{name} {float(value)!r}"
+
+
+class _MetricWriter:
+    """
+    Gom các dòng metric, mỗi metric có một dòng HELP/TYPE
+    """
+
+    def __init__(self):
+        """Khởi tạo danh sách dòng rỗng"""
+        self.lines = []
+
+    def add(self, name, metric_type, help_text, samples):
+        """
+        Thêm một metric
+
+        Args:
+            name (str): Tên metric (không có prefix)
+            metric_type (str): "gauge", "counter" hoặc "summary"
+            help_text (str): Mô tả
+            samples (list): [(hậu tố tên, labels, giá trị), ...]
+        """
+        if not samples:
+            return
+        full_name = f"{PREFIX}_{name}"
+        self.lines.append(f"# HELP {full_name} {help_text}")
+        self.lines.append(f"# TYPE {full_name} {metric_type}")
+        for suffix, labels, value in samples:
+            self.lines.append(_format_sample(full_name + suffix, labels, value))
+
+    def text(self):
+        """Nội dung trả về cho Prometheus"""
+        return "\n".join(self.lines) + "\n"
+
+
+def render_metrics(counter=None, alert_system=None, data_logger=None):
+    """
+    Tạo nội dung metric từ các component của hệ thống
+
+    Args:
+        counter (PersonCounter): Số đếm, FPS, vạch/vùng và độ trễ từng giai đoạn
+        alert_system (AlertSystem): Trạng thái cảnh báo
+        data_logger (DataLogger): Số record đang chờ ghi ra file
+
+    Returns:
+        str: Văn bản theo định dạng Prometheus
+    """
+    writer = _MetricWriter()
+    zones = {}
+
+    if counter is not None:
+        stats = counter.get_all_stats()
+        for key, name, metric_type, help_text in COUNTER_METRICS:
+            if key in stats:
+                writer.add(name, metric_type, help_text, [("", {}, stats[key])])
+
+        lines = stats.get("lines", {})
+        writer.add(
+            "line_crossings_total",
+            "counter",
+            "Số người đi qua vạch theo hướng",
+            [
+                ("", {"line": name, "direction": direction}, line[direction])
+                for name, line in lines.items()
+                for direction in ("in", "out")
+            ],
+        )
+        zones = stats.get("zones", {})
+        writer.add(
+            "zone_count",
+            "gauge",
+            "Số người đang trong vùng",
+            [("", {"zone": name}, zone["count"]) for name, zone in zones.items()],
+        )
+
+        latency = stats.get("latency", {})
+        samples = []
+        for stage, timing in latency.items():
+            for quantile, key in (
+                ("0.5", "p50_ms"),
+                ("0.95", "p95_ms"),
+                ("0.99", "p99_ms"),
+            ):
+                samples.append(
+                    ("", {"stage": stage, "quantile": quantile}, timing[key] / 1000)
+                )
+            samples.append(
+                ("_sum", {"stage": stage}, timing["mean_ms"] * timing["count"] / 1000)
+            )
+            samples.append(("_count", {"stage": stage}, timing["count"]))
+        writer.add("stage_latency_seconds", "summary", "Độ trễ từng giai đoạn", samples)
+
+    if alert_system is not None:
+        writer.add(
+            "alert_active",
+            "gauge",
+            "Đang có cảnh báo vượt ngưỡng (1/0)",
+            [("", {}, int(alert_system.is_alert_active))],
+        )
+        writer.add(
+            "alerts_total",
+            "counter",
+            "Tổng số cảnh báo",
+            [("", {}, len(alert_system.alert_history))],
+        )
+        writer.add(
+            "alert_threshold",
+            "gauge",
+            "Ngưỡng số người cảnh báo",
+            [("", {}, alert_system.max_count)],
+        )
+        # Mọi vùng đã cấu hình đều có mẫu (0 khi không cảnh báo) để series
+        # không biến mất khi vùng hết vượt ngưỡng
+        active_zones = set(alert_system.active_zones)
+        writer.add(
+            "zone_alert_active",
+            "gauge",
+            "Vùng đang vượt ngưỡng (1/0)",
+            [
+                ("", {"zone": name}, int(name in active_zones))
+                for name in sorted(active_zones.union(zones))
+            ],
+        )
+
+    if data_logger is not None:
+        writer.add(
+            "logger_queue_depth",
+            "gauge",
+            "Số record đang chờ ghi ra file",
+            [
+                ("", {"file": "counts"}, len(data_logger.data_buffer)),
+                ("", {"file": "zones"}, len(data_logger.zone_buffer)),
+            ],
+        )
+
+    return writer.text()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """
+    Xử lý request HTTP: chỉ phục vụ GET /metrics
+    """
+
+    def do_GET(self):
+        """Trả về metric hoặc 404"""
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        try:
+            body = self.server.metrics.render().encode("utf-8")
+        except Exception as e:
+            self.send_error(500, str(e))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Không in log mỗi lần Prometheus scrape"""
+
+
+class MetricsServer:
+    """
+    HTTP server xuất metric cho Prometheus, chạy trên thread riêng
+
+    Mỗi lần scrape chỉ đọc thống kê hiện có của các component (giống timer
+    cập nhật thông tin của GUI) nên không chặn vòng lặp xử lý frame. Số đếm
+    lấy từ một snapshot PersonCounter.get_all_stats() (giữ khoá của counter)
+    nên các metric của cùng một lần scrape luôn nhất quán với nhau.
+    """
+
+    def __init__(
+        self,
+        counter=None,
+        alert_system=None,
+        data_logger=None,
+        host=API_HOST,
+        port=API_PORT,
+    ):
+        """
+        Khởi tạo server
+
+        Args:
+            counter (PersonCounter): Nguồn số đếm/FPS/độ trễ
+            alert_system (AlertSystem): Nguồn trạng thái cảnh báo
+            data_logger (DataLogger): Nguồn độ dài hàng đợi ghi file
+            host (str): Địa chỉ lắng nghe
+            port (int): Cổng lắng nghe (0 = chọn cổng trống)
+        """
+        self.counter = counter
+        self.alert_system = alert_system
+        self.data_logger = data_logger
+        self.host = host
+        self.port = port
+        self.httpd = None
+        self.thread = None
+
+    def render(self):
+        """
+        Tạo nội dung metric hiện tại
+
+        Returns:
+            str: Văn bản theo định dạng Prometheus
+        """
+        return render_metrics(self.counter, self.alert_system, self.data_logger)
+
+    def start(self):
+        """
+        Mở cổng và chạy server trên daemon thread
+
+        Returns:
+            tuple: (host, port) đang lắng nghe
+        """
+        if self.httpd is not None:
+            return self.address
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.metrics = self
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, name="metrics-server", daemon=True
+        )
+        self.thread.start()
+        print(f"📈 Metrics: http://{self.address[0]}:{self.address[1]}/metrics")
+        return self.address
+
+    @property
+    def address(self):
+        """(host, port) đang lắng nghe, None nếu chưa chạy"""
+        if self.httpd is None:
+            return None
+        return self.httpd.server_address[:2]
+
+    def stop(self):
+        """
+        Dừng server và đóng cổng
+        """
+        if self.httpd is None:
+            return
+
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+        self.httpd = None
+        self.thread = None
@@ -0,0 +1,720 @@
+"""
+Module API HTTP/WebSocket (asyncio) phục vụ số đếm, cảnh báo và frame đã vẽ
+"""
+
+import asyncio
+import base64
+import collections
+import contextlib
+import hashlib
+import json
+import math
+import struct
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import cv2
+import numpy as np
+
+from config.settings import (
+    API_EVENT_RATE,
+    API_HOST,
+    API_JPEG_QUALITY,
+    API_MAX_CLIENTS,
+    API_PORT,
+    API_STREAM_FPS,
+)
+
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .metrics import render_metrics
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MJPEG_BOUNDARY = "frame"
+MAX_HEADER_SIZE = 16384
+MAX_WS_MESSAGE = 65536
+ALERT_QUEUE_SIZE = 100
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class BadRequest(Exception):
+    """
+    Request không hợp lệ (header, tham số query, ...) → trả về 400
+
+    Mọi lỗi khác khi xử lý request là lỗi của server → trả về 500.
+    """
+
+
+def _json_default(value):
+    """Chuyển kiểu NumPy/khác sang kiểu JSON"""
+    if isinstance(value, np.generic):
+        return _finite(value.item())
+    if isinstance(value, np.ndarray):
+        return _finite(value.tolist())
+    return str(value)
+
+
+def _finite(value):
+    """Thay NaN/vô cực (không có trong JSON chuẩn) bằng None, đệ quy"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def to_json(data):
+    """
+    Serialize dữ liệu (có thể chứa kiểu NumPy) thành JSON chuẩn
+
+    NaN/vô cực (vd: ô trống của CSV lịch sử, trung bình của bucket rỗng)
+    được ghi thành null thay vì NaN mà trình duyệt không đọc được.
+
+    Args:
+        data: Dữ liệu
+
+    Returns:
+        bytes: JSON dạng UTF-8
+    """
+    return json.dumps(
+        _finite(data), ensure_ascii=False, allow_nan=False, default=_json_default
+    ).encode("utf-8")
+
+
+def websocket_accept_key(key):
+    """
+    Tính Sec-WebSocket-Accept từ Sec-WebSocket-Key (RFC 6455)
+
+    Args:
+        key (str): Giá trị Sec-WebSocket-Key của client
+
+    Returns:
+        str: Giá trị Sec-WebSocket-Accept
+    """
+    digest = hashlib.sha1((key + WS_GUID).encode("ascii")).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def encode_websocket_frame(payload, opcode=0x1):
+    """
+    Đóng gói một frame WebSocket từ server (không mask)
+
+    Args:
+        payload (bytes): Nội dung
+        opcode (int): 0x1 text, 0x2 binary, 0x8 close, 0xA pong
+
+    Returns:
+        bytes: Frame hoàn chỉnh
+    """
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 65536:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+async def read_websocket_frame(reader):
+    """
+    Đọc một frame WebSocket từ client
+
+    Args:
+        reader (asyncio.StreamReader): Luồng đọc
+
+    Returns:
+        tuple: (opcode, payload)
+    """
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    if length > MAX_WS_MESSAGE:
+        raise ConnectionError("WebSocket message quá lớn")
+
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask is not None and payload:
+        data = np.frombuffer(payload, dtype=np.uint8)
+        keys = np.resize(np.frombuffer(mask, dtype=np.uint8), len(data))
+        payload = (data ^ keys).tobytes()
+    return first & 0x0F, payload
+
+
+def _query_float(query, name, default=None):
+    """Đọc tham số số thực (hữu hạn) từ query string"""
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        value = float(values[0])
+    except ValueError:
+        value = math.nan
+    if not math.isfinite(value):
+        raise BadRequest(f"Tham số {name} không hợp lệ: {values[0]!r}")
+    return value
+
+
+class ApiServer:
+    """
+    Server asyncio phục vụ dashboard không cần GUI
+
+    Các endpoint:
+    - GET /api/stats: thống kê hiện tại của PersonCounter và AlertSystem
+    - GET /api/history?since=&until=&limit=: lịch sử số liệu của DataLogger
+    - GET /api/rollup?resolution=60&since=: số người tổng hợp theo thời gian
+    - GET /metrics: metric Prometheus
+    - GET /snapshot.jpg: frame đã vẽ mới nhất
+    - GET /stream.mjpg?fps=: luồng MJPEG
+    - GET /ws?rate=: WebSocket nhận sự kiện số đếm/cảnh báo mỗi frame
+
+    Vòng lặp xử lý frame chỉ gọi publish() (đẩy dữ liệu sang event loop).
+    Mỗi frame được mã hoá JPEG đúng một lần trên thread phụ, mỗi sự kiện được
+    serialize JSON đúng một lần, rồi dùng chung cho mọi client nên chi phí
+    không tăng theo số client. Client chậm luôn nhận frame/sự kiện mới nhất
+    (bỏ qua các bản cũ) thay vì tích lũy hàng đợi; cảnh báo thì không bị bỏ.
+    """
+
+    def __init__(
+        self,
+        counter=None,
+        alert_system=None,
+        data_logger=None,
+        host=API_HOST,
+        port=API_PORT,
+        stream_fps=API_STREAM_FPS,
+        event_rate=API_EVENT_RATE,
+        jpeg_quality=API_JPEG_QUALITY,
+        max_clients=API_MAX_CLIENTS,
+    ):
+        """
+        Khởi tạo server
+
+        Args:
+            counter (PersonCounter): Nguồn thống kê
+            alert_system (AlertSystem): Nguồn trạng thái cảnh báo
+            data_logger (DataLogger): Nguồn lịch sử số liệu
+            host (str): Địa chỉ lắng nghe
+            port (int): Cổng lắng nghe (0 = chọn cổng trống)
+            stream_fps (float): FPS tối đa của MJPEG (cũng là tốc độ mã hoá tối đa)
+            event_rate (float): Số sự kiện số đếm tối đa mỗi giây cho một client
+            jpeg_quality (int): Chất lượng JPEG (0-100)
+            max_clients (int): Số kết nối đồng thời tối đa
+        """
+        self.counter = counter
+        self.alert_system = alert_system
+        self.data_logger = data_logger
+        self.host = host
+        self.port = port
+        self.stream_fps = stream_fps
+        self.event_rate = event_rate
+        self.jpeg_quality = int(jpeg_quality)
+        self.max_clients = max_clients
+
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+        # Frame JPEG mới nhất, dùng chung cho mọi client
+        self.jpeg = None
+        self.frame_seq = 0
+        self._pending_frame = None
+        self._encoding = False
+        self._last_encode = 0.0
+
+        # Sự kiện số đếm mới nhất (JSON) và hàng đợi cảnh báo của từng client
+        self.event = None
+        self.event_seq = 0
+        self.alert_queues = []
+
+        self.clients = 0
+        self.stream_clients = 0
+        self._tick = None
+        self.counts = {"frames_published": 0, "frames_encoded": 0, "events": 0}
+
+    def publish(self, frame=None, stats=None, alert_info=None):
+        """
+        Đẩy frame đã vẽ và thống kê của frame mới nhất cho các client
+
+        Không mã hoá/serialize trên thread gọi; khi server chưa chạy thì bỏ qua.
+
+        Args:
+            frame (numpy.ndarray): Frame BGR đã vẽ (None = không có frame)
+            stats (dict): Kết quả PersonCounter.get_all_stats()
+            alert_info (dict): Cảnh báo của frame (None/{} = không có)
+        """
+        loop = self.loop
+        if loop is None:
+            return
+        with contextlib.suppress(RuntimeError):
+            loop.call_soon_threadsafe(self._on_publish, frame, stats, alert_info)
+
+    def _notify(self):
+        """Đánh thức tất cả client đang chờ dữ liệu mới"""
+        tick, self._tick = self._tick, asyncio.Event()
+        tick.set()
+
+    async def _wait_change(self, timeout=None):
+        """
+        Chờ tới khi có frame/sự kiện mới
+
+        Args:
+            timeout (float): Thời gian chờ tối đa (None = vô hạn)
+        """
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._tick.wait(), timeout)
+
+    def _on_publish(self, frame, stats, alert_info):
+        """Nhận dữ liệu từ publish() trên event loop"""
+        self.counts["frames_published"] += 1
+
+        if stats is not None and self.alert_queues:
+            self.event = to_json(
+                {"type": "stats", "stats": stats, "alert": alert_info or None}
+            )
+            self.event_seq += 1
+            self.counts["events"] += 1
+
+            # Cảnh báo mới (có excess_count) hoặc thông báo trở về bình thường
+            if alert_info and (
+                "excess_count" in alert_info or not alert_info.get("is_active", True)
+            ):
+                message = to_json({"type": "alert", "alert": alert_info})
+                for queue in self.alert_queues:
+                    queue.append(message)
+
+        if frame is not None and self.stream_clients:
+            self._pending_frame = frame
+            if not self._encoding:
+                self._encoding = True
+                self.loop.create_task(self._encode_frames())
+
+        self._notify()
+
+    async def _encode_frames(self):
+        """
+        Mã hoá frame mới nhất thành JPEG (tối đa stream_fps lần mỗi giây)
+        """
+        try:
+            while self._pending_frame is not None and self.stream_clients:
+                wait = self._last_encode + 1 / self.stream_fps - time.perf_counter()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+                # Lấy frame mới nhất tại thời điểm mã hoá, bỏ qua các frame cũ hơn
+                frame, self._pending_frame = self._pending_frame, None
+                ok, buffer = await self.loop.run_in_executor(
+                    None,
+                    cv2.imencode,
+                    ".jpg",
+                    frame,
+                    [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality],
+                )
+                self._last_encode = time.perf_counter()
+                if ok:
+                    self.jpeg = buffer.tobytes()
+                    self.frame_seq += 1
+                    self.counts["frames_encoded"] += 1
+                    self._notify()
+        finally:
+            self._encoding = False
+
+    async def _handle(self, reader, writer):
+        """
+        Xử lý một kết nối (một request, sau đó đóng kết nối)
+        """
+        try:
+            request = await self._read_request(reader)
+            if request is None:
+                return
+            if self.clients >= self.max_clients:
+                await self._send(writer, 503, b"Too many clients", "text/plain")
+                return
+
+            self.clients += 1
+            try:
+                await self._route(reader, writer, *request)
+            finally:
+                self.clients -= 1
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except BadRequest as e:
+            with contextlib.suppress(ConnectionError):
+                await self._send(writer, 400, str(e).encode("utf-8"), "text/plain")
+        except Exception as e:  # pylint: disable=broad-except
+            # Không trả chi tiết lỗi nội bộ cho client
+            print(f"❌ Lỗi khi xử lý request API: {e!r}")
+            with contextlib.suppress(ConnectionError):
+                await self._send(writer, 500, b"Internal Server Error", "text/plain")
+        finally:
+            writer.close()
+            with contextlib.suppress(Exception):
+                await writer.wait_closed()
+
+    async def _read_request(self, reader):
+        """
+        Đọc request line và header
+
+        Returns:
+            tuple: (method, path, query, headers) hoặc None nếu kết nối đóng
+        """
+        try:
+            data = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise BadRequest("Header quá lớn")
+        if len(data) > MAX_HEADER_SIZE:
+            raise BadRequest("Header quá lớn")
+
+        lines = data.decode("latin-1").split("\r\n")
+        parts = lines[0].split()
+        if len(parts) != 3:
+            raise BadRequest("Request line không hợp lệ")
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        url = urlsplit(parts[1])
+        return parts[0].upper(), url.path, parse_qs(url.query), headers
+
+    async def _send(self, writer, status, body, content_type, headers=None):
+        """
+        Gửi một response hoàn chỉnh
+
+        Args:
+            writer (asyncio.StreamWriter): Luồng ghi
+            status (int): Mã trạng thái
+            body (bytes): Nội dung
+            content_type (str): Content-Type
+            headers (dict): Header bổ sung
+        """
+        head = [
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            "Connection: close",
+            "Access-Control-Allow-Origin: *",
+        ]
+        head.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def _send_json(self, writer, data):
+        """Gửi response JSON"""
+        await self._send(writer, 200, to_json(data), "application/json")
+
+    async def _route(self, reader, writer, method, path, query, headers):
+        """Chọn handler theo đường dẫn"""
+        if method != "GET":
+            await self._send(writer, 405, b"Method Not Allowed", "text/plain")
+            return
+
+        if path == "/api/stats":
+            await self._send_json(writer, self.get_stats())
+        elif path == "/api/history":
+            await self._handle_history(writer, query)
+        elif path == "/api/rollup":
+            await self._handle_rollup(writer, query)
+        elif path == "/metrics":
+            body = render_metrics(self.counter, self.alert_system, self.data_logger)
+            await self._send(writer, 200, body.encode("utf-8"), METRICS_CONTENT_TYPE)
+        elif path == "/snapshot.jpg":
+            await self._handle_snapshot(writer)
+        elif path == "/stream.mjpg":
+            await self._handle_mjpeg(writer, query)
+        elif path == "/ws":
+            await self._handle_websocket(reader, writer, headers, query)
+        else:
+            await self._send(writer, 404, b"Not Found", "text/plain")
+
+    def get_stats(self):
+        """
+        Lấy thống kê hiện tại cho /api/stats
+
+        Chạy trên event loop trong lúc vòng xử lý frame vẫn cập nhật: số đếm
+        là snapshot PersonCounter.get_all_stats() (giữ khoá của counter),
+        thống kê cảnh báo đọc trên bản sao lịch sử cảnh báo.
+
+        Returns:
+            dict: {"stats", "alerts", "server"}
+        """
+        return {
+            "stats": self.counter.get_all_stats() if self.counter else {},
+            "alerts": (
+                self.alert_system.get_alert_stats() if self.alert_system else {}
+            ),
+            "server": {
+                **self.counts,
+                "clients": self.clients,
+                "stream_clients": self.stream_clients,
+                "event_clients": len(self.alert_queues),
+            },
+        }
+
+    async def _handle_history(self, writer, query):
+        """GET /api/history: lịch sử số liệu của DataLogger"""
+        if self.data_logger is None:
+            await self._send_json(writer, {"records": []})
+            return
+
+        since = _query_float(query, "since")
+        until = _query_float(query, "until")
+        limit = _query_float(query, "limit")
+        records = await self.loop.run_in_executor(
+            None,
+            self.data_logger.query_history,
+            since,
+            until,
+            None if limit is None else int(limit),
+        )
+        await self._send_json(writer, {"records": records})
+
+    async def _handle_rollup(self, writer, query):
+        """GET /api/rollup: số người tổng hợp theo khoảng thời gian"""
+        if self.counter is None:
+            await self._send(writer, 404, b"Not Found", "text/plain")
+            return
+
+        resolution = _query_float(query, "resolution", 60)
+        if resolution == int(resolution):
+            resolution = int(resolution)
+        if resolution not in self.counter.rollup.series:
+            raise BadRequest(f"Không có độ phân giải {resolution}s")
+        series = self.counter.get_rollup(resolution, _query_float(query, "since"))
+        await self._send_json(
+            writer,
+            {"resolution": resolution, **{k: v.tolist() for k, v in series.items()}},
+        )
+
+    async def _wait_frame(self, last_seq, timeout=None):
+        """
+        Chờ frame JPEG mới hơn last_seq
+
+        Returns:
+            bool: True nếu có frame mới
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self.frame_seq == last_seq:
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                return False
+            await self._wait_change(remaining)
+        return True
+
+    async def _handle_snapshot(self, writer):
+        """
+        GET /snapshot.jpg: frame publish sau khi nhận request (chờ tối đa 2 giây)
+
+        Frame chỉ được mã hoá khi có client xem ảnh, nên JPEG đang giữ có thể
+        đã cũ: đăng ký làm client rồi chờ JPEG của lần publish kế tiếp. Nguồn
+        video dừng (không có publish mới) thì trả về JPEG cuối cùng nếu có.
+        """
+        self.stream_clients += 1
+        try:
+            if not await self._wait_frame(self.frame_seq, timeout=2.0):
+                if self.jpeg is None:
+                    await self._send(writer, 503, b"No frame yet", "text/plain")
+                    return
+            await self._send(writer, 200, self.jpeg, "image/jpeg")
+        finally:
+            self.stream_clients -= 1
+
+    async def _handle_mjpeg(self, writer, query):
+        """GET /stream.mjpg?fps=: luồng MJPEG, mỗi client có giới hạn FPS riêng"""
+        fps = min(_query_float(query, "fps", self.stream_fps), self.stream_fps)
+        if fps <= 0:
+            raise BadRequest("fps phải lớn hơn 0")
+        interval = 1 / fps
+
+        self.stream_clients += 1
+        try:
+            writer.write(
+                (
+                    "HTTP/1.1 200 OK\r\n"
+                    f"Content-Type: multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}\r\n"
+                    "Cache-Control: no-cache\r\n"
+                    "Connection: close\r\n"
+                    "Access-Control-Allow-Origin: *\r\n\r\n"
+                ).encode("latin-1")
+            )
+            await writer.drain()
+
+            last_seq = self.frame_seq - 1 if self.jpeg is not None else self.frame_seq
+            while True:
+                await self._wait_frame(last_seq)
+                sent_at = time.perf_counter()
+                last_seq, jpeg = self.frame_seq, self.jpeg
+                writer.write(
+                    (
+                        f"--{MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                        f"Content-Length: {len(jpeg)}\r\n\r\n"
+                    ).encode("latin-1")
+                    + jpeg
+                    + b"\r\n"
+                )
+                await writer.drain()
+
+                # Giới hạn tốc độ riêng của client: frame đến sớm hơn sẽ bị bỏ qua
+                wait = sent_at + interval - time.perf_counter()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+        finally:
+            self.stream_clients -= 1
+
+    async def _handle_websocket(self, reader, writer, headers, query):
+        """GET /ws?rate=: sự kiện số đếm (giới hạn tốc độ) và cảnh báo (không bỏ)"""
+        key = headers.get("sec-websocket-key")
+        if headers.get("upgrade", "").lower() != "websocket" or not key:
+            raise BadRequest("Cần WebSocket upgrade")
+
+        rate = min(_query_float(query, "rate", self.event_rate), self.event_rate)
+        if rate <= 0:
+            raise BadRequest("rate phải lớn hơn 0")
+        interval = 1 / rate
+
+        writer.write(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\n"
+                "Connection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {websocket_accept_key(key)}\r\n\r\n"
+            ).encode("latin-1")
+        )
+        await writer.drain()
+
+        alerts = collections.deque(maxlen=ALERT_QUEUE_SIZE)
+        self.alert_queues.append(alerts)
+        receiver = self.loop.create_task(self._receive_websocket(reader, writer))
+        try:
+            last_seq = self.event_seq
+            next_time = 0.0
+            while not receiver.done():
+                while alerts:
+                    writer.write(encode_websocket_frame(alerts.popleft()))
+
+                now = time.perf_counter()
+                if self.event_seq != last_seq and now >= next_time:
+                    last_seq = self.event_seq
+                    next_time = now + interval
+                    writer.write(encode_websocket_frame(self.event))
+                await writer.drain()
+
+                # Sự kiện đến sớm hơn giới hạn được gộp: chỉ gửi bản mới nhất
+                timeout = None if self.event_seq == last_seq else next_time - now
+                await self._wait_change(timeout)
+        finally:
+            self.alert_queues.remove(alerts)
+            receiver.cancel()
+
+    async def _receive_websocket(self, reader, writer):
+        """
+        Đọc frame từ client: trả lời ping, kết thúc khi client đóng kết nối
+        """
+        try:
+            while True:
+                opcode, payload = await read_websocket_frame(reader)
+                if opcode == 0x8:
+                    writer.write(encode_websocket_frame(payload[:2], opcode=0x8))
+                    break
+                if opcode == 0x9:
+                    writer.write(encode_websocket_frame(payload, opcode=0xA))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            # Đánh thức vòng gửi để nó thấy kết nối đã đóng
+            self._notify()
+
+    def start(self):
+        """
+        Chạy event loop và server trên daemon thread
+
+        Returns:
+            tuple: (host, port) đang lắng nghe
+        """
+        if self.thread is not None:
+            return self.address
+
+        self._ready.clear()
+        self._error = None
+        self.thread = threading.Thread(target=self._run, name="api-server", daemon=True)
+        self.thread.start()
+        self._ready.wait()
+
+        if self._error is not None:
+            self.thread.join()
+            self.thread = None
+            raise self._error
+
+        print(f"🌐 API: http://{self.address[0]}:{self.address[1]}")
+        return self.address
+
+    def _run(self):
+        """Thân của thread server"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self.server = loop.run_until_complete(
+                asyncio.start_server(
+                    self._handle, self.host, self.port, limit=MAX_HEADER_SIZE
+                )
+            )
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            loop.close()
+            return
+
+        self._tick = asyncio.Event()
+        self.loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self.loop = None
+            self.server.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(self.server.wait_closed())
+            loop.close()
+            self.server = None
+
+    @property
+    def address(self):
+        """(host, port) đang lắng nghe, None nếu chưa chạy"""
+        if self.server is None or not self.server.sockets:
+            return None
+        return self.server.sockets[0].getsockname()[:2]
+
+    def stop(self):
+        """
+        Dừng server, đóng tất cả kết nối
+        """
+        if self.thread is None:
+            return
+
+        loop = self.loop
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        self.thread.join()
+        self.thread = None
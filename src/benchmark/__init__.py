@@ -0,0 +1,23 @@
+"""
+Benchmark modules: đo hiệu năng các thành phần và toàn pipeline
+"""
+
+from .accuracy import accuracy_delta, evaluate_detections
+from .compare import compare_reports, find_regressions
+from .evaluation import AccuracySweep
+from .soak import SoakTest
+from .startup import StartupBenchmark
+from .suite import BenchmarkSuite, load_report, save_report
+
+__all__ = [
+    "BenchmarkSuite",
+    "load_report",
+    "save_report",
+    "compare_reports",
+    "find_regressions",
+    "SoakTest",
+    "StartupBenchmark",
+    "evaluate_detections",
+    "accuracy_delta",
+    "AccuracySweep",
+]
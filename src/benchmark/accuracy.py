@@ -0,0 +1,280 @@
+"""
+Module đo độ chính xác detection trên dataset có label: precision, recall,
+mAP@0.5 và sai số đếm người (dùng để so sánh các biến thể model)
+"""
+
+import cv2
+import numpy as np
+
+from config.settings import (
+    CONFIDENCE_THRESHOLD,
+    INFERENCE_IMGSZ,
+    IOU_THRESHOLD,
+    PERSON_CLASS_ID,
+)
+from src.core.dataset import load_labels
+from src.core.tiling import pairwise_overlap
+
+# Ngưỡng confidence khi chạy model để tính mAP (giữ gần như mọi box)
+MAP_CONFIDENCE = 0.001
+
+# Chỉ số được so sánh giữa hai lần đánh giá
+ACCURACY_METRICS = ("precision", "recall", "f1", "map50", "count_mae")
+
+
+def _as_boxes(array, columns):
+    """Mảng (N, >=columns) float32; mảng rỗng → (0, columns)"""
+    array = np.asarray(array, dtype=np.float32)
+    if array.size == 0:
+        return np.empty((0, columns), dtype=np.float32)
+    return array.reshape(len(array), -1)
+
+
+def match_detections(predictions, ground_truth, iou_threshold=0.5):
+    """
+    Ghép prediction với ground truth bằng phép toán mảng (không lặp từng box)
+
+    Các cặp có IoU >= ngưỡng được sắp theo confidence rồi IoU giảm dần; mỗi
+    prediction giữ cặp đầu tiên, mỗi ground truth thuộc về prediction có
+    confidence cao nhất trong các cặp còn lại (giống ultralytics val). Kết
+    quả của một prediction chỉ phụ thuộc các prediction confidence cao hơn
+    nên ghép một lần ở confidence thấp đúng cho mọi ngưỡng cao hơn.
+
+    Args:
+        predictions (numpy.ndarray): Mảng (N, >=5) x1, y1, x2, y2, confidence
+        ground_truth (numpy.ndarray): Mảng (M, >=4) x1, y1, x2, y2
+        iou_threshold (float): IoU tối thiểu để tính là đúng
+
+    Returns:
+        numpy.ndarray: Mảng bool (N,) theo thứ tự đầu vào, True = true positive
+    """
+    predictions = _as_boxes(predictions, 5)
+    ground_truth = _as_boxes(ground_truth, 4)
+    tp = np.zeros(len(predictions), dtype=bool)
+    if len(predictions) == 0 or len(ground_truth) == 0:
+        return tp
+
+    ious = pairwise_overlap(predictions, "iou", ground_truth[:, :4])
+    pred_index, gt_index = np.nonzero(ious >= iou_threshold)
+    if len(pred_index) == 0:
+        return tp
+
+    order = np.lexsort((-ious[pred_index, gt_index], -predictions[pred_index, 4]))
+    pred_index, gt_index = pred_index[order], gt_index[order]
+    first = np.sort(np.unique(pred_index, return_index=True)[1])
+    pred_index, gt_index = pred_index[first], gt_index[first]
+    first = np.unique(gt_index, return_index=True)[1]
+    tp[pred_index[first]] = True
+    return tp
+
+
+def average_precision(confidences, tp, num_ground_truth):
+    """
+    AP (diện tích dưới đường precision-recall, nội suy mọi điểm)
+
+    Args:
+        confidences (numpy.ndarray): Confidence của mọi prediction (mọi ảnh)
+        tp (numpy.ndarray): True positive tương ứng
+        num_ground_truth (int): Tổng số ground truth
+
+    Returns:
+        float: AP trong khoảng 0-1 (0 nếu không có ground truth)
+    """
+    if num_ground_truth == 0:
+        return 0.0
+    order = np.argsort(-np.asarray(confidences), kind="stable")
+    tp = np.asarray(tp, dtype=bool)[order]
+    tp_cum = np.cumsum(tp)
+    fp_cum = np.cumsum(~tp)
+    recall = np.concatenate([[0.0], tp_cum / num_ground_truth, [1.0]])
+    precision = np.concatenate([[1.0], tp_cum / np.maximum(tp_cum + fp_cum, 1), [0.0]])
+    # Đường bao: precision tại recall r = precision lớn nhất ở recall >= r
+    precision = np.flip(np.maximum.accumulate(np.flip(precision)))
+    changed = np.where(recall[1:] != recall[:-1])[0]
+    return float(
+        np.sum((recall[changed + 1] - recall[changed]) * precision[changed + 1])
+    )
+
+
+def match_results(results, iou_threshold=0.5):
+    """
+    Ghép prediction của mọi ảnh một lần, dùng lại cho mọi ngưỡng confidence
+
+    Args:
+        results (list): [(predictions (N, >=5), ground_truth (M, >=4))] mỗi ảnh
+        iou_threshold (float): IoU tối thiểu để tính là đúng
+
+    Returns:
+        dict: Mảng phẳng của mọi prediction "confidences", "tp", "image"
+            (chỉ số ảnh) và "ground_truth" (số ground truth mỗi ảnh)
+    """
+    confidences, matches, images = [], [], []
+    ground_truth = np.zeros(len(results), dtype=np.int64)
+    for index, (predictions, truth) in enumerate(results):
+        predictions = _as_boxes(predictions, 5)
+        truth = _as_boxes(truth, 4)
+        confidences.append(predictions[:, 4])
+        matches.append(match_detections(predictions, truth, iou_threshold))
+        images.append(np.full(len(predictions), index, dtype=np.int64))
+        ground_truth[index] = len(truth)
+
+    def concat(arrays, dtype):
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=dtype)
+
+    return {
+        "confidences": concat(confidences, np.float32),
+        "tp": concat(matches, bool),
+        "image": concat(images, np.int64),
+        "ground_truth": ground_truth,
+    }
+
+
+def threshold_metrics(matched, conf_thresholds):
+    """
+    Precision, recall, F1 và sai số đếm tại nhiều ngưỡng confidence cùng lúc
+
+    Args:
+        matched (dict): Kết quả match_results
+        conf_thresholds (list): Các ngưỡng confidence
+
+    Returns:
+        list: Mỗi ngưỡng một dict confidence, tp, fp, fn, precision, recall,
+            f1, count_mae (sai số tuyệt đối trung bình của số người mỗi ảnh)
+            và count_bias (đếm thừa > 0, đếm thiếu < 0)
+    """
+    thresholds = np.asarray(conf_thresholds, dtype=np.float32).reshape(-1)
+    ground_truth = matched["ground_truth"]
+    num_gt = int(ground_truth.sum())
+
+    # kept[t, i]: prediction i được giữ ở ngưỡng t
+    kept = matched["confidences"][None, :] >= thresholds[:, None]
+    tp = (kept & matched["tp"][None, :]).sum(axis=1)
+    detections = kept.sum(axis=1)
+
+    counts = np.zeros((len(thresholds), len(ground_truth)), dtype=np.int64)
+    rows, columns = np.nonzero(kept)
+    np.add.at(counts, (rows, matched["image"][columns]), 1)
+    errors = counts - ground_truth[None, :]
+
+    metrics = []
+    for i, threshold in enumerate(thresholds):
+        true_positive = int(tp[i])
+        precision = true_positive / detections[i] if detections[i] else 0.0
+        recall = true_positive / num_gt if num_gt else 0.0
+        total = precision + recall
+        metrics.append(
+            {
+                "confidence": float(threshold),
+                "tp": true_positive,
+                "fp": int(detections[i]) - true_positive,
+                "fn": num_gt - true_positive,
+                "precision": float(precision),
+                "recall": float(recall),
+                "f1": float(2 * precision * recall / total) if total else 0.0,
+                "count_mae": (
+                    float(np.abs(errors[i]).mean()) if errors.shape[1] else 0.0
+                ),
+                "count_bias": float(errors[i].mean()) if errors.shape[1] else 0.0,
+            }
+        )
+    return metrics
+
+
+def evaluate_detections(
+    results, conf_threshold=CONFIDENCE_THRESHOLD, iou_threshold=0.5
+):
+    """
+    Tính các chỉ số trên danh sách kết quả từng ảnh
+
+    Args:
+        results (list): [(predictions (N, >=5), ground_truth (M, >=4))] mỗi ảnh;
+            predictions nên chạy với confidence thấp (MAP_CONFIDENCE) để tính mAP
+        conf_threshold (float): Ngưỡng confidence khi đếm (precision/recall/đếm)
+        iou_threshold (float): IoU tối thiểu để tính là đúng
+
+    Returns:
+        dict: images, ground_truth, tp, fp, fn, precision, recall, f1,
+            map50, count_mae (sai số tuyệt đối trung bình của số người mỗi
+            ảnh) và count_bias (đếm thừa > 0, đếm thiếu < 0)
+    """
+    matched = match_results(results, iou_threshold)
+    metrics = threshold_metrics(matched, [conf_threshold])[0]
+    del metrics["confidence"]
+    num_gt = int(matched["ground_truth"].sum())
+    return {
+        "images": len(results),
+        "ground_truth": num_gt,
+        **metrics,
+        "map50": average_precision(matched["confidences"], matched["tp"], num_gt),
+    }
+
+
+def accuracy_delta(baseline, candidate, metrics=ACCURACY_METRICS):
+    """
+    Mức chênh của candidate so với baseline (candidate - baseline)
+
+    Args:
+        baseline (dict): Kết quả evaluate_detections của model gốc
+        candidate (dict): Kết quả của biến thể cần so sánh
+        metrics (tuple): Các chỉ số cần so sánh
+
+    Returns:
+        dict: {chỉ số: chênh lệch}
+    """
+    return {metric: candidate[metric] - baseline[metric] for metric in metrics}
+
+
+def predict_samples(
+    model_path,
+    samples,
+    imgsz=INFERENCE_IMGSZ,
+    iou=IOU_THRESHOLD,
+    class_id=PERSON_CLASS_ID,
+    label_ids=None,
+    progress=None,
+):
+    """
+    Chạy model trên các ảnh có label, lấy prediction và ground truth của một class
+
+    Args:
+        model_path (str): File model (.pt, .onnx, ...) load bằng ultralytics
+        samples (list): [(đường dẫn ảnh, đường dẫn label)]
+        imgsz (int): Kích thước inference
+        iou (float): Ngưỡng IoU của NMS
+        class_id (int): Class của model cần đánh giá
+        label_ids (tuple): Class id trong label của dataset ứng với class_id
+            (xem person_label_ids; None = chỉ class_id)
+        progress (callable): Gọi progress(số ảnh đã xong, tổng)
+
+    Returns:
+        list: [(predictions (N, 6), ground_truth (M, 5))] mỗi ảnh đọc được
+    """
+    from ultralytics import YOLO
+
+    task = None if str(model_path).endswith(".pt") else "detect"
+    model = YOLO(str(model_path), task=task)
+    label_ids = (class_id,) if label_ids is None else tuple(label_ids)
+    results = []
+    for done, (image_path, label_path) in enumerate(samples, 1):
+        image = cv2.imread(image_path)
+        if image is None:
+            continue
+        height, width = image.shape[:2]
+        ground_truth = load_labels(label_path, width, height)
+        ground_truth = ground_truth[np.isin(ground_truth[:, 4], label_ids)]
+        ground_truth[:, 4] = class_id
+
+        result = model(image, conf=MAP_CONFIDENCE, iou=iou, imgsz=imgsz, verbose=False)
+        boxes = result[0].boxes
+        predictions = np.concatenate(
+            [
+                boxes.xyxy.cpu().numpy(),
+                boxes.conf.cpu().numpy()[:, None],
+                boxes.cls.cpu().numpy()[:, None],
+            ],
+            axis=1,
+        ).astype(np.float32)
+        results.append((predictions[predictions[:, 5] == class_id], ground_truth))
+        if progress is not None:
+            progress(done, len(samples))
+    return results
@@ -0,0 +1,171 @@
+"""
+Module so sánh kết quả benchmark với baseline để phát hiện regression hiệu năng
+"""
+
+import math
+
+import numpy as np
+
+from config.settings import BENCHMARK_ALPHA, BENCHMARK_REGRESSION_THRESHOLDS
+
+# Trạng thái của một dòng so sánh
+REGRESSION = "REGRESSION"
+IMPROVEMENT = "IMPROVEMENT"
+OK = "OK"
+NEW = "NEW"
+MISSING = "MISSING"
+
+# Các metric thời gian (càng nhỏ càng tốt) có thể đặt ngưỡng
+TIME_METRICS = ("mean_ms", "median_ms", "p95_ms", "min_ms", "max_ms")
+
+
+def mann_whitney_u(current, baseline):
+    """
+    Kiểm định Mann-Whitney U một phía: current có chậm hơn baseline không
+
+    Dùng scipy nếu có; nếu không dùng xấp xỉ chuẩn có hiệu chỉnh giá trị
+    bằng nhau và hiệu chỉnh liên tục (đủ chính xác với vài chục mẫu).
+
+    Args:
+        current (list): Các mẫu thời gian của lần chạy hiện tại
+        baseline (list): Các mẫu thời gian của baseline
+
+    Returns:
+        tuple: (U của current, p-value)
+    """
+    x = np.asarray(current, dtype=np.float64)
+    y = np.asarray(baseline, dtype=np.float64)
+    n1, n2 = len(x), len(y)
+    if n1 == 0 or n2 == 0:
+        return 0.0, 1.0
+
+    try:
+        from scipy.stats import mannwhitneyu
+    except ImportError:
+        pass
+    else:
+        result = mannwhitneyu(x, y, alternative="greater")
+        return float(result.statistic), float(result.pvalue)
+
+    # Hạng trung bình cho các giá trị bằng nhau
+    _, inverse, counts = np.unique(
+        np.concatenate([x, y]), return_inverse=True, return_counts=True
+    )
+    ranks = (np.cumsum(counts) - (counts - 1) / 2)[inverse]
+    u = float(ranks[:n1].sum() - n1 * (n1 + 1) / 2)
+
+    n = n1 + n2
+    tie_term = float((counts**3 - counts).sum()) / (n * (n - 1))
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term)
+    if variance <= 0:
+        # Tất cả mẫu bằng nhau
+        return u, 1.0
+
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare_reports(current, baseline, thresholds=None, alpha=BENCHMARK_ALPHA):
+    """
+    So sánh hai báo cáo benchmark theo từng trường hợp và từng metric
+
+    Một metric là regression khi chậm hơn baseline quá ngưỡng VÀ kiểm định
+    Mann-Whitney trên các mẫu lặp lại cho thấy khác biệt có ý nghĩa (p < alpha),
+    để nhiễu đo không làm fail CI.
+
+    Args:
+        current (dict): Báo cáo hiện tại (BenchmarkSuite.run())
+        baseline (dict): Báo cáo baseline
+        thresholds (dict): {metric: tỉ lệ chậm đi tối đa}, vd: {"median_ms": 0.1}
+        alpha (float): Mức ý nghĩa
+
+    Returns:
+        list: Mỗi dòng một dict {"key", "metric", "baseline", "current",
+            "change_pct", "threshold_pct", "p_value", "status"}
+    """
+    if thresholds is None:
+        thresholds = BENCHMARK_REGRESSION_THRESHOLDS
+    current_results = {r["key"]: r for r in current["results"]}
+    baseline_results = {r["key"]: r for r in baseline["results"]}
+
+    rows = []
+    for key, result in current_results.items():
+        base = baseline_results.get(key)
+        if base is None:
+            rows.append(_row(key, None, None, result, None, NEW))
+            continue
+
+        _, p_value = mann_whitney_u(result["samples_ms"], base["samples_ms"])
+        # Chiều ngược lại: current nhanh hơn baseline có ý nghĩa
+        _, p_faster = mann_whitney_u(base["samples_ms"], result["samples_ms"])
+
+        for metric, threshold in thresholds.items():
+            old, new = base[metric], result[metric]
+            change = (new - old) / old if old > 0 else 0.0
+            if change > threshold and p_value < alpha:
+                status = REGRESSION
+            elif change < -threshold and p_faster < alpha:
+                status = IMPROVEMENT
+            else:
+                status = OK
+            rows.append(_row(key, metric, base, result, threshold, status))
+            rows[-1]["change_pct"] = change * 100
+            rows[-1]["p_value"] = p_value
+
+    for key, base in baseline_results.items():
+        if key not in current_results:
+            rows.append(_row(key, None, base, None, None, MISSING))
+
+    return rows
+
+
+def _row(key, metric, base, result, threshold, status):
+    """Tạo một dòng so sánh"""
+    return {
+        "key": key,
+        "metric": metric,
+        "baseline": base[metric] if base is not None and metric else None,
+        "current": result[metric] if result is not None and metric else None,
+        "change_pct": None,
+        "threshold_pct": threshold * 100 if threshold is not None else None,
+        "p_value": None,
+        "status": status,
+    }
+
+
+def find_regressions(rows):
+    """
+    Lọc các dòng regression
+
+    Args:
+        rows (list): Kết quả compare_reports()
+
+    Returns:
+        list: Các dòng có status REGRESSION
+    """
+    return [row for row in rows if row["status"] == REGRESSION]
+
+
+def parse_thresholds(values):
+    """
+    Đọc ngưỡng từ dòng lệnh dạng "metric=phần trăm"
+
+    Args:
+        values (list): Vd: ["median_ms=10", "p95_ms=25"]
+
+    Returns:
+        dict: {metric: tỉ lệ}, None nếu không có giá trị nào
+    """
+    if not values:
+        return None
+    thresholds = {}
+    for value in values:
+        metric, _, percent = value.partition("=")
+        metric = metric.strip()
+        if not percent or metric not in TIME_METRICS:
+            raise ValueError(
+                f"Ngưỡng không hợp lệ (cần metric=phần trăm, metric thuộc "
+                f"{', '.join(TIME_METRICS)}): {value}"
+            )
+        thresholds[metric] = float(percent) / 100
+    return thresholds
@@ -0,0 +1,367 @@
+"""
+Module đánh giá độ chính xác - tốc độ offline trên split có label: chạy
+PersonDetector với từng biến thể model và kích thước inference, lưu
+prediction vào cache rồi chấm lại theo mọi ngưỡng confidence/IoU của NMS mà
+không chạy lại inference
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from config.settings import (
+    CONFIDENCE_THRESHOLD,
+    EVAL_CACHE_DIR,
+    EVAL_CONFIDENCES,
+    EVAL_IMGSZ,
+    EVAL_IOU_THRESHOLDS,
+    EVAL_MATCH_IOU,
+    EVAL_VARIANTS,
+    INFERENCE_IMGSZ,
+    IOU_THRESHOLD,
+    PERSON_CLASS_ID,
+    YOLO_MODEL,
+)
+from src.core.dataset import load_labels
+from src.core.model_registry import file_sha256
+from src.core.person_detector import PersonDetector
+from src.core.tiling import non_max_suppression
+
+from .accuracy import (
+    MAP_CONFIDENCE,
+    average_precision,
+    match_results,
+    threshold_metrics,
+)
+from .suite import environment_info
+
+# Phiên bản định dạng file cache (đổi khi cách lưu prediction thay đổi)
+CACHE_VERSION = 2
+
+
+def _split(array, counts, columns):
+    """Tách mảng phẳng thành danh sách mảng theo số phần tử mỗi ảnh"""
+    array = np.asarray(array, dtype=np.float32).reshape(-1, columns)
+    return np.split(array, np.cumsum(counts)[:-1]) if len(counts) else []
+
+
+class AccuracySweep:
+    """
+    Quét độ chính xác và tốc độ theo biến thể model, imgsz, IoU NMS, confidence
+
+    Mỗi tổ hợp (biến thể, imgsz) chạy PersonDetector một lần trên các ảnh
+    với confidence rất thấp và ngưỡng NMS lớn nhất cần quét; prediction,
+    ground truth và độ trễ từng ảnh được lưu vào cache theo hash của model,
+    cấu hình và danh sách ảnh. Các ngưỡng IoU nhỏ hơn được áp dụng lại bằng
+    NMS trên prediction đã lưu, còn mọi ngưỡng confidence được chấm cùng lúc
+    từ một lần ghép với ground truth (xem match_detections).
+    """
+
+    def __init__(
+        self,
+        samples,
+        model_path=YOLO_MODEL,
+        variants=EVAL_VARIANTS,
+        imgsz=EVAL_IMGSZ,
+        iou_thresholds=EVAL_IOU_THRESHOLDS,
+        confidences=EVAL_CONFIDENCES,
+        match_iou=EVAL_MATCH_IOU,
+        cache_dir=EVAL_CACHE_DIR,
+        detector_factory=None,
+        label_ids=None,
+    ):
+        """
+        Khởi tạo bộ quét
+
+        Args:
+            samples (list): [(đường dẫn ảnh, đường dẫn label)] cần đánh giá
+            model_path (str): File trọng số gốc
+            variants (tuple): Biến thể model trong ModelRegistry ("pt", "onnx", ...)
+            imgsz (tuple): Các kích thước inference
+            iou_thresholds (tuple): Các ngưỡng IoU của NMS
+            confidences (tuple): Các ngưỡng confidence
+            match_iou (float): IoU tối thiểu để prediction khớp ground truth
+            cache_dir (str): Thư mục cache prediction (None = không cache)
+            detector_factory (callable): detector_factory(biến thể) → PersonDetector
+                (None = PersonDetector(model_path, variant=biến thể))
+            label_ids (tuple): Class id trong label của dataset được tính là người
+                (xem person_label_ids; None = person_class_id của detector)
+        """
+        if not samples:
+            raise ValueError("Không có ảnh có label để đánh giá")
+        if not variants or not imgsz or not iou_thresholds or not confidences:
+            raise ValueError(
+                "Cần ít nhất một biến thể, imgsz, ngưỡng IoU và confidence"
+            )
+        self.samples = list(samples)
+        self.model_path = model_path
+        self.variants = tuple(variants)
+        self.imgsz = tuple(int(size) for size in imgsz)
+        self.iou_thresholds = tuple(sorted(float(iou) for iou in iou_thresholds))
+        self.confidences = tuple(sorted(float(conf) for conf in confidences))
+        self.match_iou = float(match_iou)
+        self.cache_dir = None if cache_dir is None else str(cache_dir)
+        self.label_ids = (
+            None if label_ids is None else tuple(sorted(int(i) for i in label_ids))
+        )
+        self.detector_factory = detector_factory or (
+            lambda variant: PersonDetector(self.model_path, variant=variant)
+        )
+
+    @property
+    def nms_iou(self):
+        """Ngưỡng NMS khi chạy inference: ngưỡng lớn nhất (giữ nhiều box nhất)"""
+        return self.iou_thresholds[-1]
+
+    def person_label_ids(self, detector=None):
+        """
+        Class id trong label được tính là ground truth người
+
+        Args:
+            detector (PersonDetector): Detector sẽ chạy (khi label_ids là None)
+
+        Returns:
+            tuple: Các class id
+        """
+        if self.label_ids is not None:
+            return self.label_ids
+        return (int(getattr(detector, "person_class_id", PERSON_CLASS_ID)),)
+
+    def cache_key(self, variant, imgsz, detector=None):
+        """
+        Khoá cache của một lần chạy inference
+
+        Args:
+            variant (str): Biến thể model yêu cầu
+            imgsz (int): Kích thước inference
+            detector (PersonDetector): Detector sẽ chạy (để lấy cấu hình tile)
+
+        Returns:
+            str: Hash sha256 của model, cấu hình, class người trong label và
+                danh sách ảnh
+        """
+        model = (
+            file_sha256(self.model_path)
+            if os.path.isfile(self.model_path)
+            else str(self.model_path)
+        )
+        config = {
+            "version": CACHE_VERSION,
+            "model": model,
+            "variant": variant,
+            "imgsz": imgsz,
+            "nms_iou": self.nms_iou,
+            "confidence": MAP_CONFIDENCE,
+            "tiled": bool(getattr(detector, "tiled", False)),
+            "label_ids": list(self.person_label_ids(detector)),
+            "samples": [[str(image), str(label)] for image, label in self.samples],
+        }
+        encoded = json.dumps(config, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def _load_cache(self, key):
+        """Prediction đã lưu của một lần chạy hoặc None"""
+        if self.cache_dir is None or not os.path.isfile(self._cache_path(key)):
+            return None
+        try:
+            with np.load(self._cache_path(key)) as data:
+                counts = data["counts"]
+                truth_counts = data["truth_counts"]
+                return {
+                    "predictions": _split(data["boxes"], counts, 6),
+                    "ground_truth": _split(data["truth"], truth_counts, 4),
+                    "latency_ms": data["latency_ms"].astype(np.float64),
+                    "variant": str(data["variant"]),
+                    "cached": True,
+                }
+        except (OSError, KeyError, ValueError) as e:
+            print(f"⚠️ Bỏ qua cache hỏng {self._cache_path(key)}: {e}")
+            return None
+
+    def _save_cache(self, key, run):
+        """Ghi prediction của một lần chạy (ghi file tạm rồi đổi tên)"""
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        predictions, truth = run["predictions"], run["ground_truth"]
+        with tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, suffix=".npz", delete=False
+        ) as f:
+            np.savez_compressed(
+                f,
+                boxes=np.concatenate(predictions or [np.empty((0, 6))]),
+                counts=np.array([len(p) for p in predictions], dtype=np.int64),
+                truth=np.concatenate(truth or [np.empty((0, 4))]),
+                truth_counts=np.array([len(t) for t in truth], dtype=np.int64),
+                latency_ms=np.asarray(run["latency_ms"], dtype=np.float64),
+                variant=np.array(run["variant"]),
+            )
+            temp = f.name
+        os.replace(temp, self._cache_path(key))
+
+    def predict(self, variant, imgsz, progress=None):
+        """
+        Prediction của một tổ hợp (biến thể, imgsz): từ cache hoặc chạy detector
+
+        Args:
+            variant (str): Biến thể model yêu cầu
+            imgsz (int): Kích thước inference
+            progress (callable): Gọi progress(số ảnh đã xong, tổng) khi chạy
+
+        Returns:
+            dict: "predictions" (mỗi ảnh một mảng (N, 6)), "ground_truth"
+                (mỗi ảnh một mảng (M, 4)), "latency_ms" (mỗi ảnh), "variant"
+                (biến thể thực sự được load) và "cached"
+        """
+        detector = self.detector_factory(variant)
+        key = self.cache_key(variant, imgsz, detector)
+        run = self._load_cache(key)
+        if run is not None:
+            return run
+
+        # Giữ gần như mọi box: ngưỡng confidence/IoU được áp dụng khi chấm
+        detector.imgsz = imgsz
+        detector.confidence_threshold = MAP_CONFIDENCE
+        detector.iou_threshold = self.nms_iou
+        if not detector.warm_up():
+            raise RuntimeError(
+                f"Không load được model '{variant}': {detector.warmup_error}"
+            )
+
+        label_ids = self.person_label_ids(detector)
+        predictions, truth, latency = [], [], []
+        for done, (image_path, label_path) in enumerate(self.samples, 1):
+            image = cv2.imread(str(image_path))
+            if image is not None:
+                height, width = image.shape[:2]
+                labels = load_labels(label_path, width, height)
+                labels = labels[np.isin(labels[:, 4], label_ids)]
+
+                start = time.perf_counter()
+                boxes = detector.detect_array(image)
+                latency.append((time.perf_counter() - start) * 1000)
+                predictions.append(np.asarray(boxes, dtype=np.float32).reshape(-1, 6))
+                truth.append(labels[:, :4])
+            if progress is not None:
+                progress(done, len(self.samples))
+
+        run = {
+            "predictions": predictions,
+            "ground_truth": truth,
+            "latency_ms": np.asarray(latency, dtype=np.float64),
+            "variant": detector.variant or variant,
+            "cached": False,
+        }
+        self._save_cache(key, run)
+        return run
+
+    def score(self, run, iou_threshold):
+        """
+        Chấm prediction đã có ở một ngưỡng NMS và mọi ngưỡng confidence
+
+        Args:
+            run (dict): Kết quả predict()
+            iou_threshold (float): Ngưỡng IoU của NMS (<= nms_iou)
+
+        Returns:
+            tuple: (map50, danh sách chỉ số theo từng ngưỡng confidence)
+        """
+        predictions = run["predictions"]
+        if iou_threshold < self.nms_iou:
+            predictions = [non_max_suppression(p, iou_threshold) for p in predictions]
+        matched = match_results(
+            list(zip(predictions, run["ground_truth"])), self.match_iou
+        )
+        map50 = average_precision(
+            matched["confidences"], matched["tp"], int(matched["ground_truth"].sum())
+        )
+        return map50, threshold_metrics(matched, self.confidences)
+
+    def run(self, progress=None):
+        """
+        Chạy toàn bộ phép quét
+
+        Args:
+            progress (callable): Gọi progress(biến thể, imgsz, số ảnh đã xong, tổng)
+
+        Returns:
+            dict: Báo cáo (cấu hình, môi trường, "runs" mỗi tổ hợp biến thể/imgsz,
+                "results" mỗi tổ hợp với IoU NMS và confidence, "best" theo F1
+                và theo sai số đếm, "current" ứng với cấu hình đang dùng)
+        """
+        runs, results = [], []
+        for variant in self.variants:
+            for imgsz in self.imgsz:
+
+                def callback(done, total, variant=variant, imgsz=imgsz):
+                    if progress is not None:
+                        progress(variant, imgsz, done, total)
+
+                run = self.predict(variant, imgsz, callback)
+
+                latency = run["latency_ms"]
+                median = float(np.median(latency)) if len(latency) else 0.0
+                summary = {
+                    "variant": variant,
+                    "resolved_variant": run["variant"],
+                    "imgsz": imgsz,
+                    "images": len(run["predictions"]),
+                    "latency_ms": median,
+                    "p95_ms": (
+                        float(np.percentile(latency, 95)) if len(latency) else 0.0
+                    ),
+                    "fps": 1000 / median if median > 0 else 0.0,
+                    "cached": run["cached"],
+                }
+                runs.append(summary)
+
+                for iou in self.iou_thresholds:
+                    map50, metrics = self.score(run, iou)
+                    for metric in metrics:
+                        results.append(
+                            {
+                                "variant": variant,
+                                "imgsz": imgsz,
+                                "iou": iou,
+                                **metric,
+                                "map50": map50,
+                                "latency_ms": median,
+                                "fps": summary["fps"],
+                            }
+                        )
+
+        current = [
+            row
+            for row in results
+            if row["imgsz"] == INFERENCE_IMGSZ
+            and np.isclose(row["iou"], IOU_THRESHOLD)
+            and np.isclose(row["confidence"], CONFIDENCE_THRESHOLD)
+        ]
+        return {
+            "config": {
+                "model": str(self.model_path),
+                "images": len(self.samples),
+                "variants": list(self.variants),
+                "imgsz": list(self.imgsz),
+                "iou_thresholds": list(self.iou_thresholds),
+                "confidences": list(self.confidences),
+                "match_iou": self.match_iou,
+                "label_ids": None if self.label_ids is None else list(self.label_ids),
+            },
+            "environment": environment_info(),
+            "runs": runs,
+            "results": results,
+            "best": {
+                "f1": max(results, key=lambda row: row["f1"]),
+                "count_mae": min(results, key=lambda row: row["count_mae"]),
+            },
+            "current": current,
+        }
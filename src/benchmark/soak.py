@@ -0,0 +1,497 @@
+"""
+Module soak test: chạy pipeline nhiều frame liên tục và theo dõi bộ nhớ
+(RSS, heap Python, số object, bộ nhớ torch, kích thước các buffer) để
+phát hiện rò rỉ
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from config.settings import (
+    PROJECT_ROOT,
+    SOAK_FLUSH_INTERVAL,
+    SOAK_FRAMES,
+    SOAK_GROWTH_LIMITS,
+    SOAK_LOG_INTERVAL,
+    SOAK_SAMPLE_INTERVAL,
+    SOAK_SOURCE,
+    SOAK_TOP_SITES,
+    TRACKING_ENABLED,
+)
+from src.core.alert_system import AlertSystem
+from src.core.clock import ManualClock
+from src.core.data_logger import DataLogger
+from src.core.person_counter import PersonCounter
+from src.core.person_detector import PersonDetector
+from src.core.synthetic_source import open_video_source
+from src.core.tracker import PersonTracker
+from src.core.visualizer import Visualizer
+
+from .suite import _Result, environment_info
+
+# Các chuỗi số liệu bộ nhớ được kiểm tra tăng liên tục
+MEMORY_METRICS = ("rss_bytes", "heap_bytes", "torch_bytes", "objects")
+
+# Số frame lưu cho mỗi vị trí cấp phát: đủ sâu để vượt qua numpy/stdlib
+# và tìm ra dòng code của project đã gây cấp phát
+TRACE_DEPTH = 8
+
+# Thành phần có buffer sống suốt phiên chạy: vị trí cấp phát trong file của
+# các lớp này được báo cáo riêng
+COMPONENTS = (DataLogger, AlertSystem, Visualizer)
+
+
+class GroundTruthModel:
+    """
+    Model thay cho YOLO khi soak test: trả ground truth của nguồn giả lập
+
+    Số detection bám theo mật độ người của nguồn nên bộ đếm, tracker và
+    cảnh báo chạy như với camera thật mà không cần trọng số model.
+    """
+
+    def __init__(self, capture):
+        """
+        Args:
+            capture (SyntheticVideoCapture): Nguồn giả lập đang được đọc
+        """
+        self.capture = capture
+
+    def __call__(self, source, **kwargs):
+        truth = self.capture.get_ground_truth()
+        boxes = np.zeros((len(truth), 6), dtype=np.float32)
+        boxes[:, :4] = truth[:, :4]
+        boxes[:, 4] = 0.9
+        return [_Result(boxes)]
+
+
+def current_rss():
+    """
+    Bộ nhớ thường trú (RSS) hiện tại của process
+
+    Dùng psutil nếu có; nếu không đọc /proc/self/statm (Linux); cuối cùng
+    dùng ru_maxrss của resource (đỉnh RSS, không giảm).
+
+    Returns:
+        int: Số byte, None nếu không đọc được
+    """
+    try:
+        import psutil
+    except ImportError:
+        pass
+    else:
+        return psutil.Process().memory_info().rss
+
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS trả byte, Linux trả KB
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def torch_allocated():
+    """
+    Bộ nhớ GPU đang được cấp phát bởi allocator của torch
+
+    Không import torch (chậm); chỉ đo khi torch đã được nạp, vd: bởi YOLO.
+
+    Returns:
+        int: Số byte, None nếu không có torch hoặc CUDA
+    """
+    torch = sys.modules.get("torch")
+    if torch is None or not torch.cuda.is_available():
+        return None
+    return int(torch.cuda.memory_allocated())
+
+
+def type_counts():
+    """
+    Đếm các object được GC theo dõi theo tên kiểu
+
+    Returns:
+        collections.Counter: {tên kiểu: số object}
+    """
+    return Counter(type(obj).__name__ for obj in gc.get_objects())
+
+
+def detect_growth(frames, values, limit):
+    """
+    Phát hiện một chuỗi số liệu tăng liên tục
+
+    Mức tăng được ước lượng bằng hồi quy tuyến tính trên cả cửa sổ đo (ít
+    nhạy với một mẫu nhiễu). Chuỗi chỉ bị coi là tăng liên tục khi mức tăng
+    vượt ngưỡng VÀ mọi mẫu ở 1/3 cuối đều lớn hơn mọi mẫu ở 1/3 đầu, để một
+    đợt tăng rồi giảm (cache đầy, GC chưa chạy) không làm fail.
+
+    Args:
+        frames (list): Chỉ số frame của từng mẫu
+        values (list): Giá trị từng mẫu (None = không đo được)
+        limit (float): Mức tăng tối đa cho phép (None = chỉ báo cáo)
+
+    Returns:
+        dict: {"start", "end", "growth", "per_1k_frames", "limit", "sustained"}
+    """
+    points = [(f, v) for f, v in zip(frames, values) if v is not None]
+    result = {
+        "start": points[0][1] if points else None,
+        "end": points[-1][1] if points else None,
+        "growth": 0.0,
+        "per_1k_frames": 0.0,
+        "limit": limit,
+        "sustained": False,
+    }
+    if len(points) < 3:
+        return result
+
+    x = np.array([p[0] for p in points], dtype=np.float64)
+    y = np.array([p[1] for p in points], dtype=np.float64)
+    if x[-1] == x[0]:
+        return result
+    slope = float(np.polyfit(x, y, 1)[0])
+    growth = slope * (x[-1] - x[0])
+
+    third = max(1, len(y) // 3)
+    trending = y[-third:].min() > y[:third].max()
+
+    result["growth"] = growth
+    result["per_1k_frames"] = slope * 1000
+    result["sustained"] = bool(limit is not None and growth > limit and trending)
+    return result
+
+
+def _site(traceback):
+    """
+    Vị trí cấp phát dạng "file:dòng" (đường dẫn tương đối với project)
+
+    Lấy frame gần nhất nằm trong project (bỏ qua numpy, thư viện chuẩn) để
+    np.ones()/dict() được quy về dòng code đã gọi chúng.
+    """
+    root = str(PROJECT_ROOT)
+    frames = list(traceback)  # Từ frame cũ nhất đến frame mới nhất
+    chosen = frames[-1]
+    for frame in reversed(frames):
+        if frame.filename.startswith(root) and "site-packages" not in frame.filename:
+            chosen = frame
+            break
+    filename = chosen.filename
+    try:
+        filename = os.path.relpath(filename, root)
+    except ValueError:
+        pass
+    return f"{filename}:{chosen.lineno}"
+
+
+class SoakTest:
+    """
+    Soak test: chạy capture → detect → count → alert → log → draw nhiều frame
+
+    Vòng lặp giống VideoThread của GUI. Đồng hồ của bộ đếm và cảnh báo là
+    ManualClock tăng 1/fps mỗi frame nên cooldown cảnh báo và FPS giống chạy
+    thật dù pipeline chạy nhanh hơn thời gian thực. Cứ sample_interval frame
+    lấy mẫu RSS, heap (tracemalloc), số object và kích thước các buffer; sau
+    warm-up, chuỗi nào tăng liên tục quá ngưỡng thì soak test fail.
+    """
+
+    def __init__(
+        self,
+        frames=SOAK_FRAMES,
+        sample_interval=SOAK_SAMPLE_INTERVAL,
+        source=SOAK_SOURCE,
+        warmup=None,
+        log_interval=SOAK_LOG_INTERVAL,
+        flush_interval=SOAK_FLUSH_INTERVAL,
+        limits=None,
+        top=SOAK_TOP_SITES,
+        detector=None,
+    ):
+        """
+        Khởi tạo soak test
+
+        Args:
+            frames (int): Số frame cần chạy (nguồn hết frame thì đọc lại từ đầu)
+            sample_interval (int): Số frame giữa hai lần lấy mẫu
+            source (str): Nguồn video (synthetic://, file, camera)
+            warmup (int): Số frame đầu không tính vào phân tích (None = 1/5 frames)
+            log_interval (int): Ghi một record vào DataLogger mỗi N frame
+            flush_interval (int): Ghi buffer ra CSV mỗi N frame (0 = không ghi)
+            limits (dict): Ghi đè SOAK_GROWTH_LIMITS, vd: {"heap_bytes": 1e6}
+            top (int): Số vị trí cấp phát/kiểu object trong báo cáo
+            detector (PersonDetector): Detector dùng (None = PersonDetector với
+                ground truth của nguồn giả lập)
+        """
+        if frames <= 0 or sample_interval <= 0:
+            raise ValueError("frames và sample_interval phải > 0")
+        self.frames = int(frames)
+        self.sample_interval = int(sample_interval)
+        self.source = source
+        self.warmup = self.frames // 5 if warmup is None else int(warmup)
+        self.log_interval = int(log_interval)
+        self.flush_interval = int(flush_interval)
+        self.limits = {**SOAK_GROWTH_LIMITS, **(limits or {})}
+        self.top = int(top)
+        self.detector = detector
+
+    def _make_detector(self, capture):
+        """PersonDetector đọc ground truth của nguồn giả lập thay cho YOLO"""
+        if not hasattr(capture, "get_ground_truth"):
+            raise ValueError(
+                "Nguồn không phải synthetic:// cần truyền detector cho soak test"
+            )
+        detector = PersonDetector()
+        detector.model = GroundTruthModel(capture)
+        return detector
+
+    def run(self, progress=None):
+        """
+        Chạy soak test
+
+        Args:
+            progress (callable): Gọi progress(mẫu vừa lấy, số frame đã chạy)
+
+        Returns:
+            dict: Báo cáo (cấu hình, các mẫu, mức tăng từng chuỗi, vị trí cấp
+                phát và kiểu object tăng nhiều nhất, "passed")
+        """
+        capture = open_video_source(self.source)
+        if not capture.isOpened():
+            raise ValueError(f"Không mở được nguồn video: {self.source}")
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+
+        clock = ManualClock()
+        detector = self.detector or self._make_detector(capture)
+        counter = PersonCounter(
+            tracker=PersonTracker() if TRACKING_ENABLED else None, clock=clock
+        )
+        alert_system = AlertSystem(clock=clock)
+        visualizer = Visualizer()
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(TRACE_DEPTH)
+
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                data_logger = DataLogger(
+                    os.path.join(directory, "soak.csv"), enabled=True
+                )
+                buffers = {
+                    "DataLogger.data_buffer": lambda: len(data_logger.data_buffer),
+                    "DataLogger.zone_buffer": lambda: len(data_logger.zone_buffer),
+                    "AlertSystem.alert_history": lambda: len(
+                        alert_system.alert_history
+                    ),
+                    "PersonCounter.count_history": lambda: len(counter.count_history),
+                }
+
+                samples = []
+                snapshots = {}
+                paths = {
+                    key: os.path.join(directory, f"{key}.snapshot")
+                    for key in ("first", "last")
+                }
+                overlay = None
+                start = time.perf_counter()
+
+                for index in range(1, self.frames + 1):
+                    ret, frame = capture.read()
+                    if not ret:
+                        # Video ngắn hơn số frame cần chạy: đọc lại từ đầu
+                        capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        ret, frame = capture.read()
+                        if not ret:
+                            break
+                    clock.advance(1 / fps)
+
+                    detections = detector.detect_persons(frame)
+                    person_count = counter.update_count(detections, frame.shape)
+                    stats = counter.get_all_stats()
+                    alert_system.check_stats(stats)
+                    alert_system.check_zone_alerts(stats.get("zones", {}))
+
+                    if self.log_interval and index % self.log_interval == 0:
+                        data_logger.log_data(stats)
+                    if self.flush_interval and index % self.flush_interval == 0:
+                        data_logger.save_to_csv()
+
+                    # Frame hiển thị được giữ lại như QLabel của GUI
+                    overlay = visualizer.draw_detections(
+                        frame, detections, person_count
+                    )
+                    overlay = visualizer.draw_stats(overlay, stats)
+                    if counter.zone_counter is not None:
+                        overlay = visualizer.draw_zones(overlay, counter.zone_counter)
+                    overlay = visualizer.create_legend(overlay)
+
+                    if index % self.sample_interval == 0 or index == self.frames:
+                        sample = self._sample(index, start, buffers, overlay)
+                        samples.append(sample)
+                        if not sample["warmup"]:
+                            key = "last" if "first" in snapshots else "first"
+                            snapshots[key] = self._snapshot(paths[key])
+                        if progress is not None:
+                            progress(sample, index)
+
+                capture.release()
+                elapsed = time.perf_counter() - start
+                frames_run = samples[-1]["frame"] if samples else 0
+                report = self._analyze(samples, snapshots, paths, buffers)
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+
+        report["summary"] = {
+            "frames": frames_run,
+            "elapsed": elapsed,
+            "frames_per_sec": frames_run / elapsed if elapsed > 0 else 0.0,
+            "alerts": len(alert_system.alert_history),
+        }
+        return report
+
+    def _sample(self, index, start, buffers, overlay):
+        """Lấy một mẫu bộ nhớ sau khi thu gom rác"""
+        gc.collect()
+        heap, _ = tracemalloc.get_traced_memory()
+        return {
+            "frame": index,
+            "elapsed_s": time.perf_counter() - start,
+            "warmup": index <= self.warmup,
+            "rss_bytes": current_rss(),
+            "heap_bytes": heap,
+            "torch_bytes": torch_allocated(),
+            "objects": len(gc.get_objects()),
+            "overlay_bytes": int(overlay.nbytes) if overlay is not None else 0,
+            "buffers": {name: size() for name, size in buffers.items()},
+        }
+
+    def _snapshot(self, path):
+        """
+        Đếm object theo kiểu rồi lưu snapshot tracemalloc ra file
+
+        Snapshot không được giữ trong bộ nhớ để chính nó không bị tính là
+        object/heap tăng thêm ở các mẫu sau.
+
+        Returns:
+            collections.Counter: Số object theo kiểu tại thời điểm lấy mẫu
+        """
+        counts = type_counts()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                # Bỏ qua cấp phát của chính soak test (danh sách mẫu, ...)
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            ]
+        )
+        snapshot.dump(path)
+        return counts
+
+    def _analyze(self, samples, snapshots, paths, buffers):
+        """Tính mức tăng từng chuỗi và các vị trí cấp phát tăng nhiều nhất"""
+        measured = [s for s in samples if not s["warmup"]]
+        frames = [s["frame"] for s in measured]
+
+        growth = {}
+        for metric in MEMORY_METRICS:
+            values = [s[metric] for s in measured]
+            if any(v is not None for v in values):
+                growth[metric] = detect_growth(frames, values, self.limits.get(metric))
+        growth["overlay_bytes"] = detect_growth(
+            frames, [s["overlay_bytes"] for s in measured], None
+        )
+        for name in buffers:
+            growth[name] = detect_growth(
+                frames,
+                [s["buffers"][name] for s in measured],
+                self.limits.get("buffer_items"),
+            )
+
+        top_sites, component_sites, top_types = [], {}, []
+        if "last" in snapshots:
+            first = tracemalloc.Snapshot.load(paths["first"])
+            last = tracemalloc.Snapshot.load(paths["last"])
+            first_types, last_types = snapshots["first"], snapshots["last"]
+            top_sites = self._top_sites(first, last)
+            for component in COMPONENTS:
+                filename = sys.modules[component.__module__].__file__
+                component_sites[component.__name__] = self._top_sites(
+                    first, last, filename
+                )
+            diff = last_types.copy()
+            diff.subtract(first_types)
+            top_types = [
+                {
+                    "type": name,
+                    "start": first_types.get(name, 0),
+                    "end": last_types.get(name, 0),
+                    "diff": count,
+                }
+                for name, count in diff.most_common(self.top)
+                if count > 0
+            ]
+
+        failures = [name for name, result in growth.items() if result["sustained"]]
+        return {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "environment": environment_info(),
+            "config": {
+                "frames": self.frames,
+                "sample_interval": self.sample_interval,
+                "source": str(self.source),
+                "warmup": self.warmup,
+                "log_interval": self.log_interval,
+                "flush_interval": self.flush_interval,
+                "limits": self.limits,
+                "tracking_enabled": TRACKING_ENABLED,
+            },
+            "samples": samples,
+            "growth": growth,
+            "top_sites": top_sites,
+            "component_sites": component_sites,
+            "top_types": top_types,
+            "failures": failures,
+            "passed": not failures,
+        }
+
+    def _top_sites(self, first, last, filename=None):
+        """Các dòng code có bộ nhớ cấp phát tăng nhiều nhất giữa hai snapshot"""
+        if filename is not None:
+            # Tính cả cấp phát gián tiếp (numpy, datetime, ...) gọi từ file này
+            only = [tracemalloc.Filter(True, filename, all_frames=True)]
+            first, last = first.filter_traces(only), last.filter_traces(only)
+
+        sites = {}
+        for stat in last.compare_to(first, "traceback"):
+            site = _site(stat.traceback)
+            entry = sites.setdefault(
+                site, {"site": site, "size_diff": 0, "count_diff": 0, "size": 0}
+            )
+            entry["size_diff"] += stat.size_diff
+            entry["count_diff"] += stat.count_diff
+            entry["size"] += stat.size
+
+        # Bỏ các cấp phát của chính soak test (danh sách mẫu, kết quả model giả)
+        own = os.path.relpath(__file__, PROJECT_ROOT)
+        growing = [
+            entry
+            for entry in sites.values()
+            if entry["size_diff"] > 0 and not entry["site"].startswith(own + ":")
+        ]
+        growing.sort(key=lambda entry: entry["size_diff"], reverse=True)
+        return growing[: self.top]
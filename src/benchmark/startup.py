@@ -0,0 +1,209 @@
+"""
+Module đo thời gian import lúc khởi động (python -X importtime) và kiểm tra
+ngân sách: GUI/CLI phải hiện ra nhanh, module nặng chỉ load khi cần
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+from config.settings import (
+    IMPORT_FORBIDDEN_MODULES,
+    IMPORT_TIME_BUDGETS,
+    IMPORT_TIME_REPEATS,
+    PROJECT_ROOT,
+)
+
+from .suite import environment_info
+
+# Dòng đánh dấu: các import in ra trước dòng này là của trình thông dịch
+# (site, encodings...), không tính vào thời gian của module được đo
+MARKER = "-- importtime start --"
+
+# Số import chậm nhất (theo thời gian tự thân) được ghi vào báo cáo
+TOP_IMPORTS = 10
+
+
+def parse_importtime(output):
+    """
+    Đọc output của python -X importtime
+
+    Args:
+        output (str): stderr của process, mỗi dòng dạng
+            "import time: self [us] | cumulative | imported package"
+
+    Returns:
+        list: [{"module", "self_us", "cumulative_us", "depth"}] theo thứ tự
+            in ra (module con in trước module cha); depth = 0 là import trực
+            tiếp từ code được chạy
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Dòng tiêu đề
+        name = fields[2].rstrip()
+        module = name.lstrip()
+        entries.append(
+            {
+                "module": module,
+                "self_us": int(fields[0]),
+                "cumulative_us": int(fields[1]),
+                "depth": (len(name) - len(module) - 1) // 2,
+            }
+        )
+    return entries
+
+
+def measure_import(module):
+    """
+    Import module trong một process Python mới và đo thời gian
+
+    Args:
+        module (str): Tên module, vd: "src.core"
+
+    Returns:
+        dict: {"total_ms", "imports" (parse_importtime), "loaded" (tên các
+            module trong sys.modules sau khi import)}
+    """
+    code = (
+        "import sys, json\n"
+        f"sys.stderr.write({MARKER!r} + '\\n')\n"
+        "sys.stderr.flush()\n"
+        f"import {module}\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=str(PROJECT_ROOT),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        message = result.stderr.strip().splitlines()
+        raise RuntimeError(
+            f"Không import được {module}: {message[-1] if message else ''}"
+        )
+
+    _, _, output = result.stderr.partition(MARKER)
+    imports = parse_importtime(output)
+    # Tổng thời gian = tổng cumulative của các import trực tiếp (depth 0)
+    total_us = sum(entry["cumulative_us"] for entry in imports if entry["depth"] == 0)
+    return {
+        "total_ms": total_us / 1000,
+        "imports": imports,
+        "loaded": json.loads(result.stdout.strip().splitlines()[-1]),
+    }
+
+
+def _is_loaded(name, loaded):
+    """Package name hoặc module con của nó có trong danh sách đã load"""
+    return any(module == name or module.startswith(name + ".") for module in loaded)
+
+
+class StartupBenchmark:
+    """
+    Đo thời gian import của các module khởi động và so với ngân sách
+
+    Mỗi module được import IMPORT_TIME_REPEATS lần, mỗi lần trong một process
+    mới (không có cache sys.modules), lấy trung vị. Kiểm tra thêm các module
+    nặng (pandas, cv2, torch...) không bị kéo vào khi import: ràng buộc này
+    không phụ thuộc tốc độ máy nên bắt được regression kể cả trên CI chậm.
+    """
+
+    def __init__(
+        self,
+        budgets=None,
+        forbidden=None,
+        repeats=IMPORT_TIME_REPEATS,
+        top=TOP_IMPORTS,
+    ):
+        """
+        Khởi tạo benchmark
+
+        Args:
+            budgets (dict): {module: ngân sách ms} (None = IMPORT_TIME_BUDGETS)
+            forbidden (dict): {module: [module không được load]}
+                (None = IMPORT_FORBIDDEN_MODULES)
+            repeats (int): Số lần import mỗi module
+            top (int): Số import chậm nhất ghi vào báo cáo
+        """
+        if repeats < 1:
+            raise ValueError("repeats phải >= 1")
+        self.budgets = dict(IMPORT_TIME_BUDGETS if budgets is None else budgets)
+        self.forbidden = dict(
+            IMPORT_FORBIDDEN_MODULES if forbidden is None else forbidden
+        )
+        self.repeats = repeats
+        self.top = top
+
+    @property
+    def modules(self):
+        """Các module cần đo (theo thứ tự khai báo)"""
+        return list(dict.fromkeys(list(self.budgets) + list(self.forbidden)))
+
+    def run(self, progress=None):
+        """
+        Đo tất cả module
+
+        Args:
+            progress (callable): Gọi progress(module, kết quả) sau mỗi module
+
+        Returns:
+            dict: Báo cáo gồm kết quả từng module, failures và passed
+        """
+        results = {}
+        failures = []
+        for module in self.modules:
+            runs = [measure_import(module) for _ in range(self.repeats)]
+            samples = [run["total_ms"] for run in runs]
+            median = statistics.median(samples)
+            budget = self.budgets.get(module)
+
+            # Import chậm nhất theo thời gian tự thân (lần đo cuối)
+            slowest = sorted(runs[-1]["imports"], key=lambda e: -e["self_us"])
+            loaded = runs[-1]["loaded"]
+            violations = [
+                name
+                for name in self.forbidden.get(module, [])
+                if _is_loaded(name, loaded)
+            ]
+
+            result = {
+                "median_ms": median,
+                "min_ms": min(samples),
+                "max_ms": max(samples),
+                "samples_ms": samples,
+                "budget_ms": budget,
+                "over_budget": budget is not None and median > budget,
+                "forbidden_loaded": violations,
+                "module_count": len(runs[-1]["imports"]),
+                "slowest": [
+                    {"module": e["module"], "self_ms": e["self_us"] / 1000}
+                    for e in slowest[: self.top]
+                ],
+            }
+            results[module] = result
+            if result["over_budget"]:
+                failures.append(f"{module}: {median:.1f} ms > {budget} ms")
+            for name in violations:
+                failures.append(f"{module}: import kéo theo {name}")
+            if progress is not None:
+                progress(module, result)
+
+        return {
+            "config": {
+                "repeats": self.repeats,
+                "budgets": self.budgets,
+                "forbidden": self.forbidden,
+            },
+            "environment": environment_info(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "modules": results,
+            "failures": failures,
+            "passed": not failures,
+        }
@@ -0,0 +1,437 @@
+"""
+Module benchmark cho pipeline detect → count → alert → draw trên frame tổng hợp
+"""
+
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from config.settings import (
+    BENCHMARK_REPEATS,
+    BENCHMARK_WARMUP,
+    PROJECT_ROOT,
+    TRACKING_ENABLED,
+)
+from src.core.alert_system import AlertSystem
+from src.core.person_counter import PersonCounter
+from src.core.person_detector import PersonDetector
+from src.core.tracker import PersonTracker
+from src.core.visualizer import Visualizer
+
+SCHEMA_VERSION = 1
+
+RESOLUTIONS = {
+    "480p": (640, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+DETECTION_COUNTS = (0, 10, 50, 100, 500)
+COMPONENTS = ("detect", "count", "track", "alert", "draw", "pipeline")
+
+# Số frame detection khác nhau (box dịch chuyển dần) được xoay vòng khi đo
+SEQUENCE_LENGTH = 30
+
+
+class _Tensor:
+    """Giả lập tensor của ultralytics (chỉ cần .cpu().numpy())"""
+
+    def __init__(self, array):
+        self._array = array
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self._array
+
+
+class _Boxes:
+    """Giả lập Results.boxes của ultralytics"""
+
+    def __init__(self, boxes):
+        self.xyxy = _Tensor(boxes[:, :4])
+        self.conf = _Tensor(boxes[:, 4])
+        self.cls = _Tensor(boxes[:, 5])
+
+
+class _Result:
+    """Giả lập một Results của ultralytics"""
+
+    def __init__(self, boxes):
+        self.boxes = _Boxes(boxes)
+
+
+class ReplayModel:
+    """
+    Model thay cho YOLO khi benchmark: trả lần lượt các kết quả dựng sẵn
+
+    Cho phép đo toàn bộ phần xử lý của PersonDetector quanh model (chuyển
+    kết quả, lọc class, tạo detection) với số detection chính xác, không phụ
+    thuộc trọng số model hay GPU.
+    """
+
+    def __init__(self, sequence):
+        """
+        Args:
+            sequence (list): Các mảng (N, 6) sẽ được trả về theo vòng
+        """
+        self.results = [_Result(boxes) for boxes in sequence]
+        self.position = 0
+
+    def __call__(self, source, **kwargs):
+        result = self.results[self.position]
+        self.position = (self.position + 1) % len(self.results)
+        return [result]
+
+
+def make_frame(width, height, seed=0):
+    """
+    Tạo frame tổng hợp xác định (cùng seed → cùng frame)
+
+    Args:
+        width (int): Chiều rộng
+        height (int): Chiều cao
+        seed (int): Seed ngẫu nhiên
+
+    Returns:
+        numpy.ndarray: Frame BGR uint8
+    """
+    rng = np.random.default_rng(seed)
+    # Nền gradient + nhiễu để giống ảnh thật hơn một frame đen
+    gradient = np.linspace(0, 200, width, dtype=np.float32)[None, :, None]
+    noise = rng.integers(0, 55, size=(height, width, 3), dtype=np.uint8)
+    return (noise + gradient).astype(np.uint8)
+
+
+def make_detection_sequence(width, height, count, length=SEQUENCE_LENGTH, seed=0):
+    """
+    Tạo chuỗi detection tổng hợp: count người đi chậm qua các frame
+
+    Args:
+        width (int): Chiều rộng frame
+        height (int): Chiều cao frame
+        count (int): Số detection mỗi frame
+        length (int): Số frame trong chuỗi
+        seed (int): Seed ngẫu nhiên
+
+    Returns:
+        list: length mảng (count, 6) float32 x1, y1, x2, y2, confidence, class_id
+    """
+    rng = np.random.default_rng(seed)
+    box_h = rng.uniform(0.08, 0.25, count) * height
+    box_w = box_h * rng.uniform(0.35, 0.5, count)
+    x = rng.uniform(0, width - box_w)
+    y = rng.uniform(0, height - box_h)
+    velocity = rng.normal(0, 0.004, (count, 2)) * (width, height)
+    confidence = rng.uniform(0.5, 0.99, count)
+
+    sequence = []
+    for step in range(length):
+        x1 = np.clip(x + velocity[:, 0] * step, 0, width - box_w)
+        y1 = np.clip(y + velocity[:, 1] * step, 0, height - box_h)
+        boxes = np.column_stack(
+            [x1, y1, x1 + box_w, y1 + box_h, confidence, np.zeros(count)]
+        )
+        sequence.append(boxes.astype(np.float32).reshape(count, 6))
+    return sequence
+
+
+def measure(function, repeats, warmup):
+    """
+    Đo thời gian chạy một hàm (tắt GC trong lúc đo giống timeit)
+
+    Args:
+        function (callable): Hàm không tham số, mỗi lần gọi là một mẫu
+        repeats (int): Số mẫu
+        warmup (int): Số lần chạy trước khi đo
+
+    Returns:
+        list: Thời gian từng mẫu (ms)
+    """
+    for _ in range(warmup):
+        function()
+
+    samples = []
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter_ns()
+            function()
+            samples.append((time.perf_counter_ns() - start) / 1e6)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return samples
+
+
+def summarize(samples):
+    """
+    Thống kê các mẫu thời gian
+
+    Args:
+        samples (list): Thời gian từng mẫu (ms)
+
+    Returns:
+        dict: mean/median/p95/min/max/stdev (ms) và số lần/giây
+    """
+    values = np.asarray(samples, dtype=np.float64)
+    mean = float(values.mean())
+    return {
+        "mean_ms": mean,
+        "median_ms": float(np.median(values)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "min_ms": float(values.min()),
+        "max_ms": float(values.max()),
+        "stdev_ms": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+        "ops_per_sec": 1000 / mean if mean > 0 else 0.0,
+    }
+
+
+def environment_info():
+    """
+    Thông tin môi trường chạy benchmark (để so sánh giữa các lần chạy)
+
+    Returns:
+        dict: Python, hệ điều hành, CPU, phiên bản thư viện và commit git
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        ).stdout.strip()
+    except Exception:
+        commit = ""
+
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "git_commit": commit or None,
+    }
+
+
+class BenchmarkSuite:
+    """
+    Bộ benchmark từng thành phần và toàn pipeline
+
+    Mỗi trường hợp là một tổ hợp (thành phần, độ phân giải, số detection),
+    chạy trên frame và detection tổng hợp xác định theo seed nên kết quả
+    của các commit khác nhau so sánh được với nhau. Model YOLO được thay
+    bằng ReplayModel; thời gian inference thật đo bằng benchmark_tiling.py.
+    """
+
+    def __init__(
+        self,
+        resolutions=tuple(RESOLUTIONS),
+        detection_counts=DETECTION_COUNTS,
+        components=COMPONENTS,
+        repeats=BENCHMARK_REPEATS,
+        warmup=BENCHMARK_WARMUP,
+        seed=0,
+    ):
+        """
+        Khởi tạo bộ benchmark
+
+        Args:
+            resolutions (tuple): Tên độ phân giải trong RESOLUTIONS
+            detection_counts (tuple): Các số detection mỗi frame
+            components (tuple): Các thành phần trong COMPONENTS
+            repeats (int): Số mẫu mỗi trường hợp
+            warmup (int): Số lần chạy trước khi đo
+            seed (int): Seed của dữ liệu tổng hợp
+        """
+        for name in resolutions:
+            if name not in RESOLUTIONS:
+                raise ValueError(f"Độ phân giải không hợp lệ: {name}")
+        for name in components:
+            if name not in COMPONENTS:
+                raise ValueError(f"Thành phần không hợp lệ: {name}")
+
+        self.resolutions = tuple(resolutions)
+        self.detection_counts = tuple(int(n) for n in detection_counts)
+        self.components = tuple(components)
+        self.repeats = int(repeats)
+        self.warmup = int(warmup)
+        self.seed = seed
+
+    def _make_case(self, component, width, height, count):
+        """
+        Tạo hàm chạy một lần của trường hợp benchmark
+
+        Args:
+            component (str): Thành phần
+            width (int): Chiều rộng frame
+            height (int): Chiều cao frame
+            count (int): Số detection mỗi frame
+
+        Returns:
+            callable: Hàm không tham số
+        """
+        frame = make_frame(width, height, self.seed)
+        sequence = make_detection_sequence(width, height, count, seed=self.seed)
+        detections_sequence = [
+            [
+                {
+                    "bbox": [int(v) for v in box[:4]],
+                    "confidence": float(box[4]),
+                    "class_id": 0,
+                }
+                for box in boxes
+            ]
+            for boxes in sequence
+        ]
+        state = {"step": 0}
+
+        def next_detections():
+            step = state["step"]
+            state["step"] = (step + 1) % len(detections_sequence)
+            return detections_sequence[step]
+
+        if component == "detect":
+            detector = PersonDetector()
+            detector.model = ReplayModel(sequence)
+            return lambda: detector.detect_persons(frame)
+
+        if component in ("count", "track"):
+            counter = PersonCounter(
+                tracker=PersonTracker() if component == "track" else None
+            )
+            return lambda: counter.update_count(next_detections(), frame.shape)
+
+        if component == "alert":
+            alert_system = AlertSystem()
+            stats = {"current_count": count, "reported_count": count}
+            return lambda: alert_system.check_stats(stats)
+
+        visualizer = Visualizer()
+        if component == "draw":
+            stats = PersonCounter().get_all_stats()
+
+            def draw():
+                display = visualizer.draw_detections(frame, next_detections(), count)
+                return visualizer.draw_stats(display, stats)
+
+            return draw
+
+        # pipeline: detect → count → alert → draw như một vòng của GUI
+        detector = PersonDetector()
+        detector.model = ReplayModel(sequence)
+        counter = PersonCounter(tracker=PersonTracker() if TRACKING_ENABLED else None)
+        alert_system = AlertSystem()
+
+        def pipeline():
+            detections = detector.detect_persons(frame)
+            person_count = counter.update_count(detections, frame.shape)
+            stats = counter.get_all_stats()
+            alert_system.check_stats(stats)
+            display = visualizer.draw_detections(frame, detections, person_count)
+            return visualizer.draw_stats(display, stats)
+
+        return pipeline
+
+    def cases(self):
+        """
+        Danh sách các trường hợp benchmark
+
+        Returns:
+            list: [(thành phần, độ phân giải, số detection), ...]
+        """
+        return [
+            (component, resolution, count)
+            for component in self.components
+            for resolution in self.resolutions
+            for count in self.detection_counts
+        ]
+
+    def run(self, progress=None):
+        """
+        Chạy tất cả trường hợp
+
+        Args:
+            progress (callable): Gọi progress(kết quả, số đã xong, tổng số)
+
+        Returns:
+            dict: Báo cáo (schema, thời điểm, môi trường, cấu hình, results)
+        """
+        cases = self.cases()
+        results = []
+        for done, (component, resolution, count) in enumerate(cases, 1):
+            width, height = RESOLUTIONS[resolution]
+            function = self._make_case(component, width, height, count)
+            samples = measure(function, self.repeats, self.warmup)
+            result = {
+                "key": f"{component}/{resolution}/{count}",
+                "component": component,
+                "resolution": resolution,
+                "width": width,
+                "height": height,
+                "detections": count,
+                **summarize(samples),
+                "samples_ms": samples,
+            }
+            results.append(result)
+            if progress is not None:
+                progress(result, done, len(cases))
+
+        return {
+            "schema": SCHEMA_VERSION,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "environment": environment_info(),
+            "config": {
+                "repeats": self.repeats,
+                "warmup": self.warmup,
+                "seed": self.seed,
+                "tracking_enabled": TRACKING_ENABLED,
+            },
+            "results": results,
+        }
+
+
+def save_report(report, filename):
+    """
+    Lưu báo cáo benchmark ra file JSON
+
+    Args:
+        report (dict): Kết quả BenchmarkSuite.run()
+        filename (str): Đường dẫn file
+    """
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(filename):
+    """
+    Đọc báo cáo benchmark từ file JSON
+
+    Args:
+        filename (str): Đường dẫn file
+
+    Returns:
+        dict: Báo cáo
+    """
+    with open(filename, encoding="utf-8") as f:
+        report = json.load(f)
+    if report.get("schema") != SCHEMA_VERSION:
+        raise ValueError(f"Phiên bản báo cáo benchmark không hỗ trợ: {filename}")
+    return report
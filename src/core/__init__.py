@@ -1,11 +1,75 @@
 """
 Core modules for person detection and counting
+
+Các class được load lười (PEP 562): `import src.core` không import cv2,
+pandas hay torch; module con chỉ được import khi truy cập tên lần đầu.
 """
 
-from .alert_system import AlertSystem
-from .data_logger import DataLogger
-from .person_counter import PersonCounter
-from .person_detector import PersonDetector
-from .visualizer import Visualizer
+import importlib
+from typing import TYPE_CHECKING
+
+# Tên public → module con chứa nó
+_EXPORTS = {
+    "PersonDetector": ".person_detector",
+    "PersonCounter": ".person_counter",
+    "Visualizer": ".visualizer",
+    "DataLogger": ".data_logger",
+    "AlertSystem": ".alert_system",
+    "FramePipeline": ".pipeline",
+    "InferencePool": ".inference_pool",
+    "RegionOfInterest": ".roi",
+    "MotionGate": ".motion_gate",
+    "PersonTracker": ".tracker",
+    "ZoneCounter": ".zones",
+    "CountSmoother": ".smoothing",
+    "TimeRollup": ".rollup",
+    "Clock": ".clock",
+    "ManualClock": ".clock",
+    "FpsMeter": ".clock",
+    "LatencyRecorder": ".latency",
+    "VideoBatchProcessor": ".video_batch",
+    "ImageBatchProcessor": ".image_batch",
+    "SyntheticVideoCapture": ".synthetic_source",
+    "open_video_source": ".synthetic_source",
+    "SamplingProfiler": ".profiler",
+    "ModelRegistry": ".model_registry",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .alert_system import AlertSystem
+    from .clock import Clock, FpsMeter, ManualClock
+    from .data_logger import DataLogger
+    from .image_batch import ImageBatchProcessor
+    from .inference_pool import InferencePool
+    from .latency import LatencyRecorder
+    from .model_registry import ModelRegistry
+    from .motion_gate import MotionGate
+    from .person_counter import PersonCounter
+    from .person_detector import PersonDetector
+    from .pipeline import FramePipeline
+    from .profiler import SamplingProfiler
+    from .roi import RegionOfInterest
+    from .rollup import TimeRollup
+    from .smoothing import CountSmoother
+    from .synthetic_source import SyntheticVideoCapture, open_video_source
+    from .tracker import PersonTracker
+    from .video_batch import VideoBatchProcessor
+    from .visualizer import Visualizer
+    from .zones import ZoneCounter
+
+
+def __getattr__(name):
+    """Import module con khi truy cập src.core.<tên> lần đầu"""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    # Lưu lại để lần sau không qua __getattr__
+    globals()[name] = value
+    return value
+
 
-__all__ = ["PersonDetector", "PersonCounter", "Visualizer", "DataLogger", "AlertSystem"]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
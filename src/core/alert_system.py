@@ -2,10 +2,11 @@
 Module hệ thống cảnh báo khi số lượng người vượt ngưỡng
 """
 
-import time
 from datetime import datetime
 
-from config.settings import ALERT_ENABLED, MAX_PERSON_COUNT
+from config.settings import ALERT_COUNT_KEY, ALERT_ENABLED, MAX_PERSON_COUNT
+
+from .clock import Clock
 
 
 class AlertSystem:
@@ -13,21 +14,36 @@ class AlertSystem:
     Lớp quản lý hệ thống cảnh báo
     """
 
-    def __init__(self, max_count=MAX_PERSON_COUNT, enabled=ALERT_ENABLED):
+    def __init__(
+        self,
+        max_count=MAX_PERSON_COUNT,
+        enabled=ALERT_ENABLED,
+        count_key=ALERT_COUNT_KEY,
+        clock=None,
+    ):
         """
         Khởi tạo hệ thống cảnh báo
 
         Args:
             max_count (int): Số lượng người tối đa cho phép
             enabled (bool): Bật/tắt hệ thống cảnh báo
+            count_key (str): Chuỗi số liệu dùng cho check_stats
+                ("reported_count" đã làm mượt hoặc "current_count" thô)
+            clock (Clock): Đồng hồ đo cooldown (None = đồng hồ hệ thống)
         """
+        self.clock = clock or Clock()
         self.max_count = max_count
         self.enabled = enabled
+        self.count_key = count_key
         self.alert_history = []
-        self.last_alert_time = 0
+        self.last_alert_time = None  # Thời điểm monotonic, None = chưa cảnh báo
         self.alert_cooldown = 5  # Thời gian chờ giữa các cảnh báo (giây)
         self.is_alert_active = False
 
+        # Cảnh báo theo vùng: thời điểm cảnh báo gần nhất và vùng đang vượt ngưỡng
+        self.zone_alert_times = {}
+        self.active_zones = set()
+
     def check_alert(self, person_count):
         """
         Kiểm tra và xử lý cảnh báo
@@ -41,13 +57,15 @@ class AlertSystem:
         if not self.enabled:
             return None
 
-        current_time = time.time()
+        # Cooldown đo bằng đồng hồ monotonic, wall time chỉ dùng trong record
+        current_time = self.clock.monotonic()
+        timestamp = self.clock.to_wall(current_time)
 
         # Kiểm tra xem có vượt ngưỡng không
         if person_count > self.max_count:
             # Kiểm tra cooldown để tránh spam cảnh báo
-            if current_time - self.last_alert_time >= self.alert_cooldown:
-                alert_info = self._create_alert(person_count, current_time)
+            if self._cooldown_elapsed(self.last_alert_time, current_time):
+                alert_info = self._create_alert(person_count, timestamp)
                 self.alert_history.append(alert_info)
                 self.last_alert_time = current_time
                 self.is_alert_active = True
@@ -58,8 +76,10 @@ class AlertSystem:
                     "type": "warning",
                     "message": f"Cảnh báo: {person_count} người (vượt ngưỡng {self.max_count})",
                     "person_count": person_count,
-                    "timestamp": current_time,
-                    "datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "timestamp": timestamp,
+                    "datetime": datetime.fromtimestamp(timestamp).strftime(
+                        "%Y-%m-%d %H:%M:%S"
+                    ),
                     "is_active": True,
                 }
         else:
@@ -71,20 +91,99 @@ class AlertSystem:
                     "type": "info",
                     "message": f"Số lượng người đã trở về mức bình thường: {person_count}",
                     "person_count": person_count,
-                    "timestamp": current_time,
-                    "datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "timestamp": timestamp,
+                    "datetime": datetime.fromtimestamp(timestamp).strftime(
+                        "%Y-%m-%d %H:%M:%S"
+                    ),
                     "is_active": False,
                 }
 
         return None
 
+    def _cooldown_elapsed(self, last_time, current_time):
+        """
+        Kiểm tra đã hết thời gian chờ kể từ lần cảnh báo trước chưa
+
+        Args:
+            last_time (float): Thời điểm monotonic của cảnh báo trước (None = chưa có)
+            current_time (float): Thời điểm monotonic hiện tại
+
+        Returns:
+            bool: True nếu được phép cảnh báo lại
+        """
+        return last_time is None or current_time - last_time >= self.alert_cooldown
+
+    def check_stats(self, stats):
+        """
+        Kiểm tra cảnh báo từ thống kê của PersonCounter theo count_key
+
+        Args:
+            stats (dict): Kết quả PersonCounter.get_all_stats()
+
+        Returns:
+            dict: Thông tin cảnh báo hoặc None nếu không có cảnh báo
+        """
+        return self.check_alert(
+            stats.get(self.count_key, stats.get("current_count", 0))
+        )
+
+    def check_zone_alerts(self, zone_stats):
+        """
+        Kiểm tra cảnh báo cho các vùng có cấu hình max_count
+
+        Args:
+            zone_stats (dict): {tên vùng: {"count", "max_count", ...}}
+                (khoá "zones" trong PersonCounter.get_all_stats())
+
+        Returns:
+            list: Danh sách cảnh báo mới (mỗi vùng tối đa một cảnh báo mỗi cooldown)
+        """
+        if not self.enabled:
+            return []
+
+        current_time = self.clock.monotonic()
+        timestamp = self.clock.to_wall(current_time)
+        alerts = []
+
+        for name, zone in zone_stats.items():
+            max_count = zone.get("max_count")
+            if max_count is None or zone["count"] <= max_count:
+                self.active_zones.discard(name)
+                continue
+
+            self.active_zones.add(name)
+            if not self._cooldown_elapsed(
+                self.zone_alert_times.get(name), current_time
+            ):
+                continue
+
+            excess = zone["count"] - max_count
+            alert_info = {
+                "type": "warning" if excess <= 2 else "critical",
+                "message": f"Cảnh báo vùng {name}: {zone['count']} người (vượt ngưỡng {max_count})",
+                "zone": name,
+                "person_count": zone["count"],
+                "max_count": max_count,
+                "excess_count": excess,
+                "timestamp": timestamp,
+                "datetime": datetime.fromtimestamp(timestamp).strftime(
+                    "%Y-%m-%d %H:%M:%S"
+                ),
+                "is_active": True,
+            }
+            self.alert_history.append(alert_info)
+            self.zone_alert_times[name] = current_time
+            alerts.append(alert_info)
+
+        return alerts
+
     def _create_alert(self, person_count, timestamp):
         """
         Tạo thông tin cảnh báo
 
         Args:
             person_count (int): Số lượng người
-            timestamp (float): Thời gian cảnh báo
+            timestamp (float): Thời gian cảnh báo (Unix timestamp)
 
         Returns:
             dict: Thông tin cảnh báo
@@ -98,7 +197,7 @@ class AlertSystem:
             "max_count": self.max_count,
             "excess_count": person_count - self.max_count,
             "timestamp": timestamp,
-            "datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "datetime": datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S"),
             "is_active": True,
         }
 
@@ -168,7 +267,10 @@ class AlertSystem:
         Returns:
             dict: Thống kê cảnh báo
         """
-        if not self.alert_history:
+        # Bản sao: có thể được gọi từ thread khác (API, GUI) trong lúc vòng
+        # xử lý frame thêm/xoá cảnh báo
+        history = self.alert_history.copy()
+        if not history:
             return {
                 "total_alerts": 0,
                 "active_alerts": 0,
@@ -176,18 +278,14 @@ class AlertSystem:
                 "last_alert_time": None,
             }
 
-        total_alerts = len(self.alert_history)
-        active_alerts = sum(
-            1 for alert in self.alert_history if alert.get("is_active", False)
-        )
-        max_person_count = max(alert["person_count"] for alert in self.alert_history)
-        last_alert_time = (
-            self.alert_history[-1]["datetime"] if self.alert_history else None
-        )
+        total_alerts = len(history)
+        active_alerts = sum(1 for alert in history if alert.get("is_active", False))
+        max_person_count = max(alert["person_count"] for alert in history)
+        last_alert_time = history[-1]["datetime"]
 
         # Thống kê theo mức độ nghiêm trọng
         severity_counts = {}
-        for alert in self.alert_history:
+        for alert in history:
             severity = alert.get("type", "unknown")
             severity_counts[severity] = severity_counts.get(severity, 0) + 1
 
@@ -236,6 +334,8 @@ class AlertSystem:
         """
         self.alert_history.clear()
         self.is_alert_active = False
+        self.zone_alert_times.clear()
+        self.active_zones.clear()
         print("Đã xóa lịch sử cảnh báo")
 
     def save_alert_log(self, filename="alert_log.txt"):
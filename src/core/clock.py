@@ -0,0 +1,150 @@
+"""
+Module đồng hồ dùng chung: monotonic cho khoảng thời gian/FPS, wall time khi ghi record
+"""
+
+import time
+from collections import deque
+
+from config.settings import FPS_WINDOW
+
+
+class Clock:
+    """
+    Đồng hồ của hệ thống
+
+    monotonic() dùng perf_counter_ns nên không bị ảnh hưởng khi đồng hồ hệ
+    thống bị chỉnh (NTP, đổi giờ); chỉ dùng để đo khoảng thời gian. Thời
+    điểm monotonic được đổi sang wall time bằng một mốc ghi lúc khởi tạo,
+    chỉ khi cần định dạng hoặc lưu record.
+    """
+
+    def __init__(self):
+        """
+        Khởi tạo đồng hồ và ghi mốc wall time tương ứng
+        """
+        self._wall_anchor = time.time()
+        self._monotonic_anchor = self.monotonic()
+
+    def monotonic_ns(self):
+        """
+        Thời điểm monotonic
+
+        Returns:
+            int: Nano giây
+        """
+        return time.perf_counter_ns()
+
+    def monotonic(self):
+        """
+        Thời điểm monotonic
+
+        Returns:
+            float: Giây
+        """
+        return self.monotonic_ns() / 1e9
+
+    def wall(self):
+        """
+        Thời điểm wall time hiện tại
+
+        Returns:
+            float: Unix timestamp (giây)
+        """
+        return time.time()
+
+    def to_wall(self, monotonic):
+        """
+        Đổi thời điểm monotonic sang Unix timestamp
+
+        Args:
+            monotonic (float): Thời điểm từ monotonic()
+
+        Returns:
+            float: Unix timestamp (giây)
+        """
+        return self._wall_anchor + (monotonic - self._monotonic_anchor)
+
+
+class ManualClock(Clock):
+    """
+    Đồng hồ điều khiển bằng tay (dùng cho test, benchmark và nguồn giả lập)
+    """
+
+    def __init__(self, start=0.0, wall_start=1_700_000_000.0):
+        """
+        Khởi tạo đồng hồ
+
+        Args:
+            start (float): Thời điểm monotonic ban đầu (giây)
+            wall_start (float): Unix timestamp tương ứng với start
+        """
+        self._now_ns = int(start * 1e9)
+        self._wall_offset = wall_start - start
+        super().__init__()
+
+    def monotonic_ns(self):
+        """Thời điểm monotonic hiện tại (nano giây)"""
+        return self._now_ns
+
+    def wall(self):
+        """Unix timestamp hiện tại"""
+        return self.monotonic() + self._wall_offset
+
+    def to_wall(self, monotonic):
+        """Đổi thời điểm monotonic sang Unix timestamp"""
+        return monotonic + self._wall_offset
+
+    def advance(self, seconds):
+        """
+        Tăng thời gian
+
+        Args:
+            seconds (float): Số giây
+        """
+        self._now_ns += int(seconds * 1e9)
+
+
+class FpsMeter:
+    """
+    Đo FPS tức thời trên cửa sổ trượt gồm window frame gần nhất
+    """
+
+    def __init__(self, window=FPS_WINDOW):
+        """
+        Khởi tạo bộ đo
+
+        Args:
+            window (int): Số frame trong cửa sổ
+        """
+        if window < 2:
+            raise ValueError("window phải lớn hơn hoặc bằng 2")
+        self.times = deque(maxlen=int(window))
+
+    def tick(self, timestamp):
+        """
+        Ghi nhận một frame
+
+        Args:
+            timestamp (float): Thời điểm monotonic của frame (giây)
+        """
+        self.times.append(timestamp)
+
+    def get_fps(self):
+        """
+        Lấy FPS trên cửa sổ trượt
+
+        Returns:
+            float: FPS (0 nếu chưa đủ 2 frame)
+        """
+        if len(self.times) < 2:
+            return 0.0
+        elapsed = self.times[-1] - self.times[0]
+        if elapsed <= 0:
+            return 0.0
+        return (len(self.times) - 1) / elapsed
+
+    def reset(self):
+        """
+        Xoá các frame đã ghi nhận
+        """
+        self.times.clear()
@@ -3,31 +3,84 @@ Module lưu dữ liệu thống kê vào file CSV
 """
 
 import csv
+import json
 import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
 from datetime import datetime
-
-import pandas as pd
-
-from config.settings import CSV_FILENAME, DATA_DIR, SAVE_TO_CSV
+from itertools import chain
+
+from config.settings import (
+    CSV_FILENAME,
+    DATA_DIR,
+    HISTORY_CACHE_RECORDS,
+    HISTORY_INDEX_STRIDE,
+    LOG_COUNT_KEY,
+    SAVE_TO_CSV,
+)
+
+
+def _parse_value(text):
+    """Giá trị của một ô CSV: int, float, chuỗi hoặc None nếu ô trống"""
+    if text == "":
+        return None
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
 
 
 class DataLogger:
     """
     Lớp lưu dữ liệu thống kê vào file CSV
+
+    query_history() có thể được gọi từ thread khác (API): các dòng của file
+    CSV được đọc tăng dần (chỉ phần mới ghi thêm); chỉ history_cache record
+    gần nhất được giữ trong bộ nhớ, khoảng cũ hơn được đọc lại từ file khi
+    cần, bắt đầu từ mốc byte offset gần nhất. Khoá _lock giữ cho file,
+    buffer và bản đọc luôn khớp nhau.
     """
 
-    def __init__(self, filename=None, enabled=SAVE_TO_CSV):
+    def __init__(
+        self,
+        filename=None,
+        enabled=SAVE_TO_CSV,
+        count_key=LOG_COUNT_KEY,
+        history_cache=HISTORY_CACHE_RECORDS,
+        index_stride=HISTORY_INDEX_STRIDE,
+    ):
         """
         Khởi tạo data logger
 
         Args:
             filename (str): Tên file CSV để lưu dữ liệu
             enabled (bool): Bật/tắt chức năng lưu dữ liệu
+            count_key (str): Chuỗi số liệu ghi vào cột person_count
+                ("current_count" thô hoặc "reported_count" đã làm mượt)
+            history_cache (int): Số record gần nhất của file giữ trong bộ nhớ
+            index_stride (int): Cứ bao nhiêu dòng ghi một mốc byte offset
         """
+        if history_cache < 1 or index_stride < 1:
+            raise ValueError("history_cache và index_stride phải lớn hơn 0")
         self.filename = filename or str(DATA_DIR / CSV_FILENAME)
         self.enabled = enabled
+        self.count_key = count_key
         self.data_buffer = []
 
+        # Số đếm theo vạch/vùng được lưu vào file riêng (một dòng mỗi vạch/vùng)
+        self.zone_filename = os.path.splitext(self.filename)[0] + "_zones.csv"
+        self.zone_buffer = []
+
+        # Các record đã đọc từ file CSV cho query_history()
+        self.history_cache = int(history_cache)
+        self.index_stride = int(index_stride)
+        self._lock = threading.Lock()
+        self._reset_history()
+
         # Tạo file CSV với header nếu chưa tồn tại
         if self.enabled and not os.path.exists(self.filename):
             self._create_csv_file()
@@ -37,6 +90,10 @@ class DataLogger:
         Tạo file CSV với header
         """
         try:
+            # config không tạo sẵn thư mục lúc import
+            directory = os.path.dirname(self.filename)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
             with open(self.filename, "w", newline="", encoding="utf-8") as csvfile:
                 fieldnames = [
                     "timestamp",
@@ -57,22 +114,25 @@ class DataLogger:
         except Exception as e:
             print(f"Lỗi khi tạo file CSV: {e}")
 
-    def log_data(self, stats):
+    def log_data(self, stats, timestamp=None):
         """
         Lưu dữ liệu thống kê vào buffer
 
         Args:
             stats (dict): Dictionary chứa thống kê
+            timestamp (float): Thời điểm của số liệu (None = hiện tại), vd: thời
+                điểm trong video khi xử lý offline
         """
         if not self.enabled:
             return
 
         try:
-            # Tạo record mới
+            # Tạo record mới (đọc đồng hồ một lần cho cả hai cột thời gian)
+            now = time.time() if timestamp is None else timestamp
             record = {
-                "timestamp": datetime.now().timestamp(),
-                "datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "person_count": stats.get("current_count", 0),
+                "timestamp": now,
+                "datetime": datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"),
+                "person_count": self._get_count(stats),
                 "max_count": stats.get("max_count", 0),
                 "average_count": round(stats.get("average_count", 0), 2),
                 "total_detections": stats.get("total_detections", 0),
@@ -85,48 +145,138 @@ class DataLogger:
 
             # Thêm vào buffer
             self.data_buffer.append(record)
+            self.zone_buffer.extend(
+                self._zone_records(stats, record["timestamp"], record["datetime"])
+            )
 
         except Exception as e:
             print(f"Lỗi khi lưu dữ liệu vào buffer: {e}")
 
-    def save_to_csv(self):
+    def _get_count(self, stats):
         """
-        Lưu dữ liệu từ buffer vào file CSV
+        Lấy số người theo count_key (mặc định về số thô nếu không có)
+
+        Args:
+            stats (dict): Dictionary chứa thống kê
+
+        Returns:
+            int: Số người
         """
-        if not self.enabled or not self.data_buffer:
+        return stats.get(self.count_key, stats.get("current_count", 0))
+
+    @staticmethod
+    def _zone_records(stats, timestamp, datetime_str):
+        """
+        Tạo các dòng dữ liệu cho từng vạch đếm và vùng đếm
+
+        Args:
+            stats (dict): Dictionary chứa thống kê (khoá "lines", "zones")
+            timestamp (float): Thời điểm ghi
+            datetime_str (str): Thời điểm ghi dạng chuỗi
+
+        Returns:
+            list: Danh sách record
+        """
+        records = []
+        for name, line in stats.get("lines", {}).items():
+            records.append(
+                {
+                    "timestamp": timestamp,
+                    "datetime": datetime_str,
+                    "kind": "line",
+                    "name": name,
+                    "count": line["in"] - line["out"],
+                    "in_count": line["in"],
+                    "out_count": line["out"],
+                }
+            )
+        for name, zone in stats.get("zones", {}).items():
+            records.append(
+                {
+                    "timestamp": timestamp,
+                    "datetime": datetime_str,
+                    "kind": "zone",
+                    "name": name,
+                    "count": zone["count"],
+                    "in_count": zone["entered"],
+                    "out_count": zone["exited"],
+                }
+            )
+        return records
+
+    def _save_zone_records(self):
+        """
+        Lưu số đếm theo vạch/vùng từ buffer vào file CSV riêng
+        """
+        if not self.zone_buffer:
             return
 
         try:
-            # Kiểm tra xem file có tồn tại không
-            file_exists = os.path.exists(self.filename)
+            file_exists = os.path.exists(self.zone_filename)
 
-            with open(self.filename, "a", newline="", encoding="utf-8") as csvfile:
+            with open(self.zone_filename, "a", newline="", encoding="utf-8") as f:
                 fieldnames = [
                     "timestamp",
                     "datetime",
-                    "person_count",
-                    "max_count",
-                    "average_count",
-                    "total_detections",
-                    "total_frames",
-                    "frames_with_persons",
-                    "detection_rate",
-                    "fps",
-                    "running_time",
+                    "kind",
+                    "name",
+                    "count",
+                    "in_count",
+                    "out_count",
                 ]
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                writer = csv.DictWriter(f, fieldnames=fieldnames)
 
-                # Ghi header nếu file mới tạo
                 if not file_exists:
                     writer.writeheader()
 
-                # Ghi dữ liệu
-                for record in self.data_buffer:
-                    writer.writerow(record)
+                writer.writerows(self.zone_buffer)
 
-            # Xóa buffer sau khi lưu
-            self.data_buffer.clear()
-            print(f"Đã lưu {len(self.data_buffer)} records vào {self.filename}")
+            self.zone_buffer.clear()
+
+        except Exception as e:
+            print(f"Lỗi khi lưu dữ liệu vạch/vùng vào CSV: {e}")
+
+    def save_to_csv(self):
+        """
+        Lưu dữ liệu từ buffer vào file CSV
+        """
+        if not self.enabled or not self.data_buffer:
+            return
+
+        try:
+            # Kiểm tra xem file có tồn tại không
+            file_exists = os.path.exists(self.filename)
+            saved = len(self.data_buffer)
+
+            # Ghi file và xoá buffer cùng lúc với query_history() đọc chúng
+            with self._lock:
+                with open(self.filename, "a", newline="", encoding="utf-8") as csvfile:
+                    fieldnames = [
+                        "timestamp",
+                        "datetime",
+                        "person_count",
+                        "max_count",
+                        "average_count",
+                        "total_detections",
+                        "total_frames",
+                        "frames_with_persons",
+                        "detection_rate",
+                        "fps",
+                        "running_time",
+                    ]
+                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+
+                    # Ghi header nếu file mới tạo
+                    if not file_exists:
+                        writer.writeheader()
+
+                    # Ghi dữ liệu
+                    writer.writerows(self.data_buffer[:saved])
+
+                # Xóa buffer sau khi lưu
+                del self.data_buffer[:saved]
+            self._save_zone_records()
+            print(f"Đã lưu {saved} records vào {self.filename}")
 
         except Exception as e:
             print(f"Lỗi khi lưu dữ liệu vào CSV: {e}")
@@ -142,10 +292,11 @@ class DataLogger:
             return
 
         try:
+            now = time.time()
             record = {
-                "timestamp": datetime.now().timestamp(),
-                "datetime": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "person_count": stats.get("current_count", 0),
+                "timestamp": now,
+                "datetime": datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"),
+                "person_count": self._get_count(stats),
                 "max_count": stats.get("max_count", 0),
                 "average_count": round(stats.get("average_count", 0), 2),
                 "total_detections": stats.get("total_detections", 0),
@@ -177,6 +328,9 @@ class DataLogger:
         Returns:
             pandas.DataFrame: DataFrame chứa dữ liệu đã lưu
         """
+        # Lazy import - pandas import mất vài trăm ms, chỉ cần khi đọc file
+        import pandas as pd
+
         try:
             if os.path.exists(self.filename):
                 df = pd.read_csv(self.filename)
@@ -188,6 +342,178 @@ class DataLogger:
             print(f"Lỗi khi đọc dữ liệu từ CSV: {e}")
             return pd.DataFrame()
 
+    def query_history(self, since=None, until=None, limit=None):
+        """
+        Truy vấn lịch sử số liệu (đã ghi file và đang chờ trong buffer)
+
+        Args:
+            since (float): Chỉ lấy record có timestamp >= since (None = tất cả)
+            until (float): Chỉ lấy record có timestamp <= until (None = tất cả)
+            limit (int): Số record mới nhất tối đa (None = tất cả)
+
+        Returns:
+            list: Danh sách record, sắp xếp theo thời gian
+        """
+        if limit is not None and limit <= 0:
+            return []
+
+        def matches(record):
+            timestamp = record["timestamp"]
+            return (since is None or timestamp >= since) and (
+                until is None or timestamp <= until
+            )
+
+        with self._lock:
+            try:
+                self._read_history()
+            except (OSError, UnicodeDecodeError, csv.Error) as e:
+                print(f"Lỗi khi đọc dữ liệu từ CSV: {e}")
+            # Lọc trước, chỉ copy các record khớp điều kiện
+            records = [
+                dict(r) for r in chain(self._history, self.data_buffer) if matches(r)
+            ]
+            records.sort(key=lambda r: r["timestamp"])
+
+            # Các record đã rời bộ nhớ đều có timestamp <= _dropped_max
+            older = self._dropped_max is not None and (
+                since is None or self._dropped_max >= since
+            )
+            if (
+                older
+                and limit is not None
+                and len(records) >= limit
+                and records[-limit]["timestamp"] > self._dropped_max
+            ):
+                older = False
+            if older:
+                try:
+                    records = [
+                        r for r in self._read_older(since) if matches(r)
+                    ] + records
+                    records.sort(key=lambda r: r["timestamp"])
+                except (OSError, UnicodeDecodeError, csv.Error) as e:
+                    print(f"Lỗi khi đọc dữ liệu từ CSV: {e}")
+
+        if limit is not None:
+            records = records[-limit:]
+        return records
+
+    def _reset_history(self):
+        """Quên các record đã đọc, lần truy vấn sau đọc lại file từ đầu"""
+        # Record gần nhất của file và byte offset của từng dòng
+        self._history = deque(maxlen=self.history_cache)
+        self._history_offsets = deque(maxlen=self.history_cache)
+        self._history_fields = None
+        self._history_offset = 0
+        self._history_file = None
+        # Timestamp lớn nhất của các record đã rời bộ nhớ (None = chưa có)
+        self._dropped_max = None
+        # Mốc đọc lại: byte offset mỗi index_stride dòng và timestamp lớn
+        # nhất của mọi dòng đứng trước mốc (không giảm, dùng để bisect)
+        self._index_offsets = []
+        self._index_max = []
+        self._rows_read = 0
+        self._running_max = float("-inf")
+
+    def _read_history(self):
+        """
+        Đọc các dòng mới của file CSV vào self._history (gọi khi giữ _lock)
+
+        Chỉ đọc phần file ghi thêm từ lần đọc trước, tới dòng hoàn chỉnh cuối
+        cùng; đọc lại từ đầu khi file bị xoá, tạo lại hoặc ngắn đi. Record cũ
+        nhất bị đẩy khỏi bộ nhớ khi vượt quá history_cache.
+        """
+        try:
+            info = os.stat(self.filename)
+        except FileNotFoundError:
+            self._reset_history()
+            return
+
+        identity = (info.st_dev, info.st_ino)
+        if identity != self._history_file or info.st_size < self._history_offset:
+            self._reset_history()
+            self._history_file = identity
+        if info.st_size == self._history_offset:
+            return
+
+        with open(self.filename, "rb") as f:
+            f.seek(self._history_offset)
+            data = f.read(info.st_size - self._history_offset)
+        end = data.rfind(b"\n") + 1
+        if not end:
+            return
+        offset = self._history_offset
+        self._history_offset += end
+
+        for row_offset, row in self._parse_lines(data[:end], offset):
+            if self._history_fields is None:
+                self._history_fields = row
+                continue
+            record = self._to_record(row)
+            if self._rows_read % self.index_stride == 0:
+                self._index_offsets.append(row_offset)
+                self._index_max.append(self._running_max)
+            self._rows_read += 1
+            self._running_max = max(self._running_max, record["timestamp"])
+
+            if len(self._history) == self.history_cache:
+                dropped = self._history[0]["timestamp"]
+                if self._dropped_max is None or dropped > self._dropped_max:
+                    self._dropped_max = dropped
+            self._history.append(record)
+            self._history_offsets.append(row_offset)
+
+    def _read_older(self, since=None):
+        """
+        Đọc lại từ file các record đã rời bộ nhớ (gọi khi giữ _lock)
+
+        Bắt đầu từ mốc cuối cùng mà mọi dòng đứng trước đều có timestamp
+        < since, dừng ở dòng đầu tiên còn trong bộ nhớ.
+
+        Args:
+            since (float): Timestamp nhỏ nhất cần lấy (None = từ đầu file)
+
+        Returns:
+            list: Danh sách record (chưa lọc, chưa sắp xếp)
+        """
+        index = 0 if since is None else bisect_left(self._index_max, since) - 1
+        start = self._index_offsets[max(index, 0)]
+        stop = self._history_offsets[0]
+
+        with open(self.filename, "rb") as f:
+            f.seek(start)
+            data = f.read(stop - start)
+        return [self._to_record(row) for _, row in self._parse_lines(data, start)]
+
+    @staticmethod
+    def _parse_lines(data, offset):
+        """
+        Tách các dòng CSV hoàn chỉnh kèm byte offset của từng dòng
+
+        Args:
+            data (bytes): Dữ liệu kết thúc bằng xuống dòng
+            offset (int): Byte offset của data trong file
+
+        Yields:
+            tuple: (byte offset, danh sách ô) của các dòng không rỗng
+        """
+        lines = data.split(b"\n")[:-1]
+        offsets = []
+        for line in lines:
+            offsets.append(offset)
+            offset += len(line) + 1
+        rows = csv.reader(line.decode("utf-8") for line in lines)
+        for row_offset, row in zip(offsets, rows):
+            if row:
+                yield row_offset, row
+
+    def _to_record(self, row):
+        """Record của một dòng CSV theo header của file"""
+        return {
+            field: _parse_value(value)
+            for field, value in zip(self._history_fields, row)
+        }
+
     def get_summary_stats(self):
         """
         Lấy thống kê tổng quan từ dữ liệu đã lưu
@@ -224,11 +550,13 @@ class DataLogger:
         Xóa tất cả dữ liệu trong file CSV
         """
         try:
-            if os.path.exists(self.filename):
-                os.remove(self.filename)
-                print(f"Đã xóa file {self.filename}")
-                # Tạo lại file với header
-                self._create_csv_file()
+            with self._lock:
+                self._reset_history()
+                if os.path.exists(self.filename):
+                    os.remove(self.filename)
+                    print(f"Đã xóa file {self.filename}")
+                    # Tạo lại file với header
+                    self._create_csv_file()
         except Exception as e:
             print(f"Lỗi khi xóa dữ liệu: {e}")
 
@@ -253,6 +581,72 @@ class DataLogger:
         except Exception as e:
             print(f"Lỗi khi xuất sang Excel: {e}")
 
+    def save_rollup_csv(self, rollup, filename):
+        """
+        Xuất số liệu tổng hợp theo thời gian ra file CSV
+
+        Args:
+            rollup (TimeRollup | list): Rollup hoặc các record đã lấy
+                (PersonCounter.get_rollup_records())
+            filename (str): Đường dẫn file CSV
+
+        Returns:
+            int: Số dòng đã ghi
+        """
+        if hasattr(rollup, "to_records"):
+            records = rollup.to_records()
+        else:
+            records = [dict(record) for record in rollup]
+        for record in records:
+            record["datetime"] = datetime.fromtimestamp(record["timestamp"]).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
+
+        try:
+            with open(filename, "w", newline="", encoding="utf-8") as csvfile:
+                fieldnames = [
+                    "resolution",
+                    "timestamp",
+                    "datetime",
+                    "min",
+                    "max",
+                    "mean",
+                    "samples",
+                ]
+                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                writer.writeheader()
+                writer.writerows(records)
+            print(f"Đã xuất {len(records)} bucket vào {filename}")
+        except Exception as e:
+            print(f"Lỗi khi xuất dữ liệu tổng hợp: {e}")
+            return 0
+
+        return len(records)
+
+    def save_latency_json(self, latency, filename):
+        """
+        Xuất histogram độ trễ từng giai đoạn ra file JSON
+
+        Args:
+            latency (LatencyRecorder): Recorder độ trễ của PersonCounter
+            filename (str): Đường dẫn file JSON
+
+        Returns:
+            int: Số giai đoạn đã ghi
+        """
+        data = latency.to_dict()
+        data["timestamp"] = time.time()
+
+        try:
+            with open(filename, "w", encoding="utf-8") as jsonfile:
+                json.dump(data, jsonfile, ensure_ascii=False, indent=2)
+            print(f"Đã xuất độ trễ {len(data['stages'])} giai đoạn vào {filename}")
+        except Exception as e:
+            print(f"Lỗi khi xuất độ trễ: {e}")
+            return 0
+
+        return len(data["stages"])
+
     def set_enabled(self, enabled):
         """
         Bật/tắt chức năng lưu dữ liệu
@@ -0,0 +1,166 @@
+"""
+Module đọc dataset định dạng YOLO (data.yaml, thư mục images/labels)
+"""
+
+import os
+import random
+
+import numpy as np
+
+from config.settings import DATASET_PERSON_NAMES
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def load_data_yaml(path):
+    """
+    Đọc data.yaml và chuyển đường dẫn các split thành đường dẫn tuyệt đối
+
+    Đường dẫn tương đối được tính từ khoá "path" (nếu có) hoặc thư mục chứa
+    data.yaml. Export của Roboflow ghi "../train/images" dù thư mục nằm cạnh
+    data.yaml: giống ultralytics, thử lại với "./train/images" khi không tồn tại.
+
+    Args:
+        path (str): Đường dẫn data.yaml
+
+    Returns:
+        dict: {"root", "names" ({id: tên}), "splits" ({"train": thư mục ảnh, ...})}
+    """
+    import yaml
+
+    with open(path, encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+
+    root = os.path.dirname(os.path.abspath(path))
+    if data.get("path"):
+        root = os.path.normpath(os.path.join(root, str(data["path"])))
+
+    splits = {}
+    for split in ("train", "val", "test"):
+        value = data.get(split)
+        if not value:
+            continue
+        directory = os.path.normpath(os.path.join(root, str(value)))
+        if not os.path.exists(directory) and str(value).startswith("../"):
+            directory = os.path.normpath(os.path.join(root, str(value)[3:]))
+        splits[split] = directory
+
+    names = data.get("names", {})
+    if isinstance(names, list):
+        names = dict(enumerate(names))
+    return {"root": root, "names": names, "splits": splits}
+
+
+def person_label_ids(names, person_names=DATASET_PERSON_NAMES):
+    """
+    Các class id trong label của dataset được tính là người
+
+    Args:
+        names (dict): {id: tên} (khoá "names" của load_data_yaml)
+        person_names (tuple): Tên class được tính là người
+
+    Returns:
+        tuple: Các class id, tăng dần
+    """
+    wanted = {str(name).strip().lower() for name in person_names}
+    ids = tuple(
+        sorted(
+            int(class_id)
+            for class_id, name in names.items()
+            if str(name).strip().lower() in wanted
+        )
+    )
+    if not ids:
+        raise ValueError(
+            f"data.yaml không có class nào trong {list(person_names)} "
+            f"(names: {list(names.values())})"
+        )
+    return ids
+
+
+def label_dir(image_dir):
+    """Thư mục label tương ứng với thư mục ảnh (.../images → .../labels)"""
+    head, tail = os.path.split(os.path.normpath(image_dir))
+    return os.path.join(head, "labels") if tail == "images" else image_dir
+
+
+def list_samples(image_dir, require_images=False):
+    """
+    Liệt kê các cặp (ảnh, label) của một split
+
+    Args:
+        image_dir (str): Thư mục ảnh của split
+        require_images (bool): Bỏ các label không có ảnh đi kèm
+
+    Returns:
+        list: [(đường dẫn ảnh hoặc None, đường dẫn label)] sắp xếp theo tên
+    """
+    labels = label_dir(image_dir)
+    images = {}
+    if os.path.isdir(image_dir):
+        for name in os.listdir(image_dir):
+            stem, suffix = os.path.splitext(name)
+            if suffix.lower() in IMAGE_SUFFIXES:
+                images[stem] = os.path.join(image_dir, name)
+
+    samples = []
+    if os.path.isdir(labels):
+        for name in sorted(os.listdir(labels)):
+            stem, suffix = os.path.splitext(name)
+            if suffix != ".txt":
+                continue
+            image = images.get(stem)
+            if image is None and require_images:
+                continue
+            samples.append((image, os.path.join(labels, name)))
+    return samples
+
+
+def sample_images(image_dir, count, seed=0):
+    """
+    Chọn ngẫu nhiên (theo seed) một tập ảnh có label
+
+    Args:
+        image_dir (str): Thư mục ảnh của split
+        count (int): Số ảnh cần chọn (0 = tất cả)
+        seed (int): Seed để lần chạy sau chọn lại đúng tập này
+
+    Returns:
+        list: Đường dẫn ảnh
+    """
+    images = [image for image, _ in list_samples(image_dir, require_images=True)]
+    if count and len(images) > count:
+        images = random.Random(seed).sample(images, count)
+    return images
+
+
+def load_labels(path, width, height):
+    """
+    Đọc file label YOLO (class cx cy w h, toạ độ chuẩn hoá 0-1)
+
+    Args:
+        path (str): Đường dẫn file .txt
+        width (int): Chiều rộng ảnh
+        height (int): Chiều cao ảnh
+
+    Returns:
+        numpy.ndarray: Mảng (N, 5) float32 gồm x1, y1, x2, y2, class_id
+            theo pixel
+    """
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 5:
+                continue
+            class_id, cx, cy, w, h = (float(v) for v in parts[:5])
+            rows.append(
+                [
+                    (cx - w / 2) * width,
+                    (cy - h / 2) * height,
+                    (cx + w / 2) * width,
+                    (cy + h / 2) * height,
+                    class_id,
+                ]
+            )
+    return np.array(rows, dtype=np.float32).reshape(-1, 5)
@@ -0,0 +1,425 @@
+"""
+Module đếm người trên cả thư mục ảnh: giải mã trước bằng thread pool, gom ảnh
+cùng kích thước thành batch và ghi kết quả dạng stream (JSONL/CSV/Parquet)
+"""
+
+import csv
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from config.settings import (
+    ALLOWED_IMAGE_FORMATS,
+    BULK_BATCH_SIZE,
+    BULK_CHECKPOINT_INTERVAL,
+    BULK_DECODE_WORKERS,
+    BULK_PREFETCH,
+)
+
+from .person_detector import PersonDetector
+
+OUTPUT_FORMATS = ("jsonl", "csv", "parquet")
+CSV_FIELDS = ["path", "width", "height", "count", "boxes", "error"]
+
+
+def iter_image_files(root):
+    """
+    Duyệt thư mục (đệ quy) theo thứ tự cố định, chỉ lấy file ảnh hợp lệ
+
+    Args:
+        root (str): Thư mục gốc
+
+    Yields:
+        str: Đường dẫn file ảnh
+    """
+    formats = {ext.lower() for ext in ALLOWED_IMAGE_FORMATS}
+    for directory, dirs, files in os.walk(root):
+        # Sắp xếp để lần chạy tiếp (resume) duyệt đúng thứ tự cũ
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in formats:
+                yield os.path.join(directory, name)
+
+
+def read_image(path):
+    """
+    Đọc ảnh BGR (hỗ trợ đường dẫn Unicode trên Windows)
+
+    Args:
+        path (str): Đường dẫn ảnh
+
+    Returns:
+        numpy.ndarray: Ảnh, None nếu không đọc được
+    """
+    try:
+        data = np.fromfile(path, dtype=np.uint8)
+        return cv2.imdecode(data, cv2.IMREAD_COLOR) if data.size else None
+    except Exception:
+        return None
+
+
+def prefetch_images(paths, workers=BULK_DECODE_WORKERS, prefetch=BULK_PREFETCH):
+    """
+    Giải mã ảnh trên thread pool, luôn giữ sẵn tối đa prefetch ảnh phía trước
+
+    cv2.imdecode nhả GIL nên nhiều thread giải mã song song thật sự.
+
+    Args:
+        paths (iterable): Các đường dẫn ảnh
+        workers (int): Số thread giải mã
+        prefetch (int): Số ảnh giải mã trước
+
+    Yields:
+        tuple: (đường dẫn, ảnh hoặc None), đúng thứ tự của paths
+    """
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, workers), thread_name_prefix="ImageDecode"
+    )
+    window = deque()
+    try:
+        for path in paths:
+            window.append((path, executor.submit(read_image, path)))
+            if len(window) >= max(1, prefetch):
+                path, future = window.popleft()
+                yield path, future.result()
+        while window:
+            path, future = window.popleft()
+            yield path, future.result()
+    finally:
+        # Dừng sớm (generator bị đóng): huỷ các ảnh chưa bắt đầu giải mã;
+        # huỷ thủ công thay cho shutdown(cancel_futures=True) (Python 3.9+)
+        for _, future in window:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+class _TextWriter:
+    """Ghi JSONL/CSV nối tiếp; checkpoint lưu vị trí byte đã ghi chắc chắn"""
+
+    def __init__(self, path, fmt, state):
+        self.fmt = fmt
+        offset = state.get("offset", 0) if state else 0
+        mode = "r+" if state and os.path.exists(path) else "w"
+        self.file = open(path, mode, newline="", encoding="utf-8")
+        # Bỏ phần đã ghi sau checkpoint cuối (bị dừng giữa chừng)
+        self.file.seek(offset)
+        self.file.truncate()
+        if fmt == "csv":
+            self.writer = csv.DictWriter(self.file, fieldnames=CSV_FIELDS)
+            if offset == 0:
+                self.writer.writeheader()
+
+    def write(self, record):
+        if self.fmt == "csv":
+            self.writer.writerow({**record, "boxes": json.dumps(record["boxes"])})
+        else:
+            self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def checkpoint(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return {"offset": self.file.tell()}
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    """Ghi Parquet thành thư mục gồm các part file, mỗi checkpoint một part"""
+
+    def __init__(self, path, fmt, state):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "Cần cài pyarrow để ghi Parquet: pip install pyarrow"
+            ) from e
+
+        self.directory = path
+        self.parts = state.get("parts", 0) if state else 0
+        os.makedirs(path, exist_ok=True)
+        # Xoá part ghi dở sau checkpoint cuối
+        for name in os.listdir(path):
+            if (
+                name.startswith("part-")
+                and name.endswith(".parquet")
+                and int(name[5:10]) >= self.parts
+            ):
+                os.remove(os.path.join(path, name))
+        self.records = []
+
+    def write(self, record):
+        self.records.append({**record, "boxes": json.dumps(record["boxes"])})
+
+    def checkpoint(self):
+        if self.records:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pylist(self.records)
+            pq.write_table(
+                table, os.path.join(self.directory, f"part-{self.parts:05d}.parquet")
+            )
+            self.parts += 1
+            self.records = []
+        return {"parts": self.parts}
+
+    def close(self):
+        pass
+
+
+def _open_writer(path, fmt, state):
+    """Tạo writer theo định dạng đầu ra"""
+    if fmt == "parquet":
+        return _ParquetWriter(path, fmt, state)
+    return _TextWriter(path, fmt, state)
+
+
+class ImageBatchProcessor:
+    """
+    Lớp đếm người trên thư mục ảnh lớn (hàng triệu ảnh)
+
+    Ảnh được duyệt theo thứ tự cố định, giải mã trước trên thread pool và gom
+    theo kích thước để mỗi lần gọi model là một batch cùng shape. Kết quả được
+    ghi đúng thứ tự duyệt nên checkpoint chỉ cần số ảnh đã ghi và vị trí trong
+    file đầu ra; chạy lại với resume=True sẽ tiếp tục từ checkpoint cuối.
+    """
+
+    def __init__(
+        self,
+        detector=None,
+        decode_workers=BULK_DECODE_WORKERS,
+        prefetch=BULK_PREFETCH,
+        batch_size=BULK_BATCH_SIZE,
+        checkpoint_interval=BULK_CHECKPOINT_INTERVAL,
+    ):
+        """
+        Khởi tạo processor
+
+        Args:
+            detector: Detector có detect_array_batch() (None = PersonDetector)
+            decode_workers (int): Số thread giải mã ảnh
+            prefetch (int): Số ảnh giải mã trước
+            batch_size (int): Số ảnh cùng kích thước mỗi lần gọi model
+            checkpoint_interval (int): Lưu checkpoint sau mỗi N ảnh
+        """
+        self.detector = detector if detector is not None else PersonDetector()
+        self.decode_workers = decode_workers
+        self.prefetch = prefetch
+        self.batch_size = max(1, int(batch_size))
+        self.checkpoint_interval = max(1, int(checkpoint_interval))
+        # Số ảnh tối đa chờ gom batch trước khi buộc chạy nhóm cũ nhất
+        self.max_pending = max(self.batch_size * 4, prefetch)
+
+    @staticmethod
+    def checkpoint_path(output):
+        """
+        Đường dẫn file checkpoint của một file đầu ra
+
+        Args:
+            output (str): File (hoặc thư mục Parquet) đầu ra
+
+        Returns:
+            str: Đường dẫn checkpoint
+        """
+        return output.rstrip("/\\") + ".checkpoint.json"
+
+    def process(self, root, output, fmt=None, resume=True, progress=None):
+        """
+        Đếm người trên tất cả ảnh trong thư mục
+
+        Args:
+            root (str): Thư mục ảnh
+            output (str): File đầu ra (thư mục với Parquet)
+            fmt (str): "jsonl", "csv" hoặc "parquet" (None = theo đuôi file)
+            resume (bool): Tiếp tục từ checkpoint nếu có
+            progress (callable): Gọi progress(số ảnh đã ghi, ảnh/giây) mỗi checkpoint
+
+        Returns:
+            dict: Tổng kết (images, resumed_from, errors, persons, elapsed,
+                images_per_sec)
+        """
+        if not os.path.isdir(root):
+            raise IOError(f"Không tìm thấy thư mục ảnh: {root}")
+        fmt = fmt or os.path.splitext(output)[1].lstrip(".").lower()
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Định dạng đầu ra không hỗ trợ: {fmt}")
+
+        checkpoint_file = self.checkpoint_path(output)
+        if resume:
+            state = self._load_checkpoint(checkpoint_file, root, fmt)
+        else:
+            state = None
+            if os.path.exists(checkpoint_file):
+                os.remove(checkpoint_file)
+        skip = state["processed"] if state else 0
+
+        writer = _open_writer(output, fmt, state)
+        self._root = root
+        self._writer = writer
+        self._ready = {}
+        self._pending = {}
+        self._next_index = skip
+        self._errors = 0
+        self._persons = 0
+
+        started = time.perf_counter()
+        since_checkpoint = 0
+        try:
+            paths = iter_image_files(root)
+            for _ in range(skip):
+                if next(paths, None) is None:
+                    break
+
+            loader = prefetch_images(paths, self.decode_workers, self.prefetch)
+            for index, (path, image) in enumerate(loader, skip):
+                if image is None:
+                    self._ready[index] = self._record(path, None, None)
+                else:
+                    group = self._pending.setdefault(image.shape, [])
+                    group.append((index, path, image))
+                    if len(group) >= self.batch_size:
+                        self._run(image.shape)
+                    elif sum(map(len, self._pending.values())) > self.max_pending:
+                        # Ảnh có kích thước hiếm đang chặn việc ghi theo thứ tự
+                        oldest = min(
+                            self._pending, key=lambda s: self._pending[s][0][0]
+                        )
+                        self._run(oldest)
+
+                written = self._emit()
+                since_checkpoint += written
+                if since_checkpoint >= self.checkpoint_interval:
+                    since_checkpoint = 0
+                    self._checkpoint(
+                        checkpoint_file, root, fmt, started, skip, progress
+                    )
+
+            for shape in list(self._pending):
+                self._run(shape)
+            self._emit()
+            self._checkpoint(checkpoint_file, root, fmt, started, skip, progress)
+        finally:
+            writer.close()
+
+        elapsed = time.perf_counter() - started
+        images = self._next_index - skip
+        return {
+            "images": images,
+            "resumed_from": skip,
+            "errors": self._errors,
+            "persons": self._persons,
+            "elapsed": elapsed,
+            "images_per_sec": images / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def _run(self, shape):
+        """
+        Chạy model cho một nhóm ảnh cùng kích thước
+
+        Args:
+            shape (tuple): Kích thước của nhóm
+        """
+        group = self._pending.pop(shape)
+        arrays = self.detector.detect_array_batch([image for _, _, image in group])
+        for (index, path, _), boxes in zip(group, arrays):
+            self._ready[index] = self._record(path, shape, boxes)
+
+    def _record(self, path, shape, boxes):
+        """
+        Tạo record kết quả của một ảnh
+
+        Args:
+            path (str): Đường dẫn ảnh
+            shape (tuple): Kích thước ảnh (None nếu không đọc được)
+            boxes (numpy.ndarray): Mảng (N, 6) từ detector
+
+        Returns:
+            dict: {"path", "width", "height", "count", "boxes", "error"}
+        """
+        relative = os.path.relpath(path, self._root).replace(os.sep, "/")
+        if shape is None:
+            return {
+                "path": relative,
+                "width": None,
+                "height": None,
+                "count": None,
+                "boxes": [],
+                "error": "Không đọc được ảnh",
+            }
+        return {
+            "path": relative,
+            "width": shape[1],
+            "height": shape[0],
+            "count": len(boxes),
+            "boxes": [
+                [int(x1), int(y1), int(x2), int(y2), round(float(conf), 4)]
+                for x1, y1, x2, y2, conf in boxes[:, :5]
+            ],
+            "error": None,
+        }
+
+    def _emit(self):
+        """
+        Ghi các record liền mạch tiếp theo theo thứ tự duyệt
+
+        Returns:
+            int: Số record đã ghi
+        """
+        written = 0
+        while self._next_index in self._ready:
+            record = self._ready.pop(self._next_index)
+            self._writer.write(record)
+            if record["error"]:
+                self._errors += 1
+            else:
+                self._persons += record["count"]
+            self._next_index += 1
+            written += 1
+        return written
+
+    def _checkpoint(self, checkpoint_file, root, fmt, started, skip, progress):
+        """
+        Đẩy dữ liệu xuống đĩa rồi mới lưu checkpoint (ghi file tạm rồi đổi tên)
+        """
+        state = self._writer.checkpoint()
+        state.update(
+            {
+                "root": os.path.abspath(root),
+                "format": fmt,
+                "processed": self._next_index,
+            }
+        )
+        temp_file = checkpoint_file + ".tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(temp_file, checkpoint_file)
+
+        if progress is not None:
+            elapsed = time.perf_counter() - started
+            done = self._next_index - skip
+            progress(self._next_index, done / elapsed if elapsed > 0 else 0.0)
+
+    @staticmethod
+    def _load_checkpoint(checkpoint_file, root, fmt):
+        """
+        Đọc checkpoint của lần chạy trước
+
+        Returns:
+            dict: Trạng thái, None nếu chưa có checkpoint
+        """
+        if not os.path.exists(checkpoint_file):
+            return None
+        with open(checkpoint_file, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("root") != os.path.abspath(root) or state.get("format") != fmt:
+            raise ValueError(
+                f"Checkpoint {checkpoint_file} thuộc thư mục/định dạng khác, "
+                "hãy xoá hoặc chạy với resume=False"
+            )
+        return state
@@ -0,0 +1,533 @@
+"""
+Module chạy inference trên nhiều process, truyền frame qua shared memory
+"""
+
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config.settings import (
+    CONFIDENCE_THRESHOLD,
+    INFERENCE_MAX_FRAME_SHAPE,
+    INFERENCE_POOL_SLOTS,
+    INFERENCE_POOL_TIMEOUT,
+    INFERENCE_WORKERS,
+    IOU_THRESHOLD,
+)
+
+from .person_detector import (
+    STATE_FAILED,
+    STATE_READY,
+    STATE_WARMING_UP,
+    PersonDetector,
+    detections_from_array,
+)
+
+# Khoảng kiểm tra worker còn sống trong lúc chờ kết quả (giây)
+_POLL_INTERVAL = 0.1
+
+
+def _worker_main(shm_name, slot_size, detector_factory, task_queue, result_queue):
+    """
+    Vòng lặp của worker process: đọc frame từ slot, chạy detect, trả kết quả
+
+    Args:
+        shm_name (str): Tên vùng shared memory chứa các slot
+        slot_size (int): Kích thước mỗi slot (bytes)
+        detector_factory (callable): Hàm tạo detector (có detect_array)
+        task_queue: Queue nhận (seq, slot, shape, conf, iou) hoặc None để dừng
+        result_queue: Queue trả về (seq, slot, mảng detection, lỗi);
+            seq = None báo worker đã khởi động xong
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    detector = detector_factory()
+
+    # Load model và warm-up trước khi nhận frame đầu tiên
+    error = None
+    warm_up = getattr(detector, "warm_up", None)
+    if warm_up is not None and not warm_up():
+        error = getattr(detector, "warmup_error", None) or "warm-up lỗi"
+    result_queue.put((None, None, None, error))
+
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+
+            seq, slot, shape, confidence, iou = task
+            try:
+                # Đọc trực tiếp từ shared memory, không copy/pickle frame
+                frame = np.ndarray(
+                    shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_size
+                )
+                detector.confidence_threshold = confidence
+                detector.iou_threshold = iou
+                boxes = np.asarray(detector.detect_array(frame), dtype=np.float32)
+                del frame
+                result_queue.put((seq, slot, boxes, None))
+            except Exception as e:
+                result_queue.put((seq, slot, None, str(e)))
+    finally:
+        shm.close()
+
+
+class InferencePool:
+    """
+    Lớp chạy PersonDetector trên một nhóm worker process
+
+    Frame được ghi vào các slot của một vùng shared memory dùng chung (ring
+    slots) thay vì pickle qua queue; worker chỉ gửi về mảng detection (N, 6).
+    Có cùng interface detect_persons/detect_array với PersonDetector nên có
+    thể dùng thay thế ở bất kỳ đâu cần detector, kể cả từ nhiều thread.
+
+    Trong lúc chờ kết quả, pool kiểm tra các worker còn sống: một worker
+    chết (vd: crash trong model) làm pool hỏng và mọi lời gọi sau đó báo
+    RuntimeError thay vì treo vô hạn.
+    """
+
+    def __init__(
+        self,
+        num_workers=None,
+        num_slots=INFERENCE_POOL_SLOTS,
+        max_frame_shape=INFERENCE_MAX_FRAME_SHAPE,
+        detector_factory=PersonDetector,
+        timeout=INFERENCE_POOL_TIMEOUT,
+    ):
+        """
+        Khởi tạo pool và khởi động các worker
+
+        Args:
+            num_workers (int): Số worker process (None = INFERENCE_WORKERS,
+                hoặc một nửa số CPU nếu INFERENCE_WORKERS = 0)
+            num_slots (int): Số slot frame trong shared memory (None = 2 × workers)
+            max_frame_shape (tuple): Kích thước frame lớn nhất (h, w, c)
+            detector_factory (callable): Hàm tạo detector trong mỗi worker,
+                phải pickle được (class hoặc hàm ở cấp module)
+            timeout (float): Thời gian chờ tối đa slot trống/kết quả của
+                detect_array và map (None = chờ vô hạn)
+        """
+        if num_workers is None:
+            num_workers = INFERENCE_WORKERS or (os.cpu_count() or 2) // 2
+        self.num_workers = max(1, int(num_workers))
+        self.num_slots = int(num_slots or 2 * self.num_workers)
+        self.slot_size = int(np.prod(max_frame_shape))
+        self.timeout = timeout
+        self.confidence_threshold = CONFIDENCE_THRESHOLD
+        self.iou_threshold = IOU_THRESHOLD
+        self.region = None
+        self.motion_gate = None
+        self._last_boxes = np.empty((0, 6), dtype=np.float32)
+
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=self.slot_size * self.num_slots
+        )
+        self._free_slots = queue.Queue()
+        for slot in range(self.num_slots):
+            self._free_slots.put(slot)
+
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+        self._results = {}
+        # Frame đã hết thời gian chờ: kết quả đến muộn bị bỏ đi
+        self._abandoned = set()
+        self._results_cond = threading.Condition()
+        self.worker_error = None
+
+        # Số worker đã warm-up xong (mỗi worker báo một lần khi khởi động)
+        self._ready_workers = 0
+        self.warmup_error = None
+        self.warmup_time = None
+        self._started_at = time.perf_counter()
+        self._on_warmup_progress = None
+
+        # spawn an toàn với CUDA/torch hơn fork
+        ctx = mp.get_context("spawn")
+        self._task_queue = ctx.Queue()
+        self._result_queue = ctx.Queue()
+        self._workers = [
+            ctx.Process(
+                target=_worker_main,
+                args=(
+                    self._shm.name,
+                    self.slot_size,
+                    detector_factory,
+                    self._task_queue,
+                    self._result_queue,
+                ),
+                daemon=True,
+            )
+            for _ in range(self.num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+        # Dừng bằng event thay vì gửi None vào result queue: worker chết có
+        # thể vẫn giữ khoá ghi của queue và làm việc gửi bị treo
+        self._stop_collector = threading.Event()
+        self._collector = threading.Thread(
+            target=self._collect_results, name="inference-pool-results", daemon=True
+        )
+        self._collector.start()
+        self.running = True
+
+    def _collect_results(self):
+        """
+        Nhận kết quả từ worker, trả slot về ring và đánh thức người chờ
+        """
+        while not self._stop_collector.is_set():
+            try:
+                item = self._result_queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+            seq, slot, boxes, error = item
+            if seq is None:
+                self._worker_ready(error)
+                continue
+            self._free_slots.put(slot)
+
+            if error is not None:
+                print(f"Lỗi trong worker inference: {error}")
+                boxes = np.empty((0, 6), dtype=np.float32)
+
+            with self._results_cond:
+                if seq in self._abandoned:
+                    self._abandoned.discard(seq)
+                else:
+                    self._results[seq] = boxes
+                self._results_cond.notify_all()
+
+    def _worker_ready(self, error):
+        """Ghi nhận một worker đã khởi động xong"""
+        with self._results_cond:
+            self._ready_workers += 1
+            if error is not None:
+                print(f"Lỗi khi khởi động worker inference: {error}")
+                self.warmup_error = error
+            if self._ready_workers >= self.num_workers:
+                self.warmup_time = time.perf_counter() - self._started_at
+            self._results_cond.notify_all()
+        if self._on_warmup_progress is not None:
+            self._on_warmup_progress(self.get_warmup_status())
+
+    def warm_up_async(self, iterations=None, on_progress=None):
+        """
+        Theo dõi warm-up của các worker (worker tự warm-up khi khởi động)
+
+        Cùng interface với PersonDetector.warm_up_async.
+
+        Args:
+            iterations (int): Không dùng (worker dùng WARMUP_ITERATIONS)
+            on_progress (callable): Gọi on_progress(trạng thái) mỗi khi có
+                worker khởi động xong (trên thread nhận kết quả)
+
+        Returns:
+            None
+        """
+        self._on_warmup_progress = on_progress
+        if on_progress is not None and self._ready_workers >= self.num_workers:
+            on_progress(self.get_warmup_status())
+        return None
+
+    @property
+    def is_ready(self):
+        """Tất cả worker đã warm-up xong và không có lỗi"""
+        return self._ready_workers >= self.num_workers and self.warmup_error is None
+
+    def wait_until_ready(self, timeout=None):
+        """
+        Chờ tất cả worker khởi động xong
+
+        Args:
+            timeout (float): Thời gian chờ tối đa (None = chờ đến khi xong)
+
+        Returns:
+            bool: True nếu mọi worker sẵn sàng
+        """
+        with self._results_cond:
+            self._results_cond.wait_for(
+                lambda: self._ready_workers >= self.num_workers, timeout=timeout
+            )
+        return self.is_ready
+
+    def get_warmup_status(self):
+        """
+        Trạng thái khởi động của pool (cùng định dạng với PersonDetector)
+
+        Returns:
+            dict: {"state", "progress" (0..1), "error", "elapsed" (giây)}
+        """
+        if self.warmup_error is not None:
+            state = STATE_FAILED
+        elif self._ready_workers >= self.num_workers:
+            state = STATE_READY
+        else:
+            state = STATE_WARMING_UP
+        return {
+            "state": state,
+            "progress": min(1.0, self._ready_workers / self.num_workers),
+            "error": self.warmup_error,
+            "elapsed": self.warmup_time,
+        }
+
+    def _check_workers(self):
+        """
+        Báo lỗi nếu có worker đã dừng bất thường
+
+        Raises:
+            RuntimeError: Pool đã đóng hoặc có worker không còn chạy
+        """
+        if not self.running:
+            raise RuntimeError("InferencePool đã đóng")
+        if self.worker_error is None:
+            for worker in self._workers:
+                if not worker.is_alive():
+                    self.worker_error = (
+                        f"Worker inference đã dừng (exitcode {worker.exitcode})"
+                    )
+                    break
+        if self.worker_error is not None:
+            raise RuntimeError(self.worker_error)
+
+    def submit(self, frame, timeout=None):
+        """
+        Ghi frame vào một slot trống và gửi cho worker
+
+        Args:
+            frame (numpy.ndarray): Khung hình uint8
+            timeout (float): Thời gian chờ slot trống (None để chờ vô hạn)
+
+        Returns:
+            int: Số thứ tự dùng để lấy kết quả bằng result()
+
+        Raises:
+            TimeoutError: Không có slot trống trong thời gian chờ
+            RuntimeError: Pool đã đóng hoặc có worker đã dừng
+        """
+        self._check_workers()
+
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if frame.nbytes > self.slot_size:
+            raise ValueError(
+                f"Frame {frame.shape} vượt quá kích thước slot ({self.slot_size} bytes)"
+            )
+
+        slot = self._get_slot(timeout)
+        view = np.ndarray(
+            frame.shape,
+            dtype=np.uint8,
+            buffer=self._shm.buf,
+            offset=slot * self.slot_size,
+        )
+        np.copyto(view, frame)
+        del view
+
+        with self._seq_lock:
+            seq = self._seq
+            self._seq += 1
+
+        self._task_queue.put(
+            (seq, slot, frame.shape, self.confidence_threshold, self.iou_threshold)
+        )
+        return seq
+
+    def _get_slot(self, timeout):
+        """
+        Lấy một slot trống, kiểm tra worker còn sống trong lúc chờ
+
+        Args:
+            timeout (float): Thời gian chờ tối đa (None để chờ vô hạn)
+
+        Returns:
+            int: Chỉ số slot
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                raise TimeoutError("Hết thời gian chờ slot trống")
+            wait = (
+                _POLL_INTERVAL if remaining is None else min(_POLL_INTERVAL, remaining)
+            )
+            try:
+                return self._free_slots.get(timeout=wait)
+            except queue.Empty:
+                self._check_workers()
+
+    def result(self, seq, timeout=None):
+        """
+        Chờ và lấy kết quả của frame đã gửi
+
+        Args:
+            seq (int): Số thứ tự trả về từ submit()
+            timeout (float): Thời gian chờ tối đa (None để chờ vô hạn)
+
+        Returns:
+            numpy.ndarray: Mảng detection (N, 6) float32
+
+        Raises:
+            TimeoutError: Hết thời gian chờ (kết quả đến muộn bị bỏ đi)
+            RuntimeError: Có worker đã dừng trong lúc chờ
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self._results_cond:
+            while seq not in self._results:
+                try:
+                    self._check_workers()
+                except RuntimeError:
+                    self._abandoned.add(seq)
+                    raise
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    self._abandoned.add(seq)
+                    raise TimeoutError(f"Hết thời gian chờ kết quả frame {seq}")
+                self._results_cond.wait(
+                    _POLL_INTERVAL
+                    if remaining is None
+                    else min(_POLL_INTERVAL, remaining)
+                )
+            return self._results.pop(seq)
+
+    def detect_array(self, frame):
+        """
+        Phát hiện người (đồng bộ) và trả về mảng (N, 6)
+
+        Args:
+            frame (numpy.ndarray): Khung hình đầu vào
+
+        Returns:
+            numpy.ndarray: Mảng detection (N, 6) float32
+        """
+        if self.region is not None:
+            # Cắt ROI trước khi ghi vào shared memory để giảm dữ liệu truyền đi
+            crop, offset = self.region.crop(frame)
+            if crop.size == 0:
+                return np.empty((0, 6), dtype=np.float32)
+        else:
+            crop = frame
+
+        # Vùng quan sát không thay đổi → không gửi frame cho worker
+        if self.motion_gate is not None and not self.motion_gate.should_infer(crop):
+            return self._last_boxes.copy()
+
+        seq = self.submit(crop, timeout=self.timeout)
+        boxes = self.result(seq, timeout=self.timeout)
+        if self.region is not None:
+            boxes = self.region.restore(boxes, offset, frame.shape)
+
+        self._last_boxes = boxes
+        return boxes
+
+    def detect_persons(self, frame):
+        """
+        Phát hiện người trong khung hình (cùng định dạng với PersonDetector)
+
+        Args:
+            frame (numpy.ndarray): Khung hình đầu vào
+
+        Returns:
+            list: Danh sách các bounding box của người được phát hiện
+        """
+        try:
+            return detections_from_array(self.detect_array(frame))
+        except Exception as e:
+            print(f"Lỗi trong quá trình phát hiện: {e}")
+            return []
+
+    def map(self, frames):
+        """
+        Phát hiện người trên nhiều frame, giữ nguyên thứ tự đầu vào
+
+        Args:
+            frames (iterable): Các khung hình
+
+        Yields:
+            numpy.ndarray: Mảng detection của từng frame theo thứ tự
+        """
+        pending = []
+        for frame in frames:
+            if self.region is not None:
+                crop, offset = self.region.crop(frame)
+                # ROI nằm ngoài frame: không gửi crop rỗng cho worker
+                seq = self.submit(crop, timeout=self.timeout) if crop.size else None
+                pending.append((seq, offset, frame.shape))
+            else:
+                pending.append((self.submit(frame, timeout=self.timeout), None, None))
+            # Giữ tối đa num_slots frame đang xử lý
+            if len(pending) >= self.num_slots:
+                yield self._pending_result(*pending.pop(0))
+        for item in pending:
+            yield self._pending_result(*item)
+
+    def _pending_result(self, seq, offset, frame_shape):
+        """
+        Lấy kết quả của một frame trong map(), đưa box về toạ độ frame gốc
+
+        Args:
+            seq (int): Số thứ tự trả về từ submit() (None = crop rỗng)
+            offset (tuple): Offset của vùng crop (None nếu không dùng ROI)
+            frame_shape (tuple): Kích thước frame gốc
+
+        Returns:
+            numpy.ndarray: Mảng detection (N, 6) float32
+        """
+        if seq is None:
+            return np.empty((0, 6), dtype=np.float32)
+        boxes = self.result(seq, timeout=self.timeout)
+        if offset is None:
+            return boxes
+        return self.region.restore(boxes, offset, frame_shape)
+
+    def set_region(self, region):
+        """
+        Thay đổi vùng quan tâm/vùng loại trừ
+
+        Args:
+            region (RegionOfInterest): Vùng mới (None = toàn bộ frame)
+        """
+        self.region = region
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+
+    def set_motion_gate(self, motion_gate):
+        """
+        Bật/tắt motion gating
+
+        Args:
+            motion_gate (MotionGate): Motion gate mới (None = tắt)
+        """
+        self.motion_gate = motion_gate
+        self._last_boxes = np.empty((0, 6), dtype=np.float32)
+
+    def close(self):
+        """
+        Dừng worker và giải phóng shared memory
+        """
+        if not self.running:
+            return
+        self.running = False
+
+        for _ in self._workers:
+            self._task_queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+
+        self._stop_collector.set()
+        self._collector.join(timeout=5)
+
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
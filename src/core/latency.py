@@ -0,0 +1,248 @@
+"""
+Module đo độ trễ từng giai đoạn xử lý frame bằng histogram bucket cố định
+"""
+
+from config.settings import LATENCY_MAX_SECONDS, LATENCY_PRECISION_BITS
+
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """
+    Histogram độ trễ kiểu HDR với số bucket cố định
+
+    Giá trị được lưu theo micro giây. Mỗi khoảng [2^k, 2^(k+1)) được chia
+    thành 2^(precision_bits - 1) bucket đều nhau nên sai số tương đối của
+    percentile không vượt quá 1 / 2^(precision_bits - 1) (≈3% với 6 bit).
+    Ghi nhận một giá trị chỉ gồm vài phép toán số nguyên và một phép cộng
+    vào list, không cấp phát bộ nhớ.
+
+    Mỗi histogram chỉ nên được ghi bởi một thread (một giai đoạn của pipeline);
+    đọc từ thread khác có thể lệch vài mẫu nhưng không làm hỏng dữ liệu.
+    """
+
+    def __init__(
+        self, max_seconds=LATENCY_MAX_SECONDS, precision_bits=LATENCY_PRECISION_BITS
+    ):
+        """
+        Khởi tạo histogram
+
+        Args:
+            max_seconds (float): Giá trị lớn nhất được phân biệt (lớn hơn bị gộp vào
+                bucket cuối)
+            precision_bits (int): Số bit độ chính xác (2 - 10)
+        """
+        if not 2 <= precision_bits <= 10:
+            raise ValueError("precision_bits phải nằm trong khoảng 2 - 10")
+        if max_seconds <= 0:
+            raise ValueError("max_seconds phải lớn hơn 0")
+
+        self.precision_bits = int(precision_bits)
+        self.max_value = max(1, int(max_seconds * 1e6))
+        self._linear = 1 << self.precision_bits
+        self._half_bits = self.precision_bits - 1
+        self._half = 1 << self._half_bits
+        self.size = self._index(self.max_value) + 1
+        self.reset()
+
+    def reset(self):
+        """
+        Xoá tất cả mẫu
+        """
+        self.counts = [0] * self.size
+        self.count = 0
+        self.total = 0
+        self.max_recorded = 0
+
+    def _index(self, value):
+        """
+        Vị trí bucket của một giá trị (micro giây)
+
+        Args:
+            value (int): Giá trị không âm
+
+        Returns:
+            int: Vị trí bucket
+        """
+        if value < self._linear:
+            return value
+        shift = value.bit_length() - self.precision_bits
+        return (
+            self._linear
+            + ((shift - 1) << self._half_bits)
+            + (value >> shift)
+            - self._half
+        )
+
+    def _bucket_bounds(self, index):
+        """
+        Khoảng giá trị [thấp, cao) của một bucket (micro giây)
+
+        Args:
+            index (int): Vị trí bucket
+
+        Returns:
+            tuple: (thấp, cao)
+        """
+        if index < self._linear:
+            return index, index + 1
+        shift = (index - self._linear) // self._half + 1
+        top = (index - self._linear) % self._half + self._half
+        return top << shift, (top + 1) << shift
+
+    def record(self, seconds):
+        """
+        Ghi nhận một giá trị độ trễ
+
+        Args:
+            seconds (float): Độ trễ (giây)
+        """
+        value = int(seconds * 1e6)
+        if value < 0:
+            value = 0
+        elif value > self.max_value:
+            value = self.max_value
+
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max_recorded:
+            self.max_recorded = value
+
+    def get_percentiles(self, percentiles=PERCENTILES):
+        """
+        Tính các percentile (điểm giữa của bucket chứa percentile)
+
+        Args:
+            percentiles (tuple): Các percentile cần tính (0-100), tăng dần
+
+        Returns:
+            list: Giá trị tương ứng (giây), 0 nếu chưa có mẫu
+        """
+        count = self.count
+        if count == 0:
+            return [0.0] * len(percentiles)
+
+        targets = [max(1, -(-count * p // 100)) for p in percentiles]
+        results = []
+        cumulative = 0
+        target_index = 0
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            cumulative += bucket_count
+            while target_index < len(targets) and cumulative >= targets[target_index]:
+                low, high = self._bucket_bounds(index)
+                value = min((low + high - 1) / 2, self.max_recorded)
+                results.append(value / 1e6)
+                target_index += 1
+            if target_index == len(targets):
+                break
+        return results
+
+    def get_stats(self):
+        """
+        Lấy thống kê của histogram
+
+        Returns:
+            dict: Số mẫu, trung bình, p50/p95/p99 và lớn nhất (ms)
+        """
+        p50, p95, p99 = self.get_percentiles(PERCENTILES)
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count / 1000 if self.count else 0.0,
+            "p50_ms": p50 * 1000,
+            "p95_ms": p95 * 1000,
+            "p99_ms": p99 * 1000,
+            "max_ms": self.max_recorded / 1000,
+        }
+
+    def get_buckets(self):
+        """
+        Lấy các bucket khác 0 (để lưu/ghép histogram ở nơi khác)
+
+        Returns:
+            list: [(cận dưới µs, cận trên µs, số mẫu), ...]
+        """
+        return [
+            (*self._bucket_bounds(index), bucket_count)
+            for index, bucket_count in enumerate(self.counts)
+            if bucket_count
+        ]
+
+
+class LatencyRecorder:
+    """
+    Lớp quản lý histogram độ trễ theo từng giai đoạn (decode, inference, ...)
+
+    Khi tắt đo độ trễ, nơi gọi giữ recorder là None và bỏ qua hoàn toàn
+    việc đọc đồng hồ nên không có chi phí.
+    """
+
+    def __init__(
+        self, max_seconds=LATENCY_MAX_SECONDS, precision_bits=LATENCY_PRECISION_BITS
+    ):
+        """
+        Khởi tạo recorder
+
+        Args:
+            max_seconds (float): Độ trễ lớn nhất được phân biệt (giây)
+            precision_bits (int): Số bit độ chính xác của histogram
+        """
+        self.max_seconds = max_seconds
+        self.precision_bits = precision_bits
+        self.histograms = {}
+
+    def record(self, stage, seconds):
+        """
+        Ghi nhận độ trễ của một giai đoạn
+
+        Args:
+            stage (str): Tên giai đoạn
+            seconds (float): Độ trễ (giây)
+        """
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms.setdefault(
+                stage, LatencyHistogram(self.max_seconds, self.precision_bits)
+            )
+        histogram.record(seconds)
+
+    def get_stats(self):
+        """
+        Lấy thống kê độ trễ của tất cả giai đoạn
+
+        Returns:
+            dict: {tên giai đoạn: {"count", "mean_ms", "p50_ms", "p95_ms",
+                "p99_ms", "max_ms"}}
+        """
+        return {
+            stage: histogram.get_stats()
+            for stage, histogram in list(self.histograms.items())
+        }
+
+    def to_dict(self):
+        """
+        Chuyển thống kê và bucket của tất cả giai đoạn thành dict (để xuất JSON)
+
+        Returns:
+            dict: {"precision_bits", "unit", "stages": {tên: {... "buckets"}}}
+        """
+        stages = {}
+        for stage, histogram in list(self.histograms.items()):
+            stages[stage] = histogram.get_stats()
+            stages[stage]["buckets"] = [
+                list(bucket) for bucket in histogram.get_buckets()
+            ]
+        return {
+            "precision_bits": self.precision_bits,
+            "unit": "us",
+            "stages": stages,
+        }
+
+    def reset(self):
+        """
+        Xoá tất cả histogram
+        """
+        for histogram in list(self.histograms.values()):
+            histogram.reset()
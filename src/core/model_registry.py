@@ -0,0 +1,500 @@
+"""
+Module registry cho model: cache các biến thể dẫn xuất từ file trọng số
+(fused, FP16, ONNX, TorchScript, INT8) theo hash nội dung, build lần đầu
+dùng và tái sử dụng ở các lần khởi động sau
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from config.settings import (
+    INFERENCE_IMGSZ,
+    MODEL_BENCHMARK_RUNS,
+    MODEL_CACHE_DIR,
+    QUANT_CALIBRATION_IMAGES,
+    QUANT_CALIBRATION_METHOD,
+    QUANT_CALIBRATION_SPLIT,
+    QUANT_DATA_YAML,
+    QUANT_SEED,
+)
+
+METADATA_FILE = "metadata.json"
+# Hash của các file trọng số đã gặp (đường dẫn → size, mtime, sha256) để
+# không phải đọc lại cả file mỗi lần khởi động
+INDEX_FILE = "index.json"
+
+# Các biến thể:
+#   suffix: đuôi file artifact
+#   devices: thiết bị chạy được ("cpu", "cuda")
+#   half: được chạy FP16 trên GPU (truyền half=True khi inference)
+#   fixed_imgsz: export với kích thước đầu vào cố định (build lại nếu imgsz đổi)
+VARIANTS = {
+    "pt": {"suffix": ".pt", "devices": ("cpu", "cuda"), "half": True},
+    "fused": {"suffix": ".pt", "devices": ("cpu", "cuda"), "half": True},
+    "half": {"suffix": ".pt", "devices": ("cuda",), "half": True},
+    "onnx": {
+        "suffix": ".onnx",
+        "devices": ("cpu", "cuda"),
+        "half": False,
+        "fixed_imgsz": True,
+    },
+    "torchscript": {
+        "suffix": ".torchscript",
+        "devices": ("cpu", "cuda"),
+        "half": True,
+        "fixed_imgsz": True,
+    },
+    "int8": {
+        "suffix": ".onnx",
+        "devices": ("cpu",),
+        "half": False,
+        "fixed_imgsz": True,
+    },
+}
+
+# Biến thể dùng khi chưa có biến thể nào được đo tốc độ trên thiết bị: chỉ
+# cần torch/ultralytics để build và không bao giờ chậm hơn file gốc
+DEFAULT_VARIANTS = {"cpu": "fused", "cuda": "half"}
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """
+    Hash SHA-256 nội dung file
+
+    Args:
+        path (str): Đường dẫn file
+        chunk_size (int): Số byte đọc mỗi lần
+
+    Returns:
+        str: Chuỗi hex
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_json(path, data):
+    """Ghi JSON nguyên tử (ghi file tạm rồi đổi tên)"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(temp, path)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+def _read_json(path):
+    """Đọc JSON, trả về {} nếu file chưa có hoặc hỏng"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class ModelRegistry:
+    """
+    Cache các biến thể của một file trọng số YOLO
+
+    Artifact nằm trong <cache_dir>/<16 ký tự đầu của sha256>/, nên khi file
+    trọng số đổi nội dung (train lại) các biến thể cũ không bao giờ bị dùng
+    nhầm. metadata.json ghi class map, và với mỗi biến thể: file, kích thước
+    đầu vào, thời gian build, phiên bản ultralytics và độ trễ đo được theo
+    thiết bị (dùng để chọn biến thể nhanh nhất).
+    """
+
+    def __init__(
+        self,
+        source,
+        cache_dir=MODEL_CACHE_DIR,
+        calibration=None,
+        calibration_method=QUANT_CALIBRATION_METHOD,
+    ):
+        """
+        Khởi tạo registry
+
+        Args:
+            source (str): Đường dẫn file trọng số gốc (.pt)
+            cache_dir (str): Thư mục chứa cache của mọi model
+            calibration (list): Ảnh hiệu chỉnh khi build "int8" (None = lấy
+                từ QUANT_DATA_YAML lúc build)
+            calibration_method (str): "minmax", "entropy" hoặc "percentile"
+        """
+        if not os.path.isfile(source):
+            raise FileNotFoundError(f"Không tìm thấy file model: {source}")
+        self.source = os.path.abspath(source)
+        self.cache_dir = str(cache_dir)
+        self.sha256 = self._source_hash()
+        self.directory = os.path.join(self.cache_dir, self.sha256[:16])
+        self.calibration = calibration
+        self.calibration_method = calibration_method
+        self._lock = threading.Lock()
+
+    def _source_hash(self):
+        """Hash của file gốc, dùng lại kết quả cũ nếu size/mtime không đổi"""
+        stat = os.stat(self.source)
+        index_path = os.path.join(self.cache_dir, INDEX_FILE)
+        index = _read_json(index_path)
+        entry = index.get(self.source)
+        if (
+            entry
+            and entry.get("size") == stat.st_size
+            and entry.get("mtime_ns") == stat.st_mtime_ns
+        ):
+            return entry["sha256"]
+
+        sha256 = file_sha256(self.source)
+        index[self.source] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256,
+        }
+        try:
+            _write_json(index_path, index)
+        except OSError as e:
+            print(f"⚠️ Không ghi được index cache model: {e}")
+        return sha256
+
+    @property
+    def metadata_path(self):
+        """Đường dẫn metadata.json của model"""
+        return os.path.join(self.directory, METADATA_FILE)
+
+    def metadata(self):
+        """
+        Đọc metadata của model
+
+        Returns:
+            dict: {"source", "sha256", "names", "variants": {tên: thông tin}}
+        """
+        data = _read_json(self.metadata_path)
+        data.setdefault("source", self.source)
+        data.setdefault("sha256", self.sha256)
+        data.setdefault("names", None)
+        data.setdefault("variants", {})
+        return data
+
+    def _update_metadata(self, update):
+        """Đọc - sửa - ghi metadata (update(data) sửa tại chỗ)"""
+        with self._lock:
+            data = self.metadata()
+            update(data)
+            _write_json(self.metadata_path, data)
+            return data
+
+    def _artifact_path(self, variant, imgsz):
+        """Đường dẫn file artifact của biến thể"""
+        spec = VARIANTS[variant]
+        name = variant if not spec.get("fixed_imgsz") else f"{variant}_{imgsz}"
+        return os.path.join(self.directory, f"{name}{spec['suffix']}")
+
+    def is_built(self, variant, imgsz=INFERENCE_IMGSZ):
+        """
+        Biến thể đã có trong cache (đúng kích thước đầu vào) chưa
+
+        Args:
+            variant (str): Tên biến thể
+            imgsz (int): Kích thước đầu vào
+
+        Returns:
+            bool: True nếu dùng được ngay không cần build
+        """
+        if variant == "pt":
+            return True
+        entry = self.metadata()["variants"].get(variant)
+        if entry is None:
+            return False
+        if VARIANTS[variant].get("fixed_imgsz") and entry.get("imgsz") != imgsz:
+            return False
+        return os.path.exists(os.path.join(self.directory, entry["file"]))
+
+    def get(self, variant, imgsz=INFERENCE_IMGSZ):
+        """
+        Đường dẫn artifact của biến thể, build nếu chưa có
+
+        Args:
+            variant (str): Tên biến thể (xem VARIANTS)
+            imgsz (int): Kích thước đầu vào (với biến thể export cố định)
+
+        Returns:
+            str: Đường dẫn file load được bằng ultralytics.YOLO
+        """
+        if variant not in VARIANTS:
+            raise ValueError(
+                f"Biến thể không hợp lệ: {variant} (hỗ trợ: {', '.join(VARIANTS)})"
+            )
+        if variant == "pt":
+            return self.source
+        if not self.is_built(variant, imgsz):
+            self.build(variant, imgsz)
+        entry = self.metadata()["variants"][variant]
+        return os.path.join(self.directory, entry["file"])
+
+    def build(self, variant, imgsz=INFERENCE_IMGSZ):
+        """
+        Build (hoặc build lại) một biến thể và ghi metadata
+
+        Args:
+            variant (str): Tên biến thể
+            imgsz (int): Kích thước đầu vào
+
+        Returns:
+            str: Đường dẫn artifact
+        """
+        target = self._artifact_path(variant, imgsz)
+        os.makedirs(self.directory, exist_ok=True)
+        print(f"🔧 Đang build biến thể model '{variant}' (imgsz={imgsz})...")
+        start = time.perf_counter()
+
+        # Build trong thư mục tạm rồi đổi tên: process khác (worker của
+        # InferencePool) không bao giờ thấy file ghi dở
+        build_dir = tempfile.mkdtemp(prefix=f"build_{variant}_", dir=self.directory)
+        try:
+            built, info = getattr(self, f"_build_{variant}")(build_dir, imgsz)
+            os.replace(built, target)
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+        elapsed = time.perf_counter() - start
+
+        def update(data):
+            if info.get("names") is not None:
+                data["names"] = info["names"]
+            data["variants"][variant] = {
+                "file": os.path.basename(target),
+                "imgsz": imgsz,
+                "half": VARIANTS[variant]["half"],
+                "built_at": datetime.now().isoformat(timespec="seconds"),
+                "build_seconds": round(elapsed, 2),
+                "ultralytics": info.get("ultralytics"),
+                "latency_ms": {},
+            }
+            if info.get("quantization") is not None:
+                data["variants"][variant]["quantization"] = info["quantization"]
+
+        self._update_metadata(update)
+        print(f"✅ Đã build '{variant}' sau {elapsed:.1f}s: {target}")
+        return target
+
+    def _load_source(self):
+        """Load model gốc bằng ultralytics, trả về (model, thông tin chung)"""
+        import ultralytics
+        from ultralytics import YOLO
+
+        model = YOLO(self.source)
+        return model, {
+            "names": {str(k): v for k, v in dict(model.names).items()},
+            "ultralytics": getattr(ultralytics, "__version__", None),
+        }
+
+    def _build_fused(self, build_dir, imgsz, half=False):
+        """Gộp Conv + BatchNorm sẵn để lần load sau không phải fuse lại"""
+        import torch
+
+        model, info = self._load_source()
+        net = model.model.fuse(verbose=False)
+        if half:
+            net = net.half()
+        checkpoint = {"model": net}
+        train_args = (getattr(model, "ckpt", None) or {}).get("train_args")
+        if train_args:
+            checkpoint["train_args"] = train_args
+        path = os.path.join(build_dir, "model.pt")
+        torch.save(checkpoint, path)
+        return path, info
+
+    def _build_half(self, build_dir, imgsz):
+        """Trọng số fused lưu ở FP16 (chỉ chạy trên GPU)"""
+        return self._build_fused(build_dir, imgsz, half=True)
+
+    def _export(self, build_dir, imgsz, export_format):
+        """Export bằng ultralytics từ một bản sao của file gốc trong build_dir"""
+        from ultralytics import YOLO
+
+        # ultralytics ghi file export cạnh file trọng số: export từ bản sao để
+        # không ghi vào thư mục chứa file gốc
+        copy = os.path.join(build_dir, "model.pt")
+        shutil.copyfile(self.source, copy)
+        _, info = self._load_source()
+        exported = YOLO(copy).export(format=export_format, imgsz=imgsz, verbose=False)
+        return str(exported), info
+
+    def _build_onnx(self, build_dir, imgsz):
+        """Export ONNX (chạy bằng onnxruntime)"""
+        return self._export(build_dir, imgsz, "onnx")
+
+    def _build_torchscript(self, build_dir, imgsz):
+        """Export TorchScript (không cần Python module của model khi load)"""
+        return self._export(build_dir, imgsz, "torchscript")
+
+    def calibration_images(self):
+        """
+        Ảnh hiệu chỉnh cho biến thể "int8"
+
+        Returns:
+            list: self.calibration, hoặc QUANT_CALIBRATION_IMAGES ảnh chọn theo
+                seed từ split QUANT_CALIBRATION_SPLIT của QUANT_DATA_YAML
+                ([] nếu dataset không có ảnh)
+        """
+        if self.calibration is not None:
+            return list(self.calibration)
+        if not os.path.isfile(QUANT_DATA_YAML):
+            return []
+        from .dataset import load_data_yaml, sample_images
+
+        image_dir = load_data_yaml(QUANT_DATA_YAML)["splits"].get(
+            QUANT_CALIBRATION_SPLIT
+        )
+        if image_dir is None:
+            return []
+        return sample_images(image_dir, QUANT_CALIBRATION_IMAGES, QUANT_SEED)
+
+    def _build_int8(self, build_dir, imgsz):
+        """
+        Lượng tử hoá bản ONNX xuống INT8
+
+        Static quantization hiệu chỉnh trên ảnh của dataset (activation cũng
+        INT8, nhanh nhất trên CPU); dataset không có ảnh thì chỉ lượng tử
+        trọng số (dynamic quantization).
+        """
+        source = self.get("onnx", imgsz)
+        path = os.path.join(build_dir, "model_int8.onnx")
+        info = {"ultralytics": self.metadata()["variants"]["onnx"]["ultralytics"]}
+
+        images = self.calibration_images()
+        if images:
+            from .quantization import quantize_static_int8
+
+            info["quantization"] = quantize_static_int8(
+                source, path, images, imgsz, self.calibration_method
+            )
+        else:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            print("⚠️ Không có ảnh hiệu chỉnh → chỉ lượng tử hoá trọng số (dynamic)")
+            quantize_dynamic(source, path, weight_type=QuantType.QUInt8)
+            info["quantization"] = {"method": "dynamic"}
+        return path, info
+
+    def record_latency(self, variant, device, latency_ms):
+        """
+        Ghi độ trễ đo được của một biến thể trên thiết bị
+
+        Args:
+            variant (str): Tên biến thể
+            device (str): "cpu" hoặc "cuda"
+            latency_ms (float): Độ trễ trung vị (ms)
+        """
+
+        def update(data):
+            if variant == "pt" and "pt" not in data["variants"]:
+                data["variants"]["pt"] = {
+                    "file": None,
+                    "imgsz": None,
+                    "half": True,
+                    "latency_ms": {},
+                }
+            entry = data["variants"].get(variant)
+            if entry is None:
+                raise KeyError(f"Biến thể '{variant}' chưa được build")
+            entry.setdefault("latency_ms", {})[device] = round(latency_ms, 3)
+
+        self._update_metadata(update)
+
+    def record_accuracy(self, variant, accuracy, accepted=True):
+        """
+        Ghi kết quả đánh giá độ chính xác của một biến thể
+
+        Args:
+            variant (str): Tên biến thể
+            accuracy (dict): Chỉ số (precision, recall, map50, ...) và mức
+                chênh so với model gốc
+            accepted (bool): False nếu độ chính xác giảm quá ngưỡng: biến
+                thể bị bỏ qua khi chọn "auto"
+        """
+
+        def update(data):
+            entry = data["variants"].get(variant)
+            if entry is None:
+                raise KeyError(f"Biến thể '{variant}' chưa được build")
+            entry["accuracy"] = accuracy
+            entry["accepted"] = bool(accepted)
+
+        self._update_metadata(update)
+
+    def benchmark(
+        self, variant, device="cpu", imgsz=INFERENCE_IMGSZ, runs=MODEL_BENCHMARK_RUNS
+    ):
+        """
+        Đo độ trễ inference của một biến thể trên ảnh đen kích thước imgsz
+
+        Args:
+            variant (str): Tên biến thể (build nếu chưa có)
+            device (str): "cpu" hoặc "cuda"
+            imgsz (int): Kích thước đầu vào
+            runs (int): Số lần đo (sau 2 lần warm-up)
+
+        Returns:
+            float: Độ trễ trung vị (ms), đã ghi vào metadata
+        """
+        import numpy as np
+        from ultralytics import YOLO
+
+        path = self.get(variant, imgsz)
+        model = YOLO(path, task="detect")
+        kwargs = {
+            "imgsz": imgsz,
+            "verbose": False,
+            "device": "0" if device == "cuda" else "cpu",
+            "half": device == "cuda" and VARIANTS[variant]["half"],
+        }
+        dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+        samples = []
+        for i in range(2 + runs):
+            start = time.perf_counter()
+            model(dummy, **kwargs)
+            if i >= 2:
+                samples.append((time.perf_counter() - start) * 1000)
+
+        latency = statistics.median(samples)
+        self.record_latency(variant, device, latency)
+        return latency
+
+    def best_variant(self, device="cpu", imgsz=INFERENCE_IMGSZ):
+        """
+        Biến thể nhanh nhất đã đo trên thiết bị
+
+        Args:
+            device (str): "cpu" hoặc "cuda"
+            imgsz (int): Kích thước đầu vào sẽ dùng
+
+        Returns:
+            str: Tên biến thể có độ trễ đo được thấp nhất trong các biến thể
+                đã build, chạy được trên thiết bị và không bị loại vì giảm độ
+                chính xác; DEFAULT_VARIANTS[device] nếu chưa đo biến thể nào
+        """
+        best, best_latency = None, None
+        for variant, entry in self.metadata()["variants"].items():
+            if variant not in VARIANTS or device not in VARIANTS[variant]["devices"]:
+                continue
+            latency = entry.get("latency_ms", {}).get(device)
+            if latency is None or not self.is_built(variant, imgsz):
+                continue
+            if entry.get("accepted") is False:
+                continue  # Độ chính xác giảm quá ngưỡng
+            if best_latency is None or latency < best_latency:
+                best, best_latency = variant, latency
+        return best or DEFAULT_VARIANTS.get(device, "pt")
@@ -0,0 +1,137 @@
+"""
+Module phát hiện chuyển động để bỏ qua inference trên các frame tĩnh
+"""
+
+import cv2
+import numpy as np
+
+from config.settings import (
+    MOTION_DOWNSCALE_WIDTH,
+    MOTION_PIXEL_DELTA,
+    MOTION_REFRESH_INTERVAL,
+    MOTION_THRESHOLD,
+)
+
+
+class MotionGate:
+    """
+    Lớp quyết định có cần chạy inference cho frame hiện tại hay không
+
+    Frame được thu nhỏ, chuyển xám rồi so sánh với frame của lần inference
+    gần nhất. Nếu tỉ lệ pixel thay đổi không vượt ngưỡng thì có thể dùng lại
+    kết quả detection trước đó. Sau refresh_interval frame liên tiếp bị bỏ
+    qua, inference luôn được chạy lại để tránh kết quả bị "trôi".
+    """
+
+    def __init__(
+        self,
+        threshold=MOTION_THRESHOLD,
+        pixel_delta=MOTION_PIXEL_DELTA,
+        downscale_width=MOTION_DOWNSCALE_WIDTH,
+        refresh_interval=MOTION_REFRESH_INTERVAL,
+    ):
+        """
+        Khởi tạo motion gate
+
+        Args:
+            threshold (float): Tỉ lệ pixel thay đổi tối thiểu để coi là có chuyển động
+            pixel_delta (int): Chênh lệch độ sáng tối thiểu để coi pixel là thay đổi
+            downscale_width (int): Chiều rộng frame sau khi thu nhỏ
+            refresh_interval (int): Số frame bỏ qua tối đa trước khi bắt buộc inference
+        """
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.downscale_width = downscale_width
+        self.refresh_interval = refresh_interval
+
+        self.reference = None
+        self.reference_shape = None
+        self.frames_since_inference = 0
+        self.last_motion = 0.0
+
+        self.total_frames = 0
+        self.inferred_frames = 0
+
+    def _downscale(self, frame):
+        """
+        Thu nhỏ và chuyển frame sang ảnh xám
+
+        Args:
+            frame (numpy.ndarray): Khung hình gốc
+
+        Returns:
+            numpy.ndarray: Ảnh xám kích thước nhỏ
+        """
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.downscale_width / max(width, 1))
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+
+        # Thu nhỏ trước rồi mới chuyển xám để giảm chi phí
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def should_infer(self, frame):
+        """
+        Kiểm tra frame có thay đổi đủ lớn để cần chạy inference không
+
+        Args:
+            frame (numpy.ndarray): Khung hình hiện tại
+
+        Returns:
+            bool: True nếu cần chạy inference
+        """
+        self.total_frames += 1
+        small = self._downscale(frame)
+
+        if self.reference is None or self.reference_shape != frame.shape:
+            run = True
+            self.last_motion = 1.0
+        else:
+            diff = cv2.absdiff(small, self.reference)
+            self.last_motion = (
+                float(np.count_nonzero(diff > self.pixel_delta)) / diff.size
+            )
+            run = (
+                self.last_motion > self.threshold
+                or self.frames_since_inference >= self.refresh_interval
+            )
+
+        if run:
+            # So sánh các frame sau với frame của lần inference này
+            self.reference = small
+            self.reference_shape = frame.shape
+            self.frames_since_inference = 0
+            self.inferred_frames += 1
+        else:
+            self.frames_since_inference += 1
+
+        return run
+
+    def reset(self):
+        """
+        Xoá frame tham chiếu (vd: khi đổi nguồn video)
+        """
+        self.reference = None
+        self.reference_shape = None
+        self.frames_since_inference = 0
+        self.last_motion = 0.0
+        self.total_frames = 0
+        self.inferred_frames = 0
+
+    def get_stats(self):
+        """
+        Lấy thống kê của motion gate
+
+        Returns:
+            dict: Số frame đã xem, đã inference, đã bỏ qua và tỉ lệ bỏ qua
+        """
+        skipped = self.total_frames - self.inferred_frames
+        return {
+            "total_frames": self.total_frames,
+            "inferred_frames": self.inferred_frames,
+            "skipped_frames": skipped,
+            "skip_rate": skipped / self.total_frames if self.total_frames else 0.0,
+            "last_motion": self.last_motion,
+        }
@@ -2,35 +2,68 @@
 Module đếm số lượng người và quản lý thống kê
 """
 
-import time
+import threading
 from collections import deque
 from datetime import datetime
 
 import numpy as np
 
+from .clock import Clock, FpsMeter
+from .rollup import TimeRollup
+
 
 class PersonCounter:
     """
     Lớp đếm và quản lý thống kê số lượng người
+
+    Thread-safe: update_count() chạy trên thread xử lý frame trong khi GUI
+    (QTimer), API và /metrics đọc get_all_stats() từ thread khác. Tracker và
+    zone counter thay từng mảng trạng thái một nên mọi lần đọc/ghi đi qua
+    cùng một khoá, người đọc không bao giờ thấy trạng thái cập nhật dở.
     """
 
-    def __init__(self, max_history=100):
+    def __init__(
+        self,
+        max_history=100,
+        tracker=None,
+        zone_counter=None,
+        smoother=None,
+        clock=None,
+        latency=None,
+    ):
         """
         Khởi tạo counter
 
         Args:
             max_history (int): Số lượng frame tối đa để lưu lịch sử
+            tracker (PersonTracker): Tracker gán ID cho từng người (None = tắt)
+            zone_counter (ZoneCounter): Vạch/vùng đếm người (None = tắt)
+            smoother (CountSmoother): Làm mượt số người báo cáo (None = dùng số thô)
+            clock (Clock): Đồng hồ đo thời gian chạy/FPS (None = đồng hồ hệ thống)
+            latency (LatencyRecorder): Histogram độ trễ từng giai đoạn (None = tắt)
         """
+        self.clock = clock or Clock()
+        self.fps_meter = FpsMeter()
+        self.tracker = tracker
+        self.zone_counter = zone_counter
+        self.smoother = smoother
+        self.latency = latency
+        self._lock = threading.Lock()
         self.current_count = 0
+        self.reported_count = 0
         self.max_count = 0
         self.total_detections = 0
         self.frame_count = 0
-        self.start_time = time.time()
+        self.start_time = self.clock.monotonic()
+        self._timing_frames = 0  # frame_count tại lúc bắt đầu đo FPS
 
         # Lưu lịch sử số lượng người
         self.count_history = deque(maxlen=max_history)
         self.timestamp_history = deque(maxlen=max_history)
 
+        # Tổng hợp min/max/trung bình theo giây/phút/giờ/ngày (bộ nhớ cố định)
+        self.rollup = TimeRollup()
+
         # Thống kê
         self.stats = {
             "total_frames": 0,
@@ -39,32 +72,75 @@ class PersonCounter:
             "max_count_reached": 0,
         }
 
-    def update_count(self, detections):
+    def update_count(self, detections, frame_shape=None):
         """
         Cập nhật số lượng người hiện tại
 
         Args:
             detections (list): Danh sách các detection của người
+            frame_shape (tuple): Kích thước frame (cần cho vạch/vùng dùng toạ độ tỉ lệ)
 
         Returns:
             int: Số lượng người hiện tại
         """
-        self.current_count = len(detections)
-        self.total_detections += self.current_count
-        self.frame_count += 1
+        with self._lock:
+            self.current_count = len(detections)
 
-        # Cập nhật max count
-        if self.current_count > self.max_count:
-            self.max_count = self.current_count
+            # Số người báo cáo: làm mượt theo thời gian để tránh nhiễu từng frame
+            if self.smoother is not None:
+                self.reported_count = self.smoother.update(self.current_count)
+            else:
+                self.reported_count = self.current_count
 
-        # Lưu vào lịch sử
-        self.count_history.append(self.current_count)
-        self.timestamp_history.append(datetime.now())
+            # Đọc đồng hồ một lần cho cả frame
+            now = self.clock.monotonic()
+            self.fps_meter.tick(now)
 
-        # Cập nhật thống kê
-        self._update_stats()
+            # Gán ID track (đếm người duy nhất) và cập nhật vạch/vùng đếm
+            if self.tracker is not None or self.zone_counter is not None:
+                self._update_tracks(detections, frame_shape, now)
 
-        return self.current_count
+            self.total_detections += self.current_count
+            self.frame_count += 1
+
+            # Cập nhật max count
+            if self.current_count > self.max_count:
+                self.max_count = self.current_count
+
+            # Lưu vào lịch sử (thời điểm monotonic, chỉ đổi sang datetime khi đọc)
+            self.count_history.append(self.current_count)
+            self.timestamp_history.append(now)
+            self.rollup.add(self.current_count, self.clock.to_wall(now))
+
+            # Cập nhật thống kê
+            self._update_stats()
+
+            return self.current_count
+
+    def _update_tracks(self, detections, frame_shape=None, timestamp=None):
+        """
+        Cập nhật tracker, gắn track_id vào các detection đã được xác nhận
+        và cập nhật vạch/vùng đếm
+
+        Args:
+            detections (list): Danh sách các detection của người
+            frame_shape (tuple): Kích thước frame
+            timestamp (float): Thời điểm monotonic của frame
+        """
+        boxes = np.array(
+            [d["bbox"] + [d["confidence"], d.get("class_id", 0)] for d in detections],
+            dtype=np.float32,
+        ).reshape(-1, 6)
+
+        track_ids = None
+        if self.tracker is not None:
+            track_ids = self.tracker.update(boxes, timestamp)
+            for detection, track_id in zip(detections, track_ids):
+                if track_id >= 0:
+                    detection["track_id"] = int(track_id)
+
+        if self.zone_counter is not None:
+            self.zone_counter.update(boxes, track_ids, frame_shape)
 
     def _update_stats(self):
         """
@@ -91,6 +167,15 @@ class PersonCounter:
         """
         return self.current_count
 
+    def get_reported_count(self):
+        """
+        Lấy số lượng người báo cáo (đã làm mượt)
+
+        Returns:
+            int: Số lượng người báo cáo
+        """
+        return self.reported_count
+
     def get_max_count(self):
         """
         Lấy số lượng người tối đa đã phát hiện
@@ -116,18 +201,27 @@ class PersonCounter:
         Returns:
             float: Thời gian chạy (giây)
         """
-        return time.time() - self.start_time
+        return self.clock.monotonic() - self.start_time
 
     def get_fps(self):
         """
-        Lấy FPS hiện tại
+        Lấy FPS hiện tại (trên cửa sổ trượt các frame gần nhất)
+
+        Returns:
+            float: FPS
+        """
+        return self.fps_meter.get_fps()
+
+    def get_average_fps(self):
+        """
+        Lấy FPS trung bình từ lúc bắt đầu
 
         Returns:
             float: FPS
         """
         running_time = self.get_running_time()
         if running_time > 0:
-            return self.frame_count / running_time
+            return (self.frame_count - self._timing_frames) / running_time
         return 0.0
 
     def get_detection_rate(self):
@@ -148,17 +242,34 @@ class PersonCounter:
         Returns:
             dict: Dictionary chứa tất cả thống kê
         """
-        return {
-            "current_count": self.current_count,
-            "max_count": self.max_count,
-            "average_count": self.get_average_count(),
-            "total_detections": self.total_detections,
-            "total_frames": self.stats["total_frames"],
-            "frames_with_persons": self.stats["frames_with_persons"],
-            "detection_rate": self.get_detection_rate(),
-            "fps": self.get_fps(),
-            "running_time": self.get_running_time(),
-        }
+        with self._lock:
+            stats = {
+                "current_count": self.current_count,
+                "reported_count": self.reported_count,
+                "max_count": self.max_count,
+                "average_count": self.get_average_count(),
+                "total_detections": self.total_detections,
+                "total_frames": self.stats["total_frames"],
+                "frames_with_persons": self.stats["frames_with_persons"],
+                "detection_rate": self.get_detection_rate(),
+                "fps": self.get_fps(),
+                "average_fps": self.get_average_fps(),
+                "running_time": self.get_running_time(),
+            }
+
+            # Số người duy nhất và thời gian xuất hiện (khi bật tracking)
+            if self.tracker is not None:
+                stats.update(self.tracker.get_stats())
+
+            # Số người qua từng vạch và trong từng vùng
+            if self.zone_counter is not None:
+                stats.update(self.zone_counter.get_stats())
+
+            # Độ trễ p50/p95/p99 của từng giai đoạn (khi bật đo độ trễ)
+            if self.latency is not None:
+                stats["latency"] = self.latency.get_stats()
+
+            return stats
 
     def get_count_history(self):
         """
@@ -167,24 +278,105 @@ class PersonCounter:
         Returns:
             tuple: (counts, timestamps)
         """
-        return list(self.count_history), list(self.timestamp_history)
+        with self._lock:
+            timestamps = [
+                datetime.fromtimestamp(self.clock.to_wall(t))
+                for t in self.timestamp_history
+            ]
+            return list(self.count_history), timestamps
+
+    def set_zone_counter(self, zone_counter):
+        """
+        Thay đổi vạch/vùng đếm (vd: khi đổi nguồn video)
 
-    def reset_stats(self):
+        Args:
+            zone_counter (ZoneCounter): Zone counter mới (None = tắt)
         """
-        Reset tất cả thống kê
+        with self._lock:
+            self.zone_counter = zone_counter
+
+    def get_rollup(self, resolution, since=None):
         """
-        self.current_count = 0
-        self.max_count = 0
-        self.total_detections = 0
-        self.frame_count = 0
-        self.start_time = time.time()
+        Lấy số lượng người tổng hợp theo khoảng thời gian
 
-        self.count_history.clear()
-        self.timestamp_history.clear()
+        Args:
+            resolution (float): Độ dài bucket (giây), vd: 1, 60, 3600, 86400
+            since (float): Chỉ lấy bucket từ timestamp này (None = tất cả)
 
-        self.stats = {
-            "total_frames": 0,
-            "frames_with_persons": 0,
-            "average_count": 0.0,
-            "max_count_reached": 0,
-        }
+        Returns:
+            dict: Mảng "timestamp", "min", "max", "mean", "samples"
+        """
+        with self._lock:
+            return self.rollup.get_series(resolution, since)
+
+    def get_rollup_latest(self, resolution):
+        """
+        Lấy bucket mới nhất của một độ phân giải
+
+        Args:
+            resolution (float): Độ dài bucket (giây)
+
+        Returns:
+            dict: {"timestamp", "min", "max", "mean", "samples"}; None nếu chưa
+                có mẫu hoặc độ phân giải không được cấu hình
+        """
+        if resolution not in self.rollup.series:
+            return None
+        with self._lock:
+            return self.rollup.get_latest(resolution)
+
+    def get_rollup_records(self):
+        """
+        Lấy tất cả bucket của mọi độ phân giải (dùng để xuất file)
+
+        Returns:
+            list: Xem TimeRollup.to_records()
+        """
+        with self._lock:
+            return self.rollup.to_records()
+
+    def restart_timing(self):
+        """
+        Bắt đầu lại việc đo thời gian chạy và FPS, giữ nguyên số đếm
+
+        Gọi khi detector vừa khởi động xong để thời gian load model/warm-up
+        không làm FPS trung bình thấp đi.
+        """
+        with self._lock:
+            self.start_time = self.clock.monotonic()
+            self._timing_frames = self.frame_count
+            self.fps_meter.reset()
+
+    def reset_stats(self):
+        """
+        Reset tất cả thống kê
+        """
+        with self._lock:
+            self.current_count = 0
+            self.reported_count = 0
+            self.max_count = 0
+            self.total_detections = 0
+            self.frame_count = 0
+            self.start_time = self.clock.monotonic()
+            self._timing_frames = 0
+
+            self.count_history.clear()
+            self.timestamp_history.clear()
+            self.rollup.reset()
+            self.fps_meter.reset()
+
+            if self.smoother is not None:
+                self.smoother.reset()
+            if self.tracker is not None:
+                self.tracker.reset()
+            if self.zone_counter is not None:
+                self.zone_counter.reset()
+            if self.latency is not None:
+                self.latency.reset()
+
+            self.stats = {
+                "total_frames": 0,
+                "frames_with_persons": 0,
+                "average_count": 0.0,
+                "max_count_reached": 0,
+            }
@@ -7,38 +7,90 @@ import os
 # CRITICAL: Must be first, before any torch/ultralytics imports
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
+import threading
+import time
+
+import numpy as np
+
 from config.settings import (
     CONFIDENCE_THRESHOLD,
+    INFERENCE_IMGSZ,
     IOU_THRESHOLD,
+    MODEL_VARIANT,
     PERSON_CLASS_ID,
+    TILE_INCLUDE_FULL_FRAME,
+    TILE_MERGE_METRIC,
+    TILE_MERGE_THRESHOLD,
+    TILE_OVERLAP,
+    TILE_SIZE,
+    TILED_INFERENCE,
     VIDEO_HEIGHT,
     VIDEO_WIDTH,
+    WARMUP_ITERATIONS,
     YOLO_MODEL,
 )
 
-# Lazy import - chỉ import khi cần
-_YOLO = None
+from .model_registry import VARIANTS, ModelRegistry
+from .tiling import compute_tiles, non_max_suppression
 
+# Lazy import - chỉ import khi cần; mỗi file model chỉ load một lần
+_YOLO_MODELS = {}
+# Warm-up chạy nền và frame đầu tiên có thể cùng yêu cầu load model
+_YOLO_LOCK = threading.Lock()
 
-def _get_yolo():
-    """Lazy load YOLO model"""
-    global _YOLO
-    if _YOLO is None:
-        # Kiểm tra CUDA trước khi load model
-        try:
-            import torch
+# Trạng thái khởi động của detector
+STATE_IDLE = "idle"  # Chưa load model
+STATE_LOADING = "loading"  # Đang load trọng số
+STATE_WARMING_UP = "warming_up"  # Đang chạy inference giả
+STATE_READY = "ready"
+STATE_FAILED = "failed"
+
+
+def _get_yolo(path=YOLO_MODEL, task=None):
+    """
+    Lazy load YOLO model
+
+    Args:
+        path (str): File model (.pt hoặc artifact đã export)
+        task (str): Task của model (cần cho file export không có metadata)
+    """
+    with _YOLO_LOCK:
+        if path not in _YOLO_MODELS:
+            # Kiểm tra CUDA trước khi load model
+            try:
+                import torch
 
-            if not torch.cuda.is_available():
-                # Force CPU mode nếu không có CUDA
+                if not torch.cuda.is_available():
+                    # Force CPU mode nếu không có CUDA
+                    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+            except Exception:
+                # Nếu có lỗi gì, force CPU để an toàn
                 os.environ["CUDA_VISIBLE_DEVICES"] = ""
-        except Exception:
-            # Nếu có lỗi gì, force CPU để an toàn
-            os.environ["CUDA_VISIBLE_DEVICES"] = ""
 
-        from ultralytics import YOLO
+            from ultralytics import YOLO
+
+            _YOLO_MODELS[path] = YOLO(path, task=task)
+    return _YOLO_MODELS[path]
 
-        _YOLO = YOLO(YOLO_MODEL)  # pyright: ignore[reportConstantRedefinition]
-    return _YOLO
+
+def detections_from_array(array):
+    """
+    Chuyển mảng detection (N, 6) về danh sách dict như detect_persons
+
+    Args:
+        array (numpy.ndarray): Mảng x1, y1, x2, y2, confidence, class_id
+
+    Returns:
+        list: Danh sách detection dạng {"bbox", "confidence", "class_id"}
+    """
+    return [
+        {
+            "bbox": [int(x1), int(y1), int(x2), int(y2)],
+            "confidence": float(confidence),
+            "class_id": int(class_id),
+        }
+        for x1, y1, x2, y2, confidence, class_id in np.asarray(array).tolist()
+    ]
 
 
 class PersonDetector:
@@ -46,24 +98,266 @@ class PersonDetector:
     Lớp phát hiện người sử dụng mô hình YOLOv8
     """
 
-    def __init__(self, model_path=YOLO_MODEL):
+    def __init__(
+        self,
+        model_path=YOLO_MODEL,
+        region=None,
+        tiled=TILED_INFERENCE,
+        motion_gate=None,
+        variant=MODEL_VARIANT,
+    ):
         """
         Khởi tạo detector
 
         Args:
             model_path (str): Đường dẫn đến file mô hình YOLOv8
+            region (RegionOfInterest): Vùng quan tâm/vùng loại trừ (None = toàn frame)
+            tiled (bool): Chia frame thành các tile chồng lấn khi inference
+            motion_gate (MotionGate): Bỏ qua inference khi frame không đổi (None = tắt)
+            variant (str): Biến thể model trong ModelRegistry ("auto" = nhanh
+                nhất đã đo trên thiết bị hiện tại, "pt" = file gốc)
         """
         # Không load model ngay, sẽ load khi cần
         self.model_path = model_path
         self.model = None
+        self.requested_variant = variant
+        self.variant = None  # Biến thể thực sự được load
         self.confidence_threshold = CONFIDENCE_THRESHOLD
         self.iou_threshold = IOU_THRESHOLD
         self.person_class_id = PERSON_CLASS_ID
+        self.region = region
+        self.imgsz = INFERENCE_IMGSZ
+        self.motion_gate = motion_gate
+        self._last_boxes = np.empty((0, 6), dtype=np.float32)
+
+        # Cấu hình inference theo tile (frame độ phân giải cao)
+        self.tiled = tiled
+        self.tile_size = TILE_SIZE
+        self.tile_overlap = TILE_OVERLAP
+        self.tile_include_full_frame = TILE_INCLUDE_FULL_FRAME
+        self.tile_merge_metric = TILE_MERGE_METRIC
+        self.tile_merge_threshold = TILE_MERGE_THRESHOLD
+
+        # Trạng thái khởi động model (warm_up/warm_up_async)
+        self.state = STATE_IDLE
+        self.warmup_progress = 0.0
+        self.warmup_error = None
+        self.warmup_time = None
+        self._warmup_thread = None
+        self._warmup_done = threading.Event()
+        self._on_warmup_progress = None
 
     def _ensure_model_loaded(self):
         """Đảm bảo model đã được load"""
         if self.model is None:
-            self.model = _get_yolo()
+            path, self.variant = self._resolve_model_path()
+            self.model = _get_yolo(
+                path, task=None if self.variant == "pt" else "detect"
+            )
+            # Load lười ở frame đầu tiên, không qua warm_up()
+            if self.state == STATE_IDLE:
+                self.state = STATE_READY
+                self.warmup_progress = 1.0
+
+    def _resolve_model_path(self):
+        """
+        Chọn file model cần load theo biến thể yêu cầu
+
+        Returns:
+            tuple: (đường dẫn, tên biến thể); file gốc ("pt") nếu không dùng
+                registry được (model tải tự động như "yolov8n.pt", thiếu
+                thư viện export, build lỗi)
+        """
+        if self.requested_variant in (None, "pt") or not os.path.isfile(
+            self.model_path
+        ):
+            return self.model_path, "pt"
+
+        _, use_gpu = self._get_device()
+        device = "cuda" if use_gpu else "cpu"
+        variant = self.requested_variant
+        try:
+            registry = ModelRegistry(self.model_path)
+            if variant == "auto":
+                variant = registry.best_variant(device, self.imgsz)
+            elif device not in VARIANTS.get(variant, {}).get("devices", (device,)):
+                print(f"⚠️ Biến thể '{variant}' không chạy được trên {device}")
+                return self.model_path, "pt"
+            return registry.get(variant, self.imgsz), variant
+        except Exception as e:
+            print(f"⚠️ Không dùng được biến thể model '{variant}': {e}")
+            print(f"   → Load file gốc {self.model_path}")
+            return self.model_path, "pt"
+
+    def _set_warmup_state(self, state, progress):
+        """Cập nhật trạng thái khởi động và báo cho on_progress (nếu có)"""
+        self.state = state
+        self.warmup_progress = progress
+        if self._on_warmup_progress is not None:
+            self._on_warmup_progress(self.get_warmup_status())
+
+    def warm_up(self, iterations=WARMUP_ITERATIONS, on_progress=None):
+        """
+        Load model và chạy vài lần inference giả ở kích thước imgsz
+
+        Lần inference đầu tiên phải khởi tạo graph, chọn kernel và cấp phát
+        bộ nhớ nên chậm hơn nhiều lần các frame sau; warm-up trả chi phí này
+        trước khi frame thật đầu tiên tới.
+
+        Args:
+            iterations (int): Số lần inference giả
+            on_progress (callable): Gọi on_progress(get_warmup_status()) mỗi
+                khi trạng thái/tiến độ thay đổi
+
+        Returns:
+            bool: True nếu model sẵn sàng
+        """
+        if self.state == STATE_READY:
+            self._warmup_done.set()
+            return True
+
+        self._on_warmup_progress = on_progress
+        steps = 1 + max(0, int(iterations))
+        start = time.perf_counter()
+        try:
+            self._set_warmup_state(STATE_LOADING, 0.0)
+            self._ensure_model_loaded()
+
+            inference_kwargs = self._inference_kwargs()
+            dummy = np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)
+            for done in range(1, steps):
+                self._set_warmup_state(STATE_WARMING_UP, done / steps)
+                self.model(  # pyright: ignore[reportOptionalCall]
+                    dummy, **inference_kwargs  # pyright: ignore[reportArgumentType]
+                )
+
+            self.warmup_time = time.perf_counter() - start
+            self._set_warmup_state(STATE_READY, 1.0)
+            print(f"✅ Model sẵn sàng sau {self.warmup_time:.1f}s")
+        except Exception as e:
+            self.warmup_time = time.perf_counter() - start
+            self.warmup_error = str(e)
+            self._set_warmup_state(STATE_FAILED, self.warmup_progress)
+            print(f"❌ Lỗi khi khởi động model: {e}")
+        finally:
+            self._on_warmup_progress = None
+            self._warmup_done.set()
+
+        return self.state == STATE_READY
+
+    def warm_up_async(self, iterations=WARMUP_ITERATIONS, on_progress=None):
+        """
+        Chạy warm_up() trên thread nền (gọi khi ứng dụng khởi động)
+
+        Args:
+            iterations (int): Số lần inference giả
+            on_progress (callable): Gọi on_progress(trạng thái) trên thread nền
+
+        Returns:
+            threading.Thread: Thread warm-up (None nếu model đã sẵn sàng)
+        """
+        if self.state == STATE_READY:
+            self._warmup_done.set()
+            return None
+        if self._warmup_thread is not None and self._warmup_thread.is_alive():
+            return self._warmup_thread
+
+        self._warmup_done.clear()
+        self._warmup_thread = threading.Thread(
+            target=self.warm_up,
+            args=(iterations, on_progress),
+            name="detector-warmup",
+            daemon=True,
+        )
+        self._warmup_thread.start()
+        return self._warmup_thread
+
+    @property
+    def is_ready(self):
+        """Model đã load và warm-up xong"""
+        return self.state == STATE_READY
+
+    def wait_until_ready(self, timeout=None):
+        """
+        Chờ warm-up kết thúc
+
+        Args:
+            timeout (float): Thời gian chờ tối đa (None = chờ đến khi xong)
+
+        Returns:
+            bool: True nếu model sẵn sàng; False nếu hết giờ, warm-up lỗi
+                hoặc chưa bắt đầu warm-up
+        """
+        if self.state == STATE_IDLE and self._warmup_thread is None:
+            return False
+        self._warmup_done.wait(timeout)
+        return self.state == STATE_READY
+
+    def get_warmup_status(self):
+        """
+        Trạng thái khởi động để GUI/CLI hiển thị
+
+        Returns:
+            dict: {"state", "progress" (0..1), "error", "elapsed" (giây)}
+        """
+        return {
+            "state": self.state,
+            "progress": self.warmup_progress,
+            "error": self.warmup_error,
+            "elapsed": self.warmup_time,
+        }
+
+    def _get_device(self):
+        """
+        Xác định thiết bị inference (chỉ kiểm tra lần đầu, sau đó dùng lại)
+
+        Returns:
+            tuple: (device, use_gpu)
+        """
+        if hasattr(self, "_device"):
+            return self._device, self._use_gpu
+
+        # Kiểm tra GPU có sẵn - AN TOÀN với fallback
+        use_gpu = False
+        device = "cpu"
+
+        try:
+            import torch
+
+            # Kiểm tra CUDA có thực sự hoạt động không
+            if torch.cuda.is_available():
+                try:
+                    # Test CUDA bằng cách tạo tensor nhỏ
+                    _ = torch.cuda.FloatTensor(
+                        1
+                    )  # pyright: ignore[reportAttributeAccessIssue]
+                    use_gpu = True
+                    device = "0"
+                except Exception as cuda_err:
+                    print(f"⚠️ CUDA có nhưng không hoạt động: {cuda_err}")
+                    print("   → Chuyển sang CPU mode")
+        except Exception as torch_err:
+            print(f"⚠️ Lỗi khi import torch hoặc kiểm tra CUDA: {torch_err}")
+            print("   → Sử dụng CPU mode")
+
+        # Log device info (chỉ log lần đầu)
+        if use_gpu:
+            try:
+                print(
+                    f"🚀 Using GPU: {torch.cuda.get_device_name(0)}"
+                )  # pyright: ignore[reportPossiblyUnboundVariable]
+                cuda_version = getattr(
+                    torch.version, "cuda", "N/A"
+                )  # pyright: ignore[reportAttributeAccessIssue, reportPossiblyUnboundVariable]
+                print(f"   CUDA Version: {cuda_version}")
+            except:
+                print("🚀 Using GPU")
+        else:
+            print("💻 Using CPU (no GPU or CUDA unavailable)")
+
+        self._device = device  # pyright: ignore[reportUninitializedInstanceVariable]
+        self._use_gpu = use_gpu  # pyright: ignore[reportUninitializedInstanceVariable]
+        return device, use_gpu
 
     def detect_persons(self, frame):
         """
@@ -76,97 +370,235 @@ class PersonDetector:
             list: Danh sách các bounding box của người được phát hiện
         """
         try:
-            # Load model lần đầu (lazy loading)
-            self._ensure_model_loaded()
+            return detections_from_array(self.detect_array(frame))
 
-            # Kiểm tra GPU có sẵn - AN TOÀN với fallback
-            use_gpu = False
-            device = "cpu"
+        except Exception as e:
+            print(f"Lỗi trong quá trình phát hiện: {e}")
+            return []
 
-            try:
-                import torch
+    def _inference_kwargs(self):
+        """
+        Tham số inference cho model YOLO
 
-                # Kiểm tra CUDA có thực sự hoạt động không
-                if torch.cuda.is_available():
-                    try:
-                        # Test CUDA bằng cách tạo tensor nhỏ
-                        _ = torch.cuda.FloatTensor(
-                            1
-                        )  # pyright: ignore[reportAttributeAccessIssue]
-                        use_gpu = True
-                        device = "0"
-                    except Exception as cuda_err:
-                        print(f"⚠️ CUDA có nhưng không hoạt động: {cuda_err}")
-                        print("   → Chuyển sang CPU mode")
-            except Exception as torch_err:
-                print(f"⚠️ Lỗi khi import torch hoặc kiểm tra CUDA: {torch_err}")
-                print("   → Sử dụng CPU mode")
-
-            # Log device info (chỉ log lần đầu)
-            if not hasattr(self, "_device_logged"):
-                if use_gpu:
-                    try:
-                        print(
-                            f"🚀 Using GPU: {torch.cuda.get_device_name(0)}"
-                        )  # pyright: ignore[reportPossiblyUnboundVariable]
-                        cuda_version = getattr(
-                            torch.version, "cuda", "N/A"
-                        )  # pyright: ignore[reportAttributeAccessIssue, reportPossiblyUnboundVariable]
-                        print(f"   CUDA Version: {cuda_version}")
-                    except:
-                        print("🚀 Using GPU")
-                else:
-                    print("💻 Using CPU (no GPU or CUDA unavailable)")
-                self._device_logged = (
-                    True  # pyright: ignore[reportUninitializedInstanceVariable]
-                )
+        Returns:
+            dict: Tham số truyền vào model
+        """
+        device, use_gpu = self._get_device()
+
+        # Chạy inference với tối ưu cho speed
+        inference_kwargs = {
+            "conf": self.confidence_threshold,
+            "iou": self.iou_threshold,
+            "verbose": False,
+            "device": device,
+            "imgsz": self.imgsz,  # Kích thước inference cố định để tăng tốc
+        }
 
-            # Chạy inference với tối ưu cho speed
-            inference_kwargs = {
-                "conf": self.confidence_threshold,
-                "iou": self.iou_threshold,
-                "verbose": False,
-                "device": device,
-                "imgsz": 640,  # Kích thước inference cố định để tăng tốc
-            }
+        # Chỉ dùng FP16 trên GPU, với biến thể hỗ trợ (ONNX export ở FP32)
+        if use_gpu and VARIANTS.get(self.variant or "pt", {}).get("half", True):
+            inference_kwargs["half"] = True
 
-            # Chỉ dùng FP16 trên GPU
-            if use_gpu:
-                inference_kwargs["half"] = True
+        return inference_kwargs
+
+    def detect_array(self, frame):
+        """
+        Phát hiện người và trả về kết quả dạng mảng gọn
 
+        Args:
+            frame (numpy.ndarray): Khung hình đầu vào
+
+        Returns:
+            numpy.ndarray: Mảng (N, 6) float32 gồm x1, y1, x2, y2,
+                confidence, class_id của các detection là người
+        """
+        # Chỉ chạy inference trên vùng bao quanh ROI
+        if self.region is not None:
+            crop, offset = self.region.crop(frame)
+            if crop.size == 0:
+                return np.empty((0, 6), dtype=np.float32)
+        else:
+            crop = frame
+
+        # Vùng quan sát không thay đổi → dùng lại kết quả lần trước
+        if self.motion_gate is not None and not self.motion_gate.should_infer(crop):
+            return self._last_boxes.copy()
+
+        # Load model lần đầu (lazy loading)
+        self._ensure_model_loaded()
+
+        inference_kwargs = self._inference_kwargs()
+
+        if self.tiled:
+            boxes = self._detect_tiled(crop, inference_kwargs)
+        else:
             # Model is guaranteed to be loaded by _ensure_model_loaded()
             results = self.model(  # pyright: ignore[reportOptionalCall]
-                frame, **inference_kwargs  # pyright: ignore[reportArgumentType]
+                crop, **inference_kwargs  # pyright: ignore[reportArgumentType]
             )
+            boxes = self._results_to_array(results)
+
+        if self.region is not None:
+            # Đưa box về toạ độ frame gốc, bỏ box ngoài ROI/trong vùng loại trừ
+            boxes = self.region.restore(boxes, offset, frame.shape)
 
-            # Lọc kết quả chỉ lấy class "person"
-            person_detections = []
+        self._last_boxes = boxes
+        return boxes
 
-            for result in results:
-                if result.boxes is not None:
-                    boxes = result.boxes.xyxy.cpu().numpy()  # Bounding boxes
-                    confidences = result.boxes.conf.cpu().numpy()  # Confidence scores
-                    class_ids = result.boxes.cls.cpu().numpy()  # Class IDs
+    def detect_array_batch(self, frames):
+        """
+        Phát hiện người trên nhiều frame trong một lần gọi model (xử lý offline)
 
-                    # Lọc chỉ lấy detections của class "person"
-                    for i, class_id in enumerate(class_ids):
-                        if int(class_id) == self.person_class_id:
-                            x1, y1, x2, y2 = boxes[i]
-                            confidence = confidences[i]
+        Không dùng motion gating vì các frame trong batch được xử lý cùng lúc.
+        Ở chế độ tile, mỗi frame chạy một batch tile riêng.
+
+        Args:
+            frames (list): Danh sách khung hình (nên cùng kích thước)
+
+        Returns:
+            list: Mỗi frame một mảng (N, 6) float32 như detect_array()
+        """
+        if len(frames) == 0:
+            return []
 
-                            person_detections.append(
-                                {
-                                    "bbox": [int(x1), int(y1), int(x2), int(y2)],
-                                    "confidence": float(confidence),
-                                    "class_id": int(class_id),
-                                }
-                            )
+        self._ensure_model_loaded()
+        inference_kwargs = self._inference_kwargs()
+
+        crops = []
+        offsets = []
+        for frame in frames:
+            if self.region is not None:
+                crop, offset = self.region.crop(frame)
+            else:
+                crop, offset = frame, None
+            crops.append(crop)
+            offsets.append(offset)
+
+        # Chỉ đưa vào model các crop không rỗng (ROI nằm ngoài frame → rỗng)
+        valid = [i for i, crop in enumerate(crops) if crop.size > 0]
+        arrays = [np.empty((0, 6), dtype=np.float32) for _ in frames]
+
+        if self.tiled:
+            for i in valid:
+                arrays[i] = self._detect_tiled(crops[i], inference_kwargs)
+        elif valid:
+            results = self.model(  # pyright: ignore[reportOptionalCall]
+                [crops[i] for i in valid],
+                **inference_kwargs,  # pyright: ignore[reportArgumentType]
+            )
+            for i, result in zip(valid, results):
+                arrays[i] = self._result_to_array(result)
+
+        if self.region is not None:
+            arrays = [
+                self.region.restore(boxes, offset, frame.shape)
+                for boxes, offset, frame in zip(arrays, offsets, frames)
+            ]
+
+        return arrays
+
+    def detect_persons_batch(self, frames):
+        """
+        Phát hiện người trên nhiều frame trong một lần gọi model
+
+        Args:
+            frames (list): Danh sách khung hình
 
-            return person_detections
+        Returns:
+            list: Mỗi frame một danh sách detection như detect_persons()
+        """
+        try:
+            return [detections_from_array(a) for a in self.detect_array_batch(frames)]
 
         except Exception as e:
             print(f"Lỗi trong quá trình phát hiện: {e}")
-            return []
+            return [[] for _ in frames]
+
+    def _detect_tiled(self, frame, inference_kwargs):
+        """
+        Inference theo tile chồng lấn: tất cả tile chạy trong một batch,
+        sau đó gộp kết quả bằng NMS giữa các tile
+
+        Args:
+            frame (numpy.ndarray): Khung hình đầu vào
+            inference_kwargs (dict): Tham số inference
+
+        Returns:
+            numpy.ndarray: Mảng (N, 6) float32 theo toạ độ của frame
+        """
+        height, width = frame.shape[:2]
+        tiles = compute_tiles(height, width, self.tile_size, self.tile_overlap)
+        crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+        offsets = tiles[:, :2]
+
+        # Thêm một lượt trên toàn frame để bắt người lớn bị cắt giữa các tile
+        if self.tile_include_full_frame and len(tiles) > 1:
+            crops.append(frame)
+            offsets = np.vstack([offsets, [[0, 0]]])
+
+        results = self.model(  # pyright: ignore[reportOptionalCall]
+            crops,
+            **{
+                **inference_kwargs,
+                "imgsz": self.tile_size,
+            },  # pyright: ignore[reportArgumentType]
+        )
+
+        arrays = [self._result_to_array(result) for result in results]
+        if not arrays:
+            return np.empty((0, 6), dtype=np.float32)
+
+        counts = [len(array) for array in arrays]
+        boxes = np.concatenate(arrays)
+        shifts = np.repeat(offsets[: len(arrays)], counts, axis=0).astype(np.float32)
+        boxes[:, [0, 2]] += shifts[:, [0]]
+        boxes[:, [1, 3]] += shifts[:, [1]]
+
+        return non_max_suppression(
+            boxes, self.tile_merge_threshold, metric=self.tile_merge_metric
+        )
+
+    def _result_to_array(self, result):
+        """
+        Chuyển một kết quả YOLO thành mảng, chỉ giữ lại class "person"
+
+        Args:
+            result: Kết quả YOLO của một ảnh
+
+        Returns:
+            numpy.ndarray: Mảng (N, 6) float32
+        """
+        if result.boxes is None:
+            return np.empty((0, 6), dtype=np.float32)
+
+        boxes = result.boxes.xyxy.cpu().numpy()  # Bounding boxes
+        confidences = result.boxes.conf.cpu().numpy()  # Confidence scores
+        class_ids = result.boxes.cls.cpu().numpy()  # Class IDs
+
+        # Lọc chỉ lấy detections của class "person"
+        mask = class_ids.astype(int) == self.person_class_id
+        return np.column_stack(
+            [
+                np.asarray(boxes, dtype=np.float32).reshape(-1, 4)[mask],
+                np.asarray(confidences, dtype=np.float32)[mask],
+                np.asarray(class_ids, dtype=np.float32)[mask],
+            ]
+        )
+
+    def _results_to_array(self, results):
+        """
+        Chuyển kết quả YOLO thành mảng, chỉ giữ lại class "person"
+
+        Args:
+            results (list): Kết quả trả về từ model YOLO
+
+        Returns:
+            numpy.ndarray: Mảng (N, 6) float32
+        """
+        arrays = [self._result_to_array(result) for result in results]
+
+        if not arrays:
+            return np.empty((0, 6), dtype=np.float32)
+        return np.concatenate(arrays).astype(np.float32, copy=False)
 
     def preprocess_frame(self, frame):
         """
@@ -178,9 +610,33 @@ class PersonDetector:
         Returns:
             numpy.ndarray: Khung hình đã được tiền xử lý
         """
-        # Không cần resize vì đã set ở camera level
+        # Không cần resize vì đã set ở camera level, chỉ cắt theo ROI (nếu có)
+        if self.region is not None:
+            crop, _ = self.region.crop(frame)
+            return crop
         return frame
 
+    def set_region(self, region):
+        """
+        Thay đổi vùng quan tâm/vùng loại trừ
+
+        Args:
+            region (RegionOfInterest): Vùng mới (None = toàn bộ frame)
+        """
+        self.region = region
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+
+    def set_motion_gate(self, motion_gate):
+        """
+        Bật/tắt motion gating
+
+        Args:
+            motion_gate (MotionGate): Motion gate mới (None = tắt)
+        """
+        self.motion_gate = motion_gate
+        self._last_boxes = np.empty((0, 6), dtype=np.float32)
+
     def get_model_info(self):
         """
         Lấy thông tin về mô hình đang sử dụng
@@ -190,7 +646,11 @@ class PersonDetector:
         """
         return {
             "model_name": YOLO_MODEL,
+            "model_path": self.model_path,
+            "variant": self.variant,
             "confidence_threshold": self.confidence_threshold,
             "iou_threshold": self.iou_threshold,
             "input_size": f"{VIDEO_WIDTH}x{VIDEO_HEIGHT}",
+            "imgsz": self.imgsz,
+            "tiled": self.tiled,
         }
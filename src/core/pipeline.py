@@ -0,0 +1,291 @@
+"""
+Module pipeline xử lý frame theo từng giai đoạn chạy song song
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Đánh dấu kết thúc luồng dữ liệu giữa các giai đoạn
+_STOP = object()
+
+
+class StageTimer:
+    """
+    Lớp ghi nhận thời gian xử lý của một giai đoạn
+
+    Là nơi đo duy nhất của giai đoạn: khi có LatencyRecorder, mỗi lần ghi
+    cũng được đưa vào histogram cùng tên (p50/p95/p99).
+    """
+
+    def __init__(self, name, latency=None):
+        """
+        Khởi tạo bộ đếm thời gian
+
+        Args:
+            name (str): Tên giai đoạn
+            latency (LatencyRecorder): Histogram độ trễ nhận cùng mẫu (None = tắt)
+        """
+        self.name = name
+        self.latency = latency
+        self.count = 0
+        self.total_time = 0.0
+        self.last_time = 0.0
+        self.max_time = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed):
+        """
+        Ghi nhận thời gian xử lý một frame
+
+        Args:
+            elapsed (float): Thời gian xử lý (giây)
+        """
+        with self._lock:
+            self.count += 1
+            self.total_time += elapsed
+            self.last_time = elapsed
+            if elapsed > self.max_time:
+                self.max_time = elapsed
+        if self.latency is not None:
+            self.latency.record(self.name, elapsed)
+
+    def get_timings(self):
+        """
+        Lấy thống kê thời gian của giai đoạn
+
+        Returns:
+            dict: Số frame, thời gian gần nhất/trung bình/lớn nhất (ms)
+        """
+        with self._lock:
+            avg_time = self.total_time / self.count if self.count > 0 else 0.0
+            return {
+                "count": self.count,
+                "last_ms": self.last_time * 1000,
+                "avg_ms": avg_time * 1000,
+                "max_ms": self.max_time * 1000,
+            }
+
+
+class StageTimings:
+    """
+    Tập StageTimer theo tên giai đoạn (dùng chung cho chạy pipeline và tuần tự)
+
+    Khi tắt (enabled=False) không có timer nào: record/measure không làm gì
+    và pipeline không gọi perf_counter cho từng frame.
+    """
+
+    def __init__(self, names=(), latency=None, enabled=True):
+        """
+        Khởi tạo
+
+        Args:
+            names (list): Các giai đoạn tạo sẵn (giữ thứ tự hiển thị)
+            latency (LatencyRecorder): Histogram độ trễ nhận cùng mẫu (None = tắt)
+            enabled (bool): False để bỏ qua toàn bộ việc đo
+        """
+        self.latency = latency
+        self.enabled = enabled
+        self.timers = (
+            {name: StageTimer(name, latency) for name in names} if enabled else {}
+        )
+
+    def add(self, name):
+        """
+        Tạo timer cho giai đoạn nếu chưa có
+
+        Args:
+            name (str): Tên giai đoạn
+
+        Returns:
+            StageTimer: Timer của giai đoạn (None khi đã tắt đo)
+        """
+        if not self.enabled:
+            return None
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers.setdefault(name, StageTimer(name, self.latency))
+        return timer
+
+    def measure(self, name):
+        """
+        Context manager đo thời gian một khối lệnh vào giai đoạn name
+
+        Args:
+            name (str): Tên giai đoạn
+
+        Returns:
+            Context manager (không làm gì khi đã tắt đo)
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self._measure(name)
+
+    @contextmanager
+    def _measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, elapsed):
+        """
+        Ghi nhận thời gian của một giai đoạn (tạo timer nếu chưa có)
+
+        Args:
+            name (str): Tên giai đoạn
+            elapsed (float): Thời gian xử lý (giây)
+        """
+        timer = self.add(name)
+        if timer is not None:
+            timer.record(elapsed)
+
+    def get_timings(self):
+        """
+        Lấy thống kê thời gian của tất cả giai đoạn
+
+        Returns:
+            dict: {tên giai đoạn: thống kê thời gian}
+        """
+        return {name: timer.get_timings() for name, timer in list(self.timers.items())}
+
+
+class FramePipeline:
+    """
+    Pipeline nhiều giai đoạn, mỗi giai đoạn chạy trên một worker thread riêng
+
+    Các giai đoạn nối với nhau bằng queue có giới hạn nên frame N+1 có thể
+    được xử lý ở giai đoạn trước trong khi frame N đang ở giai đoạn sau.
+    Mỗi giai đoạn chỉ có một worker và queue là FIFO nên thứ tự frame
+    luôn được giữ nguyên.
+    """
+
+    def __init__(self, stages, queue_size=2, timings=None):
+        """
+        Khởi tạo pipeline
+
+        Args:
+            stages (list): Danh sách (tên, hàm xử lý). Mỗi hàm nhận kết quả
+                của giai đoạn trước; trả về None để bỏ qua frame đó
+            queue_size (int): Số phần tử tối đa trong mỗi queue
+            timings (StageTimings): Nơi ghi thời gian từng giai đoạn (None =
+                tạo mới, không có histogram)
+        """
+        if not stages:
+            raise ValueError("Pipeline cần ít nhất một giai đoạn")
+
+        self.stages = list(stages)
+        self.queue_size = max(1, int(queue_size))
+        self.queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        self.timings = timings if timings is not None else StageTimings()
+        for name, _ in self.stages:
+            self.timings.add(name)
+        self.threads = []
+        self.running = False
+
+    def start(self):
+        """
+        Khởi động các worker thread
+        """
+        if self.running:
+            return
+
+        self.running = True
+        self.threads = []
+        for index, (name, func) in enumerate(self.stages):
+            thread = threading.Thread(
+                target=self._worker,
+                args=(index, func),
+                name=f"pipeline-{name}",
+                daemon=True,
+            )
+            thread.start()
+            self.threads.append(thread)
+
+    def _worker(self, index, func):
+        """
+        Vòng lặp của một giai đoạn: lấy dữ liệu, xử lý, chuyển tiếp
+
+        Args:
+            index (int): Vị trí giai đoạn trong pipeline
+            func (callable): Hàm xử lý của giai đoạn
+        """
+        input_queue = self.queues[index]
+        output_queue = self.queues[index + 1] if index + 1 < len(self.queues) else None
+        timer = self.timings.timers.get(self.stages[index][0])
+
+        while True:
+            item = input_queue.get()
+            if item is _STOP:
+                if output_queue is not None:
+                    output_queue.put(_STOP)
+                break
+
+            start = time.perf_counter() if timer is not None else 0.0
+            try:
+                result = func(item)
+            except Exception as e:
+                print(f"❌ Lỗi ở giai đoạn {self.stages[index][0]}: {e}")
+                result = None
+            if timer is not None:
+                timer.record(time.perf_counter() - start)
+
+            if result is not None and output_queue is not None:
+                output_queue.put(result)
+
+    def submit(self, item, timeout=None):
+        """
+        Đưa một frame vào giai đoạn đầu tiên (chặn khi queue đầy)
+
+        Args:
+            item: Dữ liệu đầu vào của giai đoạn đầu tiên
+            timeout (float): Thời gian chờ tối đa (None để chờ vô hạn)
+
+        Returns:
+            bool: True nếu đã đưa vào pipeline, False nếu hết thời gian chờ
+        """
+        if not self.running:
+            return False
+
+        try:
+            self.queues[0].put(item, timeout=timeout)
+            return True
+        except queue.Full:
+            return False
+
+    def record_timing(self, name, elapsed):
+        """
+        Ghi nhận thời gian của giai đoạn chạy ngoài pipeline (vd: capture)
+
+        Args:
+            name (str): Tên giai đoạn
+            elapsed (float): Thời gian xử lý (giây)
+        """
+        self.timings.record(name, elapsed)
+
+    def get_stage_timings(self):
+        """
+        Lấy thống kê thời gian của tất cả giai đoạn
+
+        Returns:
+            dict: {tên giai đoạn: thống kê thời gian}
+        """
+        return self.timings.get_timings()
+
+    def stop(self, timeout=None):
+        """
+        Dừng pipeline sau khi xử lý hết các frame đã đưa vào
+
+        Args:
+            timeout (float): Thời gian chờ tối đa cho mỗi worker
+        """
+        if not self.running:
+            return
+
+        self.running = False
+        self.queues[0].put(_STOP)
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
@@ -0,0 +1,280 @@
+"""
+Module sampling profiler: định kỳ đọc stack của các thread đang chạy để tìm
+chỗ tốn thời gian ngay trên máy đang chạy thật (không cần cProfile)
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from config.settings import (
+    OUTPUT_PROFILES_DIR,
+    PROFILER_DURATION,
+    PROFILER_INTERVAL,
+    PROJECT_ROOT,
+)
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+def parse_profile_duration(value, default=PROFILER_DURATION):
+    """
+    Đọc giá trị bật profile từ biến môi trường hoặc dòng lệnh
+
+    Args:
+        value (str): "", "0", "false" = tắt; "1", "true" = default giây;
+            số khác = số giây
+        default (float): Thời lượng khi chỉ bật/tắt
+
+    Returns:
+        float: Số giây cần profile (0 = tắt)
+    """
+    value = (value or "").strip().lower()
+    if value in ("", "0", "false", "no", "off"):
+        return 0.0
+    if value in ("1", "true", "yes", "on"):
+        return float(default)
+    try:
+        seconds = float(value)
+    except ValueError:
+        raise ValueError(f"Thời lượng profile không hợp lệ: {value}") from None
+    return max(0.0, seconds)
+
+
+def _short_path(filename):
+    """Đường dẫn tương đối với project, hoặc 2 thành phần cuối nếu ở ngoài"""
+    root = str(PROJECT_ROOT)
+    if filename.startswith(root) and "site-packages" not in filename:
+        return os.path.relpath(filename, root)
+    parts = filename.replace("\\", "/").split("/")
+    return "/".join(parts[-2:])
+
+
+class SamplingProfiler:
+    """
+    Sampling profiler chạy trên một thread riêng
+
+    Cứ interval giây đọc sys._current_frames() một lần và đếm stack của từng
+    thread (gộp theo hàm, không theo dòng). Đây là thời gian thực: thread đang
+    chờ (đọc camera, queue rỗng) cũng được tính. Không cài hook vào trình thông
+    dịch (sys.setprofile/settrace) nên code được profile chạy với tốc độ
+    bình thường; chi phí chỉ là một lần duyệt stack mỗi mẫu, và bằng 0 khi
+    không profile. Chỉ thấy được thread Python của process hiện tại (worker
+    của InferencePool là process riêng).
+    """
+
+    def __init__(
+        self, interval=PROFILER_INTERVAL, output_dir=OUTPUT_PROFILES_DIR, threads=None
+    ):
+        """
+        Khởi tạo profiler
+
+        Args:
+            interval (float): Chu kỳ lấy mẫu (giây)
+            output_dir (str): Thư mục ghi file kết quả
+            threads (list): Tên các thread cần profile (None = tất cả)
+        """
+        if interval <= 0:
+            raise ValueError("interval phải > 0")
+        self.interval = interval
+        self.output_dir = output_dir
+        self.threads = set(threads) if threads is not None else None
+        self.samples = Counter()  # {(tên thread, frame gốc, ..., frame lá): số mẫu}
+        self.sample_count = 0
+        self.started_at = None
+        self.elapsed = 0.0
+        self._frames = {}  # code object → (tên hàm, file, dòng đầu)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        """Profiler có đang lấy mẫu không"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, duration=PROFILER_DURATION, on_finish=None):
+        """
+        Bắt đầu lấy mẫu trên thread nền trong một khoảng thời gian
+
+        Args:
+            duration (float): Số giây lấy mẫu, hết giờ tự dừng và ghi file
+                (None = đến khi gọi stop())
+            on_finish (callable): Gọi on_finish(paths) trên thread của profiler
+                sau khi ghi file (paths = {} nếu không có mẫu nào)
+
+        Returns:
+            bool: False nếu profiler đang chạy
+        """
+        if self.running:
+            return False
+
+        with self._lock:
+            self.samples.clear()
+            self.sample_count = 0
+        self.started_at = datetime.now()
+        self.elapsed = 0.0
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(duration, on_finish), name="profiler", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def stop(self, timeout=None):
+        """
+        Dừng lấy mẫu sớm (file vẫn được ghi như khi hết giờ)
+
+        Args:
+            timeout (float): Thời gian chờ thread profiler kết thúc
+        """
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self, duration, on_finish):
+        """Vòng lấy mẫu của thread profiler"""
+        start = time.perf_counter()
+        deadline = None if duration is None else start + duration
+        while not self._stop.wait(self.interval):
+            self.sample()
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        self.elapsed = time.perf_counter() - start
+
+        paths = {}
+        if self.sample_count:
+            try:
+                paths = self.save()
+                print(f"🔥 Đã lưu profile: {paths['speedscope']}")
+            except OSError as e:
+                print(f"❌ Không thể lưu profile: {e}")
+        if on_finish is not None:
+            on_finish(paths)
+
+    def sample(self):
+        """Lấy một mẫu stack của các thread (trừ thread profiler)"""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        current = threading.get_ident()
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == current:
+                continue
+            name = names.get(ident, f"thread-{ident}")
+            if self.threads is not None and name not in self.threads:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_key(frame.f_code))
+                frame = frame.f_back
+            stack.append((name, "", 0))
+            stacks.append(tuple(reversed(stack)))
+
+        with self._lock:
+            self.samples.update(stacks)
+            self.sample_count += 1
+
+    def _frame_key(self, code):
+        """Thông tin (tên hàm, file, dòng đầu) của một code object (có cache)"""
+        key = self._frames.get(code)
+        if key is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            key = (name, _short_path(code.co_filename), code.co_firstlineno)
+            self._frames[code] = key
+        return key
+
+    def to_collapsed(self):
+        """
+        Xuất dạng collapsed stack (flamegraph.pl, speedscope, inferno)
+
+        Returns:
+            str: Mỗi dòng "thread;hàm gốc (file:dòng);...;hàm lá (file:dòng) số_mẫu"
+        """
+        with self._lock:
+            samples = list(self.samples.items())
+        lines = []
+        for stack, count in sorted(samples):
+            labels = [stack[0][0]] + [f"{n} ({f}:{line})" for n, f, line in stack[1:]]
+            # ";" là ký tự phân cách của định dạng collapsed
+            lines.append(
+                f"{';'.join(label.replace(';', ':') for label in labels)} {count}"
+            )
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def to_speedscope(self, name="person-detection"):
+        """
+        Xuất dạng speedscope (https://www.speedscope.app), một profile mỗi thread
+
+        Args:
+            name (str): Tên profile
+
+        Returns:
+            dict: Dữ liệu JSON theo file-format-schema của speedscope
+        """
+        with self._lock:
+            samples = list(self.samples.items())
+
+        frames, index = [], {}
+        by_thread = {}
+        for stack, count in sorted(samples):
+            ids = []
+            for key in stack[1:]:
+                if key not in index:
+                    index[key] = len(frames)
+                    frames.append({"name": key[0], "file": key[1], "line": key[2]})
+                ids.append(index[key])
+            by_thread.setdefault(stack[0][0], []).append((ids, count * self.interval))
+
+        profiles = []
+        for thread, entries in sorted(by_thread.items()):
+            total = sum(weight for _, weight in entries)
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": thread,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": total,
+                    "samples": [ids for ids, _ in entries],
+                    "weights": [weight for _, weight in entries],
+                }
+            )
+
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "person-detection SamplingProfiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def save(self, prefix=None):
+        """
+        Ghi file collapsed stack (.collapsed.txt) và speedscope (.speedscope.json)
+
+        Args:
+            prefix (str): Tên file không có đuôi (None = profile_<thời điểm bắt đầu>)
+
+        Returns:
+            dict: {"collapsed": đường dẫn, "speedscope": đường dẫn}
+        """
+        if prefix is None:
+            started = self.started_at or datetime.now()
+            prefix = f"profile_{started.strftime('%Y%m%d_%H%M%S')}"
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(str(self.output_dir), prefix)
+
+        paths = {
+            "collapsed": f"{base}.collapsed.txt",
+            "speedscope": f"{base}.speedscope.json",
+        }
+        with open(paths["collapsed"], "w", encoding="utf-8") as f:
+            f.write(self.to_collapsed())
+        with open(paths["speedscope"], "w", encoding="utf-8") as f:
+            json.dump(self.to_speedscope(prefix), f)
+        return paths
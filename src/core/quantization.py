@@ -0,0 +1,192 @@
+"""
+Module lượng tử hoá INT8 sau train (post-training static quantization) cho
+model ONNX, hiệu chỉnh (calibrate) trên ảnh thật của dataset
+"""
+
+import re
+
+import cv2
+import numpy as np
+
+from config.settings import INFERENCE_IMGSZ, QUANT_CALIBRATION_METHOD
+
+# Màu viền khi letterbox, giống ultralytics
+LETTERBOX_COLOR = (114, 114, 114)
+
+
+def letterbox(image, imgsz=INFERENCE_IMGSZ):
+    """
+    Resize giữ tỉ lệ và thêm viền thành ảnh vuông imgsz (giống ultralytics)
+
+    Args:
+        image (numpy.ndarray): Ảnh BGR (H, W, 3)
+        imgsz (int): Cạnh ảnh đầu ra
+
+    Returns:
+        numpy.ndarray: Ảnh (imgsz, imgsz, 3) uint8
+    """
+    height, width = image.shape[:2]
+    scale = min(imgsz / height, imgsz / width)
+    new_w, new_h = round(width * scale), round(height * scale)
+    if (new_w, new_h) != (width, height):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    top = (imgsz - new_h) // 2
+    left = (imgsz - new_w) // 2
+    return cv2.copyMakeBorder(
+        image,
+        top,
+        imgsz - new_h - top,
+        left,
+        imgsz - new_w - left,
+        cv2.BORDER_CONSTANT,
+        value=LETTERBOX_COLOR,
+    )
+
+
+def to_model_input(image, imgsz=INFERENCE_IMGSZ):
+    """
+    Chuyển ảnh BGR thành tensor đầu vào của model YOLO export
+
+    Args:
+        image (numpy.ndarray): Ảnh BGR (H, W, 3)
+        imgsz (int): Kích thước đầu vào của model
+
+    Returns:
+        numpy.ndarray: Mảng (1, 3, imgsz, imgsz) float32 RGB, giá trị 0-1
+    """
+    rgb = letterbox(image, imgsz)[:, :, ::-1]
+    return np.ascontiguousarray(rgb.transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+class CalibrationReader:
+    """
+    Nguồn dữ liệu hiệu chỉnh cho onnxruntime.quantization.quantize_static
+
+    Đọc lần lượt từng ảnh (không giữ cả tập trong bộ nhớ) và trả về đầu vào
+    đã tiền xử lý giống hệt lúc inference. Cùng interface với
+    onnxruntime.quantization.CalibrationDataReader.
+    """
+
+    def __init__(self, images, input_name="images", imgsz=INFERENCE_IMGSZ):
+        """
+        Khởi tạo reader
+
+        Args:
+            images (list): Đường dẫn các ảnh hiệu chỉnh
+            input_name (str): Tên input của model ONNX
+            imgsz (int): Kích thước đầu vào
+        """
+        self.images = list(images)
+        self.input_name = input_name
+        self.imgsz = imgsz
+        self._index = 0
+
+    def get_next(self):
+        """Đầu vào tiếp theo ({tên input: tensor}) hoặc None khi hết ảnh"""
+        while self._index < len(self.images):
+            path = self.images[self._index]
+            self._index += 1
+            image = cv2.imread(path)
+            if image is not None:
+                return {self.input_name: to_model_input(image, self.imgsz)}
+        return None
+
+    def rewind(self):
+        """Đọc lại từ ảnh đầu tiên"""
+        self._index = 0
+
+
+def head_nodes_to_exclude(node_names):
+    """
+    Các node giải mã box ở đầu ra của Detect head (giữ FP32)
+
+    Phần DFL/softmax/ghép toạ độ sau các nhánh Conv cuối rất nhạy với sai số
+    lượng tử: quantize nó làm lệch toạ độ box nhiều mà gần như không nhanh
+    hơn. Các nhánh Conv của head (cv2.*, cv3.* - phần nặng) vẫn được quantize.
+
+    Args:
+        node_names (list): Tên các node trong graph ONNX (export của ultralytics
+            đặt tên dạng "/model.22/dfl/conv/Conv")
+
+    Returns:
+        list: Tên các node không quantize
+    """
+    pattern = re.compile(r"^/model\.(\d+)/")
+    indices = [int(m.group(1)) for m in map(pattern.match, node_names) if m]
+    if not indices:
+        return []
+    head = f"/model.{max(indices)}/"
+    return [
+        name
+        for name in node_names
+        if name.startswith(head) and not name[len(head) :].startswith("cv")
+    ]
+
+
+def quantize_static_int8(
+    onnx_path,
+    output_path,
+    images,
+    imgsz=INFERENCE_IMGSZ,
+    method=QUANT_CALIBRATION_METHOD,
+    per_channel=True,
+):
+    """
+    Lượng tử hoá tĩnh một model ONNX xuống INT8 (định dạng QDQ)
+
+    Trọng số INT8 theo từng kênh, activation UINT8 với khoảng giá trị đo trên
+    ảnh hiệu chỉnh. Cần onnx và onnxruntime.
+
+    Args:
+        onnx_path (str): Model ONNX FP32
+        output_path (str): File ONNX INT8 đầu ra
+        images (list): Đường dẫn ảnh hiệu chỉnh (vài trăm ảnh là đủ)
+        imgsz (int): Kích thước đầu vào của model
+        method (str): "minmax", "entropy" hoặc "percentile"
+        per_channel (bool): Lượng tử trọng số theo từng kênh output
+
+    Returns:
+        dict: Thông tin lượng tử hoá (ghi vào metadata của registry)
+    """
+    import onnx
+    from onnxruntime.quantization import (
+        CalibrationMethod,
+        QuantFormat,
+        QuantType,
+        quantize_static,
+    )
+
+    methods = {
+        "minmax": CalibrationMethod.MinMax,
+        "entropy": CalibrationMethod.Entropy,
+        "percentile": CalibrationMethod.Percentile,
+    }
+    if method not in methods:
+        raise ValueError(f"Phương pháp hiệu chỉnh không hợp lệ: {method}")
+    if not images:
+        raise ValueError("Cần ít nhất một ảnh hiệu chỉnh")
+
+    model = onnx.load(onnx_path)
+    input_name = model.graph.input[0].name
+    excluded = head_nodes_to_exclude([node.name for node in model.graph.node])
+    del model
+
+    quantize_static(
+        onnx_path,
+        output_path,
+        CalibrationReader(images, input_name, imgsz),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=per_channel,
+        calibrate_method=methods[method],
+        nodes_to_exclude=excluded,
+    )
+    return {
+        "method": "static",
+        "calibrate_method": method,
+        "calibration_images": len(images),
+        "per_channel": per_channel,
+        "excluded_nodes": len(excluded),
+    }
@@ -0,0 +1,166 @@
+"""
+Module vùng quan tâm (ROI) và vùng loại trừ cho việc phát hiện người
+"""
+
+import cv2
+import numpy as np
+
+
+class RegionOfInterest:
+    """
+    Lớp quản lý vùng quan tâm (ROI) và các vùng loại trừ của một nguồn video
+
+    Inference chỉ chạy trên hình chữ nhật bao quanh ROI; các box sau đó được
+    dịch về toạ độ frame gốc và bị loại bỏ nếu tâm box nằm ngoài ROI hoặc
+    nằm trong một vùng loại trừ.
+    """
+
+    def __init__(self, roi=None, exclusions=None):
+        """
+        Khởi tạo vùng quan tâm. Toạ độ đa giác có thể là pixel hoặc tỉ lệ
+        (0-1) theo kích thước frame.
+
+        Args:
+            roi (list): Đa giác ROI [(x, y), ...] (None = toàn bộ frame)
+            exclusions (list): Danh sách đa giác vùng loại trừ
+        """
+        self.roi = self._to_polygon(roi) if roi is not None else None
+        self.exclusions = [self._to_polygon(p) for p in (exclusions or [])]
+
+        # Cache theo kích thước frame: (toạ độ crop, mask hợp lệ)
+        self._cache_shape = None
+        self._cache_rect = None
+        self._cache_mask = None
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Tạo ROI từ cấu hình của một nguồn video
+
+        Args:
+            config (dict): {"roi": [...], "exclusions": [[...], ...]} hoặc None
+
+        Returns:
+            RegionOfInterest: ROI hoặc None nếu không cấu hình gì
+        """
+        if not config:
+            return None
+        return cls(roi=config.get("roi"), exclusions=config.get("exclusions"))
+
+    @staticmethod
+    def _to_polygon(points):
+        """
+        Chuyển danh sách điểm thành mảng (N, 2)
+
+        Args:
+            points (list): Danh sách điểm (x, y)
+
+        Returns:
+            numpy.ndarray: Mảng float64 (N, 2)
+        """
+        polygon = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        if len(polygon) < 3:
+            raise ValueError("Đa giác cần ít nhất 3 điểm")
+        return polygon
+
+    @staticmethod
+    def _scale(polygon, width, height):
+        """
+        Đổi toạ độ tỉ lệ (0-1) sang pixel nếu cần
+
+        Args:
+            polygon (numpy.ndarray): Đa giác (N, 2)
+            width (int): Chiều rộng frame
+            height (int): Chiều cao frame
+
+        Returns:
+            numpy.ndarray: Đa giác toạ độ pixel kiểu int32
+        """
+        if polygon.max() <= 1.0:
+            polygon = polygon * [width, height]
+        return np.round(polygon).astype(np.int32)
+
+    def _prepare(self, frame_shape):
+        """
+        Tính hình chữ nhật crop và mask hợp lệ cho kích thước frame
+
+        Args:
+            frame_shape (tuple): Kích thước frame (h, w, ...)
+        """
+        shape = tuple(frame_shape[:2])
+        if shape == self._cache_shape:
+            return
+
+        height, width = shape
+        mask = np.zeros((height, width), dtype=np.uint8)
+
+        if self.roi is not None:
+            roi = self._scale(self.roi, width, height)
+            cv2.fillPoly(mask, [roi], 1)
+            x, y, w, h = cv2.boundingRect(roi)
+            x1, y1 = max(x, 0), max(y, 0)
+            x2, y2 = min(x + w, width), min(y + h, height)
+        else:
+            mask[:] = 1
+            x1, y1, x2, y2 = 0, 0, width, height
+
+        for exclusion in self.exclusions:
+            cv2.fillPoly(mask, [self._scale(exclusion, width, height)], 0)
+
+        self._cache_shape = shape
+        self._cache_rect = (x1, y1, max(x2, x1), max(y2, y1))
+        self._cache_mask = mask.astype(bool)
+
+    def crop(self, frame):
+        """
+        Cắt frame theo hình chữ nhật bao quanh ROI
+
+        Args:
+            frame (numpy.ndarray): Khung hình gốc
+
+        Returns:
+            tuple: (vùng crop, (offset_x, offset_y))
+        """
+        self._prepare(frame.shape)
+        x1, y1, x2, y2 = self._cache_rect
+        return frame[y1:y2, x1:x2], (x1, y1)
+
+    def restore(self, boxes, offset, frame_shape):
+        """
+        Dịch box về toạ độ frame gốc và loại bỏ box ngoài vùng hợp lệ
+
+        Args:
+            boxes (numpy.ndarray): Mảng (N, 6) x1, y1, x2, y2, conf, class_id
+                theo toạ độ vùng crop
+            offset (tuple): (offset_x, offset_y) trả về từ crop()
+            frame_shape (tuple): Kích thước frame gốc
+
+        Returns:
+            numpy.ndarray: Các box hợp lệ theo toạ độ frame gốc
+        """
+        self._prepare(frame_shape)
+        boxes = np.array(boxes, dtype=np.float32).reshape(-1, 6)
+        if len(boxes) == 0:
+            return boxes
+
+        boxes[:, [0, 2]] += offset[0]
+        boxes[:, [1, 3]] += offset[1]
+        return boxes[self.contains(boxes, frame_shape)]
+
+    def contains(self, boxes, frame_shape):
+        """
+        Kiểm tra tâm các box có nằm trong vùng hợp lệ không (vector hoá)
+
+        Args:
+            boxes (numpy.ndarray): Mảng (N, >=4) theo toạ độ frame gốc
+            frame_shape (tuple): Kích thước frame gốc
+
+        Returns:
+            numpy.ndarray: Mảng bool (N,)
+        """
+        self._prepare(frame_shape)
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(len(boxes), -1)
+        height, width = self._cache_mask.shape
+        cx = ((boxes[:, 0] + boxes[:, 2]) / 2).astype(np.int64).clip(0, width - 1)
+        cy = ((boxes[:, 1] + boxes[:, 3]) / 2).astype(np.int64).clip(0, height - 1)
+        return self._cache_mask[cy, cx]
@@ -0,0 +1,255 @@
+"""
+Module tổng hợp số liệu theo khoảng thời gian (giây/phút/giờ/ngày) với bộ nhớ cố định
+"""
+
+import numpy as np
+
+from config.settings import ROLLUP_RESOLUTIONS
+
+
+class RollupSeries:
+    """
+    Bộ đệm vòng các bucket thời gian ở một độ phân giải (kiểu round-robin database)
+
+    Bucket thứ b chứa các mẫu có timestamp trong [b * resolution,
+    (b + 1) * resolution) và nằm ở ô b % capacity. Khi thời gian trôi qua,
+    bucket mới ghi đè bucket cũ nhất nên bộ nhớ không tăng theo thời gian.
+    """
+
+    def __init__(self, resolution, capacity):
+        """
+        Khởi tạo chuỗi bucket
+
+        Args:
+            resolution (float): Độ dài mỗi bucket (giây)
+            capacity (int): Số bucket được giữ lại
+        """
+        if resolution <= 0 or capacity <= 0:
+            raise ValueError("resolution và capacity phải lớn hơn 0")
+
+        self.resolution = resolution
+        self.capacity = int(capacity)
+        self.reset()
+
+    def reset(self):
+        """
+        Xoá tất cả bucket
+        """
+        self.bucket_ids = np.full(self.capacity, -1, dtype=np.int64)
+        self.samples = np.zeros(self.capacity, dtype=np.int32)
+        self.minimum = np.zeros(self.capacity, dtype=np.float32)
+        self.maximum = np.zeros(self.capacity, dtype=np.float32)
+        self.total = np.zeros(self.capacity, dtype=np.float64)
+        self.latest = -1
+
+        # Bucket đang mở được cộng dồn bằng số Python, chỉ ghi vào mảng khi
+        # chuyển sang bucket mới (tránh chi phí truy cập phần tử NumPy mỗi frame)
+        self._samples = 0
+        self._minimum = 0.0
+        self._maximum = 0.0
+        self._total = 0.0
+
+    def _flush(self):
+        """
+        Ghi bucket đang mở vào bộ đệm vòng
+        """
+        if self._samples == 0:
+            return
+
+        slot = self.latest % self.capacity
+        self.bucket_ids[slot] = self.latest
+        self.samples[slot] = self._samples
+        self.minimum[slot] = self._minimum
+        self.maximum[slot] = self._maximum
+        self.total[slot] = self._total
+
+    def add(self, value, timestamp):
+        """
+        Thêm một mẫu
+
+        Args:
+            value (float): Giá trị
+            timestamp (float): Thời điểm (giây)
+        """
+        bucket = int(timestamp // self.resolution)
+
+        if bucket == self.latest:
+            self._samples += 1
+            self._total += value
+            if value < self._minimum:
+                self._minimum = value
+            elif value > self._maximum:
+                self._maximum = value
+            return
+
+        if bucket > self.latest:
+            self._flush()
+            self.latest = bucket
+            self._samples = 1
+            self._minimum = self._maximum = self._total = value
+            return
+
+        # Mẫu đến muộn thuộc bucket cũ
+        if bucket <= self.latest - self.capacity:
+            return
+
+        slot = bucket % self.capacity
+        if self.bucket_ids[slot] != bucket:
+            self.bucket_ids[slot] = bucket
+            self.samples[slot] = 0
+            self.minimum[slot] = value
+            self.maximum[slot] = value
+            self.total[slot] = 0.0
+
+        self.samples[slot] += 1
+        self.total[slot] += value
+        self.minimum[slot] = min(self.minimum[slot], value)
+        self.maximum[slot] = max(self.maximum[slot], value)
+
+    def get_series(self, since=None):
+        """
+        Lấy các bucket còn hiệu lực, sắp xếp theo thời gian
+
+        Args:
+            since (float): Chỉ lấy bucket bắt đầu từ thời điểm này (None = tất cả)
+
+        Returns:
+            dict: Mảng "timestamp" (thời điểm bắt đầu bucket), "min", "max",
+                "mean", "samples"
+        """
+        # Chỉ đọc: bucket đang mở được nối vào bản sao, không ghi vào bộ đệm vòng
+        since_bucket = None if since is None else int(since // self.resolution)
+        valid = (self.bucket_ids >= 0) & (self.bucket_ids > self.latest - self.capacity)
+        if since_bucket is not None:
+            valid &= self.bucket_ids >= since_bucket
+
+        slots = np.flatnonzero(valid)
+        slots = slots[np.argsort(self.bucket_ids[slots])]
+        bucket_ids = self.bucket_ids[slots]
+        samples = self.samples[slots]
+        minimum = self.minimum[slots]
+        maximum = self.maximum[slots]
+        total = self.total[slots]
+
+        if self._samples and (since_bucket is None or self.latest >= since_bucket):
+            bucket_ids = np.append(bucket_ids, self.latest)
+            samples = np.append(samples, np.int32(self._samples))
+            minimum = np.append(minimum, np.float32(self._minimum))
+            maximum = np.append(maximum, np.float32(self._maximum))
+            total = np.append(total, self._total)
+
+        return {
+            "timestamp": bucket_ids * self.resolution,
+            "min": minimum,
+            "max": maximum,
+            "mean": total / samples,
+            "samples": samples,
+        }
+
+    @property
+    def nbytes(self):
+        """Dung lượng bộ nhớ của các bucket (byte)"""
+        return (
+            self.bucket_ids.nbytes
+            + self.samples.nbytes
+            + self.minimum.nbytes
+            + self.maximum.nbytes
+            + self.total.nbytes
+        )
+
+
+class TimeRollup:
+    """
+    Lớp tổng hợp một chuỗi số liệu ở nhiều độ phân giải cùng lúc
+
+    Mỗi mẫu được cộng trực tiếp vào bucket của tất cả độ phân giải nên
+    thống kê ở độ phân giải thô vẫn chính xác (không tính lại từ bucket mịn).
+    """
+
+    def __init__(self, resolutions=ROLLUP_RESOLUTIONS):
+        """
+        Khởi tạo rollup
+
+        Args:
+            resolutions (list): Danh sách (độ dài bucket giây, số bucket)
+        """
+        self.series = {
+            resolution: RollupSeries(resolution, capacity)
+            for resolution, capacity in resolutions
+        }
+
+    def add(self, value, timestamp):
+        """
+        Thêm một mẫu vào tất cả độ phân giải
+
+        Args:
+            value (float): Giá trị
+            timestamp (float): Thời điểm (giây)
+        """
+        for series in self.series.values():
+            series.add(value, timestamp)
+
+    def get_series(self, resolution, since=None):
+        """
+        Lấy các bucket của một độ phân giải
+
+        Args:
+            resolution (float): Độ dài bucket (giây), phải có trong cấu hình
+            since (float): Chỉ lấy bucket từ thời điểm này (None = tất cả)
+
+        Returns:
+            dict: Xem RollupSeries.get_series()
+        """
+        if resolution not in self.series:
+            raise ValueError(f"Không có độ phân giải {resolution}s")
+        return self.series[resolution].get_series(since)
+
+    def get_latest(self, resolution):
+        """
+        Lấy bucket mới nhất của một độ phân giải
+
+        Args:
+            resolution (float): Độ dài bucket (giây)
+
+        Returns:
+            dict: {"timestamp", "min", "max", "mean", "samples"} hoặc None
+        """
+        series = self.get_series(resolution)
+        if len(series["timestamp"]) == 0:
+            return None
+        return {key: values[-1].item() for key, values in series.items()}
+
+    def to_records(self):
+        """
+        Chuyển tất cả bucket thành danh sách record (dùng để xuất file)
+
+        Returns:
+            list: Mỗi record gồm resolution, timestamp, min, max, mean, samples
+        """
+        records = []
+        for resolution in self.series:
+            series = self.get_series(resolution)
+            for i in range(len(series["timestamp"])):
+                records.append(
+                    {
+                        "resolution": resolution,
+                        "timestamp": series["timestamp"][i].item(),
+                        "min": series["min"][i].item(),
+                        "max": series["max"][i].item(),
+                        "mean": round(series["mean"][i].item(), 3),
+                        "samples": series["samples"][i].item(),
+                    }
+                )
+        return records
+
+    def reset(self):
+        """
+        Xoá tất cả bucket
+        """
+        for series in self.series.values():
+            series.reset()
+
+    @property
+    def nbytes(self):
+        """Tổng dung lượng bộ nhớ của các bucket (byte)"""
+        return sum(series.nbytes for series in self.series.values())
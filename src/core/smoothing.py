@@ -0,0 +1,222 @@
+"""
+Module làm mượt số lượng người theo thời gian (median/EMA/mode + hysteresis)
+"""
+
+import math
+from bisect import bisect_left, insort
+from collections import deque
+
+from config.settings import (
+    COUNT_HOLD_FRAMES,
+    COUNT_HYSTERESIS,
+    COUNT_SMOOTHING,
+    COUNT_SMOOTHING_ALPHA,
+    COUNT_SMOOTHING_WINDOW,
+)
+
+SMOOTHING_METHODS = ("median", "ema", "mode")
+
+
+class CountSmoother:
+    """
+    Lớp tính "số người báo cáo" ổn định từ số người thô của từng frame
+
+    Giá trị làm mượt được cập nhật tăng dần mỗi frame:
+    - median: danh sách đã sắp xếp của cửa sổ, chèn/xoá bằng tìm kiếm nhị phân
+    - ema: trung bình trượt hàm mũ, O(1)
+    - mode: bảng tần suất và nhóm giá trị theo tần suất, O(1)
+
+    Hysteresis tránh số báo cáo dao động:
+    - ema: số báo cáo chỉ thay đổi khi giá trị làm mượt lệch khỏi số báo cáo
+      hiện tại nhiều hơn ngưỡng (tránh dao động quanh x.5)
+    - median/mode: giá trị là số nguyên nên ngưỡng được làm tròn lên thành
+      biên độ nguyên ceil(hysteresis); thay đổi trong biên độ (vd: ±1 với
+      ngưỡng 0.6) chỉ được báo cáo khi giữ nguyên hướng trong hold_frames
+      frame liên tiếp, thay đổi lớn hơn được báo cáo ngay
+    """
+
+    def __init__(
+        self,
+        method=COUNT_SMOOTHING,
+        window=COUNT_SMOOTHING_WINDOW,
+        alpha=COUNT_SMOOTHING_ALPHA,
+        hysteresis=COUNT_HYSTERESIS,
+        hold_frames=COUNT_HOLD_FRAMES,
+    ):
+        """
+        Khởi tạo bộ làm mượt
+
+        Args:
+            method (str): "median", "ema" hoặc "mode"
+            window (int): Số frame của cửa sổ (median/mode)
+            alpha (float): Hệ số EMA (0-1], càng lớn càng bám sát số thô
+            hysteresis (float): Độ lệch tối thiểu (số người) để đổi số báo cáo;
+                với median/mode là biên độ nguyên ceil(hysteresis) cần hold_frames
+            hold_frames (int): Median/mode: số frame liên tiếp một thay đổi trong
+                biên độ phải giữ trước khi được báo cáo
+        """
+        if method not in SMOOTHING_METHODS:
+            raise ValueError(f"Phương pháp làm mượt không hợp lệ: {method}")
+        if window < 1:
+            raise ValueError("window phải lớn hơn 0")
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha phải nằm trong khoảng (0, 1]")
+        if hysteresis < 0 or hold_frames < 1:
+            raise ValueError("hysteresis phải >= 0 và hold_frames phải lớn hơn 0")
+
+        self.method = method
+        self.window = int(window)
+        self.alpha = alpha
+        self.hysteresis = hysteresis
+        self.margin = math.ceil(hysteresis)
+        self.hold_frames = int(hold_frames)
+        self.reset()
+
+    def reset(self):
+        """
+        Xoá trạng thái làm mượt
+        """
+        self.smoothed = 0.0
+        self.reported = 0
+        self._started = False
+        self._held = 0
+        self._held_direction = 0
+
+        self._values = deque()
+        self._sorted = []
+        self._frequency = {}
+        self._buckets = {}
+        self._max_frequency = 0
+
+    def _push_window(self, count):
+        """
+        Thêm giá trị vào cửa sổ và trả về giá trị bị đẩy ra (hoặc None)
+
+        Args:
+            count (int): Số người thô
+
+        Returns:
+            int: Giá trị cũ nhất bị loại khỏi cửa sổ, None nếu cửa sổ chưa đầy
+        """
+        self._values.append(count)
+        if len(self._values) > self.window:
+            return self._values.popleft()
+        return None
+
+    def _update_median(self, count):
+        """Cập nhật median của cửa sổ trượt"""
+        insort(self._sorted, count)
+        removed = self._push_window(count)
+        if removed is not None:
+            del self._sorted[bisect_left(self._sorted, removed)]
+
+        size = len(self._sorted)
+        middle = size // 2
+        if size % 2:
+            return float(self._sorted[middle])
+        return (self._sorted[middle - 1] + self._sorted[middle]) / 2
+
+    def _update_ema(self, count):
+        """Cập nhật trung bình trượt hàm mũ"""
+        if not self._started:
+            return float(count)
+        return self.alpha * count + (1 - self.alpha) * self.smoothed
+
+    def _change_frequency(self, value, delta):
+        """
+        Tăng/giảm tần suất của một giá trị và cập nhật nhóm theo tần suất
+
+        Args:
+            value (int): Giá trị
+            delta (int): +1 hoặc -1
+        """
+        old = self._frequency.get(value, 0)
+        new = old + delta
+
+        if old:
+            bucket = self._buckets[old]
+            bucket.discard(value)
+            if not bucket:
+                del self._buckets[old]
+        if new:
+            self._frequency[value] = new
+            self._buckets.setdefault(new, set()).add(value)
+        else:
+            del self._frequency[value]
+
+        if new > self._max_frequency:
+            self._max_frequency = new
+        elif old == self._max_frequency and old not in self._buckets:
+            # Giá trị vừa giảm là giá trị duy nhất có tần suất lớn nhất
+            self._max_frequency = new
+
+    def _update_mode(self, count):
+        """Cập nhật giá trị xuất hiện nhiều nhất trong cửa sổ"""
+        self._change_frequency(count, 1)
+        removed = self._push_window(count)
+        if removed is not None:
+            self._change_frequency(removed, -1)
+
+        candidates = self._buckets[self._max_frequency]
+        # Nhiều giá trị cùng tần suất → ưu tiên số mới nhất để phản ứng nhanh
+        if count in candidates:
+            return float(count)
+        return float(max(candidates))
+
+    def update(self, count):
+        """
+        Cập nhật với số người thô của frame mới
+
+        Args:
+            count (int): Số người thô
+
+        Returns:
+            int: Số người báo cáo sau làm mượt và hysteresis
+        """
+        if self.method == "median":
+            self.smoothed = self._update_median(count)
+        elif self.method == "ema":
+            self.smoothed = self._update_ema(count)
+        else:
+            self.smoothed = self._update_mode(count)
+
+        target = int(round(self.smoothed))
+        if not self._started:
+            self._started = True
+            self.reported = target
+        elif self.method == "ema":
+            if abs(self.smoothed - self.reported) > self.hysteresis:
+                self.reported = target
+        else:
+            self._hold(target)
+
+        return self.reported
+
+    def _hold(self, target):
+        """
+        Hysteresis cho median/mode: thay đổi nhỏ phải giữ hold_frames frame
+
+        Args:
+            target (int): Số người làm mượt của frame hiện tại
+        """
+        step = target - self.reported
+        if step == 0:
+            self._held = 0
+            self._held_direction = 0
+            return
+        if abs(step) > self.margin:
+            self.reported = target
+            self._held = 0
+            self._held_direction = 0
+            return
+
+        direction = 1 if step > 0 else -1
+        if direction == self._held_direction:
+            self._held += 1
+        else:
+            self._held = 1
+            self._held_direction = direction
+        if self._held >= self.hold_frames:
+            self.reported = target
+            self._held = 0
+            self._held_direction = 0
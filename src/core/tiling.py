@@ -0,0 +1,117 @@
+"""
+Module chia frame thành các tile chồng lấn và gộp kết quả (kiểu SAHI)
+"""
+
+import numpy as np
+
+
+def compute_tiles(height, width, tile_size, overlap):
+    """
+    Tính toạ độ các tile chồng lấn phủ toàn bộ frame
+
+    Args:
+        height (int): Chiều cao frame
+        width (int): Chiều rộng frame
+        tile_size (int): Kích thước cạnh tile (pixels)
+        overlap (float): Tỉ lệ chồng lấn giữa hai tile liền kề (0 - <1)
+
+    Returns:
+        numpy.ndarray: Mảng (T, 4) int gồm x1, y1, x2, y2 của từng tile
+    """
+    if tile_size <= 0:
+        raise ValueError("tile_size phải lớn hơn 0")
+    if not 0 <= overlap < 1:
+        raise ValueError("overlap phải nằm trong khoảng [0, 1)")
+
+    stride = max(1, int(round(tile_size * (1 - overlap))))
+
+    def _starts(length):
+        if length <= tile_size:
+            return [0]
+        starts = list(range(0, length - tile_size, stride))
+        # Tile cuối luôn sát mép để không bỏ sót vùng nào
+        starts.append(length - tile_size)
+        return starts
+
+    tiles = [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in _starts(height)
+        for x in _starts(width)
+    ]
+    return np.array(tiles, dtype=np.int64).reshape(-1, 4)
+
+
+def pairwise_overlap(boxes, metric="iou", other=None):
+    """
+    Tính ma trận độ chồng lấn giữa các cặp box (vector hoá)
+
+    Args:
+        boxes (numpy.ndarray): Mảng (N, >=4) x1, y1, x2, y2
+        metric (str): "iou" (giao/hợp) hoặc "ios" (giao/box nhỏ hơn)
+        other (numpy.ndarray): Mảng (M, >=4) để so sánh (None = so với chính boxes)
+
+    Returns:
+        numpy.ndarray: Ma trận (N, M) float32
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(len(boxes), -1)
+    other = boxes if other is None else np.asarray(other, dtype=np.float32)
+    other = other.reshape(len(other), -1)
+
+    ax1, ay1, ax2, ay2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    bx1, by1, bx2, by2 = other[:, 0], other[:, 1], other[:, 2], other[:, 3]
+    areas_a = np.clip(ax2 - ax1, 0, None) * np.clip(ay2 - ay1, 0, None)
+    areas_b = np.clip(bx2 - bx1, 0, None) * np.clip(by2 - by1, 0, None)
+
+    inter_w = np.clip(
+        np.minimum(ax2[:, None], bx2[None, :]) - np.maximum(ax1[:, None], bx1[None, :]),
+        0,
+        None,
+    )
+    inter_h = np.clip(
+        np.minimum(ay2[:, None], by2[None, :]) - np.maximum(ay1[:, None], by1[None, :]),
+        0,
+        None,
+    )
+    inter = inter_w * inter_h
+
+    if metric == "ios":
+        denom = np.minimum(areas_a[:, None], areas_b[None, :])
+    elif metric == "iou":
+        denom = areas_a[:, None] + areas_b[None, :] - inter
+    else:
+        raise ValueError(f"metric không hợp lệ: {metric}")
+
+    return np.divide(inter, denom, out=np.zeros_like(inter), where=denom > 0)
+
+
+def non_max_suppression(boxes, iou_threshold, metric="iou"):
+    """
+    Non-maximum suppression trên mảng detection
+
+    Ma trận chồng lấn được tính một lần cho tất cả box; vòng lặp chỉ đi qua
+    các box còn giữ lại và loại bỏ cả hàng box chồng lấn bằng phép toán mảng.
+
+    Args:
+        boxes (numpy.ndarray): Mảng (N, 6) x1, y1, x2, y2, confidence, class_id
+        iou_threshold (float): Ngưỡng chồng lấn để loại box
+        metric (str): "iou" hoặc "ios"
+
+    Returns:
+        numpy.ndarray: Các box được giữ lại, sắp xếp theo confidence giảm dần
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 6)
+    if len(boxes) <= 1:
+        return boxes
+
+    boxes = boxes[np.argsort(-boxes[:, 4], kind="stable")]
+    overlap = pairwise_overlap(boxes, metric)
+    # Chỉ so sánh các box cùng class
+    overlap[boxes[:, 5][:, None] != boxes[:, 5][None, :]] = 0
+
+    suppressed = np.zeros(len(boxes), dtype=bool)
+    for i in range(len(boxes)):
+        if suppressed[i]:
+            continue
+        suppressed[i + 1 :] |= overlap[i, i + 1 :] > iou_threshold
+
+    return boxes[~suppressed]
@@ -0,0 +1,367 @@
+"""
+Module theo dõi người qua các frame (kiểu SORT/ByteTrack) để gán ID ổn định
+"""
+
+import time
+
+import numpy as np
+
+from config.settings import (
+    TRACK_HIGH_CONFIDENCE,
+    TRACK_IOU_THRESHOLD,
+    TRACK_MATCHING,
+    TRACK_MAX_AGE,
+    TRACK_MIN_HITS,
+)
+
+from .tiling import pairwise_overlap
+
+# Mô hình vận tốc không đổi trên trạng thái [cx, cy, s, r, vcx, vcy, vs]
+# (s = diện tích box, r = tỉ lệ w/h được coi là không đổi)
+_F = np.eye(7)
+_F[0, 4] = _F[1, 5] = _F[2, 6] = 1.0
+_H = np.eye(4, 7)
+_Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001])
+_R = np.diag([1.0, 1.0, 10.0, 10.0])
+_P0 = np.diag([10.0, 10.0, 10.0, 10.0, 10000.0, 10000.0, 10000.0])
+
+
+def boxes_to_measurements(boxes):
+    """
+    Đổi box x1, y1, x2, y2 sang vector đo [cx, cy, s, r]
+
+    Args:
+        boxes (numpy.ndarray): Mảng (N, >=4)
+
+    Returns:
+        numpy.ndarray: Mảng (N, 4) float64
+    """
+    boxes = np.asarray(boxes, dtype=np.float64)
+    w = np.maximum(boxes[:, 2] - boxes[:, 0], 1e-6)
+    h = np.maximum(boxes[:, 3] - boxes[:, 1], 1e-6)
+    return np.stack(
+        [boxes[:, 0] + w / 2, boxes[:, 1] + h / 2, w * h, w / h], axis=1
+    ).reshape(-1, 4)
+
+
+def states_to_boxes(states):
+    """
+    Đổi trạng thái Kalman [cx, cy, s, r, ...] về box x1, y1, x2, y2
+
+    Args:
+        states (numpy.ndarray): Mảng (N, >=4)
+
+    Returns:
+        numpy.ndarray: Mảng (N, 4) float32
+    """
+    states = np.asarray(states, dtype=np.float64)
+    w = np.sqrt(np.clip(states[:, 2] * states[:, 3], 0, None))
+    h = np.divide(states[:, 2], w, out=np.zeros_like(w), where=w > 0)
+    cx, cy = states[:, 0], states[:, 1]
+    return np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1).astype(
+        np.float32
+    )
+
+
+def linear_assignment(score, threshold, method="hungarian"):
+    """
+    Ghép cặp hàng/cột của ma trận điểm (IoU) sao cho tổng điểm lớn nhất
+
+    Args:
+        score (numpy.ndarray): Ma trận (N, M) điểm tương đồng
+        threshold (float): Điểm tối thiểu để một cặp được chấp nhận
+        method (str): "hungarian" (cần scipy) hoặc "greedy"
+
+    Returns:
+        numpy.ndarray: Mảng (K, 2) chỉ số (hàng, cột) đã ghép
+    """
+    if score.size == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    if method == "hungarian":
+        try:
+            from scipy.optimize import linear_sum_assignment
+        except ImportError:
+            # Không có scipy → dùng ghép tham lam
+            method = "greedy"
+        else:
+            rows, cols = linear_sum_assignment(-score)
+            keep = score[rows, cols] >= threshold
+            return np.stack([rows[keep], cols[keep]], axis=1).astype(np.int64)
+
+    if method != "greedy":
+        raise ValueError(f"Phương pháp ghép không hợp lệ: {method}")
+
+    # Duyệt các cặp theo điểm giảm dần, bỏ qua hàng/cột đã được ghép
+    rows, cols = np.nonzero(score >= threshold)
+    order = np.argsort(-score[rows, cols], kind="stable")
+    used_rows = np.zeros(score.shape[0], dtype=bool)
+    used_cols = np.zeros(score.shape[1], dtype=bool)
+    matches = []
+    for row, col in zip(rows[order], cols[order]):
+        if used_rows[row] or used_cols[col]:
+            continue
+        used_rows[row] = used_cols[col] = True
+        matches.append((row, col))
+    return np.array(matches, dtype=np.int64).reshape(-1, 2)
+
+
+class PersonTracker:
+    """
+    Lớp theo dõi nhiều người với ID cố định qua các frame
+
+    Trạng thái của tất cả track được lưu trong mảng NumPy nên bước dự đoán
+    và cập nhật Kalman chạy một lần cho cả tập track. Việc ghép cặp chạy hai
+    lượt như ByteTrack: detection có confidence cao được ghép trước, các
+    track còn lại được ghép tiếp với detection confidence thấp. Track chỉ
+    được tính là một người (được gán ID) sau min_hits lần ghép.
+    """
+
+    def __init__(
+        self,
+        max_age=TRACK_MAX_AGE,
+        min_hits=TRACK_MIN_HITS,
+        iou_threshold=TRACK_IOU_THRESHOLD,
+        high_confidence=TRACK_HIGH_CONFIDENCE,
+        matching=TRACK_MATCHING,
+    ):
+        """
+        Khởi tạo tracker
+
+        Args:
+            max_age (int): Số frame tối đa một track được giữ khi không ghép được
+            min_hits (int): Số lần ghép tối thiểu để xác nhận track
+            iou_threshold (float): IoU tối thiểu giữa box dự đoán và detection
+            high_confidence (float): Ngưỡng tách detection cao/thấp (ByteTrack)
+            matching (str): "hungarian" hoặc "greedy"
+        """
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.iou_threshold = iou_threshold
+        self.high_confidence = high_confidence
+        self.matching = matching
+        self.reset()
+
+    def reset(self):
+        """
+        Xoá tất cả track và thống kê
+        """
+        self._x = np.empty((0, 7))
+        self._P = np.empty((0, 7, 7))
+        self._ids = np.empty(0, dtype=np.int64)
+        self._hits = np.empty(0, dtype=np.int64)
+        self._misses = np.empty(0, dtype=np.int64)
+        self._first_seen = np.empty(0)
+        self._last_seen = np.empty(0)
+
+        self._next_id = 1
+        self.frame_count = 0
+        self.unique_count = 0
+
+        # Thống kê dwell time của track đã kết thúc (không lưu từng track)
+        self._closed_count = 0
+        self._closed_dwell_total = 0.0
+        self._closed_dwell_max = 0.0
+
+    def _predict(self):
+        """
+        Dự đoán vị trí tất cả track ở frame hiện tại
+        """
+        # Không để diện tích âm
+        shrinking = self._x[:, 2] + self._x[:, 6] <= 0
+        self._x[shrinking, 6] = 0.0
+
+        self._x = self._x @ _F.T
+        self._P = _F @ self._P @ _F.T + _Q
+
+    def _correct(self, indices, boxes):
+        """
+        Cập nhật Kalman cho các track đã ghép với detection
+
+        Args:
+            indices (numpy.ndarray): Chỉ số track
+            boxes (numpy.ndarray): Các box detection tương ứng
+        """
+        x = self._x[indices]
+        P = self._P[indices]
+        z = boxes_to_measurements(boxes)
+
+        y = z - x @ _H.T
+        S = _H @ P @ _H.T + _R
+        K = P @ _H.T @ np.linalg.inv(S)
+
+        self._x[indices] = x + (K @ y[:, :, None])[:, :, 0]
+        self._P[indices] = (np.eye(7) - K @ _H) @ P
+
+    def _add_tracks(self, boxes, now):
+        """
+        Tạo track mới từ các detection chưa được ghép
+
+        Args:
+            boxes (numpy.ndarray): Các box detection
+            now (float): Thời điểm hiện tại
+        """
+        count = len(boxes)
+        x = np.zeros((count, 7))
+        x[:, :4] = boxes_to_measurements(boxes)
+
+        self._x = np.concatenate([self._x, x])
+        self._P = np.concatenate([self._P, np.repeat(_P0[None], count, axis=0)])
+        self._ids = np.concatenate([self._ids, np.zeros(count, dtype=np.int64)])
+        self._hits = np.concatenate([self._hits, np.ones(count, dtype=np.int64)])
+        self._misses = np.concatenate([self._misses, np.zeros(count, dtype=np.int64)])
+        self._first_seen = np.concatenate([self._first_seen, np.full(count, now)])
+        self._last_seen = np.concatenate([self._last_seen, np.full(count, now)])
+
+    def _remove_stale(self):
+        """
+        Xoá track đã mất quá max_age frame và cộng dồn dwell time của chúng
+        """
+        stale = self._misses > self.max_age
+        if not stale.any():
+            return
+
+        closed = stale & (self._ids > 0)
+        dwell = self._last_seen[closed] - self._first_seen[closed]
+        if len(dwell):
+            self._closed_count += len(dwell)
+            self._closed_dwell_total += float(dwell.sum())
+            self._closed_dwell_max = max(self._closed_dwell_max, float(dwell.max()))
+
+        keep = ~stale
+        self._x = self._x[keep]
+        self._P = self._P[keep]
+        self._ids = self._ids[keep]
+        self._hits = self._hits[keep]
+        self._misses = self._misses[keep]
+        self._first_seen = self._first_seen[keep]
+        self._last_seen = self._last_seen[keep]
+
+    def _match(self, tracks, detections, predicted, boxes, track_for_detection):
+        """
+        Ghép một tập track với một tập detection theo IoU
+
+        Args:
+            tracks (numpy.ndarray): Chỉ số track chưa được ghép
+            detections (numpy.ndarray): Chỉ số detection cần ghép
+            predicted (numpy.ndarray): Box dự đoán của tất cả track
+            boxes (numpy.ndarray): Tất cả detection của frame
+            track_for_detection (numpy.ndarray): Kết quả ghép, cập nhật tại chỗ
+
+        Returns:
+            tuple: (track chưa được ghép, detection chưa được ghép)
+        """
+        if len(tracks) == 0 or len(detections) == 0:
+            return tracks, detections
+
+        score = pairwise_overlap(predicted[tracks], "iou", boxes[detections, :4])
+        matches = linear_assignment(score, self.iou_threshold, self.matching)
+        track_for_detection[detections[matches[:, 1]]] = tracks[matches[:, 0]]
+        return np.delete(tracks, matches[:, 0]), np.delete(detections, matches[:, 1])
+
+    def update(self, boxes, timestamp=None):
+        """
+        Cập nhật tracker với detection của frame hiện tại
+
+        Args:
+            boxes (numpy.ndarray): Mảng (N, 6) x1, y1, x2, y2, confidence, class_id
+            timestamp (float): Thời điểm monotonic của frame (None = perf_counter)
+
+        Returns:
+            numpy.ndarray: Mảng (N,) ID track của từng detection
+                (-1 nếu detection chưa thuộc track đã xác nhận)
+        """
+        now = time.perf_counter() if timestamp is None else timestamp
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 6)
+        self.frame_count += 1
+
+        track_for_detection = np.full(len(boxes), -1, dtype=np.int64)
+        unmatched_tracks = np.arange(len(self._x))
+
+        if len(self._x):
+            self._predict()
+        predicted = states_to_boxes(self._x)
+
+        # Lượt 1: detection confidence cao, lượt 2: detection confidence thấp
+        high = np.flatnonzero(boxes[:, 4] >= self.high_confidence)
+        low = np.flatnonzero(boxes[:, 4] < self.high_confidence)
+        unmatched_tracks, unmatched_high = self._match(
+            unmatched_tracks, high, predicted, boxes, track_for_detection
+        )
+        unmatched_tracks, _ = self._match(
+            unmatched_tracks, low, predicted, boxes, track_for_detection
+        )
+
+        matched = np.flatnonzero(track_for_detection >= 0)
+        tracks = track_for_detection[matched]
+        if len(matched):
+            self._correct(tracks, boxes[matched, :4])
+            self._hits[tracks] += 1
+            self._misses[tracks] = 0
+            self._last_seen[tracks] = now
+        self._misses[unmatched_tracks] += 1
+
+        # Detection confidence cao chưa ghép được → track mới
+        if len(unmatched_high):
+            track_for_detection[unmatched_high] = np.arange(
+                len(self._x), len(self._x) + len(unmatched_high)
+            )
+            self._add_tracks(boxes[unmatched_high, :4], now)
+
+        # Xác nhận track đủ số lần ghép và cấp ID mới
+        confirm = np.flatnonzero((self._ids == 0) & (self._hits >= self.min_hits))
+        if len(confirm):
+            self._ids[confirm] = np.arange(self._next_id, self._next_id + len(confirm))
+            self._next_id += len(confirm)
+            self.unique_count += len(confirm)
+
+        assigned = np.flatnonzero(track_for_detection >= 0)
+        ids = np.full(len(boxes), -1, dtype=np.int64)
+        ids[assigned] = self._ids[track_for_detection[assigned]]
+        ids[ids == 0] = -1
+
+        self._remove_stale()
+
+        return ids
+
+    def get_tracks(self):
+        """
+        Lấy các track đã xác nhận và được ghép ở frame gần nhất
+
+        Returns:
+            numpy.ndarray: Mảng (M, 5) x1, y1, x2, y2 (vị trí Kalman), track_id
+        """
+        active = (self._ids > 0) & (self._misses == 0)
+        boxes = states_to_boxes(self._x[active])
+        return np.concatenate([boxes, self._ids[active, None].astype(np.float32)], 1)
+
+    def get_dwell_times(self):
+        """
+        Lấy thời gian xuất hiện của các track đang theo dõi
+
+        Returns:
+            dict: {track_id: số giây từ lần đầu tới lần cuối thấy}
+        """
+        confirmed = self._ids > 0
+        dwell = self._last_seen[confirmed] - self._first_seen[confirmed]
+        return dict(zip(self._ids[confirmed].tolist(), dwell.tolist()))
+
+    def get_stats(self):
+        """
+        Lấy thống kê của tracker
+
+        Returns:
+            dict: Số người đang theo dõi, tổng số người duy nhất, dwell time
+        """
+        confirmed = self._ids > 0
+        dwell = self._last_seen[confirmed] - self._first_seen[confirmed]
+        total = self._closed_count + len(dwell)
+        dwell_sum = self._closed_dwell_total + float(dwell.sum())
+        dwell_max = max([self._closed_dwell_max, *dwell.tolist()])
+
+        return {
+            "tracked_count": int(np.count_nonzero(confirmed & (self._misses == 0))),
+            "unique_count": self.unique_count,
+            "average_dwell_time": dwell_sum / total if total else 0.0,
+            "max_dwell_time": dwell_max,
+        }
@@ -0,0 +1,325 @@
+"""
+Module xử lý video offline: chia video thành các đoạn thời gian và đếm người
+song song trên nhiều process
+"""
+
+import math
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from config.settings import (
+    OFFLINE_BATCH_SIZE,
+    OFFLINE_CHUNK_SECONDS,
+    OFFLINE_FRAME_STEP,
+    OFFLINE_WORKERS,
+)
+
+from .person_detector import PersonDetector
+from .synthetic_source import is_synthetic_source, open_video_source
+
+# Detector của worker process (tạo một lần trong initializer)
+_worker_detector = None
+
+
+def split_ranges(frame_count, fps, chunk_seconds):
+    """
+    Chia video thành các đoạn liền nhau, ranh giới trùng với đầu mỗi giây
+
+    Args:
+        frame_count (int): Tổng số frame
+        fps (float): FPS của video
+        chunk_seconds (float): Độ dài mỗi đoạn (giây)
+
+    Returns:
+        list: [(frame bắt đầu, frame kết thúc (không gồm)), ...]
+    """
+    if frame_count <= 0 or fps <= 0:
+        return []
+
+    duration = frame_count / fps
+    step = max(1, int(chunk_seconds))
+    # Frame đầu tiên của giây s là ceil(s * fps) nên int(frame / fps) == s
+    boundaries = [math.ceil(s * fps) for s in range(0, math.ceil(duration), step)]
+    boundaries.append(frame_count)
+    return [
+        (start, end)
+        for start, end in zip(boundaries[:-1], boundaries[1:])
+        if end > start
+    ]
+
+
+def _init_worker(detector_factory):
+    """Tạo detector cho worker process"""
+    global _worker_detector
+    _worker_detector = detector_factory()
+
+
+def _process_range(task):
+    """
+    Đếm người trong một đoạn video (chạy trong worker process)
+
+    Args:
+        task (tuple): (đường dẫn, frame bắt đầu, frame kết thúc, fps,
+            batch_size, frame_step)
+
+    Returns:
+        list: Số liệu theo từng giây, xem process_range()
+    """
+    return process_range(_worker_detector, *task)
+
+
+def process_range(detector, path, start, end, fps, batch_size, frame_step):
+    """
+    Đọc các frame [start, end) của video, detect theo batch và tổng hợp theo giây
+
+    Args:
+        detector: Detector có detect_array_batch()
+        path (str): Đường dẫn video
+        start (int): Frame bắt đầu
+        end (int): Frame kết thúc (không gồm)
+        fps (float): FPS của video
+        batch_size (int): Số frame mỗi lần gọi model
+        frame_step (int): Chỉ detect frame có chỉ số chia hết cho frame_step
+
+    Returns:
+        list: Mỗi giây một dict {"second", "frames", "min", "max", "mean",
+            "detections", "with_persons"}, sắp xếp theo thời gian
+    """
+    cap = open_video_source(path)
+    if not cap.isOpened():
+        raise IOError(f"Không thể mở video: {path}")
+    if start > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+    indices = []
+    counts = []
+    batch = []
+    batch_indices = []
+
+    def flush():
+        for boxes in detector.detect_array_batch(batch):
+            counts.append(len(boxes))
+        indices.extend(batch_indices)
+        batch.clear()
+        batch_indices.clear()
+
+    try:
+        for index in range(start, end):
+            if index % frame_step:
+                # Bỏ qua frame: chỉ grab (không giải mã thành ảnh)
+                if not cap.grab():
+                    break
+                continue
+
+            ret, frame = cap.read()
+            if not ret:
+                break
+            batch.append(frame)
+            batch_indices.append(index)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        cap.release()
+
+    if not indices:
+        return []
+
+    # Tổng hợp theo giây bằng NumPy
+    seconds = (np.asarray(indices) / fps).astype(np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+    unique, starts = np.unique(seconds, return_index=True)
+    frames = np.diff(np.append(starts, len(seconds)))
+    totals = np.add.reduceat(counts, starts)
+    return [
+        {
+            "second": int(second),
+            "frames": int(n),
+            "min": int(low),
+            "max": int(high),
+            "mean": float(total / n),
+            "detections": int(total),
+            "with_persons": int(occupied),
+        }
+        for second, n, low, high, total, occupied in zip(
+            unique,
+            frames,
+            np.minimum.reduceat(counts, starts),
+            np.maximum.reduceat(counts, starts),
+            totals,
+            np.add.reduceat(counts > 0, starts),
+        )
+    ]
+
+
+class VideoBatchProcessor:
+    """
+    Lớp đếm người trong file video nhanh hơn thời gian thực
+
+    Video được chia thành các đoạn theo thời gian (ranh giới ở đầu giây), mỗi
+    đoạn được một worker process tự giải mã (seek tới frame đầu) và detect
+    theo batch. Kết quả theo giây được gộp đúng thứ tự vào DataLogger.
+    """
+
+    def __init__(
+        self,
+        workers=OFFLINE_WORKERS,
+        chunk_seconds=OFFLINE_CHUNK_SECONDS,
+        batch_size=OFFLINE_BATCH_SIZE,
+        frame_step=OFFLINE_FRAME_STEP,
+        detector_factory=PersonDetector,
+    ):
+        """
+        Khởi tạo processor
+
+        Args:
+            workers (int): Số worker process (None = số CPU, 0 = chạy trong
+                process hiện tại)
+            chunk_seconds (float): Độ dài mỗi đoạn giao cho một worker (giây)
+            batch_size (int): Số frame mỗi lần gọi model
+            frame_step (int): Chỉ detect 1 trong N frame
+            detector_factory (callable): Hàm tạo detector trong mỗi worker,
+                phải pickle được (class hoặc hàm ở cấp module)
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = int(workers)
+        self.chunk_seconds = chunk_seconds
+        self.batch_size = max(1, int(batch_size))
+        self.frame_step = max(1, int(frame_step))
+        self.detector_factory = detector_factory
+
+    def process(self, path, data_logger=None, start_time=None, progress=None):
+        """
+        Đếm người trong toàn bộ video
+
+        Args:
+            path (str): Đường dẫn video hoặc synthetic://...?frames=N
+            data_logger (DataLogger): Nơi ghi số liệu theo giây (None = không ghi)
+            start_time (float): Unix timestamp của frame đầu tiên (None = thời
+                điểm sửa file trừ độ dài video)
+            progress (callable): Gọi progress(đoạn đã xong, tổng số đoạn)
+
+        Returns:
+            dict: {"seconds": số liệu theo giây, "summary": tổng kết}
+        """
+        cap = open_video_source(path)
+        if not cap.isOpened():
+            raise IOError(f"Không thể mở video: {path}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        if fps <= 0 or frame_count <= 0:
+            raise ValueError(f"Không đọc được FPS/số frame của video: {path}")
+
+        duration = frame_count / fps
+        if start_time is None:
+            if is_synthetic_source(path):
+                start_time = time.time() - duration
+            else:
+                start_time = os.path.getmtime(path) - duration
+
+        ranges = split_ranges(frame_count, fps, self.chunk_seconds)
+        tasks = [
+            (path, start, end, fps, self.batch_size, self.frame_step)
+            for start, end in ranges
+        ]
+
+        began = time.perf_counter()
+        seconds = []
+        for done, chunk in enumerate(self._run(tasks), 1):
+            seconds.extend(chunk)
+            if progress is not None:
+                progress(done, len(tasks))
+        elapsed = time.perf_counter() - began
+
+        if data_logger is not None:
+            self._log(data_logger, seconds, start_time, fps)
+
+        frames = sum(s["frames"] for s in seconds)
+        return {
+            "seconds": seconds,
+            "summary": {
+                "path": path,
+                "fps": fps,
+                "frame_count": frame_count,
+                "duration": duration,
+                "frames_processed": frames,
+                "chunks": len(tasks),
+                "workers": self.workers,
+                "elapsed": elapsed,
+                "speedup": duration / elapsed if elapsed > 0 else 0.0,
+                "max_count": max((s["max"] for s in seconds), default=0),
+            },
+        }
+
+    def _run(self, tasks):
+        """
+        Chạy các đoạn và trả về kết quả theo đúng thứ tự đoạn
+
+        Args:
+            tasks (list): Tham số của _process_range cho từng đoạn
+
+        Yields:
+            list: Số liệu theo giây của từng đoạn
+        """
+        if self.workers <= 0 or len(tasks) <= 1:
+            detector = self.detector_factory()
+            for task in tasks:
+                yield process_range(detector, *task)
+            return
+
+        # spawn an toàn với CUDA/torch hơn fork
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, len(tasks)),
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.detector_factory,),
+        ) as executor:
+            # map() trả kết quả theo thứ tự task dù các đoạn xong không theo thứ tự
+            yield from executor.map(_process_range, tasks)
+
+    @staticmethod
+    def _log(data_logger, seconds, start_time, fps):
+        """
+        Ghi số liệu theo giây vào DataLogger (cùng định dạng với chế độ trực tiếp)
+
+        Args:
+            data_logger (DataLogger): Data logger
+            seconds (list): Số liệu theo giây
+            start_time (float): Unix timestamp của frame đầu tiên
+            fps (float): FPS của video
+        """
+        max_count = 0
+        total_detections = 0
+        total_frames = 0
+        frames_with_persons = 0
+        for second in seconds:
+            max_count = max(max_count, second["max"])
+            total_detections += second["detections"]
+            total_frames += second["frames"]
+            frames_with_persons += second["with_persons"]
+
+            count = int(round(second["mean"]))
+            data_logger.log_data(
+                {
+                    "current_count": count,
+                    "reported_count": count,
+                    "max_count": max_count,
+                    "average_count": second["mean"],
+                    "total_detections": total_detections,
+                    "total_frames": total_frames,
+                    "frames_with_persons": frames_with_persons,
+                    "detection_rate": frames_with_persons / total_frames,
+                    "fps": fps,
+                    "running_time": second["second"] + 1,
+                },
+                timestamp=start_time + second["second"],
+            )
+        data_logger.save_to_csv()
@@ -9,7 +9,9 @@ from config.settings import (
     BOUNDING_BOX_COLOR,
     FONT_SCALE,
     FONT_THICKNESS,
+    LINE_COLOR,
     TEXT_COLOR,
+    ZONE_COLOR,
 )
 
 
@@ -55,8 +57,11 @@ class Visualizer:
                 display_frame, (x1, y1), (x2, y2), self.bbox_color, self.font_thickness
             )
 
-            # Tạo label với confidence
-            label = f"Person {i+1}: {confidence:.2f}"
+            # Tạo label với confidence (dùng ID track nếu có)
+            if "track_id" in detection:
+                label = f"ID {detection['track_id']}: {confidence:.2f}"
+            else:
+                label = f"Person {i+1}: {confidence:.2f}"
 
             # Tính kích thước text để vẽ background
             (text_width, text_height), baseline = cv2.getTextSize(
@@ -178,6 +183,41 @@ class Visualizer:
 
         return frame
 
+    def draw_zones(self, frame, zone_counter, stats=None):
+        """
+        Vẽ vạch đếm và vùng đếm cùng số đếm hiện tại
+
+        Args:
+            frame (numpy.ndarray): Frame hiện tại
+            zone_counter (ZoneCounter): Zone counter của nguồn video
+            stats (dict): Số đếm của frame này (khoá "lines"/"zones" trong
+                PersonCounter.get_all_stats()); None = đọc trực tiếp zone_counter
+
+        Returns:
+            numpy.ndarray: Frame với vạch/vùng
+        """
+        lines, zones = zone_counter.get_geometry(frame.shape)
+        if stats is None:
+            stats = zone_counter.get_stats()
+
+        for name, polygon in zones.items():
+            zone = stats["zones"][name]
+            cv2.polylines(frame, [polygon], True, ZONE_COLOR, 2)
+            x, y = polygon.min(axis=0)
+            label = f"{name}: {zone['count']}"
+            if zone["max_count"] is not None:
+                label += f"/{zone['max_count']}"
+            cv2.putText(frame, label, (x + 5, y + 20), self.font, 0.5, ZONE_COLOR, 1)
+
+        for name, points in lines.items():
+            line = stats["lines"][name]
+            (x1, y1), (x2, y2) = points
+            cv2.line(frame, (x1, y1), (x2, y2), LINE_COLOR, 2)
+            label = f"{name}: in {line['in']} / out {line['out']}"
+            cv2.putText(frame, label, (x1 + 5, y1 - 8), self.font, 0.5, LINE_COLOR, 1)
+
+        return frame
+
     def draw_alert(self, frame, message, alert_type="warning"):
         """
         Vẽ cảnh báo lên frame
@@ -0,0 +1,347 @@
+"""
+Module đếm người qua vạch ảo và số người trong từng vùng (zone)
+"""
+
+import numpy as np
+
+from config.settings import TRACK_MAX_AGE
+
+
+def _as_points(points, min_points):
+    """
+    Chuyển danh sách điểm thành mảng (N, 2)
+
+    Args:
+        points (list): Danh sách điểm (x, y)
+        min_points (int): Số điểm tối thiểu
+
+    Returns:
+        numpy.ndarray: Mảng float64 (N, 2)
+    """
+    array = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(array) < min_points:
+        raise ValueError(f"Cần ít nhất {min_points} điểm")
+    return array
+
+
+def _scale(points, frame_shape):
+    """
+    Đổi toạ độ tỉ lệ (0-1) sang pixel nếu cần
+
+    Args:
+        points (numpy.ndarray): Mảng (N, 2)
+        frame_shape (tuple): Kích thước frame (h, w, ...) hoặc None
+
+    Returns:
+        numpy.ndarray: Mảng (N, 2) toạ độ pixel
+    """
+    if frame_shape is not None and points.max() <= 1.0:
+        height, width = frame_shape[:2]
+        return points * [width, height]
+    return points
+
+
+def _cross(d, v):
+    """Tích có hướng 2D của hai mảng vector (broadcast)"""
+    return d[..., 0] * v[..., 1] - d[..., 1] * v[..., 0]
+
+
+def segments_cross(starts, ends, line_starts, line_ends):
+    """
+    Kiểm tra các đoạn di chuyển có cắt các vạch đếm không (vector hoá)
+
+    Args:
+        starts (numpy.ndarray): Điểm đầu (K, 2) của đoạn di chuyển
+        ends (numpy.ndarray): Điểm cuối (K, 2)
+        line_starts (numpy.ndarray): Điểm đầu (L, 2) của vạch
+        line_ends (numpy.ndarray): Điểm cuối (L, 2)
+
+    Returns:
+        tuple: (crossed, inward) hai mảng bool (K, L). inward = True khi đi
+            sang phía bên phải của hướng A→B (theo toạ độ ảnh)
+    """
+    direction = (line_ends - line_starts)[None, :, :]
+    # Điểm nằm đúng trên vạch được coi là phía trái để không đếm hai lần
+    side_start = _cross(direction, starts[:, None, :] - line_starts[None]) > 0
+    side_end = _cross(direction, ends[:, None, :] - line_starts[None]) > 0
+
+    # Hai đầu vạch phải nằm khác phía so với đoạn di chuyển (vạch hữu hạn)
+    movement = (ends - starts)[:, None, :]
+    t_a = _cross(movement, line_starts[None] - starts[:, None, :])
+    t_b = _cross(movement, line_ends[None] - starts[:, None, :])
+
+    crossed = (side_start != side_end) & (t_a * t_b <= 0)
+    return crossed, crossed & side_end
+
+
+def points_in_polygons(points, edge_starts, edge_ends, zone_starts):
+    """
+    Kiểm tra điểm nằm trong các đa giác bằng ray casting (vector hoá)
+
+    Args:
+        points (numpy.ndarray): Các điểm (N, 2)
+        edge_starts (numpy.ndarray): Điểm đầu (E, 2) các cạnh của tất cả đa giác
+        edge_ends (numpy.ndarray): Điểm cuối (E, 2)
+        zone_starts (numpy.ndarray): Vị trí cạnh đầu tiên của từng đa giác (Z,)
+
+    Returns:
+        numpy.ndarray: Mảng bool (N, Z)
+    """
+    if len(points) == 0:
+        return np.zeros((0, len(zone_starts)), dtype=bool)
+
+    px, py = points[:, 0:1], points[:, 1:2]
+    x1, y1 = edge_starts[:, 0], edge_starts[:, 1]
+    x2, y2 = edge_ends[:, 0], edge_ends[:, 1]
+
+    spans = (y1 > py) != (y2 > py)
+    dy = np.broadcast_to(y2 - y1, spans.shape)
+    t = np.divide(py - y1, dy, out=np.zeros(spans.shape), where=spans)
+    hits = spans & (px < x1 + t * (x2 - x1))
+
+    # Đếm số cạnh bị tia cắt theo từng đa giác, lẻ = nằm trong
+    return np.add.reduceat(hits.astype(np.int32), zone_starts, axis=1) % 2 == 1
+
+
+class ZoneCounter:
+    """
+    Lớp đếm người đi qua vạch ảo và số người trong từng vùng
+
+    Mỗi frame chỉ tính toán trên mảng: tâm box của tất cả người được kiểm tra
+    với tất cả vạch/vùng cùng lúc. Việc đếm vào/ra cần ID track để biết vị
+    trí ở frame trước; số người hiện tại trong vùng tính trên mọi detection.
+    """
+
+    def __init__(self, lines=None, zones=None, stale_frames=TRACK_MAX_AGE):
+        """
+        Khởi tạo zone counter. Toạ độ có thể là pixel hoặc tỉ lệ (0-1)
+        theo kích thước frame.
+
+        Args:
+            lines (dict): {tên: [(x1, y1), (x2, y2)]} các vạch đếm
+            zones (dict): {tên: {"polygon": [...], "max_count": int}} các vùng;
+                max_count (tuỳ chọn) dùng cho cảnh báo theo vùng
+            stale_frames (int): Số frame giữ vị trí của track đã mất
+        """
+        self.line_names = list((lines or {}).keys())
+        self._lines = [_as_points(p, 2)[:2] for p in (lines or {}).values()]
+
+        self.zone_names = []
+        self.zone_limits = {}
+        self._zones = []
+        for name, zone in (zones or {}).items():
+            if not isinstance(zone, dict):
+                zone = {"polygon": zone}
+            self.zone_names.append(name)
+            self.zone_limits[name] = zone.get("max_count")
+            self._zones.append(_as_points(zone["polygon"], 3))
+
+        self.stale_frames = stale_frames
+
+        # Cache toạ độ pixel theo kích thước frame
+        self._cache_shape = False
+        self._geometry = None
+
+        self.reset()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Tạo zone counter từ cấu hình của một nguồn video
+
+        Args:
+            config (dict): {"lines": {...}, "zones": {...}} hoặc None
+
+        Returns:
+            ZoneCounter: Zone counter hoặc None nếu không cấu hình gì
+        """
+        if not config or not (config.get("lines") or config.get("zones")):
+            return None
+        return cls(lines=config.get("lines"), zones=config.get("zones"))
+
+    def reset(self):
+        """
+        Xoá trạng thái track và các bộ đếm
+        """
+        self.frame_count = 0
+        self.line_in = np.zeros(len(self._lines), dtype=np.int64)
+        self.line_out = np.zeros(len(self._lines), dtype=np.int64)
+        self.zone_count = np.zeros(len(self._zones), dtype=np.int64)
+        self.zone_peak = np.zeros(len(self._zones), dtype=np.int64)
+        self.zone_entered = np.zeros(len(self._zones), dtype=np.int64)
+        self.zone_exited = np.zeros(len(self._zones), dtype=np.int64)
+
+        # Trạng thái track, sắp xếp theo ID để tra cứu bằng searchsorted
+        self._ids = np.empty(0, dtype=np.int64)
+        self._centroids = np.empty((0, 2))
+        self._inside = np.zeros((0, len(self._zones)), dtype=bool)
+        self._last_frame = np.empty(0, dtype=np.int64)
+
+    def _prepare(self, frame_shape):
+        """
+        Đổi toạ độ vạch/vùng sang pixel cho kích thước frame
+
+        Args:
+            frame_shape (tuple): Kích thước frame hoặc None (toạ độ pixel)
+        """
+        shape = None if frame_shape is None else tuple(frame_shape[:2])
+        if shape == self._cache_shape:
+            return
+
+        lines = [_scale(line, shape) for line in self._lines]
+        zones = [_scale(zone, shape) for zone in self._zones]
+        sizes = [len(zone) for zone in zones]
+
+        self._geometry = {
+            "line_starts": np.array([line[0] for line in lines]).reshape(-1, 2),
+            "line_ends": np.array([line[1] for line in lines]).reshape(-1, 2),
+            "edge_starts": np.concatenate(zones) if zones else np.empty((0, 2)),
+            "edge_ends": (
+                np.concatenate([np.roll(zone, -1, axis=0) for zone in zones])
+                if zones
+                else np.empty((0, 2))
+            ),
+            "zone_starts": np.cumsum([0] + sizes[:-1]).astype(np.int64),
+        }
+        self._cache_shape = shape
+
+    def update(self, boxes, track_ids=None, frame_shape=None):
+        """
+        Cập nhật bộ đếm với các người trong frame hiện tại
+
+        Args:
+            boxes (numpy.ndarray): Mảng (N, >=4) x1, y1, x2, y2
+            track_ids (numpy.ndarray): ID track của từng box (-1 = chưa có ID)
+            frame_shape (tuple): Kích thước frame (cần khi dùng toạ độ tỉ lệ)
+        """
+        self._prepare(frame_shape)
+        geometry = self._geometry
+        self.frame_count += 1
+
+        boxes = np.asarray(boxes, dtype=np.float64)
+        boxes = boxes.reshape(len(boxes), -1) if len(boxes) else np.empty((0, 4))
+        centroids = np.stack(
+            [(boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2], axis=1
+        ).reshape(-1, 2)
+        if track_ids is None:
+            track_ids = np.full(len(boxes), -1, dtype=np.int64)
+        track_ids = np.asarray(track_ids, dtype=np.int64)
+
+        inside = np.zeros((len(boxes), len(self._zones)), dtype=bool)
+        if self._zones:
+            inside = points_in_polygons(
+                centroids,
+                geometry["edge_starts"],
+                geometry["edge_ends"],
+                geometry["zone_starts"],
+            )
+            self.zone_count = inside.sum(axis=0)
+            self.zone_peak = np.maximum(self.zone_peak, self.zone_count)
+
+        # Chỉ các box có ID track mới đếm được vào/ra
+        tracked = track_ids >= 0
+        ids = track_ids[tracked]
+        centroids = centroids[tracked]
+        inside = inside[tracked]
+
+        pos = np.searchsorted(self._ids, ids)
+        known = pos < len(self._ids)
+        known[known] = self._ids[pos[known]] == ids[known]
+        rows = pos[known]
+
+        if self._lines and known.any():
+            crossed, inward = segments_cross(
+                self._centroids[rows],
+                centroids[known],
+                geometry["line_starts"],
+                geometry["line_ends"],
+            )
+            self.line_in += inward.sum(axis=0)
+            self.line_out += (crossed & ~inward).sum(axis=0)
+
+        if self._zones:
+            prev_inside = self._inside[rows]
+            self.zone_entered += (inside[known] & ~prev_inside).sum(axis=0)
+            self.zone_exited += (~inside[known] & prev_inside).sum(axis=0)
+            # Track mới xuất hiện ngay trong vùng được tính là đi vào
+            self.zone_entered += inside[~known].sum(axis=0)
+
+        # Cập nhật trạng thái track đã biết và thêm track mới
+        self._centroids[rows] = centroids[known]
+        self._inside[rows] = inside[known]
+        self._last_frame[rows] = self.frame_count
+
+        if (~known).any():
+            ids = np.concatenate([self._ids, ids[~known]])
+            order = np.argsort(ids, kind="stable")
+            self._ids = ids[order]
+            self._centroids = np.concatenate([self._centroids, centroids[~known]])[
+                order
+            ]
+            self._inside = np.concatenate([self._inside, inside[~known]])[order]
+            self._last_frame = np.concatenate(
+                [self._last_frame, np.full((~known).sum(), self.frame_count)]
+            )[order]
+
+        self._remove_stale()
+
+    def _remove_stale(self):
+        """
+        Xoá track đã mất quá stale_frames frame (tính là đã rời vùng)
+        """
+        stale = self.frame_count - self._last_frame > self.stale_frames
+        if not stale.any():
+            return
+
+        self.zone_exited += self._inside[stale].sum(axis=0)
+        keep = ~stale
+        self._ids = self._ids[keep]
+        self._centroids = self._centroids[keep]
+        self._inside = self._inside[keep]
+        self._last_frame = self._last_frame[keep]
+
+    def get_stats(self):
+        """
+        Lấy số đếm của từng vạch và từng vùng
+
+        Returns:
+            dict: {"lines": {tên: {"in", "out"}},
+                "zones": {tên: {"count", "peak", "entered", "exited", "max_count"}}}
+        """
+        return {
+            "lines": {
+                name: {"in": int(self.line_in[i]), "out": int(self.line_out[i])}
+                for i, name in enumerate(self.line_names)
+            },
+            "zones": {
+                name: {
+                    "count": int(self.zone_count[i]),
+                    "peak": int(self.zone_peak[i]),
+                    "entered": int(self.zone_entered[i]),
+                    "exited": int(self.zone_exited[i]),
+                    "max_count": self.zone_limits[name],
+                }
+                for i, name in enumerate(self.zone_names)
+            },
+        }
+
+    def get_geometry(self, frame_shape=None):
+        """
+        Lấy toạ độ pixel của các vạch và vùng (dùng để vẽ)
+
+        Args:
+            frame_shape (tuple): Kích thước frame
+
+        Returns:
+            tuple: ({tên vạch: (2, 2)}, {tên vùng: (N, 2)}) mảng int32
+        """
+        shape = None if frame_shape is None else tuple(frame_shape[:2])
+        lines = {
+            name: np.round(_scale(line, shape)).astype(np.int32)
+            for name, line in zip(self.line_names, self._lines)
+        }
+        zones = {
+            name: np.round(_scale(zone, shape)).astype(np.int32)
+            for name, zone in zip(self.zone_names, self._zones)
+        }
+        return lines, zones
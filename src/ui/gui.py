@@ -9,6 +9,8 @@ import os
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
 import sys
+import threading
+import time
 from datetime import datetime
 
 import cv2
@@ -32,6 +34,33 @@ from PyQt6.QtWidgets import (
     QWidget,
 )
 
+from config.settings import (
+    COUNT_SMOOTHING,
+    INFERENCE_WORKERS,
+    LATENCY_ENABLED,
+    METRICS_ENABLED,
+    MOTION_GATE_ENABLED,
+    PIPELINE_ENABLED,
+    PIPELINE_QUEUE_SIZE,
+    PROFILE_ON_START,
+    PROFILER_DURATION,
+    ROI_CONFIG,
+    TRACKING_ENABLED,
+    ZONE_CONFIG,
+    ensure_directories,
+)
+from src.core.person_detector import (
+    STATE_FAILED,
+    STATE_IDLE,
+    STATE_LOADING,
+    STATE_READY,
+)
+from src.core.pipeline import FramePipeline, StageTimings
+from src.core.profiler import SamplingProfiler, parse_profile_duration
+from src.core.roi import RegionOfInterest
+from src.core.synthetic_source import open_video_source
+from src.core.zones import ZoneCounter
+
 
 class VideoThread(QThread):
     """Thread xử lý video để không làm đơ UI"""
@@ -39,7 +68,13 @@ class VideoThread(QThread):
     frame_signal = pyqtSignal(np.ndarray, dict, dict)  # frame, stats, alert_info
 
     def __init__(
-        self, detector, counter, visualizer, alert_system, source: int | str = 0
+        self,
+        detector,
+        counter,
+        visualizer,
+        alert_system,
+        source: int | str = 0,
+        use_pipeline: bool = PIPELINE_ENABLED,
     ):
         super().__init__()
         self.detector = detector
@@ -47,15 +82,34 @@ class VideoThread(QThread):
         self.visualizer = visualizer
         self.alert_system = alert_system
         self.source = source
+        self.use_pipeline = use_pipeline
         self.running = False
         self.cap = None
+        self.pipeline = None
+        # capture → inference → postprocess → draw → publish; chạy trên các
+        # worker của pipeline hoặc tuần tự trên thread này
+        self.stages = [
+            ("inference", self._infer),
+            ("postprocess", self._postprocess),
+            ("draw", self._draw),
+            ("publish", self._publish),
+        ]
+        # Nơi đo duy nhất thời gian từng giai đoạn, chỉ bật cùng đo độ trễ
+        # (LATENCY_ENABLED): mẫu được đưa vào histogram p50/p95/p99 của counter
+        self.timings = StageTimings(
+            ["decode"] + [name for name, _ in self.stages],
+            latency=counter.latency,
+            enabled=counter.latency is not None,
+        )
 
     def run(self):
         """Chạy xử lý video"""
         self.running = True
+        # Đặt tên để phân biệt thread này trong kết quả của profiler
+        threading.current_thread().name = "VideoThread"
 
-        # Mở camera hoặc video
-        self.cap = cv2.VideoCapture(self.source)
+        # Mở camera, video hoặc nguồn giả lập (synthetic://...)
+        self.cap = open_video_source(self.source)
 
         if not self.cap.isOpened():
             print(f"❌ Không thể mở camera/video source: {self.source}")
@@ -65,45 +119,118 @@ class VideoThread(QThread):
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
 
+        # Frame đầu không bị khựng vì load model; FPS chỉ tính từ đây
+        self._wait_for_detector()
+
+        if self.use_pipeline:
+            # capture (thread này) → các giai đoạn trên worker riêng
+            self.pipeline = FramePipeline(
+                self.stages, queue_size=PIPELINE_QUEUE_SIZE, timings=self.timings
+            )
+            self.pipeline.start()
+
         while self.running:
-            ret, frame = self.cap.read()
+            with self.timings.measure("decode"):
+                ret, frame = self.cap.read()
 
             if not ret:
                 print("⚠️ Không thể đọc frame, thử lại...")
                 continue
 
-            try:
-                # Xử lý frame - frame đã là 640x480 rồi
-                detections = self.detector.detect_persons(frame)
+            if self.pipeline is not None:
+                # Chờ theo từng khoảng ngắn để vẫn dừng được khi queue đầy
+                while self.running and not self.pipeline.submit(frame, timeout=0.1):
+                    pass
+            else:
+                item = frame
+                for name, func in self.stages:
+                    with self.timings.measure(name):
+                        item = func(item)
 
-                # Debug: In số lượng detection
-                if len(detections) > 0:
-                    print(f"✅ Phát hiện {len(detections)} người")
+        if self.pipeline is not None:
+            self.pipeline.stop()
 
-                person_count = self.counter.update_count(detections)
-                stats = self.counter.get_all_stats()
-                alert_info = self.alert_system.check_alert(person_count) or {}
+        if self.cap:
+            self.cap.release()
+            print("✅ Đã giải phóng camera/video source")
 
-                # Vẽ kết quả
-                display_frame = self.visualizer.draw_detections(
-                    frame, detections, person_count
+    def _wait_for_detector(self):
+        """Chờ detector khởi động xong (warm-up chạy nền từ lúc mở ứng dụng)"""
+        while self.running and not self.detector.wait_until_ready(timeout=0.1):
+            state = self.detector.get_warmup_status()["state"]
+            if state in (STATE_IDLE, STATE_FAILED):
+                # Chưa warm-up hoặc warm-up lỗi: frame đầu tiên sẽ tự load model
+                break
+        self.counter.restart_timing()
+
+    def _infer(self, frame):
+        """Giai đoạn phát hiện người trên frame"""
+        try:
+            # Xử lý frame - frame đã là 640x480 rồi
+            detections = self.detector.detect_persons(frame)
+        except Exception as e:
+            print(f"❌ Lỗi trong quá trình phát hiện: {e}")
+            detections = None
+
+        return frame, detections
+
+    def _postprocess(self, item):
+        """Giai đoạn cập nhật thống kê và cảnh báo"""
+        frame, detections = item
+        if detections is None:
+            return frame, None, {}, {}
+
+        try:
+            # Debug: In số lượng detection
+            if len(detections) > 0:
+                print(f"✅ Phát hiện {len(detections)} người")
+
+            self.counter.update_count(detections, frame.shape)
+            stats = self.counter.get_all_stats()
+            alert_info = self.alert_system.check_stats(stats) or {}
+
+            # Cảnh báo theo vùng chỉ hiển thị khi không có cảnh báo tổng
+            zone_alerts = self.alert_system.check_zone_alerts(stats.get("zones", {}))
+            if zone_alerts and not alert_info:
+                alert_info = zone_alerts[0]
+
+            if self.timings.enabled:
+                stats["stage_timings"] = self.timings.get_timings()
+            return frame, detections, stats, alert_info
+
+        except Exception as e:
+            print(f"❌ Lỗi trong quá trình phát hiện: {e}")
+            return frame, None, {}, {}
+
+    def _draw(self, item):
+        """Giai đoạn vẽ kết quả lên frame"""
+        frame, detections, stats, alert_info = item
+        if detections is None:
+            # Hiển thị frame gốc khi lỗi
+            return frame, {}, {}
+
+        try:
+            display_frame = self.visualizer.draw_detections(
+                frame, detections, stats["current_count"]
+            )
+            display_frame = self.visualizer.draw_stats(display_frame, stats)
+            if self.counter.zone_counter is not None:
+                # Số đếm theo vạch/vùng lấy từ stats của chính frame này
+                display_frame = self.visualizer.draw_zones(
+                    display_frame, self.counter.zone_counter, stats
                 )
-                display_frame = self.visualizer.draw_stats(display_frame, stats)
 
-                display_frame = self.visualizer.create_legend(display_frame)
+            display_frame = self.visualizer.create_legend(display_frame)
+            return display_frame, stats, alert_info
 
-                # Gửi frame về UI
-                self.frame_signal.emit(display_frame, stats, alert_info)
+        except Exception as e:
+            print(f"❌ Lỗi khi vẽ kết quả: {e}")
+            return frame, {}, {}
 
-            except Exception as e:
-                print(f"❌ Lỗi trong quá trình phát hiện: {e}")
-                # Hiển thị frame gốc khi lỗi
-                self.frame_signal.emit(frame, {}, {})
-                continue
-
-        if self.cap:
-            self.cap.release()
-            print("✅ Đã giải phóng camera/video source")
+    def _publish(self, item):
+        """Giai đoạn gửi frame về UI"""
+        display_frame, stats, alert_info = item
+        self.frame_signal.emit(display_frame, stats, alert_info)
 
     def stop(self):
         """Dừng xử lý video"""
@@ -113,26 +240,74 @@ class VideoThread(QThread):
 class PersonDetectionGUI(QMainWindow):
     """Giao diện chính cho hệ thống nhận dạng người"""
 
+    # Phát từ thread của profiler khi đã ghi file profile
+    profile_signal = pyqtSignal(dict)
+    # Phát từ thread warm-up khi trạng thái khởi động model thay đổi
+    warmup_signal = pyqtSignal(dict)
+
     def __init__(self):
         super().__init__()
         self.video_thread = None
 
+        # Sampling profiler: bật từ menu hoặc biến môi trường PROFILE
+        self.profiler = SamplingProfiler()
+        self.profile_action = None
+        try:
+            self.profile_on_start = parse_profile_duration(PROFILE_ON_START)
+        except ValueError as e:
+            print(f"⚠️ {e}")
+            self.profile_on_start = 0.0
+
         # Import core modules sau khi đã set environment variable
         from src.core import (
             AlertSystem,
+            CountSmoother,
             DataLogger,
+            InferencePool,
+            LatencyRecorder,
+            MotionGate,
             PersonCounter,
             PersonDetector,
+            PersonTracker,
             Visualizer,
         )
 
         # Khởi tạo các component
-        self.detector = PersonDetector()
-        self.counter = PersonCounter()
+        if INFERENCE_WORKERS > 0:
+            # Chạy inference trên nhiều process để tận dụng tất cả CPU core
+            self.detector = InferencePool(num_workers=INFERENCE_WORKERS)
+        else:
+            self.detector = PersonDetector()
+        if MOTION_GATE_ENABLED:
+            # Bỏ qua inference khi camera quay cảnh tĩnh
+            self.detector.set_motion_gate(MotionGate())
+
+        # Load model và warm-up trên thread nền trong lúc người dùng chọn nguồn
+        self.warmup_signal.connect(self.on_warmup_progress)
+        self.detector.warm_up_async(on_progress=self.warmup_signal.emit)
+        self.counter = PersonCounter(
+            tracker=PersonTracker() if TRACKING_ENABLED else None,
+            smoother=CountSmoother() if COUNT_SMOOTHING else None,
+            latency=LatencyRecorder() if LATENCY_ENABLED else None,
+        )
         self.visualizer = Visualizer()
         self.data_logger = DataLogger(enabled=True)
         self.alert_system = AlertSystem()
 
+        # Xuất metric cho Prometheus trên thread riêng
+        self.metrics_server = None
+        if METRICS_ENABLED:
+            from src.api import MetricsServer
+
+            self.metrics_server = MetricsServer(
+                self.counter, self.alert_system, self.data_logger
+            )
+            try:
+                self.metrics_server.start()
+            except OSError as e:
+                print(f"⚠️ Không thể mở cổng metrics: {e}")
+                self.metrics_server = None
+
         # Thông tin video source
         self.video_source: int | str = 0
         self.is_detecting = False
@@ -157,11 +332,63 @@ class PersonDetectionGUI(QMainWindow):
         side_panel = self.create_side_panel()
         main_layout.addWidget(side_panel, stretch=3)
 
+        self.create_menu()
+
         # Thanh trạng thái
         status_bar = self.statusBar()
         if status_bar:
             status_bar.showMessage("Sẵn sàng")
 
+    def create_menu(self):
+        """Tạo menu Công cụ (profile hiệu năng)"""
+        menu_bar = self.menuBar()
+        if menu_bar is None:
+            return
+        tools_menu = menu_bar.addMenu("Công cụ")
+        if tools_menu is None:
+            return
+        self.profile_action = tools_menu.addAction(
+            f"🔥 Profile hiệu năng ({PROFILER_DURATION:g} giây)"
+        )
+        if self.profile_action is not None:
+            self.profile_action.triggered.connect(
+                lambda: self.start_profile(PROFILER_DURATION)
+            )
+        self.profile_signal.connect(self.on_profile_finished)
+
+    def start_profile(self, duration):
+        """
+        Bắt đầu lấy mẫu profile trong một khoảng thời gian
+
+        Args:
+            duration (float): Số giây profile
+        """
+        if not self.profiler.start(duration, on_finish=self.profile_signal.emit):
+            return
+        if self.profile_action is not None:
+            self.profile_action.setEnabled(False)
+        status_bar = self.statusBar()
+        if status_bar:
+            status_bar.showMessage(f"🔥 Đang profile trong {duration:g} giây...")
+
+    def on_profile_finished(self, paths):
+        """Hiển thị đường dẫn file profile khi profiler dừng"""
+        if self.profile_action is not None:
+            self.profile_action.setEnabled(True)
+        status_bar = self.statusBar()
+        if not paths:
+            if status_bar:
+                status_bar.showMessage("Profile không có mẫu nào")
+            return
+        if status_bar:
+            status_bar.showMessage(f"Đã lưu profile: {paths['speedscope']}")
+        QMessageBox.information(
+            self,
+            "Profile hiệu năng",
+            "Đã lưu profile (mở bằng https://www.speedscope.app):\n"
+            f"{paths['speedscope']}\n{paths['collapsed']}",
+        )
+
     def create_video_panel(self):
         """Tạo vùng hiển thị video chính"""
         group_box = QGroupBox("Luồng Video Trực Tiếp")
@@ -322,10 +549,13 @@ class PersonDetectionGUI(QMainWindow):
         export_btn.clicked.connect(self.export_report)
         export_alert_btn = QPushButton("📋 Xuất Log Cảnh Báo")
         export_alert_btn.clicked.connect(self.export_alert_log)
+        export_rollup_btn = QPushButton("🕒 Xuất Thống Kê Theo Thời Gian")
+        export_rollup_btn.clicked.connect(self.export_rollup)
 
         control_layout.addWidget(save_btn)
         control_layout.addWidget(export_btn)
         control_layout.addWidget(export_alert_btn)
+        control_layout.addWidget(export_rollup_btn)
 
         control_group.setLayout(control_layout)
         layout.addWidget(control_group)
@@ -411,6 +641,14 @@ class PersonDetectionGUI(QMainWindow):
         """
         )
 
+        # Áp dụng ROI/vùng loại trừ đã cấu hình cho nguồn video hiện tại
+        self.detector.set_region(
+            RegionOfInterest.from_config(ROI_CONFIG.get(self.video_source))
+        )
+        self.counter.set_zone_counter(
+            ZoneCounter.from_config(ZONE_CONFIG.get(self.video_source))
+        )
+
         # Khởi tạo video thread
         self.video_thread = VideoThread(
             self.detector,
@@ -422,6 +660,11 @@ class PersonDetectionGUI(QMainWindow):
         self.video_thread.frame_signal.connect(self.update_frame)
         self.video_thread.start()
 
+        # PROFILE=...: profile lần nhận dạng đầu tiên
+        if self.profile_on_start > 0:
+            self.start_profile(self.profile_on_start)
+            self.profile_on_start = 0.0
+
         self.camera_status.setText("🟢 Đang kết nối...")
         status_bar = self.statusBar()
         if status_bar:
@@ -544,11 +787,35 @@ class PersonDetectionGUI(QMainWindow):
                     self, "Lỗi", f"Lỗi khi xuất log cảnh báo:\n{str(e)}"
                 )
 
+    def export_rollup(self):
+        """Xuất số người tổng hợp theo giây/phút/giờ/ngày"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Xuất thống kê theo thời gian",
+            f"rollup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            "CSV Files (*.csv);;All Files (*.*)",
+        )
+
+        if file_path:
+            rows = self.data_logger.save_rollup_csv(
+                self.counter.get_rollup_records(), file_path
+            )
+            if rows:
+                QMessageBox.information(
+                    self, "Thành công", f"Đã xuất {rows} dòng thống kê!\n{file_path}"
+                )
+            else:
+                QMessageBox.warning(self, "Cảnh báo", "Không có dữ liệu để xuất!")
+
     def update_frame(self, frame, stats, alert_info):
         """Cập nhật frame video"""
         if frame is None:
             return
 
+        # Chỉ đo thời gian chuyển đổi khi bật đo độ trễ
+        timings = self.video_thread.timings if self.video_thread is not None else None
+        start = time.perf_counter() if timings is not None and timings.enabled else None
+
         # Chuyển đổi frame OpenCV sang QImage
         rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         h, w, ch = rgb_image.shape
@@ -566,9 +833,12 @@ class PersonDetectionGUI(QMainWindow):
         )
         self.video_label.setPixmap(scaled_pixmap)
 
+        if start is not None:
+            timings.record("qt_convert", time.perf_counter() - start)
+
         # Cập nhật thông tin
         self.current_count_label.setText(
-            f"Người hiện tại: {stats.get('current_count', 0)}"
+            f"Người hiện tại: {stats.get('reported_count', stats.get('current_count', 0))}"
         )
         self.fps_label.setText(f"FPS: {stats.get('fps', 0):.1f}")
 
@@ -621,6 +891,21 @@ class PersonDetectionGUI(QMainWindow):
 
         self.camera_status.setText("🟢 Đang chạy")
 
+    def on_warmup_progress(self, status):
+        """Hiển thị tiến độ khởi động model trên thanh trạng thái"""
+        state = status["state"]
+        if state == STATE_READY:
+            message = f"✅ Model sẵn sàng ({status['elapsed'] or 0:.1f}s)"
+        elif state == STATE_FAILED:
+            message = f"❌ Lỗi khởi động model: {status['error']}"
+        elif state == STATE_LOADING:
+            message = "⏳ Đang tải model..."
+        else:
+            message = f"⏳ Đang khởi động model... {status['progress']:.0%}"
+        status_bar = self.statusBar()
+        if status_bar:
+            status_bar.showMessage(message)
+
     def update_info(self):
         """Cập nhật thông tin chi tiết"""
         stats = self.counter.get_all_stats()
@@ -628,13 +913,54 @@ class PersonDetectionGUI(QMainWindow):
         info_text = f"""
 📊 Thống Kê Chi Tiết:
 ━━━━━━━━━━━━━━━━━━━━
-• Số người hiện tại: {stats.get('current_count', 0)}
+• Số người hiện tại: {stats.get('reported_count', 0)} (thô: {stats.get('current_count', 0)})
 • Số người tối đa: {stats.get('max_count', 0)}
 • Trung bình: {stats.get('average_count', 0):.1f}
 • Tổng detections: {stats.get('total_detections', 0)}
 • Tỷ lệ phát hiện: {stats.get('detection_rate', 0):.1%}
         """
 
+        # Số người theo phút/giờ gần nhất (từ rollup)
+        for resolution, label in ((60, "Phút"), (3600, "Giờ")):
+            bucket = self.counter.get_rollup_latest(resolution)
+            if bucket is not None:
+                info_text += (
+                    f"• {label} này: TB {bucket['mean']:.1f}, "
+                    f"min {bucket['min']:.0f}, max {bucket['max']:.0f}\n"
+                )
+
+        # Người duy nhất và thời gian xuất hiện (khi bật tracking)
+        if "unique_count" in stats:
+            info_text += (
+                f"\n👣 Người duy nhất: {stats['unique_count']}\n"
+                f"• Đang theo dõi: {stats['tracked_count']}\n"
+                f"• Thời gian TB: {stats['average_dwell_time']:.1f}s\n"
+                f"• Thời gian tối đa: {stats['max_dwell_time']:.1f}s\n"
+            )
+
+        # Số người qua từng vạch và trong từng vùng
+        for name, line in stats.get("lines", {}).items():
+            info_text += f"🚪 {name}: vào {line['in']} / ra {line['out']}\n"
+        for name, zone in stats.get("zones", {}).items():
+            info_text += (
+                f"📍 {name}: {zone['count']} người (đã vào {zone['entered']})\n"
+            )
+
+        # Thời gian từng giai đoạn (p50/p95/p99), chỉ có khi bật đo độ trễ
+        if stats.get("latency"):
+            info_text += "\n⏱ Độ trễ p50 / p95 / p99 (ms):\n"
+            for name, timing in stats["latency"].items():
+                info_text += (
+                    f"• {name}: {timing['p50_ms']:.1f} / "
+                    f"{timing['p95_ms']:.1f} / {timing['p99_ms']:.1f}\n"
+                )
+
+        # Tỉ lệ frame được bỏ qua nhờ motion gating
+        motion_gate = getattr(self.detector, "motion_gate", None)
+        if motion_gate is not None:
+            gate_stats = motion_gate.get_stats()
+            info_text += f"\n💤 Bỏ qua inference: {gate_stats['skip_rate']:.1%}\n"
+
         self.info_text.setPlainText(info_text)
 
     def closeEvent(self, a0):
@@ -642,6 +968,17 @@ class PersonDetectionGUI(QMainWindow):
         if self.is_detecting:
             self.stop_detection()
 
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+
+        # Profile đang chạy dở vẫn được ghi file
+        if self.profiler.running:
+            self.profiler.stop(timeout=5)
+
+        # Dừng các worker inference (nếu dùng InferencePool)
+        if hasattr(self.detector, "close"):
+            self.detector.close()
+
         # Lưu dữ liệu cuối
         stats = self.counter.get_all_stats()
         self.data_logger.save_immediate(stats)
@@ -662,11 +999,24 @@ class PersonDetectionGUI(QMainWindow):
             except Exception as e:
                 print(f"Không thể lưu log cảnh báo khi đóng: {e}")
 
+        # Lưu histogram độ trễ (khi bật đo độ trễ)
+        if self.counter.latency is not None and self.counter.latency.histograms:
+            from config.settings import OUTPUT_REPORTS_DIR
+
+            latency_filename = (
+                OUTPUT_REPORTS_DIR
+                / f"latency_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            )
+            self.data_logger.save_latency_json(
+                self.counter.latency, str(latency_filename)
+            )
+
         a0.accept()  # pyright: ignore[reportOptionalMemberAccess]
 
 
 def main():
     """Chạy ứng dụng GUI"""
+    ensure_directories()
     app = QApplication(sys.argv)
 
     # Thiết lập style
@@ -16,13 +16,15 @@ def validate_video_source(source: Union[str, int]) -> bool:
     Validate if video source is accessible
 
     Args:
-        source: Video source (camera index or file path)
+        source: Video source (camera index, file path or synthetic://...)
 
     Returns:
         bool: True if source is valid, False otherwise
     """
+    from src.core.synthetic_source import open_video_source
+
     try:
-        cap = cv2.VideoCapture(source)
+        cap = open_video_source(source)
         if not cap.isOpened():
             return False
 
@@ -0,0 +1,146 @@
+"""
+Unit tests for detection accuracy metrics
+"""
+
+from unittest.mock import MagicMock, patch
+
+import cv2
+import numpy as np
+import pytest
+
+from src.benchmark.accuracy import (
+    accuracy_delta,
+    average_precision,
+    evaluate_detections,
+    match_detections,
+    match_results,
+    predict_samples,
+    threshold_metrics,
+)
+from src.core.dataset import list_samples, load_data_yaml, person_label_ids
+
+GROUND_TRUTH = np.array([[0, 0, 10, 10], [20, 20, 30, 30]], dtype=np.float32)
+
+
+class TestAccuracy:
+    """Test cases for accuracy metrics"""
+
+    def test_match_greedy_by_confidence(self):
+        """TC1: Box confidence cao nhận ground truth trước; box trùng lặp là false positive"""
+        predictions = np.array(
+            [
+                [0, 0, 10, 10, 0.6],
+                [1, 0, 10, 10, 0.9],  # trùng ground truth đầu, confidence cao hơn
+                [50, 50, 60, 60, 0.8],
+            ],
+            dtype=np.float32,
+        )
+
+        tp = match_detections(predictions, GROUND_TRUTH)
+        np.testing.assert_array_equal(tp, [False, True, False])
+        assert match_detections(np.empty((0, 5)), GROUND_TRUTH).shape == (0,)
+        assert not match_detections(predictions, np.empty((0, 4))).any()
+
+    def test_average_precision(self):
+        """TC2: AP = 1 khi mọi box đúng xếp trước; box sai confidence cao làm giảm AP"""
+        assert average_precision([0.9, 0.8], [True, True], 2) == pytest.approx(1.0)
+        assert average_precision([0.9, 0.8], [False, True], 2) == pytest.approx(0.25)
+        assert average_precision([0.9], [True], 2) == pytest.approx(0.5)
+        assert average_precision([], [], 0) == 0.0
+
+    def test_evaluate_detections(self):
+        """TC3: Precision/recall/mAP/sai số đếm trên nhiều ảnh; box dưới ngưỡng chỉ tính vào mAP"""
+        results = [
+            (
+                np.array(
+                    [[0, 0, 10, 10, 0.9], [50, 50, 60, 60, 0.7], [20, 20, 30, 30, 0.1]]
+                ),
+                GROUND_TRUTH,
+            ),
+            (np.empty((0, 5)), GROUND_TRUTH[:1]),
+        ]
+
+        metrics = evaluate_detections(results, conf_threshold=0.5)
+        assert metrics["images"] == 2
+        assert metrics["ground_truth"] == 3
+        assert (metrics["tp"], metrics["fp"], metrics["fn"]) == (1, 1, 2)
+        assert metrics["precision"] == pytest.approx(0.5)
+        assert metrics["recall"] == pytest.approx(1 / 3)
+        # Box thứ ba (0.1) vẫn góp vào mAP: AP = 1/3 * 1 + 1/3 * 2/3
+        assert metrics["map50"] == pytest.approx(1 / 3 + 2 / 9)
+        assert metrics["count_mae"] == pytest.approx(0.5)
+        assert metrics["count_bias"] == pytest.approx(-0.5)
+
+        empty = evaluate_detections([])
+        assert empty["map50"] == 0.0 and empty["count_mae"] == 0.0
+
+    def test_accuracy_delta(self):
+        """TC4: Chênh lệch candidate - baseline theo từng chỉ số"""
+        baseline = {"map50": 0.80, "recall": 0.9}
+        candidate = {"map50": 0.79, "recall": 0.95}
+
+        delta = accuracy_delta(baseline, candidate, metrics=("map50", "recall"))
+        assert delta["map50"] == pytest.approx(-0.01)
+        assert delta["recall"] == pytest.approx(0.05)
+
+    def test_threshold_sweep_matches_single_evaluation(self):
+        """TC5: Quét nhiều ngưỡng confidence từ một lần ghép cho kết quả như đánh giá riêng từng ngưỡng"""
+        rng = np.random.default_rng(0)
+        results = []
+        for _ in range(20):
+            ground_truth = rng.uniform(0, 80, (rng.integers(0, 6), 2))
+            ground_truth = np.hstack([ground_truth, ground_truth + 20])
+            jitter = rng.normal(0, 3, ground_truth.shape)
+            predictions = np.vstack(
+                [ground_truth + jitter, rng.uniform(0, 100, (3, 4))]
+            )
+            confidences = rng.uniform(0, 1, (len(predictions), 1))
+            results.append((np.hstack([predictions, confidences]), ground_truth))
+
+        thresholds = (0.2, 0.5, 0.8)
+        swept = threshold_metrics(match_results(results), thresholds)
+        for threshold, metrics in zip(thresholds, swept):
+            single = evaluate_detections(results, conf_threshold=threshold)
+            for key in ("tp", "fp", "fn", "precision", "recall", "count_mae"):
+                assert metrics[key] == pytest.approx(single[key])
+            # Ghép lại chỉ với box trên ngưỡng cho cùng kết quả
+            kept = [(p[p[:, 4] >= threshold], g) for p, g in results]
+            assert metrics["tp"] == sum(
+                int(match_detections(p, g).sum()) for p, g in kept
+            )
+
+    def test_predict_samples_two_class_dataset(self, tmp_path):
+        """TC6: Dataset hai class ('1', 'person') - label của cả hai class là ground truth người"""
+        (tmp_path / "data.yaml").write_text(
+            "val: ../valid/images\nnc: 2\nnames: ['1', 'person']\n", encoding="utf-8"
+        )
+        images = tmp_path / "valid" / "images"
+        labels = tmp_path / "valid" / "labels"
+        images.mkdir(parents=True)
+        labels.mkdir(parents=True)
+        for stem, rows in (
+            ("a", "0 0.25 0.5 0.2 0.4\n"),
+            ("b", "1 0.75 0.5 0.2 0.4\n"),
+            ("c", "0 0.25 0.5 0.2 0.4\n1 0.75 0.5 0.2 0.4\n"),
+        ):
+            cv2.imwrite(str(images / f"{stem}.jpg"), np.zeros((100, 200, 3), np.uint8))
+            (labels / f"{stem}.txt").write_text(rows, encoding="utf-8")
+
+        data = load_data_yaml(str(tmp_path / "data.yaml"))
+        samples = list_samples(data["splits"]["val"], require_images=True)
+
+        boxes = MagicMock()
+        boxes.xyxy.cpu.return_value.numpy.return_value = np.array([[30, 30, 70, 70]])
+        boxes.conf.cpu.return_value.numpy.return_value = np.array([0.9])
+        boxes.cls.cpu.return_value.numpy.return_value = np.array([0.0])
+        with patch("ultralytics.YOLO") as yolo:
+            yolo.return_value.return_value = [MagicMock(boxes=boxes)]
+            results = predict_samples(
+                "model.pt", samples, label_ids=person_label_ids(data["names"])
+            )
+            only_first = predict_samples("model.pt", samples)
+
+        assert [len(truth) for _, truth in results] == [1, 1, 2]
+        assert (np.concatenate([truth for _, truth in results])[:, 4] == 0).all()
+        assert [len(truth) for _, truth in only_first] == [1, 0, 1]
+        assert evaluate_detections(results)["ground_truth"] == 4
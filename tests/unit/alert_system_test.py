@@ -1,5 +1,5 @@
 """
-Unit tests for AlertSystem - 20 Test Cases theo đặc tả
+Unit tests for AlertSystem - 23 Test Cases theo đặc tả
 """
 
 import os
@@ -249,3 +249,53 @@ class TestAlertSystem:
 
         result = alert_system.check_alert(15)
         assert result is not None
+
+    def test_check_zone_alerts(self, alert_system):
+        """TC21: Cảnh báo theo vùng vượt max_count, có cooldown riêng từng vùng"""
+        zones = {
+            "queue": {"count": 6, "max_count": 5},
+            "door": {"count": 9, "max_count": None},
+            "hall": {"count": 2, "max_count": 5},
+        }
+
+        alerts = alert_system.check_zone_alerts(zones)
+
+        assert [alert["zone"] for alert in alerts] == ["queue"]
+        assert alerts[0]["excess_count"] == 1
+        assert alert_system.active_zones == {"queue"}
+        # Trong thời gian cooldown → không cảnh báo lại
+        assert alert_system.check_zone_alerts(zones) == []
+
+        zones["queue"]["count"] = 3
+        alert_system.check_zone_alerts(zones)
+        assert alert_system.active_zones == set()
+
+    def test_check_stats_uses_count_key(self):
+        """TC22: check_stats dùng chuỗi số liệu theo count_key"""
+        stats = {"current_count": 15, "reported_count": 8}
+
+        smoothed = AlertSystem(max_count=10, enabled=True, count_key="reported_count")
+        raw = AlertSystem(max_count=10, enabled=True, count_key="current_count")
+
+        assert smoothed.check_stats(stats) is None
+        assert raw.check_stats(stats)["person_count"] == 15
+
+    def test_cooldown_uses_monotonic_clock(self, monkeypatch):
+        """TC23: Cooldown đo bằng đồng hồ monotonic, không phụ thuộc wall time"""
+        from src.core.clock import ManualClock
+
+        clock = ManualClock()
+        alert_system = AlertSystem(max_count=10, enabled=True, clock=clock)
+
+        alert = alert_system.check_alert(15)
+        assert alert["timestamp"] == clock.wall()
+
+        # Đồng hồ hệ thống bị chỉnh lùi/tiến không ảnh hưởng cooldown
+        monkeypatch.setattr(time, "time", lambda: 0.0)
+        clock.advance(4.9)
+        alert_system.check_alert(15)
+        assert len(alert_system.alert_history) == 1
+
+        clock.advance(0.1)
+        alert_system.check_alert(15)
+        assert len(alert_system.alert_history) == 2
@@ -0,0 +1,348 @@
+"""
+Unit tests for ApiServer (HTTP, WebSocket, MJPEG)
+"""
+
+import asyncio
+import base64
+import json
+import os
+import random
+import socket
+import struct
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import cv2
+import numpy as np
+import pytest
+
+from src.api.server import (
+    ApiServer,
+    encode_websocket_frame,
+    read_websocket_frame,
+    to_json,
+    websocket_accept_key,
+)
+from src.core.alert_system import AlertSystem
+from src.core.data_logger import DataLogger
+from src.core.person_counter import PersonCounter
+from src.core.tracker import PersonTracker
+
+DETECTION = {"bbox": [0, 0, 10, 10], "confidence": 0.9, "class_id": 0}
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Fixture chạy ApiServer trên cổng trống"""
+    counter = PersonCounter()
+    counter.update_count([DETECTION] * 2)
+    data_logger = DataLogger(filename=str(tmp_path / "data.csv"), enabled=True)
+    api = ApiServer(
+        counter,
+        AlertSystem(max_count=5, enabled=True),
+        data_logger,
+        host="127.0.0.1",
+        port=0,
+        stream_fps=100,
+        event_rate=100,
+    )
+    api.start()
+    yield api
+    api.stop()
+
+
+def _get(api, path):
+    """Gửi GET và trả về (status, content_type, body)"""
+    host, port = api.address
+    with urllib.request.urlopen(f"http://{host}:{port}{path}", timeout=5) as response:
+        return response.status, response.headers["Content-Type"], response.read()
+
+
+def _connect(api, path, headers=""):
+    """Mở socket và gửi request GET, trả về (socket, header response)"""
+    sock = socket.create_connection(api.address, timeout=5)
+    sock.sendall(f"GET {path} HTTP/1.1\r\nHost: test\r\n{headers}\r\n".encode())
+    data = b""
+    while b"\r\n\r\n" not in data:
+        data += sock.recv(1)
+    return sock, data.decode("latin-1")
+
+
+def _recv_exactly(sock, size):
+    """Đọc đúng size byte"""
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("closed")
+        data += chunk
+    return data
+
+
+def _recv_ws_message(sock):
+    """Đọc một frame WebSocket từ server (không mask)"""
+    first, second = _recv_exactly(sock, 2)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", _recv_exactly(sock, 2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", _recv_exactly(sock, 8))
+    return first & 0x0F, _recv_exactly(sock, length)
+
+
+def _publish_until(api, condition, timeout=5, **kwargs):
+    """Gọi publish() lặp lại tới khi condition() đúng"""
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "Hết thời gian chờ"
+        api.publish(**kwargs)
+        time.sleep(0.01)
+
+
+class TestWebSocketHelpers:
+    """Test cases for các hàm WebSocket"""
+
+    def test_accept_key(self):
+        """TC1: Sec-WebSocket-Accept theo ví dụ của RFC 6455"""
+        assert (
+            websocket_accept_key("dGhlIHNhbXBsZSBub25jZQ==")
+            == "s3pPLMBiTxaQ9kYGzzhZRbK+xOo="
+        )
+
+    def test_frame_roundtrip(self):
+        """TC2: Frame từ server đọc lại được; frame có mask được giải mã"""
+        assert encode_websocket_frame(b"hi") == b"\x81\x02hi"
+        assert encode_websocket_frame(b"x" * 300)[:4] == b"\x81\x7e\x01\x2c"
+
+        mask = b"\x01\x02\x03\x04"
+        payload = b"hello"
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+        async def read():
+            reader = asyncio.StreamReader()
+            reader.feed_data(b"\x81\x85" + mask + masked)
+            reader.feed_eof()
+            return await read_websocket_frame(reader)
+
+        assert asyncio.run(read()) == (0x1, payload)
+
+
+class TestApiServer:
+    """Test cases for ApiServer class"""
+
+    def test_stats_and_metrics(self, server):
+        """TC3: /api/stats trả về JSON, /metrics trả về Prometheus, sai đường dẫn → 404"""
+        status, content_type, body = _get(server, "/api/stats")
+        data = json.loads(body)
+
+        assert status == 200
+        assert content_type == "application/json"
+        assert data["stats"]["current_count"] == 2
+        assert data["alerts"]["total_alerts"] == 0
+
+        _, content_type, body = _get(server, "/metrics")
+        assert content_type.startswith("text/plain")
+        assert b"person_detection_current_count 2.0" in body
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            _get(server, "/missing")
+        assert error.value.code == 404
+
+    def test_history_query(self, server):
+        """TC4: /api/history lọc lịch sử của DataLogger theo thời gian và limit"""
+        for count in (1, 2, 3):
+            server.data_logger.log_data({"current_count": count})
+            server.data_logger.data_buffer[-1]["timestamp"] = 1000.0 + count
+
+        _, _, body = _get(server, "/api/history?since=1002")
+        records = json.loads(body)["records"]
+        assert [r["person_count"] for r in records] == [2, 3]
+
+        _, _, body = _get(server, "/api/history?limit=1")
+        assert [r["person_count"] for r in json.loads(body)["records"]] == [3]
+
+    def test_rollup_and_bad_request(self, server):
+        """TC5: /api/rollup trả về bucket; tham số sai → 400"""
+        _, _, body = _get(server, "/api/rollup?resolution=60")
+        data = json.loads(body)
+
+        assert data["resolution"] == 60
+        assert sum(data["samples"]) == 1
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            _get(server, "/api/rollup?resolution=7")
+        assert error.value.code == 400
+
+    def test_websocket_events(self, server):
+        """TC6: WebSocket nhận sự kiện số đếm và cảnh báo mới"""
+        key = base64.b64encode(os.urandom(16)).decode()
+        sock, response = _connect(
+            server,
+            "/ws",
+            f"Upgrade: websocket\r\nConnection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n",
+        )
+        try:
+            assert response.startswith("HTTP/1.1 101")
+            assert websocket_accept_key(key) in response
+
+            _publish_until(server, lambda: server.alert_queues, stats={"n": 1})
+            server.publish(stats={"current_count": 7}, alert_info=None)
+            server.publish(
+                stats={"current_count": 8},
+                alert_info={"type": "warning", "excess_count": 3},
+            )
+
+            messages = []
+            while not any(m["type"] == "alert" for m in messages):
+                opcode, payload = _recv_ws_message(sock)
+                assert opcode == 0x1
+                messages.append(json.loads(payload))
+
+            assert messages[0]["type"] == "stats"
+            alert = [m for m in messages if m["type"] == "alert"][0]
+            assert alert["alert"]["excess_count"] == 3
+        finally:
+            sock.close()
+
+    def test_mjpeg_encoded_once_for_all_clients(self, server):
+        """TC7: MJPEG - frame mã hoá một lần, mọi client nhận cùng một JPEG"""
+        clients = [_connect(server, "/stream.mjpg") for _ in range(3)]
+        frame = np.full((48, 64, 3), 128, dtype=np.uint8)
+        try:
+            for _, response in clients:
+                assert "multipart/x-mixed-replace" in response
+
+            _publish_until(server, lambda: server.stream_clients == 3)
+            _publish_until(server, lambda: server.jpeg is not None, frame=frame)
+
+            parts = []
+            for sock, _ in clients:
+                header = b""
+                while not header.endswith(b"\r\n\r\n"):
+                    header += sock.recv(1)
+                length = int(header.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+                parts.append(_recv_exactly(sock, length))
+        finally:
+            for sock, _ in clients:
+                sock.close()
+
+        assert parts[0][:2] == b"\xff\xd8"  # JPEG SOI
+        assert parts[0] == parts[1] == parts[2]
+        assert server.counts["frames_encoded"] <= server.counts["frames_published"]
+
+    def test_stats_during_updates(self, server):
+        """TC8: /api/stats trong lúc thread khác update_count() và kiểm tra cảnh báo"""
+        counter = PersonCounter(tracker=PersonTracker(min_hits=1))
+        server.counter = counter
+        stop = threading.Event()
+        errors, snapshots = [], []
+
+        def update():
+            rng = random.Random(0)
+            while not stop.is_set():
+                detections = [
+                    {"bbox": [x * 20, 0, x * 20 + 15, 40], "confidence": 0.9}
+                    for x in rng.sample(range(40), rng.randint(0, 32))
+                ]
+                counter.update_count(detections, (480, 800, 3))
+                server.alert_system.check_stats(counter.get_all_stats())
+
+        def read():
+            while not stop.is_set():
+                try:
+                    snapshots.append(server.get_stats())
+                except Exception as e:  # pylint: disable=broad-except
+                    errors.append(e)
+
+        threads = [threading.Thread(target=update), threading.Thread(target=read)]
+        for thread in threads:
+            thread.start()
+        try:
+            time.sleep(1.0)
+            status, _, body = _get(server, "/api/stats")
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        assert status == 200
+        assert json.loads(body)["stats"]["total_frames"] > 0
+        assert errors == []
+        for snapshot in snapshots:
+            stats = snapshot["stats"]
+            assert stats["frames_with_persons"] <= stats["total_frames"]
+
+    def test_internal_error_is_500(self, server):
+        """TC9: Tham số sai → 400; lỗi khi xử lý (kể cả ValueError) → 500"""
+
+        class BrokenCounter:
+            def get_all_stats(self):
+                raise ValueError("operands could not be broadcast together")
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            _get(server, "/api/history?limit=abc")
+        assert error.value.code == 400
+
+        server.counter = BrokenCounter()
+        with pytest.raises(urllib.error.HTTPError) as error:
+            _get(server, "/api/stats")
+        assert error.value.code == 500
+        assert b"broadcast" not in error.value.read()
+
+    def test_nan_serialized_as_null(self, server):
+        """TC10: NaN/vô cực (kể cả kiểu NumPy, ô trống của CSV) → null trong JSON"""
+        data = {
+            "mean": float("nan"),
+            "fps": np.float64("inf"),
+            "rows": [{"count": np.float32("nan")}, (1.5, np.int64(2))],
+            "series": np.array([1.0, np.nan]),
+        }
+        assert json.loads(to_json(data)) == {
+            "mean": None,
+            "fps": None,
+            "rows": [{"count": None}, [1.5, 2]],
+            "series": [1.0, None],
+        }
+
+        # Record cũ thiếu cột fps
+        server.data_logger.log_data({"current_count": 1})
+        server.data_logger.data_buffer[-1]["fps"] = float("nan")
+
+        _, _, body = _get(server, "/api/history")
+        assert b"NaN" not in body
+        assert json.loads(body)["records"][0]["fps"] is None
+
+    def test_snapshot_is_current_frame(self, server):
+        """TC11: /snapshot.jpg trả về frame mới nhất dù không có client MJPEG"""
+        value = {"pixel": 50}
+        stop = threading.Event()
+
+        def publish():
+            while not stop.is_set():
+                frame = np.full((48, 64, 3), value["pixel"], dtype=np.uint8)
+                server.publish(frame=frame)
+                time.sleep(0.01)
+
+        thread = threading.Thread(target=publish)
+        thread.start()
+        try:
+            pixels = []
+            for pixel in (50, 200):
+                value["pixel"] = pixel
+                time.sleep(0.1)
+                status, content_type, body = _get(server, "/snapshot.jpg")
+                assert status == 200 and content_type == "image/jpeg"
+                image = cv2.imdecode(np.frombuffer(body, np.uint8), cv2.IMREAD_COLOR)
+                pixels.append(int(image.mean()))
+        finally:
+            stop.set()
+            thread.join()
+
+        assert abs(pixels[0] - 50) <= 3
+        assert abs(pixels[1] - 200) <= 3
+
+        # Nguồn video dừng: vẫn trả về frame cuối cùng
+        status, _, _ = _get(server, "/snapshot.jpg")
+        assert status == 200
@@ -0,0 +1,88 @@
+"""
+Unit tests for benchmark comparator
+"""
+
+import numpy as np
+import pytest
+
+from src.benchmark.compare import (
+    IMPROVEMENT,
+    MISSING,
+    NEW,
+    OK,
+    REGRESSION,
+    compare_reports,
+    find_regressions,
+    mann_whitney_u,
+    parse_thresholds,
+)
+from src.benchmark.suite import summarize
+
+
+def make_report(cases, seed=0):
+    """Tạo báo cáo benchmark từ {key: trung bình ms}, 30 mẫu nhiễu ±5%"""
+    rng = np.random.default_rng(seed)
+    results = []
+    for key, mean in cases.items():
+        samples = list(mean * (1 + rng.uniform(-0.05, 0.05, 30)))
+        results.append({"key": key, **summarize(samples), "samples_ms": samples})
+    return {"schema": 1, "results": results}
+
+
+class TestBenchmarkCompare:
+    """Test cases for compare_reports"""
+
+    def test_mann_whitney_detects_shift(self):
+        """TC1: Mẫu chậm hơn rõ rệt → p nhỏ; cùng phân bố → p lớn; tất cả bằng nhau → p=1"""
+        rng = np.random.default_rng(1)
+        baseline = rng.normal(10, 0.5, 40)
+
+        _, p_slower = mann_whitney_u(baseline + 2, baseline)
+        _, p_same = mann_whitney_u(rng.normal(10, 0.5, 40), baseline)
+        _, p_equal = mann_whitney_u([1.0] * 5, [1.0] * 5)
+
+        assert p_slower < 0.001
+        assert p_same > 0.01
+        assert p_equal == 1.0
+
+    def test_regression_flagged(self):
+        """TC2: Chậm 30% với ngưỡng 10% → REGRESSION"""
+        baseline = make_report({"draw/480p/10": 2.0}, seed=1)
+        current = make_report({"draw/480p/10": 2.6}, seed=2)
+
+        rows = compare_reports(current, baseline, thresholds={"median_ms": 0.1})
+
+        assert [row["status"] for row in rows] == [REGRESSION]
+        assert rows[0]["change_pct"] == pytest.approx(30, abs=5)
+        assert find_regressions(rows) == rows
+
+    def test_within_threshold_and_noise_ok(self):
+        """TC3: Chậm hơn nhưng dưới ngưỡng, hoặc chỉ là nhiễu → OK"""
+        baseline = make_report({"count/480p/10": 1.0}, seed=1)
+        slightly_slower = make_report({"count/480p/10": 1.05}, seed=2)
+        same = make_report({"count/480p/10": 1.0}, seed=3)
+
+        for current in (slightly_slower, same):
+            rows = compare_reports(current, baseline, thresholds={"median_ms": 0.1})
+            assert [row["status"] for row in rows] == [OK]
+
+    def test_improvement_new_and_missing(self):
+        """TC4: Nhanh hơn → IMPROVEMENT; trường hợp mới → NEW; bị bỏ → MISSING"""
+        baseline = make_report({"a/480p/0": 4.0, "b/480p/0": 1.0}, seed=1)
+        current = make_report({"a/480p/0": 2.0, "c/480p/0": 1.0}, seed=2)
+
+        rows = compare_reports(current, baseline, thresholds={"median_ms": 0.1})
+
+        status = {row["key"]: row["status"] for row in rows}
+        assert status == {"a/480p/0": IMPROVEMENT, "c/480p/0": NEW, "b/480p/0": MISSING}
+        assert find_regressions(rows) == []
+
+    def test_parse_thresholds(self):
+        """TC5: Đọc ngưỡng "metric=phần trăm", metric không hợp lệ → ValueError"""
+        assert parse_thresholds(None) is None
+        assert parse_thresholds(["median_ms=10", "p95_ms=25"]) == {
+            "median_ms": 0.1,
+            "p95_ms": 0.25,
+        }
+        with pytest.raises(ValueError):
+            parse_thresholds(["ops_per_sec=10"])
@@ -0,0 +1,84 @@
+"""
+Unit tests for BenchmarkSuite
+"""
+
+import numpy as np
+import pytest
+
+from src.benchmark.suite import (
+    COMPONENTS,
+    BenchmarkSuite,
+    ReplayModel,
+    load_report,
+    make_detection_sequence,
+    make_frame,
+    measure,
+    save_report,
+    summarize,
+)
+from src.core.person_detector import PersonDetector
+
+
+class TestBenchmarkSuite:
+    """Test cases for BenchmarkSuite class"""
+
+    def test_synthetic_data_is_deterministic(self):
+        """TC1: Cùng seed → cùng frame và cùng chuỗi detection"""
+        np.testing.assert_array_equal(make_frame(64, 48, 3), make_frame(64, 48, 3))
+        first = make_detection_sequence(640, 480, 20, length=5, seed=1)
+        second = make_detection_sequence(640, 480, 20, length=5, seed=1)
+
+        assert len(first) == 5
+        assert first[0].shape == (20, 6)
+        for a, b in zip(first, second):
+            np.testing.assert_array_equal(a, b)
+        # Box nằm trong frame
+        assert (first[-1][:, [0, 1]] >= 0).all()
+        assert (first[-1][:, 2] <= 640).all() and (first[-1][:, 3] <= 480).all()
+
+    def test_replay_model_drives_detector(self):
+        """TC2: PersonDetector với ReplayModel trả đúng số detection đã dựng"""
+        detector = PersonDetector()
+        detector.model = ReplayModel(make_detection_sequence(640, 480, 7, length=2))
+
+        detections = detector.detect_persons(make_frame(640, 480))
+
+        assert len(detections) == 7
+
+    def test_measure_and_summarize(self):
+        """TC3: measure trả đúng số mẫu, summarize tính thống kê (ms)"""
+        samples = measure(lambda: sum(range(100)), repeats=5, warmup=2)
+        stats = summarize([1.0, 2.0, 3.0, 4.0])
+
+        assert len(samples) == 5
+        assert all(s >= 0 for s in samples)
+        assert stats["mean_ms"] == 2.5
+        assert stats["median_ms"] == 2.5
+        assert stats["min_ms"] == 1.0 and stats["max_ms"] == 4.0
+        assert stats["ops_per_sec"] == 400
+
+    def test_run_all_components(self, tmp_path):
+        """TC4: Chạy đủ tổ hợp thành phần × độ phân giải × số detection, lưu/đọc JSON"""
+        suite = BenchmarkSuite(
+            resolutions=("480p",), detection_counts=(0, 5), repeats=3, warmup=1
+        )
+
+        report = suite.run()
+
+        keys = [r["key"] for r in report["results"]]
+        assert len(keys) == len(COMPONENTS) * 2
+        assert "pipeline/480p/5" in keys
+        assert all(len(r["samples_ms"]) == 3 for r in report["results"])
+        assert report["config"]["repeats"] == 3
+        assert "python" in report["environment"]
+
+        path = str(tmp_path / "bench.json")
+        save_report(report, path)
+        assert load_report(path)["results"][0]["key"] == keys[0]
+
+    def test_invalid_names_rejected(self):
+        """TC5: Tên độ phân giải/thành phần không hợp lệ → ValueError"""
+        with pytest.raises(ValueError):
+            BenchmarkSuite(resolutions=("8k",))
+        with pytest.raises(ValueError):
+            BenchmarkSuite(components=("inference",))
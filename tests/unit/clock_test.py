@@ -0,0 +1,75 @@
+"""
+Unit tests for Clock, ManualClock và FpsMeter
+"""
+
+import time
+
+import pytest
+
+from src.core.clock import Clock, FpsMeter, ManualClock
+
+
+class TestClock:
+    """Test cases for Clock và ManualClock"""
+
+    def test_monotonic_never_decreases(self):
+        """TC1: monotonic() không giảm giữa các lần đọc"""
+        clock = Clock()
+        readings = [clock.monotonic() for _ in range(100)]
+
+        assert readings == sorted(readings)
+        assert isinstance(clock.monotonic_ns(), int)
+
+    def test_to_wall_matches_wall_time(self):
+        """TC2: to_wall() đổi thời điểm monotonic sang Unix timestamp"""
+        clock = Clock()
+
+        assert abs(clock.to_wall(clock.monotonic()) - time.time()) < 0.1
+
+    def test_manual_clock_advance(self):
+        """TC3: ManualClock chỉ thay đổi khi gọi advance()"""
+        clock = ManualClock(start=10.0, wall_start=1_700_000_000.0)
+
+        assert clock.monotonic() == 10.0
+        clock.advance(2.5)
+        assert clock.monotonic() == 12.5
+        assert clock.wall() == 1_700_000_002.5
+        assert clock.to_wall(10.0) == 1_700_000_000.0
+
+
+class TestFpsMeter:
+    """Test cases for FpsMeter class"""
+
+    def test_invalid_window_raises(self):
+        """TC4: window < 2 → ValueError"""
+        with pytest.raises(ValueError):
+            FpsMeter(window=1)
+
+    def test_not_enough_frames(self):
+        """TC5: Chưa đủ 2 frame hoặc thời gian bằng 0 → FPS = 0"""
+        meter = FpsMeter(window=5)
+        assert meter.get_fps() == 0.0
+
+        meter.tick(1.0)
+        assert meter.get_fps() == 0.0
+
+        meter.tick(1.0)
+        assert meter.get_fps() == 0.0
+
+    def test_sliding_window(self):
+        """TC6: FPS chỉ tính trên window frame gần nhất"""
+        meter = FpsMeter(window=5)
+        # 10 frame đầu ở 10 FPS, sau đó 5 frame ở 50 FPS
+        timestamp = 0.0
+        for _ in range(10):
+            timestamp += 0.1
+            meter.tick(timestamp)
+        assert meter.get_fps() == pytest.approx(10.0)
+
+        for _ in range(5):
+            timestamp += 0.02
+            meter.tick(timestamp)
+        assert meter.get_fps() == pytest.approx(50.0)
+
+        meter.reset()
+        assert meter.get_fps() == 0.0
@@ -1,9 +1,10 @@
 """
-Unit tests for DataLogger - 23 Test Cases theo đặc tả
+Unit tests for DataLogger - 32 Test Cases theo đặc tả
 """
 
 import os
 import time
+from datetime import datetime
 
 import pandas as pd
 import pytest
@@ -348,3 +349,175 @@ class TestDataLogger:
         assert abs(record["detection_rate"] - 0.8) < 0.001  # round 3 chữ số
         assert abs(record["fps"] - 30.5) < 0.01  # round 2 chữ số
         assert abs(record["running_time"] - 120.5) < 0.01  # round 2 chữ số
+
+    def test_zone_counts_saved_to_separate_csv(self, logger, sample_stats):
+        """TC24: Số đếm vạch/vùng được lưu vào file *_zones.csv riêng"""
+        sample_stats["lines"] = {"door": {"in": 7, "out": 3}}
+        sample_stats["zones"] = {
+            "queue": {"count": 2, "entered": 5, "exited": 3, "max_count": None}
+        }
+
+        logger.log_data(sample_stats)
+        logger.save_to_csv()
+
+        df = pd.read_csv(logger.zone_filename)
+        assert df["name"].tolist() == ["door", "queue"]
+        assert df["kind"].tolist() == ["line", "zone"]
+        assert df["count"].tolist() == [4, 2]
+        assert df["in_count"].tolist() == [7, 5]
+        # File chính giữ nguyên định dạng cũ
+        assert "lines" not in pd.read_csv(logger.filename).columns
+
+    def test_log_data_count_key(self, temp_csv_file, sample_stats):
+        """TC25: Cột person_count lấy theo count_key"""
+        sample_stats["reported_count"] = 4
+        raw = DataLogger(filename=temp_csv_file, enabled=True)
+        smoothed = DataLogger(
+            filename=temp_csv_file, enabled=True, count_key="reported_count"
+        )
+
+        raw.log_data(sample_stats)
+        smoothed.log_data(sample_stats)
+
+        assert raw.data_buffer[0]["person_count"] == 5
+        assert smoothed.data_buffer[0]["person_count"] == 4
+
+    def test_save_rollup_csv(self, logger, tmp_path):
+        """TC26: Xuất rollup ra CSV, mỗi bucket một dòng"""
+        from src.core.rollup import TimeRollup
+
+        rollup = TimeRollup(resolutions=[(60, 10), (3600, 5)])
+        for offset, value in [(0, 2), (30, 4), (90, 6)]:
+            rollup.add(value, 1_700_000_040 + offset)
+        filename = str(tmp_path / "rollup.csv")
+
+        rows = logger.save_rollup_csv(rollup, filename)
+
+        df = pd.read_csv(filename)
+        assert rows == 3
+        assert df["resolution"].tolist() == [60, 60, 3600]
+        assert df["mean"].tolist() == [3.0, 6.0, 4.0]
+        assert "datetime" in df.columns
+
+    def test_save_latency_json(self, logger, tmp_path):
+        """TC27: Xuất histogram độ trễ ra JSON"""
+        import json
+
+        from src.core.latency import LatencyRecorder
+
+        latency = LatencyRecorder()
+        latency.record("decode", 0.001)
+        latency.record("draw", 0.004)
+        filename = str(tmp_path / "latency.json")
+
+        stages = logger.save_latency_json(latency, filename)
+
+        with open(filename, encoding="utf-8") as f:
+            data = json.load(f)
+        assert stages == 2
+        assert set(data["stages"]) == {"decode", "draw"}
+        assert data["stages"]["draw"]["count"] == 1
+        assert "p95_ms" in data["stages"]["decode"]
+        assert data["stages"]["decode"]["buckets"]
+
+    def test_query_history(self, logger):
+        """TC28: Truy vấn lịch sử gồm record đã ghi file và record trong buffer"""
+        for count in (1, 2):
+            logger.log_data({"current_count": count})
+            logger.data_buffer[-1]["timestamp"] = 1000.0 + count
+        logger.save_to_csv()
+        logger.log_data({"current_count": 3})
+        logger.data_buffer[-1]["timestamp"] = 1003.0
+
+        assert [r["person_count"] for r in logger.query_history()] == [1, 2, 3]
+        assert [r["person_count"] for r in logger.query_history(since=1002)] == [2, 3]
+        assert [r["person_count"] for r in logger.query_history(until=1001)] == [1]
+        assert [r["person_count"] for r in logger.query_history(limit=2)] == [2, 3]
+
+    def test_log_data_explicit_timestamp(self, logger):
+        """TC29: Ghi record với thời điểm cho trước (xử lý video offline)"""
+        timestamp = 1700000000.0
+
+        logger.log_data({"current_count": 2}, timestamp=timestamp)
+
+        record = logger.data_buffer[-1]
+        assert record["timestamp"] == timestamp
+        assert record["datetime"] == datetime.fromtimestamp(timestamp).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )
+
+    def test_creates_missing_directory(self, tmp_path, sample_stats):
+        """TC30: Thư mục của file CSV chưa tồn tại → tự tạo khi tạo file"""
+        filename = tmp_path / "processed" / "daily" / "counts.csv"
+
+        logger = DataLogger(filename=str(filename), enabled=True)
+        logger.save_immediate(sample_stats)
+
+        assert filename.exists()
+        assert len(logger.load_data()) == 1
+
+    def test_query_history_reads_incrementally(self, logger):
+        """TC31: Lịch sử chỉ đọc phần file ghi thêm; file bị xoá/tạo lại → đọc lại"""
+        for count in (1, 2):
+            logger.log_data({"current_count": count})
+        logger.save_to_csv()
+        assert [r["person_count"] for r in logger.query_history()] == [1, 2]
+        offset = logger._history_offset
+        assert offset == os.path.getsize(logger.filename)
+
+        # Dòng đang ghi dở chưa được đọc
+        logger.log_data({"current_count": 3})
+        logger.save_to_csv()
+        with open(logger.filename, "a", encoding="utf-8") as f:
+            f.write(f"{time.time() + 60},2030-01-01 00:00:00,4")
+
+        records = logger.query_history()
+        assert [r["person_count"] for r in records] == [1, 2, 3]
+        assert isinstance(records[0]["timestamp"], float)
+        assert records[0]["datetime"] == logger._history[0]["datetime"]
+        assert logger._history_offset > offset
+
+        with open(logger.filename, "a", encoding="utf-8") as f:
+            f.write(",4,4.0,4,4,4,100.0,,1.0\n")
+        records = logger.query_history()
+        assert [r["person_count"] for r in records] == [1, 2, 3, 4]
+        assert records[-1]["fps"] is None
+
+        logger.clear_data()
+        assert logger.query_history() == []
+
+    def test_query_history_bounded_cache(self, temp_csv_file, monkeypatch):
+        """TC32: Chỉ giữ history_cache record gần nhất; khoảng cũ đọc lại từ file"""
+        logger = DataLogger(
+            filename=temp_csv_file, enabled=True, history_cache=3, index_stride=2
+        )
+        # Timestamp không tăng dần: record 2000 nằm trong khoảng đã rời bộ nhớ
+        timestamps = [1000, 2000, 1001, 1002, 1003, 1004, 1005, 1006, 1007]
+        for count, timestamp in enumerate(timestamps):
+            logger.log_data({"current_count": count}, timestamp=timestamp)
+        logger.save_to_csv()
+        logger.log_data({"current_count": 9}, timestamp=1008)
+
+        def counts(**kwargs):
+            return [r["person_count"] for r in logger.query_history(**kwargs)]
+
+        assert counts() == [0, 2, 3, 4, 5, 6, 7, 8, 9, 1]
+        assert len(logger._history) == 3
+        assert len(logger._index_offsets) == 5
+        assert counts(since=1004) == [5, 6, 7, 8, 9, 1]
+        assert counts(since=1500) == [1]
+        assert counts(until=1002) == [0, 2, 3]
+        assert counts(since=1001, until=1003, limit=2) == [3, 4]
+
+        # Record mới nhất nằm trong bộ nhớ → không đọc lại file
+        def fail(*args):
+            raise AssertionError("không cần đọc lại file")
+
+        logger.log_data({"current_count": 10}, timestamp=3000)
+        monkeypatch.setattr(logger, "_read_older", fail)
+        assert counts(limit=1) == [10]
+        assert counts(since=2500) == [10]
+        assert counts(limit=0) == []
+
+        with pytest.raises(ValueError):
+            DataLogger(filename=temp_csv_file, history_cache=0)
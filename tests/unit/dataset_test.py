@@ -0,0 +1,91 @@
+"""
+Unit tests for YOLO dataset helpers
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from src.core.dataset import (
+    label_dir,
+    list_samples,
+    load_data_yaml,
+    load_labels,
+    person_label_ids,
+    sample_images,
+)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """Dataset kiểu Roboflow: data.yaml ghi "../train/images", 3 label, 2 ảnh"""
+    (tmp_path / "data.yaml").write_text(
+        "train: ../train/images\nval: ../valid/images\nnc: 1\nnames: ['person']\n",
+        encoding="utf-8",
+    )
+    images = tmp_path / "train" / "images"
+    labels = tmp_path / "train" / "labels"
+    images.mkdir(parents=True)
+    labels.mkdir(parents=True)
+    for stem in ("a", "b", "c"):
+        (labels / f"{stem}.txt").write_text("0 0.5 0.5 0.2 0.4\n", encoding="utf-8")
+    for stem in ("a", "c"):
+        (images / f"{stem}.jpg").write_bytes(b"")
+    (images / "notes.txt").write_text("", encoding="utf-8")
+    return tmp_path
+
+
+class TestDataset:
+    """Test cases for dataset helpers"""
+
+    def test_load_data_yaml_resolves_splits(self, dataset):
+        """TC1: Đường dẫn "../" của Roboflow được sửa về thư mục cạnh data.yaml; names list → dict"""
+        data = load_data_yaml(str(dataset / "data.yaml"))
+
+        assert data["names"] == {0: "person"}
+        assert data["splits"]["train"] == str(dataset / "train" / "images")
+        assert data["splits"]["val"] == str(dataset / "valid" / "images")
+        assert "test" not in data["splits"]
+        assert label_dir(data["splits"]["train"]) == str(dataset / "train" / "labels")
+
+    def test_list_and_sample(self, dataset):
+        """TC2: Liệt kê cặp ảnh/label, bỏ label không có ảnh khi yêu cầu, chọn mẫu theo seed"""
+        image_dir = str(dataset / "train" / "images")
+
+        samples = list_samples(image_dir)
+        assert [os.path.basename(label) for _, label in samples] == [
+            "a.txt",
+            "b.txt",
+            "c.txt",
+        ]
+        assert samples[1][0] is None
+        assert len(list_samples(image_dir, require_images=True)) == 2
+
+        assert len(sample_images(image_dir, 0)) == 2
+        picked = sample_images(image_dir, 1, seed=3)
+        assert len(picked) == 1
+        assert sample_images(image_dir, 1, seed=3) == picked
+        assert list_samples(str(dataset / "missing" / "images")) == []
+
+    def test_load_labels_to_pixels(self, tmp_path):
+        """TC3: Toạ độ chuẩn hoá được chuyển thành x1, y1, x2, y2 theo pixel; file rỗng → (0, 5)"""
+        path = tmp_path / "label.txt"
+        path.write_text("0 0.5 0.5 0.2 0.4\n1 0.25 0.25 0.5 0.5\n\n", encoding="utf-8")
+
+        labels = load_labels(str(path), 200, 100)
+        np.testing.assert_allclose(
+            labels, [[80, 30, 120, 70, 0], [0, 0, 100, 50, 1]], atol=1e-4
+        )
+
+        path.write_text("", encoding="utf-8")
+        assert load_labels(str(path), 200, 100).shape == (0, 5)
+
+    def test_person_label_ids(self):
+        """TC4: Class người theo tên trong data.yaml; không có class nào khớp → ValueError"""
+        assert person_label_ids({0: "1", 1: "person"}) == (0, 1)
+        assert person_label_ids({0: "car", 1: " Person "}) == (1,)
+        assert person_label_ids({0: "a", 1: "b"}, person_names=("b",)) == (1,)
+
+        with pytest.raises(ValueError):
+            person_label_ids({0: "car"})
@@ -0,0 +1,161 @@
+"""
+Unit tests for AccuracySweep
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from src.benchmark.accuracy import MAP_CONFIDENCE
+from src.benchmark.evaluation import AccuracySweep
+from src.benchmark.suite import _Result
+from src.core.person_detector import PersonDetector
+
+# Prediction theo giá trị pixel của ảnh (ảnh 1: một người + box trùng lặp,
+# ảnh 2: hai người, một người confidence thấp). Label dùng cả hai class của
+# dataset ('1' và 'person' đều là người)
+PREDICTIONS = {
+    1: [[30, 30, 70, 70, 0.9, 0], [32, 30, 72, 70, 0.6, 0]],
+    2: [[10, 10, 40, 40, 0.8, 0], [60, 60, 90, 90, 0.3, 0]],
+}
+LABELS = {
+    1: "0 0.5 0.5 0.4 0.4\n",
+    2: "0 0.25 0.25 0.3 0.3\n1 0.75 0.75 0.3 0.3\n",
+}
+
+
+class LookupModel:
+    """Model giả: trả prediction theo giá trị pixel, ghi lại tham số inference"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, source, **kwargs):
+        self.calls.append(kwargs)
+        boxes = PREDICTIONS.get(int(source[0, 0, 0]), [])
+        return [_Result(np.array(boxes, dtype=np.float32).reshape(-1, 6))]
+
+
+@pytest.fixture
+def samples(tmp_path):
+    """Hai ảnh 100x100 có label"""
+    samples = []
+    for value, label in LABELS.items():
+        image = tmp_path / f"{value}.png"
+        cv2.imwrite(str(image), np.full((100, 100, 3), value, dtype=np.uint8))
+        path = tmp_path / f"{value}.txt"
+        path.write_text(label, encoding="utf-8")
+        samples.append((str(image), str(path)))
+    return samples
+
+
+def make_factory(model):
+    """Tạo PersonDetector dùng model giả, không kiểm tra GPU"""
+
+    def factory(variant):
+        detector = PersonDetector("missing.pt", variant=variant)
+        detector.model = model
+        detector._device, detector._use_gpu = "cpu", False
+        return detector
+
+    return factory
+
+
+def make_sweep(samples, tmp_path, model, label_ids=(0, 1)):
+    return AccuracySweep(
+        samples,
+        model_path="missing.pt",
+        variants=("pt",),
+        imgsz=(64,),
+        iou_thresholds=(0.95, 0.5),
+        confidences=(0.5, 0.25),
+        cache_dir=tmp_path / "cache",
+        detector_factory=make_factory(model),
+        label_ids=label_ids,
+    )
+
+
+def find(report, iou, confidence):
+    """Dòng kết quả của một cặp ngưỡng"""
+    (row,) = [
+        row
+        for row in report["results"]
+        if row["iou"] == iou and row["confidence"] == confidence
+    ]
+    return row
+
+
+class TestAccuracySweep:
+    """Test cases for AccuracySweep class"""
+
+    def test_sweep_rescored_from_one_run(self, samples, tmp_path):
+        """TC1: Một lần inference (confidence thấp, NMS lớn nhất) cho mọi ngưỡng IoU/confidence"""
+        model = LookupModel()
+        report = make_sweep(samples, tmp_path, model).run()
+
+        inference = [call for call in model.calls if call["imgsz"] == 64]
+        assert {call["conf"] for call in inference} == {MAP_CONFIDENCE}
+        assert {call["iou"] for call in inference} == {0.95}
+        assert len(report["results"]) == 4
+        (run,) = report["runs"]
+        assert run["images"] == 2 and not run["cached"]
+        assert run["fps"] > 0
+
+        # NMS 0.95 giữ box trùng lặp: đếm thừa ảnh 1, thiếu ảnh 2
+        loose = find(report, 0.95, 0.5)
+        assert (loose["tp"], loose["fp"], loose["fn"]) == (2, 1, 1)
+        assert loose["count_mae"] == pytest.approx(1.0)
+        assert loose["count_bias"] == pytest.approx(0.0)
+
+        # NMS 0.5 áp dụng lại trên prediction đã lưu: box trùng lặp bị loại
+        strict = find(report, 0.5, 0.5)
+        assert (strict["tp"], strict["fp"], strict["fn"]) == (2, 0, 1)
+        assert strict["precision"] == pytest.approx(1.0)
+        assert strict["recall"] == pytest.approx(2 / 3)
+        assert strict["map50"] == pytest.approx(1.0)
+        assert loose["map50"] < strict["map50"]
+
+        best = report["best"]["f1"]
+        assert (best["iou"], best["confidence"], best["f1"]) == (0.5, 0.25, 1.0)
+        assert report["best"]["count_mae"]["count_mae"] == 0.0
+
+    def test_cached_predictions_reused(self, samples, tmp_path):
+        """TC2: Lần chạy sau dùng prediction trong cache, không gọi model; đổi cấu hình → chạy lại"""
+        first = make_sweep(samples, tmp_path, LookupModel()).run()
+
+        model = LookupModel()
+        second = make_sweep(samples, tmp_path, model).run()
+        assert model.calls == []
+        assert second["runs"][0]["cached"]
+        assert second["results"] == first["results"]
+
+        changed = make_sweep(samples[:1], tmp_path, model).run()
+        assert not changed["runs"][0]["cached"]
+        assert changed["runs"][0]["images"] == 1
+
+    def test_invalid_configuration(self, samples, tmp_path):
+        """TC3: Không có ảnh hoặc danh sách quét rỗng → ValueError"""
+        with pytest.raises(ValueError):
+            AccuracySweep([], cache_dir=None)
+        with pytest.raises(ValueError):
+            AccuracySweep(samples, confidences=(), cache_dir=None)
+
+    def test_label_class_mapping(self, samples, tmp_path):
+        """TC4: Chỉ label thuộc label_ids là ground truth; đổi label_ids → khoá cache khác"""
+        make_sweep(samples, tmp_path, LookupModel()).run()
+
+        model = LookupModel()
+        report = make_sweep(samples, tmp_path, model, label_ids=None).run()
+
+        # Không ánh xạ: chỉ class 0 (person_class_id), người class 1 của ảnh 2
+        # thành false positive
+        assert not report["runs"][0]["cached"] and model.calls
+        row = find(report, 0.5, 0.25)
+        assert (row["tp"], row["fp"], row["fn"]) == (2, 1, 0)
+        assert report["config"]["label_ids"] is None
+
+        sweep = make_sweep(samples, tmp_path, model)
+        assert sweep.cache_key("pt", 64) != make_sweep(
+            samples, tmp_path, model, label_ids=None
+        ).cache_key("pt", 64)
+        assert sweep.person_label_ids() == (0, 1)
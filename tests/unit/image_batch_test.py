@@ -0,0 +1,185 @@
+"""
+Unit tests for ImageBatchProcessor
+"""
+
+import csv
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core import image_batch
+from src.core.image_batch import (
+    ImageBatchProcessor,
+    iter_image_files,
+    prefetch_images,
+)
+
+
+class FakeDetector:
+    """Detector giả: số người = độ sáng / 50, ghi lại kích thước từng batch"""
+
+    def __init__(self):
+        self.batches = []
+
+    def detect_array_batch(self, frames):
+        self.batches.append([frame.shape for frame in frames])
+        arrays = []
+        for frame in frames:
+            count = int(round(frame.mean() / 50))
+            boxes = np.tile(
+                np.array([1, 2, 11, 22, 0.9, 0], dtype=np.float32), (count, 1)
+            )
+            arrays.append(boxes.reshape(count, 6))
+        return arrays
+
+
+class StopProcessing(Exception):
+    """Giả lập chương trình bị dừng giữa chừng"""
+
+
+@pytest.fixture
+def image_dir(tmp_path):
+    """
+    Thư mục 10 ảnh hai kích thước (ảnh thứ i có i % 4 người), một thư mục con,
+    một file ảnh hỏng và một file không phải ảnh
+    """
+    root = tmp_path / "images"
+    (root / "sub").mkdir(parents=True)
+    for i in range(10):
+        shape = (40, 60, 3) if i % 3 else (30, 50, 3)
+        folder = root / "sub" if i >= 8 else root
+        cv2.imwrite(
+            str(folder / f"img_{i:02d}.png"), np.full(shape, 50 * (i % 4), np.uint8)
+        )
+    (root / "img_05b.jpg").write_bytes(b"not an image")
+    (root / "notes.txt").write_text("bỏ qua")
+    return str(root)
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestImageBatchProcessor:
+    """Test cases for ImageBatchProcessor class"""
+
+    def test_iter_image_files_sorted(self, image_dir):
+        """TC1: Chỉ lấy file ảnh, thứ tự cố định, duyệt cả thư mục con"""
+        names = [os.path.relpath(p, image_dir) for p in iter_image_files(image_dir)]
+
+        assert len(names) == 11
+        assert names[:3] == ["img_00.png", "img_01.png", "img_02.png"]
+        assert names[-2:] == [
+            os.path.join("sub", "img_08.png"),
+            os.path.join("sub", "img_09.png"),
+        ]
+
+    def test_prefetch_keeps_order(self, image_dir):
+        """TC2: Giải mã song song nhưng trả về đúng thứ tự, ảnh hỏng → None"""
+        paths = list(iter_image_files(image_dir))
+
+        results = list(prefetch_images(paths, workers=3, prefetch=4))
+
+        assert [p for p, _ in results] == paths
+        assert [image is None for _, image in results].count(True) == 1
+
+    def test_jsonl_output_batches_same_shape(self, image_dir, tmp_path):
+        """TC3: Mỗi batch chỉ gồm ảnh cùng kích thước, kết quả ghi đúng thứ tự"""
+        detector = FakeDetector()
+        output = str(tmp_path / "result.jsonl")
+        processor = ImageBatchProcessor(
+            detector, decode_workers=2, prefetch=4, batch_size=3
+        )
+
+        summary = processor.process(image_dir, output)
+
+        assert all(len(set(batch)) == 1 for batch in detector.batches)
+        assert max(len(batch) for batch in detector.batches) == 3
+        records = read_jsonl(output)
+        assert [r["path"] for r in records][-1] == "sub/img_09.png"
+        assert [r["count"] for r in records if not r["error"]] == [
+            i % 4 for i in range(10)
+        ]
+        assert records[1]["boxes"] == [[1, 2, 11, 22, 0.9]]
+        assert summary["images"] == 11
+        assert summary["errors"] == 1
+        assert summary["persons"] == sum(i % 4 for i in range(10))
+        assert summary["images_per_sec"] > 0
+
+    def test_csv_output(self, image_dir, tmp_path):
+        """TC4: Xuất CSV, cột boxes là chuỗi JSON"""
+        output = str(tmp_path / "result.csv")
+
+        ImageBatchProcessor(FakeDetector(), batch_size=4).process(image_dir, output)
+
+        with open(output, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 11
+        assert rows[0]["width"] == "50" and rows[0]["height"] == "30"
+        assert json.loads(rows[3]["boxes"]) == [[1, 2, 11, 22, 0.9]] * 3
+
+    def test_resume_from_checkpoint(self, image_dir, tmp_path):
+        """TC5: Dừng giữa chừng rồi chạy lại → tiếp tục từ checkpoint, không trùng"""
+        output = str(tmp_path / "result.jsonl")
+
+        def stop(processed, rate):
+            if processed >= 4:
+                raise StopProcessing
+
+        processor = ImageBatchProcessor(
+            FakeDetector(), batch_size=2, checkpoint_interval=2
+        )
+        with pytest.raises(StopProcessing):
+            processor.process(image_dir, output, progress=stop)
+
+        summary = processor.process(image_dir, output)
+
+        assert summary["resumed_from"] >= 4
+        assert summary["resumed_from"] + summary["images"] == 11
+        paths = [r["path"] for r in read_jsonl(output)]
+        assert len(paths) == len(set(paths)) == 11
+
+    def test_checkpoint_from_other_format_rejected(self, image_dir, tmp_path):
+        """TC6: Checkpoint của định dạng khác → ValueError; resume=False chạy lại từ đầu"""
+        output = str(tmp_path / "result.jsonl")
+        processor = ImageBatchProcessor(FakeDetector())
+        processor.process(image_dir, output)
+
+        with pytest.raises(ValueError):
+            processor.process(image_dir, output, fmt="csv")
+        summary = processor.process(image_dir, output, fmt="csv", resume=False)
+        assert summary["resumed_from"] == 0
+
+    def test_parquet_output(self, image_dir, tmp_path):
+        """TC7: Xuất Parquet thành thư mục part file (cần pyarrow)"""
+        pq = pytest.importorskip("pyarrow.parquet")
+        output = str(tmp_path / "result.parquet")
+
+        ImageBatchProcessor(FakeDetector(), checkpoint_interval=5).process(
+            image_dir, output
+        )
+
+        table = pq.read_table(output)
+        assert table.num_rows == 11
+
+    def test_prefetch_close_cancels_pending(self, monkeypatch):
+        """TC8: Đóng generator sớm → các ảnh chưa giải mã bị huỷ"""
+        started = []
+
+        def slow_read(path):
+            started.append(path)
+            time.sleep(0.05)
+            return None
+
+        monkeypatch.setattr(image_batch, "read_image", slow_read)
+        images = prefetch_images([f"{i}.jpg" for i in range(20)], workers=1, prefetch=8)
+
+        assert next(images) == ("0.jpg", None)
+        images.close()
+
+        assert len(started) < 8
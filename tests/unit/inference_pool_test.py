@@ -0,0 +1,203 @@
+"""
+Unit tests for InferencePool
+"""
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.core.inference_pool import InferencePool
+from src.core.roi import RegionOfInterest
+
+
+class FakeDetector:
+    """Detector giả: trả về 1 box phủ toàn frame, confidence = độ sáng trung bình"""
+
+    def __init__(self):
+        self.confidence_threshold = 0.5
+        self.iou_threshold = 0.35
+
+    def detect_array(self, frame):
+        if frame.mean() == 0:
+            return np.empty((0, 6), dtype=np.float32)
+        h, w = frame.shape[:2]
+        return np.array([[0, 0, w, h, frame.mean() / 255.0, 0]], dtype=np.float32)
+
+
+class FailingDetector(FakeDetector):
+    """Detector giả luôn lỗi"""
+
+    def detect_array(self, frame):
+        raise RuntimeError("model lỗi")
+
+
+class ColdDetector(FakeDetector):
+    """Detector giả không warm-up được"""
+
+    warmup_error = "không load được model"
+
+    def warm_up(self):
+        return False
+
+
+class CrashingDetector(FakeDetector):
+    """Detector giả làm worker process chết giữa chừng"""
+
+    def detect_array(self, frame):
+        os._exit(1)
+
+
+class SlowDetector(FakeDetector):
+    """Detector giả xử lý chậm frame có độ sáng 1"""
+
+    def detect_array(self, frame):
+        if frame.mean() == 1:
+            time.sleep(1.0)
+        return super().detect_array(frame)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    """Pool 2 worker dùng FakeDetector"""
+    with InferencePool(
+        num_workers=2,
+        num_slots=3,
+        max_frame_shape=(120, 160, 3),
+        detector_factory=FakeDetector,
+    ) as p:
+        yield p
+
+
+class TestInferencePool:
+    """Test cases for InferencePool class"""
+
+    def test_detect_array_reads_frame_from_shared_memory(self, pool):
+        """TC1: Worker đọc đúng nội dung frame qua shared memory"""
+        frame = np.full((120, 160, 3), 51, dtype=np.uint8)
+
+        boxes = pool.detect_array(frame)
+
+        assert boxes.shape == (1, 6)
+        assert boxes.dtype == np.float32
+        np.testing.assert_allclose(boxes[0], [0, 0, 160, 120, 0.2, 0], atol=1e-6)
+
+    def test_detect_persons_returns_dicts(self, pool):
+        """TC2: detect_persons trả về cùng định dạng với PersonDetector"""
+        frame = np.full((60, 80, 3), 255, dtype=np.uint8)
+
+        detections = pool.detect_persons(frame)
+
+        assert detections == [
+            {"bbox": [0, 0, 80, 60], "confidence": 1.0, "class_id": 0}
+        ]
+
+    def test_empty_result(self, pool):
+        """TC3: Frame không có người → mảng rỗng"""
+        frame = np.zeros((120, 160, 3), dtype=np.uint8)
+
+        assert pool.detect_array(frame).shape == (0, 6)
+
+    def test_map_preserves_order_with_slot_reuse(self, pool):
+        """TC4: map giữ thứ tự và tái sử dụng slot khi số frame > số slot"""
+        frames = [np.full((120, 160, 3), v, dtype=np.uint8) for v in range(1, 21)]
+
+        results = list(pool.map(frames))
+
+        confidences = [boxes[0, 4] for boxes in results]
+        np.testing.assert_allclose(
+            confidences, [v / 255.0 for v in range(1, 21)], atol=1e-6
+        )
+
+    def test_frame_too_large_raises(self, pool):
+        """TC5: Frame lớn hơn slot → ValueError"""
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+
+        with pytest.raises(ValueError):
+            pool.submit(frame)
+
+    def test_worker_error_returns_empty(self):
+        """TC6: Lỗi trong worker không làm treo pool"""
+        with InferencePool(
+            num_workers=1,
+            max_frame_shape=(10, 10, 3),
+            detector_factory=FailingDetector,
+        ) as failing_pool:
+            frame = np.ones((10, 10, 3), dtype=np.uint8)
+
+            assert failing_pool.detect_persons(frame) == []
+
+    def test_submit_after_close_raises(self):
+        """TC7: Không nhận frame sau khi đã đóng"""
+        closed_pool = InferencePool(
+            num_workers=1, max_frame_shape=(10, 10, 3), detector_factory=FakeDetector
+        )
+        closed_pool.close()
+
+        with pytest.raises(RuntimeError):
+            closed_pool.submit(np.zeros((10, 10, 3), dtype=np.uint8))
+
+    def test_wait_until_ready(self, pool):
+        """TC8: Pool sẵn sàng khi mọi worker đã khởi động; warm-up lỗi → failed"""
+        assert pool.wait_until_ready(timeout=30)
+        status = pool.get_warmup_status()
+        assert status["state"] == "ready"
+        assert status["progress"] == 1.0
+
+        with InferencePool(
+            num_workers=1, max_frame_shape=(10, 10, 3), detector_factory=ColdDetector
+        ) as cold_pool:
+            assert not cold_pool.wait_until_ready(timeout=30)
+            status = cold_pool.get_warmup_status()
+            assert status["state"] == "failed"
+            assert status["error"] == "không load được model"
+
+    def test_map_skips_empty_roi_crop(self, pool):
+        """TC9: map không gửi crop rỗng (ROI ngoài frame) mà trả về mảng (0, 6)"""
+        frames = [np.full((120, 160, 3), 51, dtype=np.uint8) for _ in range(3)]
+        pool.set_region(RegionOfInterest(roi=[(500, 500), (600, 500), (600, 600)]))
+        try:
+            results = list(pool.map(frames))
+        finally:
+            pool.set_region(None)
+
+        assert [boxes.shape for boxes in results] == [(0, 6)] * 3
+
+    def test_dead_worker_raises_instead_of_hanging(self):
+        """TC10: Worker chết khi đang xử lý → RuntimeError, không treo"""
+        with InferencePool(
+            num_workers=1,
+            max_frame_shape=(10, 10, 3),
+            detector_factory=CrashingDetector,
+            timeout=30,
+        ) as crashed_pool:
+            assert crashed_pool.wait_until_ready(timeout=30)
+            frame = np.ones((10, 10, 3), dtype=np.uint8)
+
+            start = time.perf_counter()
+            with pytest.raises(RuntimeError):
+                crashed_pool.detect_array(frame)
+
+            assert time.perf_counter() - start < 10
+            assert crashed_pool.detect_persons(frame) == []
+
+    def test_result_timeout_discards_late_result(self):
+        """TC11: Hết thời gian chờ → TimeoutError, kết quả đến muộn bị bỏ đi"""
+        with InferencePool(
+            num_workers=1,
+            max_frame_shape=(10, 10, 3),
+            detector_factory=SlowDetector,
+            timeout=0.2,
+        ) as slow_pool:
+            assert slow_pool.wait_until_ready(timeout=30)
+
+            with pytest.raises(TimeoutError):
+                slow_pool.detect_array(np.ones((10, 10, 3), dtype=np.uint8))
+
+            slow_pool.timeout = 30
+            boxes = slow_pool.detect_array(np.full((10, 10, 3), 51, dtype=np.uint8))
+
+            np.testing.assert_allclose(boxes[0, 4], 0.2, atol=1e-6)
+            assert slow_pool._results == {}
+            assert slow_pool._abandoned == set()
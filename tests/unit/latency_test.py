@@ -0,0 +1,86 @@
+"""
+Unit tests for LatencyHistogram và LatencyRecorder
+"""
+
+import numpy as np
+import pytest
+
+from src.core.latency import LatencyHistogram, LatencyRecorder
+
+
+class TestLatencyHistogram:
+    """Test cases for LatencyHistogram class"""
+
+    def test_invalid_arguments_raise(self):
+        """TC1: precision_bits/max_seconds không hợp lệ → ValueError"""
+        with pytest.raises(ValueError):
+            LatencyHistogram(precision_bits=1)
+        with pytest.raises(ValueError):
+            LatencyHistogram(max_seconds=0)
+
+    def test_buckets_cover_all_values(self):
+        """TC2: Mỗi giá trị nằm trong đúng bucket của nó, độ rộng bucket ≤ 3%"""
+        histogram = LatencyHistogram(max_seconds=1, precision_bits=6)
+
+        for value in range(0, 1_000_000, 97):
+            low, high = histogram._bucket_bounds(histogram._index(value))
+            assert low <= value < high
+            assert high - low <= max(1, low / 32)
+
+    def test_fixed_size(self):
+        """TC3: Số bucket cố định, giá trị quá lớn bị gộp vào bucket cuối"""
+        histogram = LatencyHistogram(max_seconds=1, precision_bits=6)
+        size = len(histogram.counts)
+
+        histogram.record(5.0)
+        histogram.record(-1.0)
+
+        assert len(histogram.counts) == size
+        assert histogram.counts[-1] == 1
+        assert histogram.counts[0] == 1
+        assert histogram.get_stats()["max_ms"] == 1000.0
+
+    def test_empty_percentiles(self):
+        """TC4: Chưa có mẫu → percentile bằng 0"""
+        stats = LatencyHistogram().get_stats()
+
+        assert stats["count"] == 0
+        assert stats["p50_ms"] == stats["p99_ms"] == 0.0
+
+    def test_percentiles_match_numpy(self):
+        """TC5: p50/p95/p99 sai lệch không quá 3% so với giá trị chính xác"""
+        rng = np.random.default_rng(0)
+        values = rng.lognormal(np.log(0.02), 0.5, 20000)
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(float(value))
+
+        stats = histogram.get_stats()
+        expected = np.percentile(values, [50, 95, 99]) * 1000
+
+        for key, value in zip(("p50_ms", "p95_ms", "p99_ms"), expected):
+            assert stats[key] == pytest.approx(value, rel=0.03)
+        assert stats["mean_ms"] == pytest.approx(values.mean() * 1000, rel=0.01)
+
+
+class TestLatencyRecorder:
+    """Test cases for LatencyRecorder class"""
+
+    def test_stages_and_dump(self):
+        """TC6: Mỗi giai đoạn một histogram; to_dict có thống kê và bucket"""
+        recorder = LatencyRecorder()
+        for _ in range(10):
+            recorder.record("decode", 0.002)
+            recorder.record("inference", 0.030)
+
+        stats = recorder.get_stats()
+        dump = recorder.to_dict()
+
+        assert set(stats) == {"decode", "inference"}
+        assert stats["inference"]["count"] == 10
+        assert stats["inference"]["p50_ms"] == pytest.approx(30.0, rel=0.03)
+        assert dump["unit"] == "us"
+        assert sum(b[2] for b in dump["stages"]["decode"]["buckets"]) == 10
+
+        recorder.reset()
+        assert recorder.get_stats()["decode"]["count"] == 0
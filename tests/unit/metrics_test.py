@@ -0,0 +1,183 @@
+"""
+Unit tests for MetricsServer và render_metrics
+"""
+
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.api.metrics import MetricsServer, render_metrics
+from src.core.alert_system import AlertSystem
+from src.core.data_logger import DataLogger
+from src.core.latency import LatencyRecorder
+from src.core.person_counter import PersonCounter
+from src.core.tracker import PersonTracker
+from src.core.zones import ZoneCounter
+
+DETECTION = {"bbox": [0, 0, 10, 10], "confidence": 0.9, "class_id": 0}
+
+
+@pytest.fixture
+def components(tmp_path):
+    """Fixture tạo counter/alert/logger đã có dữ liệu"""
+    counter = PersonCounter(latency=LatencyRecorder())
+    counter.update_count([DETECTION] * 3)
+    counter.latency.record("inference", 0.02)
+
+    alert_system = AlertSystem(max_count=2, enabled=True)
+    alert_system.check_alert(3)
+
+    data_logger = DataLogger(filename=str(tmp_path / "data.csv"), enabled=True)
+    data_logger.log_data(counter.get_all_stats())
+    return counter, alert_system, data_logger
+
+
+class TestRenderMetrics:
+    """Test cases for render_metrics"""
+
+    def test_counter_alert_logger_metrics(self, components):
+        """TC1: Số đếm, cảnh báo và hàng đợi ghi file theo định dạng Prometheus"""
+        text = render_metrics(*components)
+
+        assert "# TYPE person_detection_current_count gauge" in text
+        assert "person_detection_current_count 3.0" in text
+        assert "# TYPE person_detection_frames_total counter" in text
+        assert "person_detection_alert_active 1.0" in text
+        assert "person_detection_alerts_total 1.0" in text
+        assert 'person_detection_logger_queue_depth{file="counts"} 1.0' in text
+        assert text.endswith("\n")
+
+    def test_latency_summary(self, components):
+        """TC2: Độ trễ từng giai đoạn là summary có quantile, _sum, _count"""
+        text = render_metrics(counter=components[0])
+
+        assert "# TYPE person_detection_stage_latency_seconds summary" in text
+        assert (
+            'person_detection_stage_latency_seconds{stage="inference",quantile="0.99"}'
+            in text
+        )
+        assert (
+            'person_detection_stage_latency_seconds_count{stage="inference"} 1.0'
+            in text
+        )
+
+    def test_optional_metrics_omitted(self):
+        """TC3: Không có tracker/vùng/độ trễ → không xuất metric tương ứng"""
+        text = render_metrics(counter=PersonCounter())
+
+        assert "unique_persons_total" not in text
+        assert "zone_count" not in text
+        assert "stage_latency_seconds" not in text
+
+    def test_zone_alert_active_for_every_zone(self):
+        """TC4: Mọi vùng đã cấu hình có zone_alert_active, 0 khi không cảnh báo"""
+        counter = PersonCounter(
+            zone_counter=ZoneCounter(
+                zones={
+                    "left": {"polygon": [(0, 0), (0.5, 0), (0.5, 1), (0, 1)]},
+                    "right": {
+                        "polygon": [(0.5, 0), (1, 0), (1, 1), (0.5, 1)],
+                        "max_count": 1,
+                    },
+                }
+            )
+        )
+        alert_system = AlertSystem(enabled=True)
+        detections = [
+            {"bbox": [x, 10, x + 20, 50], "confidence": 0.9} for x in (400, 500, 600)
+        ]
+        counter.update_count(detections, (480, 640, 3))
+        alert_system.check_zone_alerts(counter.get_all_stats()["zones"])
+
+        text = render_metrics(counter, alert_system)
+
+        assert 'person_detection_zone_alert_active{zone="left"} 0.0' in text
+        assert 'person_detection_zone_alert_active{zone="right"} 1.0' in text
+
+        counter.update_count([], (480, 640, 3))
+        alert_system.check_zone_alerts(counter.get_all_stats()["zones"])
+        text = render_metrics(counter, alert_system)
+
+        assert 'person_detection_zone_alert_active{zone="right"} 0.0' in text
+
+
+class TestMetricsServer:
+    """Test cases for MetricsServer class"""
+
+    def test_scrape_over_http(self, components):
+        """TC5: GET /metrics trả về metric, đường dẫn khác trả về 404"""
+        server = MetricsServer(*components, host="127.0.0.1", port=0)
+        host, port = server.start()
+        try:
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+                body = response.read().decode("utf-8")
+                content_type = response.headers["Content-Type"]
+
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f"http://{host}:{port}/other")
+        finally:
+            server.stop()
+
+        assert content_type.startswith("text/plain; version=0.0.4")
+        assert "person_detection_current_count 3.0" in body
+        assert error.value.code == 404
+        assert server.address is None
+
+    def test_scrape_during_updates(self):
+        """TC6: Scrape từ thread khác trong lúc update_count() không lỗi"""
+        counter = PersonCounter(
+            tracker=PersonTracker(min_hits=1),
+            zone_counter=ZoneCounter(
+                lines={"door": [(0, 0.5), (1, 0.5)]},
+                zones={"left": [(0, 0), (0.5, 0), (0.5, 1), (0, 1)]},
+            ),
+        )
+        server = MetricsServer(counter, host="127.0.0.1", port=0)
+        stop = threading.Event()
+        errors, bodies = [], []
+
+        def update():
+            rng = random.Random(0)
+            while not stop.is_set():
+                detections = [
+                    {"bbox": [x * 20, 0, x * 20 + 15, 40], "confidence": 0.9}
+                    for x in rng.sample(range(40), rng.randint(0, 32))
+                ]
+                counter.update_count(detections, (480, 800, 3))
+
+        def scrape():
+            while not stop.is_set():
+                try:
+                    bodies.append(server.render())
+                except Exception as e:  # pylint: disable=broad-except
+                    errors.append(e)
+
+        threads = [threading.Thread(target=update), threading.Thread(target=scrape)]
+        host, port = server.start()
+        try:
+            for thread in threads:
+                thread.start()
+            time.sleep(1.0)
+            # Scrape qua HTTP trong lúc vẫn đang cập nhật
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+                bodies.append(response.read().decode("utf-8"))
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            server.stop()
+
+        assert errors == []
+        assert bodies
+        for body in bodies:
+            values = dict(
+                line.rsplit(" ", 1) for line in body.splitlines() if line[:1] != "#"
+            )
+            # Các giá trị của một lần scrape đến từ cùng một snapshot
+            assert float(values["person_detection_frames_with_persons_total"]) <= (
+                float(values["person_detection_frames_total"])
+            )
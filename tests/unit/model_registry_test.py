@@ -0,0 +1,155 @@
+"""
+Unit tests for ModelRegistry
+"""
+
+import os
+
+import pytest
+
+from src.core import model_registry
+from src.core.model_registry import ModelRegistry
+
+
+class FakeRegistry(ModelRegistry):
+    """Registry build artifact giả (không cần torch/ultralytics), đếm số lần build"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.builds = []
+
+    def _load_source(self):
+        return None, {"names": {"0": "person"}, "ultralytics": "8.0.0"}
+
+    def _fake_build(self, build_dir, imgsz, variant):
+        self.builds.append((variant, imgsz))
+        path = os.path.join(build_dir, "artifact")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"{variant}@{imgsz}")
+        return path, self._load_source()[1]
+
+    def _build_fused(self, build_dir, imgsz):
+        return self._fake_build(build_dir, imgsz, "fused")
+
+    def _build_onnx(self, build_dir, imgsz):
+        return self._fake_build(build_dir, imgsz, "onnx")
+
+    def _build_half(self, build_dir, imgsz):
+        return self._fake_build(build_dir, imgsz, "half")
+
+
+@pytest.fixture
+def weights(tmp_path):
+    """File trọng số giả"""
+    path = tmp_path / "weights" / "best.pt"
+    path.parent.mkdir()
+    path.write_bytes(b"weights-v1")
+    return path
+
+
+@pytest.fixture
+def registry(weights, tmp_path):
+    """Registry với cache trong thư mục tạm"""
+    return FakeRegistry(str(weights), cache_dir=tmp_path / "cache")
+
+
+class TestModelRegistry:
+    """Test cases for ModelRegistry class"""
+
+    def test_cache_keyed_by_content_hash(self, weights, tmp_path, monkeypatch):
+        """TC1: Cùng nội dung → cùng thư mục cache; đổi nội dung → thư mục mới; hash được nhớ theo size/mtime"""
+        cache = tmp_path / "cache"
+        copy = tmp_path / "copy.pt"
+        copy.write_bytes(weights.read_bytes())
+
+        first = ModelRegistry(str(weights), cache_dir=cache)
+        same = ModelRegistry(str(copy), cache_dir=cache)
+        assert first.directory == same.directory
+        assert first.sha256 == model_registry.file_sha256(str(weights))
+
+        # Lần sau không đọc lại file
+        calls = []
+        monkeypatch.setattr(
+            model_registry, "file_sha256", lambda path: calls.append(path) or "x" * 64
+        )
+        assert ModelRegistry(str(weights), cache_dir=cache).sha256 == first.sha256
+        assert calls == []
+
+        weights.write_bytes(b"weights-v2-retrained")
+        changed = ModelRegistry(str(weights), cache_dir=cache)
+        assert calls == [os.path.abspath(weights)]
+        assert changed.directory != first.directory
+
+        with pytest.raises(FileNotFoundError):
+            ModelRegistry(str(tmp_path / "missing.pt"), cache_dir=cache)
+
+    def test_build_on_first_use_then_reuse(self, registry, weights, tmp_path):
+        """TC2: get() build lần đầu, lần sau (kể cả registry mới) dùng lại; metadata có imgsz và class map"""
+        path = registry.get("fused", imgsz=640)
+
+        assert registry.get("fused", imgsz=640) == path
+        assert registry.builds == [("fused", 640)]
+        assert registry.get("pt") == os.path.abspath(weights)
+
+        reopened = FakeRegistry(str(weights), cache_dir=tmp_path / "cache")
+        assert reopened.get("fused", imgsz=640) == path
+        assert reopened.builds == []
+
+        metadata = reopened.metadata()
+        assert metadata["names"] == {"0": "person"}
+        entry = metadata["variants"]["fused"]
+        assert entry["imgsz"] == 640
+        assert entry["ultralytics"] == "8.0.0"
+        assert not [f for f in os.listdir(registry.directory) if f.startswith("build_")]
+
+    def test_fixed_size_variant_rebuilt_for_new_imgsz(self, registry):
+        """TC3: Biến thể export cố định (onnx) build lại khi imgsz đổi"""
+        first = registry.get("onnx", imgsz=640)
+        second = registry.get("onnx", imgsz=320)
+
+        assert first.endswith("onnx_640.onnx")
+        assert second.endswith("onnx_320.onnx")
+        assert registry.builds == [("onnx", 640), ("onnx", 320)]
+        assert not registry.is_built("onnx", 640)
+        with pytest.raises(ValueError):
+            registry.get("tensorrt")
+
+    def test_best_variant_by_measured_latency(self, registry):
+        """TC4: Chọn biến thể nhanh nhất đã đo cho thiết bị; chưa đo → mặc định"""
+        assert registry.best_variant("cpu") == "fused"
+        assert registry.best_variant("cuda") == "half"
+
+        for variant in ("fused", "onnx", "half"):
+            registry.get(variant, imgsz=640)
+        registry.record_latency("pt", "cpu", 80.0)
+        registry.record_latency("fused", "cpu", 60.0)
+        registry.record_latency("onnx", "cpu", 45.0)
+        registry.record_latency("half", "cpu", 10.0)  # half không chạy trên CPU
+        registry.record_latency("half", "cuda", 8.0)
+
+        assert registry.best_variant("cpu", imgsz=640) == "onnx"
+        assert registry.best_variant("cuda", imgsz=640) == "half"
+        # onnx đo ở 640 không dùng được cho imgsz khác
+        assert registry.best_variant("cpu", imgsz=320) == "fused"
+        with pytest.raises(KeyError):
+            registry.record_latency("torchscript", "cpu", 1.0)
+
+    def test_rejected_variant_skipped(self, registry, tmp_path):
+        """TC5: Biến thể bị loại vì giảm độ chính xác không được chọn; ảnh hiệu chỉnh truyền vào được dùng"""
+        for variant in ("fused", "onnx"):
+            registry.get(variant, imgsz=640)
+        registry.record_latency("fused", "cpu", 60.0)
+        registry.record_latency("onnx", "cpu", 30.0)
+
+        registry.record_accuracy("onnx", {"map50": 0.70}, accepted=False)
+        assert registry.best_variant("cpu", imgsz=640) == "fused"
+        registry.record_accuracy("onnx", {"map50": 0.80}, accepted=True)
+        assert registry.best_variant("cpu", imgsz=640) == "onnx"
+        assert registry.metadata()["variants"]["onnx"]["accuracy"] == {"map50": 0.80}
+        with pytest.raises(KeyError):
+            registry.record_accuracy("int8", {}, accepted=True)
+
+        images = [str(tmp_path / "a.jpg")]
+        assert (
+            FakeRegistry(registry.source, calibration=images).calibration_images()
+            == images
+        )
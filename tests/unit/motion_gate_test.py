@@ -0,0 +1,101 @@
+"""
+Unit tests for MotionGate
+"""
+
+import numpy as np
+
+from src.core.motion_gate import MotionGate
+
+
+def make_frame(value=0, box=None):
+    """Tạo frame 480x640 màu đồng nhất, có thể vẽ thêm một khối sáng"""
+    frame = np.full((480, 640, 3), value, dtype=np.uint8)
+    if box is not None:
+        x1, y1, x2, y2 = box
+        frame[y1:y2, x1:x2] = 255
+    return frame
+
+
+class TestMotionGate:
+    """Test cases for MotionGate class"""
+
+    def test_first_frame_always_inferred(self):
+        """TC1: Frame đầu tiên luôn chạy inference"""
+        gate = MotionGate()
+
+        assert gate.should_infer(make_frame()) is True
+
+    def test_static_frames_skipped(self):
+        """TC2: Các frame giống hệt nhau → bỏ qua inference"""
+        gate = MotionGate(refresh_interval=100)
+        gate.should_infer(make_frame())
+
+        results = [gate.should_infer(make_frame()) for _ in range(5)]
+
+        assert results == [False] * 5
+        assert gate.last_motion == 0.0
+
+    def test_motion_triggers_inference(self):
+        """TC3: Có vùng thay đổi lớn hơn ngưỡng → chạy inference"""
+        gate = MotionGate(threshold=0.01, refresh_interval=100)
+        gate.should_infer(make_frame())
+
+        assert gate.should_infer(make_frame(box=(100, 100, 300, 300))) is True
+        assert gate.last_motion > 0.01
+
+    def test_small_noise_ignored(self):
+        """TC4: Nhiễu độ sáng nhỏ hơn pixel_delta không tính là chuyển động"""
+        gate = MotionGate(pixel_delta=25, refresh_interval=100)
+        gate.should_infer(make_frame(100))
+
+        assert gate.should_infer(make_frame(110)) is False
+
+    def test_reference_follows_last_inference(self):
+        """TC5: Frame tham chiếu là frame của lần inference gần nhất"""
+        gate = MotionGate(threshold=0.01, refresh_interval=100)
+        gate.should_infer(make_frame())
+        moved = make_frame(box=(100, 100, 300, 300))
+
+        assert gate.should_infer(moved) is True
+        # Vật thể đứng yên ở vị trí mới → không inference lại
+        assert gate.should_infer(moved.copy()) is False
+
+    def test_forced_refresh(self):
+        """TC6: Bỏ qua refresh_interval frame liên tiếp → bắt buộc inference"""
+        gate = MotionGate(refresh_interval=3)
+        frame = make_frame()
+
+        results = [gate.should_infer(frame) for _ in range(6)]
+
+        assert results == [True, False, False, False, True, False]
+
+    def test_reset_forces_inference(self):
+        """TC7: reset() xoá frame tham chiếu và thống kê"""
+        gate = MotionGate(refresh_interval=100)
+        gate.should_infer(make_frame())
+        gate.should_infer(make_frame())
+
+        gate.reset()
+
+        assert gate.get_stats()["total_frames"] == 0
+        assert gate.should_infer(make_frame()) is True
+
+    def test_frame_size_change_forces_inference(self):
+        """TC8: Kích thước frame thay đổi → chạy inference"""
+        gate = MotionGate(refresh_interval=100)
+        gate.should_infer(make_frame())
+
+        assert gate.should_infer(np.zeros((240, 320, 3), dtype=np.uint8)) is True
+
+    def test_get_stats(self):
+        """TC9: Thống kê số frame bỏ qua và tỉ lệ bỏ qua"""
+        gate = MotionGate(refresh_interval=100)
+        for _ in range(4):
+            gate.should_infer(make_frame())
+
+        stats = gate.get_stats()
+
+        assert stats["total_frames"] == 4
+        assert stats["inferred_frames"] == 1
+        assert stats["skipped_frames"] == 3
+        assert stats["skip_rate"] == 0.75
@@ -1,5 +1,5 @@
 """
-Unit tests for PersonCounter - 20 Test Cases theo đặc tả
+Unit tests for PersonCounter - 27 Test Cases theo đặc tả
 """
 
 import time
@@ -295,6 +295,166 @@ class TestPersonCounter(unittest.TestCase):
         stats = self.counter.get_all_stats()
         self.assertEqual(stats["frames_with_persons"], 3)
 
+    def test_update_count_with_tracker(self):
+        """TC21: Tracker gán ID ổn định và thống kê người duy nhất"""
+        from src.core.tracker import PersonTracker
+
+        counter = PersonCounter(tracker=PersonTracker(min_hits=2, matching="greedy"))
+        for step in range(4):
+            detections = [
+                {"bbox": [10 + step, 10, 50 + step, 100], "confidence": 0.9},
+                {"bbox": [200, 200, 240, 300], "confidence": 0.9, "class_id": 0},
+            ]
+            counter.update_count(detections)
+
+        self.assertEqual([d["track_id"] for d in detections], [1, 2])
+
+        stats = counter.get_all_stats()
+        self.assertEqual(stats["unique_count"], 2)
+        self.assertEqual(stats["tracked_count"], 2)
+        self.assertGreaterEqual(stats["max_dwell_time"], 0.0)
+
+        counter.reset_stats()
+        self.assertEqual(counter.get_all_stats()["unique_count"], 0)
+
+    def test_reported_count_with_smoother(self):
+        """TC22: reported_count làm mượt nằm cạnh current_count thô"""
+        from src.core.smoothing import CountSmoother
+
+        counter = PersonCounter(smoother=CountSmoother(method="median", window=3))
+        detection = {"bbox": [0, 0, 10, 10], "confidence": 0.9, "class_id": 0}
+        for count in (2, 2, 6):
+            counter.update_count([detection] * count)
+
+        stats = counter.get_all_stats()
+        self.assertEqual(stats["current_count"], 6)
+        self.assertEqual(stats["reported_count"], 2)
+        self.assertEqual(counter.get_reported_count(), 2)
+
+        # Không có smoother → số báo cáo bằng số thô
+        self.counter.update_count([detection] * 4)
+        self.assertEqual(self.counter.get_all_stats()["reported_count"], 4)
+
+    def test_get_rollup(self):
+        """TC23: Số người được tổng hợp theo khoảng thời gian"""
+        detection = {"bbox": [0, 0, 10, 10], "confidence": 0.9, "class_id": 0}
+        for count in (1, 3, 2):
+            self.counter.update_count([detection] * count)
+
+        minute = self.counter.get_rollup(60)
+
+        self.assertEqual(int(minute["samples"].sum()), 3)
+        self.assertEqual(float(minute["min"].min()), 1.0)
+        self.assertEqual(float(minute["max"].max()), 3.0)
+
+        latest = self.counter.get_rollup_latest(60)
+        self.assertEqual(latest["samples"], 3)
+        self.assertAlmostEqual(latest["mean"], 2.0)
+        self.assertIsNone(self.counter.get_rollup_latest(7))
+        records = self.counter.get_rollup_records()
+        self.assertEqual(sum(r["samples"] for r in records if r["resolution"] == 60), 3)
+
+        self.counter.reset_stats()
+        self.assertEqual(len(self.counter.get_rollup(60)["timestamp"]), 0)
+        self.assertIsNone(self.counter.get_rollup_latest(60))
+
+    def test_sliding_window_fps(self):
+        """TC24: FPS tức thời theo cửa sổ trượt, FPS trung bình từ lúc bắt đầu"""
+        from src.core.clock import FpsMeter, ManualClock
+
+        clock = ManualClock()
+        counter = PersonCounter(clock=clock)
+        counter.fps_meter = FpsMeter(window=5)
+
+        # 10 frame ở 10 FPS, sau đó 5 frame ở 50 FPS
+        for step in [0.1] * 10 + [0.02] * 5:
+            clock.advance(step)
+            counter.update_count([])
+
+        stats = counter.get_all_stats()
+        self.assertAlmostEqual(stats["fps"], 50.0)
+        self.assertAlmostEqual(stats["average_fps"], 15 / 1.1)
+        self.assertAlmostEqual(stats["running_time"], 1.1)
+
+        _, timestamps = counter.get_count_history()
+        self.assertEqual(timestamps[-1].timestamp(), clock.to_wall(1.1))
+
+    def test_latency_stats(self):
+        """TC25: Độ trễ từng giai đoạn có trong get_all_stats khi bật"""
+        from src.core.latency import LatencyRecorder
+
+        self.assertNotIn("latency", self.counter.get_all_stats())
+
+        counter = PersonCounter(latency=LatencyRecorder())
+        counter.latency.record("inference", 0.02)
+        latency = counter.get_all_stats()["latency"]
+
+        self.assertEqual(latency["inference"]["count"], 1)
+        self.assertAlmostEqual(latency["inference"]["p99_ms"], 20.0, delta=0.6)
+
+        counter.reset_stats()
+        self.assertEqual(counter.get_all_stats()["latency"]["inference"]["count"], 0)
+
+    def test_restart_timing(self):
+        """TC26: restart_timing loại thời gian chờ warm-up khỏi FPS trung bình"""
+        from src.core.clock import ManualClock
+
+        clock = ManualClock()
+        counter = PersonCounter(clock=clock)
+        for _ in range(10):
+            clock.advance(1.0)
+            counter.update_count([])
+
+        counter.restart_timing()
+        for _ in range(10):
+            clock.advance(0.1)
+            counter.update_count([])
+
+        stats = counter.get_all_stats()
+        self.assertEqual(stats["total_frames"], 20)
+        self.assertAlmostEqual(stats["average_fps"], 10.0)
+        self.assertAlmostEqual(stats["running_time"], 1.0)
+
+    def test_concurrent_stats_reads(self):
+        """TC27: get_all_stats() từ thread khác trong lúc update_count() với tracking không lỗi"""
+        import random
+        import threading
+
+        from src.core.tracker import PersonTracker
+
+        counter = PersonCounter(tracker=PersonTracker(min_hits=1))
+        stop = threading.Event()
+        errors = []
+
+        def update():
+            rng = random.Random(0)
+            while not stop.is_set():
+                detections = [
+                    {"bbox": [x * 20, 0, x * 20 + 15, 40], "confidence": 0.9}
+                    for x in rng.sample(range(40), rng.randint(0, 32))
+                ]
+                counter.update_count(detections, (480, 800, 3))
+
+        def read():
+            while not stop.is_set():
+                try:
+                    counter.get_all_stats()
+                    counter.get_rollup_latest(60)
+                    counter.get_rollup_records()
+                except Exception as e:  # pylint: disable=broad-except
+                    errors.append(e)
+
+        threads = [threading.Thread(target=update), threading.Thread(target=read)]
+        for thread in threads:
+            thread.start()
+        time.sleep(1.0)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertGreater(counter.get_all_stats()["total_frames"], 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,13 +1,21 @@
 """
-Unit tests for PersonDetector - 20 Test Cases theo đặc tả
+Unit tests for PersonDetector - 29 Test Cases theo đặc tả
 """
 
+import os
+import tempfile
 import unittest
 from unittest.mock import Mock, patch
 
 import numpy as np
 
-from src.core.person_detector import PersonDetector
+from src.core.person_detector import (
+    STATE_FAILED,
+    STATE_LOADING,
+    STATE_READY,
+    STATE_WARMING_UP,
+    PersonDetector,
+)
 
 
 class TestPersonDetector(unittest.TestCase):
@@ -432,6 +440,237 @@ class TestPersonDetector(unittest.TestCase):
         self.assertEqual(len(detections), 1)
         self.assertAlmostEqual(detections[0]["confidence"], 1.0, places=2)
 
+    def test_detect_persons_with_region(self):
+        """TC21: Inference chạy trên vùng crop ROI, box được dịch về frame gốc"""
+        from src.core.roi import RegionOfInterest
+
+        mock_model = Mock()
+        mock_result = Mock()
+        # Box thứ 2 có tâm nằm trong vùng loại trừ (sau khi dịch)
+        mock_result.boxes.xyxy.cpu.return_value.numpy.return_value = np.array(
+            [[10, 10, 30, 50], [150, 150, 170, 190]]
+        )
+        mock_result.boxes.conf.cpu.return_value.numpy.return_value = np.array(
+            [0.9, 0.8]
+        )
+        mock_result.boxes.cls.cpu.return_value.numpy.return_value = np.array([0, 0])
+        mock_model.return_value = [mock_result]
+
+        region = RegionOfInterest(
+            roi=[(100, 100), (400, 100), (400, 400), (100, 400)],
+            exclusions=[[(240, 240), (300, 240), (300, 300), (240, 300)]],
+        )
+        detector = PersonDetector(region=region)
+        detector.model = mock_model
+
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        detections = detector.detect_persons(frame)
+
+        # Model chỉ nhận vùng crop 301x301 thay vì toàn frame
+        self.assertEqual(mock_model.call_args[0][0].shape, (301, 301, 3))
+        self.assertEqual(len(detections), 1)
+        self.assertEqual(detections[0]["bbox"], [110, 110, 130, 150])
+
+    def test_preprocess_frame_with_region(self):
+        """TC22: preprocess_frame cắt frame theo ROI"""
+        from src.core.roi import RegionOfInterest
+
+        self.detector.set_region(
+            RegionOfInterest(roi=[(0, 0), (320, 0), (320, 240), (0, 240)])
+        )
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+        processed = self.detector.preprocess_frame(frame)
+
+        self.assertEqual(processed.shape, (241, 321, 3))
+
+    def test_detect_persons_tiled(self):
+        """TC23: Chế độ tile chạy một batch và gộp box trùng giữa các tile"""
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+        def fake_model(crops, **kwargs):
+            results = []
+            for crop in crops:
+                result = Mock()
+                if crop.shape[:2] == (720, 1280):
+                    # Lượt toàn frame: không phát hiện gì
+                    result.boxes = None
+                else:
+                    # Mỗi tile phát hiện cùng một người ở toạ độ frame (600, 300)
+                    # → sau khi dịch về frame, các box trùng nhau
+                    x1, y1 = tile_offsets.pop(0)
+                    box = np.array([[600 - x1, 300 - y1, 640 - x1, 400 - y1]])
+                    result.boxes.xyxy.cpu.return_value.numpy.return_value = box
+                    result.boxes.conf.cpu.return_value.numpy.return_value = np.array(
+                        [0.9]
+                    )
+                    result.boxes.cls.cpu.return_value.numpy.return_value = np.array([0])
+                results.append(result)
+            return results
+
+        mock_model = Mock(side_effect=fake_model)
+        detector = PersonDetector(tiled=True)
+        detector.model = mock_model
+        detector.tile_size = 640
+        detector.tile_overlap = 0.5
+
+        from src.core.tiling import compute_tiles
+
+        tiles = compute_tiles(720, 1280, 640, 0.5)
+        tile_offsets = [tuple(t[:2]) for t in tiles]
+
+        detections = detector.detect_persons(frame)
+
+        # Một lần gọi model cho tất cả tile + toàn frame
+        self.assertEqual(mock_model.call_count, 1)
+        self.assertEqual(len(mock_model.call_args[0][0]), len(tiles) + 1)
+        self.assertEqual(mock_model.call_args[1]["imgsz"], 640)
+        self.assertEqual(len(detections), 1)
+        self.assertEqual(detections[0]["bbox"], [600, 300, 640, 400])
+
+    def test_detect_persons_motion_gate_reuses_boxes(self):
+        """TC24: Frame tĩnh → không gọi model, dùng lại kết quả lần trước"""
+        from src.core.motion_gate import MotionGate
+
+        mock_model = Mock()
+        mock_result = Mock()
+        mock_result.boxes.xyxy.cpu.return_value.numpy.return_value = np.array(
+            [[100, 100, 200, 300]]
+        )
+        mock_result.boxes.conf.cpu.return_value.numpy.return_value = np.array([0.9])
+        mock_result.boxes.cls.cpu.return_value.numpy.return_value = np.array([0])
+        mock_model.return_value = [mock_result]
+
+        detector = PersonDetector(motion_gate=MotionGate(refresh_interval=10))
+        detector.model = mock_model
+
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        first = detector.detect_persons(frame)
+        second = detector.detect_persons(frame.copy())
+
+        self.assertEqual(mock_model.call_count, 1)
+        self.assertEqual(first, second)
+
+        # Frame thay đổi → inference chạy lại
+        moving = frame.copy()
+        moving[100:300, 100:300] = 255
+        detector.detect_persons(moving)
+        self.assertEqual(mock_model.call_count, 2)
+
+    def test_detect_array_batch(self):
+        """TC25: Nhiều frame chạy trong một lần gọi model, mỗi frame một kết quả"""
+        mock_model = Mock()
+        results = []
+        for boxes in ([[10, 10, 50, 90]], [[20, 20, 60, 100], [200, 50, 260, 200]]):
+            result = Mock()
+            result.boxes.xyxy.cpu.return_value.numpy.return_value = np.array(boxes)
+            result.boxes.conf.cpu.return_value.numpy.return_value = np.full(
+                len(boxes), 0.9
+            )
+            result.boxes.cls.cpu.return_value.numpy.return_value = np.zeros(len(boxes))
+            results.append(result)
+        mock_model.return_value = results
+
+        detector = PersonDetector()
+        detector.model = mock_model
+        frames = [np.zeros((480, 640, 3), dtype=np.uint8) for _ in range(2)]
+
+        arrays = detector.detect_array_batch(frames)
+
+        self.assertEqual(mock_model.call_count, 1)
+        self.assertEqual(len(mock_model.call_args[0][0]), 2)
+        self.assertEqual([len(a) for a in arrays], [1, 2])
+        self.assertEqual(detector.detect_array_batch([]), [])
+
+    def test_warm_up(self):
+        """TC26: warm_up chạy inference giả ở kích thước imgsz, báo tiến độ đến READY"""
+        mock_model = Mock(return_value=[])
+        detector = PersonDetector()
+        detector.model = mock_model
+        updates = []
+
+        self.assertFalse(detector.is_ready)
+        self.assertTrue(detector.warm_up(iterations=3, on_progress=updates.append))
+
+        self.assertTrue(detector.is_ready)
+        self.assertEqual(mock_model.call_count, 3)
+        dummy = mock_model.call_args[0][0]
+        self.assertEqual(dummy.shape, (detector.imgsz, detector.imgsz, 3))
+        self.assertEqual(mock_model.call_args[1]["imgsz"], detector.imgsz)
+        self.assertEqual(
+            [u["state"] for u in updates],
+            [STATE_LOADING] + [STATE_WARMING_UP] * 3 + [STATE_READY],
+        )
+        self.assertEqual([u["progress"] for u in updates], [0, 0.25, 0.5, 0.75, 1.0])
+        self.assertIsNotNone(detector.get_warmup_status()["elapsed"])
+
+        # Đã sẵn sàng → không chạy lại
+        detector.warm_up()
+        self.assertEqual(mock_model.call_count, 3)
+
+    def test_warm_up_async(self):
+        """TC27: warm_up_async chạy trên thread nền, wait_until_ready chờ đến khi xong"""
+        detector = PersonDetector()
+        detector.model = Mock(return_value=[])
+
+        # Chưa warm-up → không chờ vô hạn
+        self.assertFalse(detector.wait_until_ready(timeout=0.01))
+
+        thread = detector.warm_up_async(iterations=2)
+
+        self.assertEqual(thread.name, "detector-warmup")
+        self.assertTrue(detector.wait_until_ready(timeout=5))
+        self.assertEqual(detector.model.call_count, 2)
+        self.assertIsNone(detector.warm_up_async())
+
+    def test_warm_up_failure(self):
+        """TC28: Model lỗi khi warm-up → FAILED kèm thông báo lỗi"""
+        detector = PersonDetector()
+        detector.model = Mock(side_effect=RuntimeError("CUDA out of memory"))
+
+        detector.warm_up_async()
+
+        self.assertFalse(detector.wait_until_ready(timeout=5))
+        status = detector.get_warmup_status()
+        self.assertEqual(status["state"], STATE_FAILED)
+        self.assertEqual(status["error"], "CUDA out of memory")
+        self.assertFalse(detector.is_ready)
+
+    def test_model_variant_resolution(self):
+        """TC29: Biến thể "auto" load artifact nhanh nhất từ registry; lỗi → file gốc"""
+        with tempfile.TemporaryDirectory() as tmp:
+            weights = os.path.join(tmp, "best.pt")
+            with open(weights, "wb") as f:
+                f.write(b"weights")
+            registry = Mock()
+            registry.best_variant.return_value = "onnx"
+            registry.get.return_value = os.path.join(tmp, "onnx_640.onnx")
+
+            with (
+                patch("src.core.person_detector.ModelRegistry", return_value=registry),
+                patch("src.core.person_detector._get_yolo") as get_yolo,
+            ):
+                detector = PersonDetector(model_path=weights, variant="auto")
+                detector._device, detector._use_gpu = "0", True
+                detector._ensure_model_loaded()
+
+                registry.best_variant.assert_called_once_with("cuda", detector.imgsz)
+                get_yolo.assert_called_once_with(
+                    registry.get.return_value, task="detect"
+                )
+                self.assertEqual(detector.get_model_info()["variant"], "onnx")
+                # ONNX export ở FP32 → không bật half trên GPU
+                self.assertNotIn("half", detector._inference_kwargs())
+
+                registry.get.side_effect = ImportError("No module named 'onnx'")
+                fallback = PersonDetector(model_path=weights, variant="onnx")
+                fallback._device, fallback._use_gpu = "cpu", False
+                self.assertEqual(fallback._resolve_model_path(), (weights, "pt"))
+
+            # File không có trên đĩa (model tải tự động) → không qua registry
+            missing = PersonDetector(model_path="yolov8n.pt", variant="auto")
+            self.assertEqual(missing._resolve_model_path(), ("yolov8n.pt", "pt"))
+
 
 if __name__ == "__main__":
     unittest.main()
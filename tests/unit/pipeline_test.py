@@ -0,0 +1,151 @@
+"""
+Unit tests for FramePipeline
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.core.latency import LatencyRecorder
+from src.core.pipeline import FramePipeline, StageTimings
+
+
+class TestFramePipeline:
+    """Test cases for FramePipeline class"""
+
+    def _collect(self, stages, items, queue_size=2, timings=None):
+        """Chạy pipeline và thu thập kết quả của giai đoạn cuối"""
+        results = []
+        pipeline = FramePipeline(
+            stages + [("publish", results.append)],
+            queue_size=queue_size,
+            timings=timings,
+        )
+        pipeline.start()
+        for item in items:
+            assert pipeline.submit(item)
+        pipeline.stop()
+        return pipeline, results
+
+    def test_empty_stages_raises(self):
+        """TC1: Pipeline không có giai đoạn nào → ValueError"""
+        with pytest.raises(ValueError):
+            FramePipeline([])
+
+    def test_preserves_frame_order(self):
+        """TC2: Thứ tự frame được giữ nguyên qua các giai đoạn"""
+
+        def slow_infer(x):
+            time.sleep(0.001 * (x % 3))
+            return x * 2
+
+        _, results = self._collect(
+            [("infer", slow_infer), ("annotate", lambda x: x + 1)], range(50)
+        )
+
+        assert results == [x * 2 + 1 for x in range(50)]
+
+    def test_none_result_drops_frame(self):
+        """TC3: Giai đoạn trả về None thì frame bị bỏ qua"""
+        _, results = self._collect(
+            [("infer", lambda x: x if x % 2 == 0 else None)], range(10)
+        )
+
+        assert results == [0, 2, 4, 6, 8]
+
+    def test_stage_error_does_not_stop_pipeline(self):
+        """TC4: Lỗi ở một frame không làm dừng pipeline"""
+
+        def flaky(x):
+            if x == 3:
+                raise RuntimeError("boom")
+            return x
+
+        _, results = self._collect([("infer", flaky)], range(6))
+
+        assert results == [0, 1, 2, 4, 5]
+
+    def test_stage_timings_exposed(self):
+        """TC5: Thời gian xử lý từng giai đoạn được ghi nhận"""
+        pipeline, _ = self._collect([("infer", lambda x: x)], range(5))
+        pipeline.record_timing("capture", 0.002)
+
+        timings = pipeline.get_stage_timings()
+
+        assert set(timings) == {"infer", "publish", "capture"}
+        assert timings["infer"]["count"] == 5
+        assert timings["capture"]["avg_ms"] == pytest.approx(2.0)
+
+    def test_stages_overlap(self):
+        """TC6: Các giai đoạn chạy song song trên các thread khác nhau"""
+        thread_names = set()
+
+        def stage(x):
+            thread_names.add(threading.current_thread().name)
+            time.sleep(0.01)
+            return x
+
+        start = time.perf_counter()
+        self._collect([("infer", stage), ("annotate", stage)], range(10))
+        elapsed = time.perf_counter() - start
+
+        # Chạy tuần tự mất ~0.2s, chạy chồng lấn chỉ ~0.11s
+        assert elapsed < 0.18
+        assert thread_names == {"pipeline-infer", "pipeline-annotate"}
+
+    def test_submit_after_stop_returns_false(self):
+        """TC7: Không nhận frame mới sau khi đã dừng"""
+        pipeline, _ = self._collect([("infer", lambda x: x)], [1])
+
+        assert pipeline.submit(2) is False
+
+    def test_shared_timings_feed_latency_histograms(self):
+        """TC8: StageTimings dùng chung đưa cùng mẫu vào histogram độ trễ"""
+        latency = LatencyRecorder()
+        timings = StageTimings(["decode", "infer"], latency=latency)
+        pipeline = FramePipeline(
+            [("infer", lambda x: x), ("publish", lambda x: None)], timings=timings
+        )
+        pipeline.start()
+        for item in range(5):
+            assert pipeline.submit(item)
+        pipeline.stop()
+        timings.record("decode", 0.002)
+
+        stats = latency.get_stats()
+
+        assert list(timings.get_timings()) == ["decode", "infer", "publish"]
+        assert pipeline.get_stage_timings() == timings.get_timings()
+        for name, timing in timings.get_timings().items():
+            assert stats[name]["count"] == timing["count"]
+        assert stats["infer"]["count"] == 5
+        assert stats["decode"]["p50_ms"] == pytest.approx(2.0, rel=0.05)
+
+    def test_disabled_timings_are_noop(self):
+        """TC9: StageTimings tắt không tạo timer và không ghi mẫu nào"""
+        latency = LatencyRecorder()
+        timings = StageTimings(["decode"], latency=latency, enabled=False)
+        pipeline, results = self._collect(
+            [("infer", lambda x: x * 2)], [1, 2, 3], timings=timings
+        )
+
+        with timings.measure("decode"):
+            pass
+        timings.record("draw", 0.001)
+
+        assert results == [2, 4, 6]
+        assert timings.get_timings() == {}
+        assert pipeline.get_stage_timings() == {}
+        assert latency.get_stats() == {}
+
+    def test_measure_records_block(self):
+        """TC10: measure() ghi thời gian của khối lệnh vào giai đoạn"""
+        timings = StageTimings()
+
+        with timings.measure("draw"):
+            time.sleep(0.01)
+
+        timing = timings.get_timings()["draw"]
+        assert timing["count"] == 1
+        assert timing["last_ms"] >= 5
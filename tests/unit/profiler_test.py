@@ -0,0 +1,121 @@
+"""
+Unit tests for SamplingProfiler
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from src.core.profiler import SamplingProfiler, parse_profile_duration
+
+
+def busy_loop(stop):
+    """Hàm bận CPU để profiler bắt được"""
+    total = 0
+    while not stop.is_set():
+        total += sum(range(100))
+    return total
+
+
+@pytest.fixture
+def busy_thread():
+    """Thread tên "worker" chạy busy_loop đến khi test kết thúc"""
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_loop, args=(stop,), name="worker")
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+class TestSamplingProfiler:
+    """Test cases for SamplingProfiler class"""
+
+    def test_parse_profile_duration(self):
+        """TC1: ""/0/false → tắt; 1/true → mặc định; số → số giây; sai → ValueError"""
+        assert parse_profile_duration("") == 0
+        assert parse_profile_duration(None) == 0
+        assert parse_profile_duration("0") == 0
+        assert parse_profile_duration("false") == 0
+        assert parse_profile_duration("1", default=30) == 30
+        assert parse_profile_duration("TRUE", default=30) == 30
+        assert parse_profile_duration("12.5") == 12.5
+        with pytest.raises(ValueError):
+            parse_profile_duration("abc")
+
+    def test_sample_collects_named_thread_stack(self, busy_thread):
+        """TC2: sample() ghi stack từ gốc thread đến hàm đang chạy"""
+        profiler = SamplingProfiler(threads=["worker"])
+
+        for _ in range(5):
+            profiler.sample()
+            time.sleep(0.001)
+
+        assert profiler.sample_count == 5
+        assert sum(profiler.samples.values()) == 5
+        for stack in profiler.samples:
+            assert stack[0][0] == "worker"
+            names = [frame[0] for frame in stack[1:]]
+            assert "busy_loop" in names
+            assert names.index("Thread.run") < names.index("busy_loop")
+
+    def test_collapsed_format(self, busy_thread):
+        """TC3: Mỗi dòng collapsed có dạng thread;hàm (file:dòng);... số_mẫu"""
+        profiler = SamplingProfiler(threads=["worker"])
+        for _ in range(3):
+            profiler.sample()
+
+        lines = profiler.to_collapsed().splitlines()
+
+        assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == 3
+        for line in lines:
+            stack = line.rsplit(" ", 1)[0].split(";")
+            assert stack[0] == "worker"
+            assert any(
+                frame.startswith("busy_loop (tests/unit/profiler_test.py:")
+                for frame in stack
+            )
+
+    def test_timed_run_writes_speedscope(self, busy_thread, tmp_path):
+        """TC4: start(duration) tự dừng, ghi collapsed + speedscope hợp lệ, gọi on_finish"""
+        finished = []
+        profiler = SamplingProfiler(interval=0.005, output_dir=tmp_path)
+
+        assert profiler.start(0.2, on_finish=finished.append)
+        assert not profiler.start(0.2)  # Đang chạy
+        profiler._thread.join(5)
+
+        assert not profiler.running
+        assert profiler.sample_count >= 5
+        paths = finished[0]
+        assert (tmp_path / paths["collapsed"]).exists()
+        with open(paths["speedscope"], encoding="utf-8") as f:
+            data = json.load(f)
+        frames = data["shared"]["frames"]
+        worker = next(p for p in data["profiles"] if p["name"] == "worker")
+        assert worker["type"] == "sampled"
+        assert len(worker["samples"]) == len(worker["weights"])
+        assert worker["endValue"] == pytest.approx(sum(worker["weights"]))
+        assert all(0 <= i < len(frames) for stack in worker["samples"] for i in stack)
+        assert any(frames[i]["name"] == "busy_loop" for i in worker["samples"][0])
+
+    def test_stop_early_still_saves(self, busy_thread, tmp_path):
+        """TC5: stop() trước khi hết giờ vẫn ghi file; không có mẫu → không ghi"""
+        finished = []
+        profiler = SamplingProfiler(interval=0.005, output_dir=tmp_path)
+
+        profiler.start(60, on_finish=finished.append)
+        time.sleep(0.1)
+        profiler.stop()
+
+        assert not profiler.running
+        assert profiler.elapsed < 10
+        assert set(finished[0]) == {"collapsed", "speedscope"}
+
+        empty = SamplingProfiler(interval=10, output_dir=tmp_path / "empty")
+        empty.start(60, on_finish=finished.append)
+        empty.stop()
+        assert finished[1] == {}
+        assert not (tmp_path / "empty").exists()
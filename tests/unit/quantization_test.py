@@ -0,0 +1,70 @@
+"""
+Unit tests for INT8 quantization helpers
+"""
+
+import cv2
+import numpy as np
+
+from src.core.quantization import (
+    LETTERBOX_COLOR,
+    CalibrationReader,
+    head_nodes_to_exclude,
+    letterbox,
+    to_model_input,
+)
+
+
+class TestQuantization:
+    """Test cases for quantization helpers"""
+
+    def test_letterbox_keeps_aspect_ratio(self):
+        """TC1: Ảnh ngang được resize giữ tỉ lệ và thêm viền trên/dưới"""
+        image = np.full((100, 200, 3), 255, dtype=np.uint8)
+
+        boxed = letterbox(image, 64)
+        assert boxed.shape == (64, 64, 3)
+        assert (boxed[16:48] == 255).all()
+        assert (boxed[:16] == LETTERBOX_COLOR).all()
+        assert (boxed[48:] == LETTERBOX_COLOR).all()
+
+        tensor = to_model_input(image, 64)
+        assert tensor.shape == (1, 3, 64, 64)
+        assert tensor.dtype == np.float32
+        assert tensor.max() == 1.0
+
+    def test_calibration_reader(self, tmp_path):
+        """TC2: Reader trả lần lượt từng ảnh, bỏ ảnh hỏng, trả None khi hết và rewind được"""
+        good = str(tmp_path / "good.png")
+        cv2.imwrite(good, np.zeros((32, 48, 3), dtype=np.uint8))
+        broken = str(tmp_path / "broken.png")
+        with open(broken, "wb") as f:
+            f.write(b"not an image")
+
+        reader = CalibrationReader([broken, good], input_name="images", imgsz=32)
+        first = reader.get_next()
+        assert list(first) == ["images"]
+        assert first["images"].shape == (1, 3, 32, 32)
+        assert reader.get_next() is None
+
+        reader.rewind()
+        assert reader.get_next() is not None
+
+    def test_head_nodes_excluded(self):
+        """TC3: Chỉ phần giải mã box của Detect head (model cuối, ngoài cv*) giữ FP32"""
+        nodes = [
+            "/model.0/conv/Conv",
+            "/model.21/cv1/conv/Conv",
+            "/model.22/cv2.0/cv2.0.0/conv/Conv",
+            "/model.22/cv3.1/cv3.1.2/Conv",
+            "/model.22/dfl/conv/Conv",
+            "/model.22/Concat_3",
+            "/model.22/Sigmoid",
+            "output0_Identity",
+        ]
+
+        assert head_nodes_to_exclude(nodes) == [
+            "/model.22/dfl/conv/Conv",
+            "/model.22/Concat_3",
+            "/model.22/Sigmoid",
+        ]
+        assert head_nodes_to_exclude(["Conv_0", "Relu_1"]) == []
@@ -0,0 +1,99 @@
+"""
+Unit tests for RegionOfInterest
+"""
+
+import numpy as np
+import pytest
+
+from src.core.roi import RegionOfInterest
+
+
+def make_boxes(*centers, size=10):
+    """Tạo mảng box (N, 6) có tâm tại các điểm cho trước"""
+    half = size / 2
+    return np.array(
+        [[x - half, y - half, x + half, y + half, 0.9, 0] for x, y in centers],
+        dtype=np.float32,
+    )
+
+
+class TestRegionOfInterest:
+    """Test cases for RegionOfInterest class"""
+
+    def test_from_config_empty_returns_none(self):
+        """TC1: Không cấu hình → không dùng ROI"""
+        assert RegionOfInterest.from_config(None) is None
+        assert RegionOfInterest.from_config({}) is None
+
+    def test_invalid_polygon_raises(self):
+        """TC2: Đa giác ít hơn 3 điểm → ValueError"""
+        with pytest.raises(ValueError):
+            RegionOfInterest(roi=[(0, 0), (10, 10)])
+
+    def test_crop_to_roi_bounding_rect(self):
+        """TC3: Crop theo hình chữ nhật bao quanh ROI"""
+        region = RegionOfInterest(roi=[(100, 50), (300, 50), (200, 250)])
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+        crop, offset = region.crop(frame)
+
+        assert offset == (100, 50)
+        assert crop.shape == (201, 201, 3)
+
+    def test_normalized_coordinates(self):
+        """TC4: Toạ độ tỉ lệ 0-1 được đổi theo kích thước frame"""
+        region = RegionOfInterest(roi=[(0.5, 0), (1, 0), (1, 1), (0.5, 1)])
+        frame = np.zeros((100, 200, 3), dtype=np.uint8)
+
+        crop, offset = region.crop(frame)
+
+        assert offset == (100, 0)
+        assert crop.shape[:2] == (100, 100)
+
+    def test_no_roi_keeps_full_frame(self):
+        """TC5: Chỉ có vùng loại trừ → crop toàn bộ frame"""
+        region = RegionOfInterest(exclusions=[[(0, 0), (50, 0), (50, 50), (0, 50)]])
+        frame = np.zeros((100, 200, 3), dtype=np.uint8)
+
+        crop, offset = region.crop(frame)
+
+        assert offset == (0, 0)
+        assert crop.shape == frame.shape
+
+    def test_restore_shifts_boxes_to_frame_coordinates(self):
+        """TC6: Box trong vùng crop được dịch về toạ độ frame gốc"""
+        region = RegionOfInterest(roi=[(100, 100), (300, 100), (300, 300), (100, 300)])
+        boxes = make_boxes((50, 50))
+
+        restored = region.restore(boxes, (100, 100), (480, 640, 3))
+
+        np.testing.assert_allclose(restored[0, :4], [145, 145, 155, 155])
+
+    def test_restore_drops_boxes_outside_roi(self):
+        """TC7: Box có tâm ngoài đa giác ROI (nhưng trong crop) bị loại"""
+        # ROI tam giác: góc dưới phải của hình chữ nhật bao nằm ngoài ROI
+        region = RegionOfInterest(roi=[(0, 0), (200, 0), (0, 200)])
+        boxes = make_boxes((20, 20), (180, 180))
+
+        restored = region.restore(boxes, (0, 0), (480, 640, 3))
+
+        assert len(restored) == 1
+        np.testing.assert_allclose(restored[0, :4], [15, 15, 25, 25])
+
+    def test_restore_drops_boxes_in_exclusion(self):
+        """TC8: Box có tâm trong vùng loại trừ bị loại"""
+        region = RegionOfInterest(exclusions=[[(0, 0), (100, 0), (100, 100), (0, 100)]])
+        boxes = make_boxes((50, 50), (300, 300))
+
+        restored = region.restore(boxes, (0, 0), (480, 640, 3))
+
+        assert len(restored) == 1
+        np.testing.assert_allclose(restored[0, :2], [295, 295])
+
+    def test_restore_empty(self):
+        """TC9: Không có box → mảng rỗng (0, 6)"""
+        region = RegionOfInterest(roi=[(0, 0), (10, 0), (10, 10)])
+
+        restored = region.restore(np.empty((0, 6)), (0, 0), (480, 640, 3))
+
+        assert restored.shape == (0, 6)
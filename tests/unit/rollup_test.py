@@ -0,0 +1,130 @@
+"""
+Unit tests for TimeRollup
+"""
+
+import pytest
+
+from src.core.rollup import RollupSeries, TimeRollup
+
+T0 = 1_700_000_040  # Đầu một phút
+
+
+class TestRollupSeries:
+    """Test cases for RollupSeries class"""
+
+    def test_invalid_arguments_raise(self):
+        """TC1: resolution/capacity không hợp lệ → ValueError"""
+        with pytest.raises(ValueError):
+            RollupSeries(0, 10)
+        with pytest.raises(ValueError):
+            RollupSeries(60, 0)
+
+    def test_bucket_aggregates(self):
+        """TC2: Mỗi bucket giữ min/max/mean/số mẫu"""
+        series = RollupSeries(60, 10)
+        for offset, value in [(0, 2), (10, 6), (59, 4), (60, 1)]:
+            series.add(value, T0 + offset)
+
+        result = series.get_series()
+
+        assert result["timestamp"].tolist() == [T0, T0 + 60]
+        assert result["min"].tolist() == [2, 1]
+        assert result["max"].tolist() == [6, 1]
+        assert result["mean"].tolist() == [4.0, 1.0]
+        assert result["samples"].tolist() == [3, 1]
+
+    def test_fixed_capacity_overwrites_oldest(self):
+        """TC3: Bộ nhớ cố định, bucket cũ nhất bị ghi đè"""
+        series = RollupSeries(1, 5)
+        nbytes = series.nbytes
+        for second in range(20):
+            series.add(second, T0 + second)
+
+        result = series.get_series()
+
+        assert result["timestamp"].tolist() == [T0 + s for s in range(15, 20)]
+        assert series.nbytes == nbytes
+
+    def test_late_sample_goes_to_old_bucket(self):
+        """TC4: Mẫu đến muộn được cộng vào bucket cũ còn hiệu lực"""
+        series = RollupSeries(60, 10)
+        series.add(1, T0)
+        series.add(3, T0 + 60)
+
+        series.add(9, T0 + 30)
+
+        result = series.get_series()
+        assert result["max"].tolist() == [9, 3]
+        assert result["samples"].tolist() == [2, 1]
+
+    def test_since_filter(self):
+        """TC5: Lọc bucket theo thời điểm bắt đầu"""
+        series = RollupSeries(60, 10)
+        for minute in range(5):
+            series.add(minute, T0 + minute * 60)
+
+        result = series.get_series(since=T0 + 180)
+
+        assert result["timestamp"].tolist() == [T0 + 180, T0 + 240]
+
+
+class TestTimeRollup:
+    """Test cases for TimeRollup class"""
+
+    def test_multiple_resolutions(self):
+        """TC6: Một mẫu được cộng vào tất cả độ phân giải"""
+        rollup = TimeRollup(resolutions=[(1, 120), (60, 10)])
+        for second in range(90):
+            rollup.add(second % 3, T0 + second)
+
+        assert len(rollup.get_series(1)["timestamp"]) == 90
+        assert rollup.get_series(60)["samples"].tolist() == [60, 30]
+        assert rollup.get_latest(60) == {
+            "timestamp": T0 + 60,
+            "min": 0.0,
+            "max": 2.0,
+            "mean": 1.0,
+            "samples": 30,
+        }
+
+    def test_unknown_resolution_raises(self):
+        """TC7: Độ phân giải không cấu hình → ValueError"""
+        with pytest.raises(ValueError):
+            TimeRollup(resolutions=[(60, 10)]).get_series(1)
+
+    def test_to_records_and_reset(self):
+        """TC8: to_records() trả về mọi bucket, reset() xoá dữ liệu"""
+        rollup = TimeRollup(resolutions=[(60, 10), (3600, 2)])
+        rollup.add(5, T0)
+
+        records = rollup.to_records()
+
+        assert [r["resolution"] for r in records] == [60, 3600]
+        assert records[0]["mean"] == 5.0
+
+        rollup.reset()
+        assert rollup.to_records() == []
+        assert rollup.get_latest(60) is None
+
+    def test_default_footprint_is_small(self):
+        """TC9: Cấu hình mặc định chiếm vài chục KB bất kể thời gian chạy"""
+        assert TimeRollup().nbytes < 32 * 1024
+
+    def test_get_series_does_not_modify_buffer(self):
+        """TC10: Đọc bucket đang mở không ghi vào bộ đệm vòng (an toàn khi đọc song song)"""
+        series = RollupSeries(60, 10)
+        series.add(2, T0)
+        series.add(4, T0 + 1)
+        before = [array.copy() for array in (series.bucket_ids, series.samples)]
+
+        first = series.get_series()
+        series.add(6, T0 + 2)
+        second = series.get_series()
+
+        assert (series.bucket_ids == before[0]).all()
+        assert (series.samples == before[1]).all()
+        assert first["samples"].tolist() == [2]
+        assert second["samples"].tolist() == [3]
+        assert second["mean"].tolist() == [4.0]
+        assert second["max"].tolist() == [6.0]
+        assert series.get_series(since=T0 + 60)["samples"].tolist() == []
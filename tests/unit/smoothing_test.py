@@ -0,0 +1,104 @@
+"""
+Unit tests for CountSmoother
+"""
+
+import pytest
+
+from src.core.smoothing import CountSmoother
+
+
+def feed(smoother, counts):
+    """Đưa lần lượt các số người thô vào bộ làm mượt"""
+    return [smoother.update(count) for count in counts]
+
+
+class TestCountSmoother:
+    """Test cases for CountSmoother class"""
+
+    def test_invalid_arguments_raise(self):
+        """TC1: Tham số không hợp lệ → ValueError"""
+        with pytest.raises(ValueError):
+            CountSmoother(method="mean")
+        with pytest.raises(ValueError):
+            CountSmoother(window=0)
+        with pytest.raises(ValueError):
+            CountSmoother(method="ema", alpha=0)
+
+    def test_median_removes_single_frame_spike(self):
+        """TC2: Median bỏ qua nhiễu một frame"""
+        smoother = CountSmoother(method="median", window=5, hysteresis=0.6)
+
+        reported = feed(smoother, [3, 3, 3, 11, 3, 3])
+
+        assert reported == [3, 3, 3, 3, 3, 3]
+
+    def test_median_follows_sustained_change(self):
+        """TC3: Median theo kịp thay đổi kéo dài hơn nửa cửa sổ"""
+        smoother = CountSmoother(method="median", window=5, hysteresis=0.6)
+
+        reported = feed(smoother, [2, 2, 2, 2, 2, 5, 5, 5])
+
+        assert reported[-1] == 5
+        assert reported[5] == 2
+
+    def test_median_window_slides(self):
+        """TC4: Giá trị cũ bị loại khỏi cửa sổ"""
+        smoother = CountSmoother(method="median", window=3, hysteresis=0)
+
+        feed(smoother, [1, 9, 9, 2, 2])
+
+        assert smoother.smoothed == 2.0
+
+    def test_ema_with_hysteresis(self):
+        """TC5: EMA chỉ đổi số báo cáo khi lệch quá ngưỡng hysteresis"""
+        smoother = CountSmoother(method="ema", alpha=0.5, hysteresis=0.6)
+
+        # smoothed: 4 → 4.5 → 4.75 (lệch 0.75 > 0.6 → báo cáo 5)
+        reported = feed(smoother, [4, 5, 5])
+
+        assert reported == [4, 4, 5]
+        assert smoother.smoothed == pytest.approx(4.75)
+
+    def test_hysteresis_prevents_flapping(self):
+        """TC6: Số thô dao động quanh ngưỡng → số báo cáo không đổi liên tục"""
+        smoother = CountSmoother(method="ema", alpha=0.3, hysteresis=0.6)
+
+        reported = feed(smoother, [10, 11, 10, 11, 10, 11, 10, 11])
+
+        assert set(reported) == {10}
+
+    def test_mode(self):
+        """TC7: Mode trả về giá trị xuất hiện nhiều nhất trong cửa sổ"""
+        smoother = CountSmoother(method="mode", window=5, hysteresis=0)
+
+        reported = feed(smoother, [2, 2, 7, 2, 7, 7, 7])
+
+        assert reported[:5] == [2, 2, 2, 2, 2]
+        assert reported[-1] == 7
+
+    def test_reset(self):
+        """TC8: reset() xoá trạng thái"""
+        smoother = CountSmoother(method="median", window=5)
+        feed(smoother, [5, 5, 5])
+
+        smoother.reset()
+
+        assert smoother.reported == 0
+        assert smoother.update(1) == 1
+
+    def test_median_mode_hysteresis_hold(self):
+        """TC9: Median/mode: thay đổi ±1 chỉ báo cáo khi giữ đủ hold_frames, thay đổi lớn báo cáo ngay"""
+        for method in ("median", "mode"):
+            smoother = CountSmoother(
+                method=method, window=1, hysteresis=0.6, hold_frames=3
+            )
+            assert feed(smoother, [3, 4, 3, 4, 3, 4, 3]) == [3] * 7
+            assert feed(smoother, [4, 4, 4, 4]) == [3, 3, 4, 4]
+            assert feed(smoother, [3, 4]) == [4, 4]
+            assert feed(smoother, [7]) == [7]
+
+            plain = CountSmoother(method=method, window=1, hysteresis=0)
+            assert feed(plain, [3, 4, 3]) == [3, 4, 3]
+
+        with pytest.raises(ValueError):
+            CountSmoother(hold_frames=0)
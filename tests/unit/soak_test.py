@@ -0,0 +1,128 @@
+"""
+Unit tests for SoakTest
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from src.benchmark.soak import SoakTest, current_rss, detect_growth, torch_allocated
+from src.core.person_detector import PersonDetector
+from src.core.synthetic_source import open_video_source
+
+SOURCE = "synthetic://?width=160&height=120&fps=30&persons=15&occupancy=0.8&noise=0"
+
+
+class LeakyDetector:
+    """Detector giữ lại một mảng 64 KB mỗi frame (rò rỉ giả lập)"""
+
+    def __init__(self):
+        self.leaked = []
+
+    def detect_persons(self, frame):
+        self.leaked.append(np.ones(64 * 1024, dtype=np.uint8))
+        return []
+
+
+class TestSoakTest:
+    """Test cases for SoakTest class"""
+
+    def test_detect_growth(self):
+        """TC1: Tăng đều quá ngưỡng → sustained; đi ngang, dưới ngưỡng, tăng rồi giảm → không"""
+        frames = list(range(0, 1000, 100))
+
+        growing = detect_growth(frames, [i * 100 for i in range(10)], limit=500)
+        flat = detect_growth(frames, [1000, 1010, 990, 1005] * 2 + [1000, 995], 500)
+        small = detect_growth(frames, [i * 10 for i in range(10)], limit=500)
+        spike = detect_growth(frames, [0, 0, 0, 2000, 2000, 2000, 0, 0, 0, 0], 500)
+
+        assert growing["sustained"]
+        assert growing["growth"] == pytest.approx(900)
+        assert growing["per_1k_frames"] == pytest.approx(1000)
+        assert not flat["sustained"]
+        assert not small["sustained"]
+        assert not spike["sustained"]
+        # Chưa đủ mẫu hoặc không có ngưỡng → không bao giờ fail
+        assert not detect_growth([0, 100], [0, 10**9], 1)["sustained"]
+        assert not detect_growth(frames, [i * 100 for i in range(10)], None)[
+            "sustained"
+        ]
+
+    def test_memory_probes(self):
+        """TC2: Đọc được RSS; không có torch/CUDA → None"""
+        rss = current_rss()
+        allocated = torch_allocated()
+
+        assert rss is None or rss > 0
+        assert allocated is None or allocated >= 0
+
+    def test_stable_pipeline_passes(self):
+        """TC3: Pipeline đầy đủ với buffer được ghi định kỳ → không fail"""
+        soak = SoakTest(frames=300, sample_interval=50, source=SOURCE, log_interval=5)
+
+        report = soak.run()
+
+        assert report["passed"], report["failures"]
+        assert [s["frame"] for s in report["samples"]] == [50, 100, 150, 200, 250, 300]
+        assert report["samples"][0]["warmup"] and not report["samples"][-1]["warmup"]
+        assert report["growth"]["PersonCounter.count_history"]["end"] == 100
+        assert report["summary"]["frames"] == 300
+        assert report["summary"]["alerts"] > 0
+        assert set(report["component_sites"]) == {
+            "DataLogger",
+            "AlertSystem",
+            "Visualizer",
+        }
+
+    def test_unbounded_buffer_fails(self):
+        """TC4: DataLogger không bao giờ ghi ra file → data_buffer tăng liên tục, fail"""
+        soak = SoakTest(
+            frames=300,
+            sample_interval=50,
+            source=SOURCE,
+            log_interval=1,
+            flush_interval=0,
+            limits={"buffer_items": 100},
+        )
+
+        report = soak.run()
+
+        assert not report["passed"]
+        assert "DataLogger.data_buffer" in report["failures"]
+        assert report["growth"]["DataLogger.data_buffer"]["end"] == 300
+        assert any(
+            site["site"].startswith("src/core/data_logger.py")
+            for site in report["component_sites"]["DataLogger"]
+        )
+
+    def test_leak_reported_with_allocation_site(self):
+        """TC5: Rò rỉ trong detector → heap tăng liên tục, vị trí cấp phát đứng đầu"""
+        soak = SoakTest(
+            frames=200,
+            sample_interval=25,
+            source=SOURCE,
+            limits={"heap_bytes": 2 * 1024 * 1024},
+            detector=LeakyDetector(),
+        )
+
+        report = soak.run()
+
+        assert "heap_bytes" in report["failures"]
+        assert report["top_sites"][0]["site"].endswith(
+            "soak_test.py:"
+            + str(LeakyDetector.detect_persons.__code__.co_firstlineno + 1)
+        )
+        assert report["top_sites"][0]["size_diff"] > 5 * 1024 * 1024
+
+    def test_default_detector_uses_ground_truth(self):
+        """TC6: Detector mặc định trả đúng số người của ground truth; nguồn không có ground truth → ValueError"""
+        capture = open_video_source(SOURCE)
+        _, frame = capture.read()
+
+        detector = SoakTest(source=SOURCE)._make_detector(capture)
+        detections = detector.detect_persons(frame)
+
+        assert isinstance(detector, PersonDetector)
+        assert len(detections) == len(capture.get_ground_truth()) > 0
+        with pytest.raises(ValueError):
+            SoakTest()._make_detector(cv2.VideoCapture())
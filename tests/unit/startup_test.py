@@ -0,0 +1,86 @@
+"""
+Unit tests for StartupBenchmark và lazy import của src.core
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+from config.settings import PROJECT_ROOT
+from src.benchmark.startup import StartupBenchmark, measure_import, parse_importtime
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _abc
+import time:       300 |        420 |   abc
+import time:      1000 |       1420 | json
+import time:        50 |         50 | config
+"""
+
+
+class TestStartupBenchmark:
+    """Test cases for StartupBenchmark class"""
+
+    def test_parse_importtime(self):
+        """TC1: Đọc self/cumulative và độ sâu từ output -X importtime, bỏ dòng tiêu đề"""
+        entries = parse_importtime(SAMPLE + "Traceback: khác\n")
+
+        assert [e["module"] for e in entries] == ["_abc", "abc", "json", "config"]
+        assert [e["depth"] for e in entries] == [2, 1, 0, 0]
+        assert entries[2]["self_us"] == 1000
+        assert entries[2]["cumulative_us"] == 1420
+
+    def test_core_package_is_lazy(self):
+        """TC2: import src.core không kéo theo numpy/cv2/pandas/torch"""
+        result = measure_import("src.core")
+
+        heavy = {"numpy", "cv2", "pandas", "torch", "ultralytics"}
+        assert not heavy & {name.split(".")[0] for name in result["loaded"]}
+        assert "src.core.person_detector" not in result["loaded"]
+        assert result["total_ms"] > 0
+
+    def test_lazy_attribute_access(self):
+        """TC3: Truy cập src.core.<tên> import đúng module; tên lạ → AttributeError"""
+        import src.core
+        from src.core.person_counter import PersonCounter
+
+        assert src.core.PersonCounter is PersonCounter
+        assert "DataLogger" in dir(src.core)
+        with pytest.raises(AttributeError):
+            src.core.NotAModule
+
+    def test_no_filesystem_work_at_import(self):
+        """TC4: import config.settings và src.core không tạo thư mục"""
+        code = (
+            "import os, pathlib\n"
+            "def fail(*args, **kwargs):\n"
+            "    raise AssertionError('mkdir lúc import')\n"
+            "pathlib.Path.mkdir = fail\n"
+            "os.makedirs = os.mkdir = fail\n"
+            "import config.settings, src.core\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=str(PROJECT_ROOT),
+            capture_output=True,
+            text=True,
+        )
+
+        assert result.returncode == 0, result.stderr
+
+    def test_budget_and_forbidden_failures(self):
+        """TC5: Vượt ngân sách hoặc import module bị cấm → failures, passed=False"""
+        report = StartupBenchmark(
+            budgets={"config.settings": 1000, "decimal": 0.0001},
+            forbidden={"config.settings": ["pathlib", "numpy"]},
+            repeats=1,
+        ).run()
+
+        assert not report["passed"]
+        settings = report["modules"]["config.settings"]
+        assert not settings["over_budget"]
+        assert settings["forbidden_loaded"] == ["pathlib"]
+        assert report["modules"]["decimal"]["over_budget"]
+        assert len(report["failures"]) == 2
+        with pytest.raises(ValueError):
+            StartupBenchmark(repeats=0)
@@ -0,0 +1,147 @@
+"""
+Unit tests for SyntheticVideoCapture
+"""
+
+import cv2
+import numpy as np
+import pytest
+
+from src.core.clock import ManualClock
+from src.core.synthetic_source import (
+    SyntheticVideoCapture,
+    is_synthetic_source,
+    open_video_source,
+)
+from src.core.video_batch import process_range
+
+
+class GroundTruthDetector:
+    """Detector "hoàn hảo": đọc ground truth từ nguồn giả lập cùng cấu hình"""
+
+    def __init__(self, source):
+        self.source = source
+
+    def detect_array_batch(self, frames):
+        results = []
+        for _ in frames:
+            self.source.grab()
+            results.append(self.source.get_ground_truth())
+        return results
+
+
+class TestSyntheticVideoCapture:
+    """Test cases for SyntheticVideoCapture class"""
+
+    def test_read_frames_like_video_capture(self):
+        """TC1: read() trả frame đúng kích thước, hết frame → (False, None)"""
+        cap = SyntheticVideoCapture(width=320, height=240, fps=10, persons=3, frames=2)
+
+        ret1, frame = cap.read()
+        ret2, _ = cap.read()
+        ret3, end = cap.read()
+
+        assert cap.isOpened()
+        assert ret1 and ret2 and not ret3 and end is None
+        assert frame.shape == (240, 320, 3) and frame.dtype == np.uint8
+        assert cap.get(cv2.CAP_PROP_FPS) == 10
+        assert cap.get(cv2.CAP_PROP_FRAME_COUNT) == 2
+        cap.release()
+        assert not cap.isOpened()
+
+    def test_same_seed_same_frames(self):
+        """TC2: Cùng seed → frame và ground truth giống hệt; seed khác → khác"""
+        a = SyntheticVideoCapture(width=160, height=120, persons=5, seed=7)
+        b = SyntheticVideoCapture(width=160, height=120, persons=5, seed=7)
+        c = SyntheticVideoCapture(width=160, height=120, persons=5, seed=8)
+
+        for _ in range(3):
+            _, frame_a = a.read()
+            _, frame_b = b.read()
+            _, frame_c = c.read()
+            np.testing.assert_array_equal(frame_a, frame_b)
+            np.testing.assert_array_equal(a.get_ground_truth(), b.get_ground_truth())
+        assert not np.array_equal(frame_a, frame_c)
+
+    def test_ground_truth_inside_frame_and_moves(self):
+        """TC3: Ground truth có đủ người, nằm trong frame và di chuyển liên tục"""
+        cap = SyntheticVideoCapture(width=640, height=480, persons=8)
+
+        cap.read()
+        first = cap.get_ground_truth()
+        cap.read()
+        second = cap.get_ground_truth()
+
+        assert first.shape == (8, 5)
+        assert (first[:, :2] >= 0).all()
+        assert (first[:, 2] <= 640).all() and (first[:, 3] <= 480).all()
+        # Cùng ID, vị trí thay đổi rất ít giữa hai frame liên tiếp
+        common = np.intersect1d(first[:, 4], second[:, 4])
+        assert len(common) >= 6
+        a = first[np.isin(first[:, 4], common)]
+        b = second[np.isin(second[:, 4], common)]
+        assert np.abs(a[:, :4] - b[:, :4]).max() < 20
+
+    def test_occupancy_controls_density(self):
+        """TC4: occupancy=0.5 → trung bình khoảng một nửa số người"""
+        cap = SyntheticVideoCapture(
+            width=160, height=120, fps=10, persons=40, occupancy=0.5, noise=False
+        )
+
+        counts = []
+        for _ in range(200):
+            cap.grab()
+            counts.append(len(cap.get_ground_truth()))
+
+        assert 14 <= np.mean(counts) <= 26
+        assert max(counts) <= 40
+
+    def test_seek_matches_sequential_read(self):
+        """TC5: Seek bằng CAP_PROP_POS_FRAMES cho đúng frame như đọc tuần tự"""
+        sequential = SyntheticVideoCapture(width=160, height=120, persons=4, seed=3)
+        for _ in range(50):
+            sequential.grab()
+        _, expected = sequential.retrieve()
+
+        seeker = SyntheticVideoCapture(width=160, height=120, persons=4, seed=3)
+        assert seeker.set(cv2.CAP_PROP_POS_FRAMES, 49)
+        _, frame = seeker.read()
+
+        np.testing.assert_array_equal(frame, expected)
+        np.testing.assert_array_equal(
+            seeker.get_ground_truth(), sequential.get_ground_truth()
+        )
+
+    def test_realtime_with_manual_clock(self):
+        """TC6: realtime + ManualClock → đồng hồ tăng 1/fps mỗi frame, không sleep"""
+        clock = ManualClock()
+        cap = SyntheticVideoCapture(
+            width=64, height=48, fps=25, persons=1, realtime=True, clock=clock
+        )
+
+        for _ in range(51):
+            cap.grab()
+
+        assert clock.monotonic() == pytest.approx(2.0)
+
+    def test_open_video_source_url(self):
+        """TC7: open_video_source nhận synthetic://, tham số sai → ValueError"""
+        url = "synthetic://?width=200&height=100&fps=5&persons=2&frames=3&noise=0"
+
+        cap = open_video_source(url)
+
+        assert is_synthetic_source(url) and not is_synthetic_source(0)
+        assert isinstance(cap, SyntheticVideoCapture)
+        assert (cap.width, cap.height, cap.fps, cap.frames) == (200, 100, 5.0, 3)
+        assert cap._noise is None
+        with pytest.raises(ValueError):
+            open_video_source("synthetic://?people=3")
+
+    def test_offline_processing_on_synthetic_source(self):
+        """TC8: Xử lý offline đọc được nguồn giả lập, số người khớp ground truth"""
+        url = "synthetic://?width=160&height=120&fps=10&persons=6&frames=30&seed=2"
+        detector = GroundTruthDetector(open_video_source(url))
+
+        seconds = process_range(detector, url, 0, 30, 10.0, 8, 1)
+
+        assert [s["frames"] for s in seconds] == [10, 10, 10]
+        assert all(s["max"] == 6 for s in seconds)
@@ -0,0 +1,95 @@
+"""
+Unit tests for tiled inference helpers
+"""
+
+import numpy as np
+import pytest
+
+from src.core.tiling import compute_tiles, non_max_suppression, pairwise_overlap
+
+
+class TestComputeTiles:
+    """Test cases for compute_tiles"""
+
+    def test_small_frame_single_tile(self):
+        """TC1: Frame nhỏ hơn tile → một tile phủ toàn frame"""
+        tiles = compute_tiles(480, 600, 640, 0.2)
+
+        np.testing.assert_array_equal(tiles, [[0, 0, 600, 480]])
+
+    def test_tiles_cover_frame_with_overlap(self):
+        """TC2: Các tile phủ kín frame 4K và chồng lấn đúng tỉ lệ"""
+        tiles = compute_tiles(2160, 3840, 640, 0.25)
+
+        covered = np.zeros((2160, 3840), dtype=bool)
+        for x1, y1, x2, y2 in tiles:
+            covered[y1:y2, x1:x2] = True
+        assert covered.all()
+
+        # Mọi tile đều đủ kích thước và nằm trong frame
+        assert ((tiles[:, 2] - tiles[:, 0]) == 640).all()
+        assert ((tiles[:, 3] - tiles[:, 1]) == 640).all()
+        assert tiles[:, 2].max() == 3840 and tiles[:, 3].max() == 2160
+
+        # Hai tile liền kề cách nhau stride = 480
+        xs = np.unique(tiles[:, 0])
+        assert xs[1] - xs[0] == 480
+
+    @pytest.mark.parametrize("tile_size,overlap", [(0, 0.2), (640, 1.0), (640, -0.1)])
+    def test_invalid_arguments(self, tile_size, overlap):
+        """TC3: Tham số không hợp lệ → ValueError"""
+        with pytest.raises(ValueError):
+            compute_tiles(480, 640, tile_size, overlap)
+
+
+class TestNonMaxSuppression:
+    """Test cases for non_max_suppression"""
+
+    def test_pairwise_iou(self):
+        """TC4: Ma trận IoU/IoS tính đúng"""
+        boxes = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [0, 0, 5, 5]])
+
+        iou = pairwise_overlap(boxes, "iou")
+        ios = pairwise_overlap(boxes, "ios")
+
+        assert iou[0, 1] == pytest.approx(50 / 150)
+        assert iou[0, 0] == pytest.approx(1.0)
+        # Box nhỏ nằm trọn trong box lớn → IoS = 1
+        assert ios[0, 2] == pytest.approx(1.0)
+        assert iou[0, 2] == pytest.approx(0.25)
+
+    def test_suppresses_duplicates_keeps_highest(self):
+        """TC5: Box trùng lặp bị loại, giữ box confidence cao nhất"""
+        boxes = np.array(
+            [
+                [0, 0, 10, 10, 0.6, 0],
+                [1, 1, 11, 11, 0.9, 0],
+                [50, 50, 60, 60, 0.7, 0],
+            ]
+        )
+
+        kept = non_max_suppression(boxes, 0.5)
+
+        np.testing.assert_allclose(kept[:, 4], [0.9, 0.7])
+
+    def test_ios_merges_partial_boxes_across_tiles(self):
+        """TC6: Box bị cắt ở mép tile nằm trong box đầy đủ → gộp với IoS"""
+        boxes = np.array(
+            [
+                [100, 100, 140, 200, 0.9, 0],  # Người đầy đủ
+                [100, 100, 140, 130, 0.6, 0],  # Phần bị cắt ở tile bên cạnh
+            ]
+        )
+
+        assert len(non_max_suppression(boxes, 0.5, metric="iou")) == 2
+        assert len(non_max_suppression(boxes, 0.5, metric="ios")) == 1
+
+    def test_different_classes_not_suppressed(self):
+        """TC7: Box khác class không loại nhau"""
+        boxes = np.array([[0, 0, 10, 10, 0.9, 0], [0, 0, 10, 10, 0.8, 1]])
+
+        assert len(non_max_suppression(boxes, 0.5)) == 2
+
+    def test_empty(self):
+        """TC8: Không có box → mảng rỗng (0, 6)"""
+        assert non_max_suppression(np.empty((0, 6)), 0.5).shape == (0, 6)
@@ -0,0 +1,148 @@
+"""
+Unit tests for PersonTracker
+"""
+
+import numpy as np
+import pytest
+
+from src.core.tracker import (
+    PersonTracker,
+    boxes_to_measurements,
+    linear_assignment,
+    states_to_boxes,
+)
+
+
+def make_boxes(*boxes, confidence=0.9):
+    """Tạo mảng detection (N, 6) từ các box x1, y1, x2, y2"""
+    return np.array([[*box, confidence, 0] for box in boxes], dtype=np.float32).reshape(
+        -1, 6
+    )
+
+
+class TestLinearAssignment:
+    """Test cases for linear_assignment"""
+
+    @pytest.mark.parametrize("method", ["hungarian", "greedy"])
+    def test_matches_above_threshold(self, method):
+        """TC1: Chỉ ghép các cặp có điểm ≥ ngưỡng"""
+        score = np.array([[0.9, 0.1], [0.2, 0.05]])
+
+        matches = linear_assignment(score, 0.3, method)
+
+        assert matches.tolist() == [[0, 0]]
+
+    def test_empty_matrix(self):
+        """TC2: Ma trận rỗng → không có cặp nào"""
+        matches = linear_assignment(np.empty((0, 3)), 0.3, "greedy")
+
+        assert matches.shape == (0, 2)
+
+    def test_invalid_method_raises(self):
+        """TC3: Phương pháp không hợp lệ → ValueError"""
+        with pytest.raises(ValueError):
+            linear_assignment(np.ones((1, 1)), 0.3, "random")
+
+
+class TestPersonTracker:
+    """Test cases for PersonTracker class"""
+
+    def test_measurement_round_trip(self):
+        """TC4: Đổi box ↔ trạng thái Kalman không làm sai toạ độ"""
+        boxes = np.array([[10, 20, 50, 120], [0, 0, 30, 30]], dtype=np.float32)
+
+        restored = states_to_boxes(boxes_to_measurements(boxes))
+
+        np.testing.assert_allclose(restored, boxes, atol=1e-3)
+
+    def test_track_confirmed_after_min_hits(self):
+        """TC5: Track chỉ có ID sau min_hits frame"""
+        tracker = PersonTracker(min_hits=3, matching="greedy")
+        boxes = make_boxes((10, 10, 50, 100))
+
+        ids = [tracker.update(boxes, timestamp=t)[0] for t in range(4)]
+
+        assert ids == [-1, -1, 1, 1]
+        assert tracker.unique_count == 1
+
+    def test_ids_stable_for_moving_people(self):
+        """TC6: Người di chuyển đều giữ nguyên ID"""
+        tracker = PersonTracker(min_hits=1, matching="greedy")
+        history = []
+        for step in range(10):
+            boxes = make_boxes(
+                (10 + 5 * step, 10, 50 + 5 * step, 100),
+                (400 - 5 * step, 200, 440 - 5 * step, 300),
+            )
+            history.append(tracker.update(boxes, timestamp=step).tolist())
+
+        assert all(ids == [1, 2] for ids in history)
+        assert tracker.unique_count == 2
+
+    def test_track_survives_missed_frames(self):
+        """TC7: Mất detection vài frame (< max_age) vẫn giữ ID cũ"""
+        tracker = PersonTracker(max_age=5, min_hits=1, matching="greedy")
+        box = make_boxes((10, 10, 50, 100))
+        tracker.update(box, timestamp=0)
+        for t in range(1, 4):
+            tracker.update(make_boxes(), timestamp=t)
+
+        ids = tracker.update(box, timestamp=4)
+
+        assert ids.tolist() == [1]
+        assert tracker.unique_count == 1
+
+    def test_stale_track_removed(self):
+        """TC8: Track mất quá max_age frame bị xoá, người quay lại có ID mới"""
+        tracker = PersonTracker(max_age=2, min_hits=1, matching="greedy")
+        box = make_boxes((10, 10, 50, 100))
+        tracker.update(box, timestamp=0)
+        tracker.update(box, timestamp=1)
+        for t in range(2, 6):
+            tracker.update(make_boxes(), timestamp=t)
+
+        ids = tracker.update(box, timestamp=6)
+
+        assert ids.tolist() == [2]
+        stats = tracker.get_stats()
+        assert stats["unique_count"] == 2
+        assert stats["max_dwell_time"] == 1.0
+
+    def test_low_confidence_only_extends_tracks(self):
+        """TC9: Detection confidence thấp nối track cũ nhưng không tạo track mới"""
+        tracker = PersonTracker(min_hits=1, high_confidence=0.6, matching="greedy")
+        tracker.update(make_boxes((10, 10, 50, 100)), timestamp=0)
+
+        ids = tracker.update(
+            np.concatenate(
+                [
+                    make_boxes((11, 10, 51, 100), confidence=0.4),
+                    make_boxes((300, 300, 340, 400), confidence=0.4),
+                ]
+            ),
+            timestamp=1,
+        )
+
+        assert ids.tolist() == [1, -1]
+        assert len(tracker.get_tracks()) == 1
+
+    def test_dwell_times(self):
+        """TC10: Dwell time tính từ lần đầu đến lần cuối thấy"""
+        tracker = PersonTracker(min_hits=1, matching="greedy")
+        for t in (0.0, 1.5, 3.0):
+            tracker.update(make_boxes((10, 10, 50, 100)), timestamp=t)
+
+        assert tracker.get_dwell_times() == {1: 3.0}
+        stats = tracker.get_stats()
+        assert stats["tracked_count"] == 1
+        assert stats["average_dwell_time"] == 3.0
+
+    def test_reset(self):
+        """TC11: reset() xoá track và thống kê"""
+        tracker = PersonTracker(min_hits=1, matching="greedy")
+        tracker.update(make_boxes((10, 10, 50, 100)), timestamp=0)
+
+        tracker.reset()
+
+        assert tracker.get_stats()["unique_count"] == 0
+        assert len(tracker.get_tracks()) == 0
@@ -0,0 +1,113 @@
+"""
+Unit tests for VideoBatchProcessor
+"""
+
+import cv2
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.core.data_logger import DataLogger
+from src.core.video_batch import VideoBatchProcessor, process_range, split_ranges
+
+FPS = 10
+SECONDS = 5
+
+
+class FakeDetector:
+    """Detector giả: số người = độ sáng trung bình của frame / 50"""
+
+    def detect_array_batch(self, frames):
+        return [
+            np.zeros((int(round(frame.mean() / 50)), 6), dtype=np.float32)
+            for frame in frames
+        ]
+
+
+@pytest.fixture(scope="module")
+def video_path(tmp_path_factory):
+    """Video 5 giây, 10 FPS; giây thứ s có s người (độ sáng 50 * s)"""
+    path = str(tmp_path_factory.mktemp("video") / "sample.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), FPS, (64, 48))
+    for index in range(FPS * SECONDS):
+        writer.write(np.full((48, 64, 3), 50 * (index // FPS), dtype=np.uint8))
+    writer.release()
+    return path
+
+
+class TestSplitRanges:
+    """Test cases for split_ranges"""
+
+    def test_ranges_cover_video_on_second_boundaries(self):
+        """TC1: Các đoạn liền nhau, bắt đầu ở frame đầu tiên của một giây"""
+        ranges = split_ranges(100, 29.97, 1)
+
+        assert ranges[0][0] == 0
+        assert ranges[-1][1] == 100
+        assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+        # Frame bắt đầu mỗi đoạn thuộc đúng giây mới, frame trước đó thuộc giây cũ
+        for second, (start, _) in enumerate(ranges):
+            assert int(start / 29.97) == second
+            if start:
+                assert int((start - 1) / 29.97) == second - 1
+
+    def test_empty_video(self):
+        """TC2: Video không có frame → không có đoạn nào"""
+        assert split_ranges(0, 30, 60) == []
+
+
+class TestVideoBatchProcessor:
+    """Test cases for VideoBatchProcessor class"""
+
+    def test_process_range_aggregates_per_second(self, video_path):
+        """TC3: Đoạn giữa video được seek đúng và tổng hợp theo giây"""
+        seconds = process_range(FakeDetector(), video_path, 20, 40, FPS, 4, 1)
+
+        assert [s["second"] for s in seconds] == [2, 3]
+        assert [s["frames"] for s in seconds] == [10, 10]
+        assert [s["mean"] for s in seconds] == [2.0, 3.0]
+        assert [s["detections"] for s in seconds] == [20, 30]
+        assert [s["with_persons"] for s in seconds] == [10, 10]
+
+    def test_frame_step_skips_frames(self, video_path):
+        """TC4: frame_step=5 chỉ detect 2 frame mỗi giây"""
+        seconds = process_range(FakeDetector(), video_path, 0, 20, FPS, 8, 5)
+
+        assert [s["frames"] for s in seconds] == [2, 2]
+        assert [s["max"] for s in seconds] == [0, 1]
+
+    def test_process_in_process(self, video_path, tmp_path):
+        """TC5: workers=0 xử lý toàn bộ video và ghi CSV theo giây"""
+        logger = DataLogger(str(tmp_path / "offline.csv"), enabled=True)
+        processor = VideoBatchProcessor(
+            workers=0, chunk_seconds=2, batch_size=4, detector_factory=FakeDetector
+        )
+
+        result = processor.process(video_path, data_logger=logger, start_time=1000.0)
+
+        assert result["summary"]["frames_processed"] == FPS * SECONDS
+        assert result["summary"]["chunks"] == 3
+        assert result["summary"]["max_count"] == SECONDS - 1
+        df = pd.read_csv(logger.filename)
+        assert df["person_count"].tolist() == [0, 1, 2, 3, 4]
+        assert df["timestamp"].tolist() == [1000.0, 1001.0, 1002.0, 1003.0, 1004.0]
+        assert df["total_detections"].iloc[-1] == FPS * (0 + 1 + 2 + 3 + 4)
+
+    def test_process_with_workers_matches_in_process(self, video_path):
+        """TC6: Chạy song song 2 process cho kết quả giống hệt, đúng thứ tự"""
+        serial = VideoBatchProcessor(
+            workers=0, chunk_seconds=1, detector_factory=FakeDetector
+        ).process(video_path, start_time=0.0)
+        parallel = VideoBatchProcessor(
+            workers=2, chunk_seconds=1, detector_factory=FakeDetector
+        ).process(video_path, start_time=0.0)
+
+        assert parallel["seconds"] == serial["seconds"]
+        assert parallel["summary"]["chunks"] == SECONDS
+
+    def test_missing_video_raises(self, tmp_path):
+        """TC7: File không mở được → IOError"""
+        processor = VideoBatchProcessor(workers=0, detector_factory=FakeDetector)
+
+        with pytest.raises(IOError):
+            processor.process(str(tmp_path / "missing.avi"))
@@ -0,0 +1,135 @@
+"""
+Unit tests for ZoneCounter
+"""
+
+import numpy as np
+import pytest
+
+from src.core.zones import ZoneCounter, points_in_polygons, segments_cross
+
+FRAME_SHAPE = (480, 640, 3)
+
+
+def box_at(x, y, size=20):
+    """Tạo box có tâm tại (x, y)"""
+    half = size / 2
+    return [x - half, y - half, x + half, y + half]
+
+
+class TestGeometry:
+    """Test cases for vectorized geometry helpers"""
+
+    def test_segments_cross_direction(self):
+        """TC1: Đi xuống qua vạch trái→phải là "in", đi lên là "out\" """
+        starts = np.array([[50.0, 40.0], [60.0, 60.0], [200.0, 40.0]])
+        ends = np.array([[50.0, 60.0], [60.0, 40.0], [200.0, 60.0]])
+
+        crossed, inward = segments_cross(
+            starts, ends, np.array([[0.0, 50.0]]), np.array([[100.0, 50.0]])
+        )
+
+        # Điểm thứ 3 nằm ngoài đoạn vạch
+        assert crossed[:, 0].tolist() == [True, True, False]
+        assert inward[:, 0].tolist() == [True, False, False]
+
+    def test_points_in_multiple_polygons(self):
+        """TC2: Kiểm tra điểm trong nhiều đa giác cùng lúc"""
+        square = np.array([[0, 0], [10, 0], [10, 10], [0, 10]], dtype=np.float64)
+        triangle = np.array([[20, 0], [30, 0], [25, 10]], dtype=np.float64)
+        polygons = [square, triangle]
+        edge_starts = np.concatenate(polygons)
+        edge_ends = np.concatenate([np.roll(p, -1, axis=0) for p in polygons])
+
+        inside = points_in_polygons(
+            np.array([[5.0, 5.0], [25.0, 3.0], [15.0, 5.0]]),
+            edge_starts,
+            edge_ends,
+            np.array([0, 4]),
+        )
+
+        assert inside.tolist() == [[True, False], [False, True], [False, False]]
+
+
+class TestZoneCounter:
+    """Test cases for ZoneCounter class"""
+
+    def test_from_config_empty_returns_none(self):
+        """TC3: Không cấu hình vạch/vùng → None"""
+        assert ZoneCounter.from_config(None) is None
+        assert ZoneCounter.from_config({"lines": {}, "zones": {}}) is None
+
+    def test_invalid_geometry_raises(self):
+        """TC4: Vạch < 2 điểm hoặc vùng < 3 điểm → ValueError"""
+        with pytest.raises(ValueError):
+            ZoneCounter(lines={"door": [(0, 0)]})
+        with pytest.raises(ValueError):
+            ZoneCounter(zones={"queue": {"polygon": [(0, 0), (1, 1)]}})
+
+    def test_line_in_out_counts(self):
+        """TC5: Đếm vào/ra qua vạch theo track, toạ độ tỉ lệ"""
+        counter = ZoneCounter(lines={"door": [(0, 0.5), (1, 0.5)]})
+
+        for y in range(100, 400, 50):
+            boxes = np.array([box_at(100, y), box_at(500, 500 - y)])
+            counter.update(boxes, np.array([1, 2]), FRAME_SHAPE)
+
+        assert counter.get_stats()["lines"]["door"] == {"in": 1, "out": 1}
+
+    def test_untracked_boxes_not_counted_on_lines(self):
+        """TC6: Box chưa có ID track không được đếm qua vạch"""
+        counter = ZoneCounter(lines={"door": [(0, 240), (640, 240)]})
+
+        for y in (200, 280):
+            counter.update(np.array([box_at(100, y)]), np.array([-1]), FRAME_SHAPE)
+
+        assert counter.get_stats()["lines"]["door"] == {"in": 0, "out": 0}
+
+    def test_zone_occupancy_and_entries(self):
+        """TC7: Số người trong vùng, số lần vào/ra và đỉnh"""
+        counter = ZoneCounter(
+            zones={
+                "left": {"polygon": [(0, 0), (320, 0), (320, 480), (0, 480)]},
+                "right": {
+                    "polygon": [(320, 0), (640, 0), (640, 480), (320, 480)],
+                    "max_count": 1,
+                },
+            }
+        )
+
+        counter.update(np.array([box_at(100, 100), box_at(200, 100)]), np.array([1, 2]))
+        counter.update(np.array([box_at(100, 100), box_at(400, 100)]), np.array([1, 2]))
+
+        zones = counter.get_stats()["zones"]
+        assert zones["left"] == {
+            "count": 1,
+            "peak": 2,
+            "entered": 2,
+            "exited": 1,
+            "max_count": None,
+        }
+        assert zones["right"]["count"] == 1
+        assert zones["right"]["entered"] == 1
+        assert zones["right"]["max_count"] == 1
+
+    def test_lost_track_counts_as_exit(self):
+        """TC8: Track mất quá stale_frames frame được tính là đã rời vùng"""
+        counter = ZoneCounter(
+            zones={"all": [(0, 0), (640, 0), (640, 480), (0, 480)]}, stale_frames=2
+        )
+        counter.update(np.array([box_at(100, 100)]), np.array([1]))
+        for _ in range(3):
+            counter.update(np.empty((0, 6)), np.empty(0, dtype=np.int64))
+
+        zones = counter.get_stats()["zones"]
+        assert zones["all"]["count"] == 0
+        assert zones["all"]["exited"] == 1
+
+    def test_reset(self):
+        """TC9: reset() xoá bộ đếm"""
+        counter = ZoneCounter(lines={"door": [(0, 240), (640, 240)]})
+        counter.update(np.array([box_at(100, 200)]), np.array([1]))
+        counter.update(np.array([box_at(100, 280)]), np.array([1]))
+
+        counter.reset()
+
+        assert counter.get_stats()["lines"]["door"] == {"in": 0, "out": 0}